@@ -22,7 +22,7 @@ class ContactRepository(BaseRepository[Contact]):
     async def get_by_client_id(
         self, client_id: str, page: int, limit: int, search: Optional[str] = None, sort: Optional[SortByCreatedAt] = None
     ):
-        async with self.session as db_session:
+        async with self.session.replica() as db_session:
             try:
                 query = (
                     select(Contact)
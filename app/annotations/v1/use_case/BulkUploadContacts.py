@@ -1,4 +1,3 @@
-import phonenumbers
 from typing import Dict, Any
 from fastapi import UploadFile
 
@@ -9,6 +8,7 @@ from app.user_management.user.models.Client import Client
 from app.user_management.user.models.User import User
 from app.user_management.user.services.UserService import UserService
 from app.utils.FileProcessor import FileProcessor
+from app.utils.PhoneNumberNormalizer import phone_number_normalizer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,12 +49,10 @@ class BulkUploadContacts:
                 error_message = str(e)
                 logger.error(f"Error in contact creation: {error_message}")
                 
-                try:
-                    full_phone_number = record['country_code'] + record['phone_number']
-                    parsed_number = phonenumbers.parse(full_phone_number, None)
-                    formatted_number = f"+{parsed_number.country_code}{parsed_number.national_number}"
-                except:
-                    formatted_number = record.get('country_code', '') + record.get('phone_number', '')
+                full_phone_number = record.get('country_code', '') + record.get('phone_number', '')
+                # Served from the cache: the same number was just parsed by _create_contact_from_record.
+                parsed_number = phone_number_normalizer.try_normalize(full_phone_number, require_valid=False)
+                formatted_number = parsed_number.country_code + parsed_number.national_number if parsed_number else full_phone_number
                 
                 if "already exists" in error_message:
                     already_exist_numbers.append(formatted_number)
@@ -114,13 +112,15 @@ class BulkUploadContacts:
 
         try:
             full_phone_number = record['country_code'] + record['phone_number']
-            parsed_number = phonenumbers.parse(full_phone_number, None)
+            parsed_number = phone_number_normalizer.try_normalize(full_phone_number, require_valid=False)
+            if parsed_number is None:
+                raise ValueError(f"Invalid phone number format: {full_phone_number}")
             
-            if not phonenumbers.is_valid_number(parsed_number):
+            if not parsed_number.is_valid:
                 raise ValueError(f"Invalid phone number: {full_phone_number}")
             
-            country_code = f"+{parsed_number.country_code}"
-            national_number = str(parsed_number.national_number)
+            country_code = parsed_number.country_code
+            national_number = parsed_number.national_number
             
             existing_contact = await self.contact_service.get_by_client_id_phone_number(
                 client_id, country_code + national_number, should_exist=False
@@ -142,7 +142,5 @@ class BulkUploadContacts:
             
             return contact
             
-        except phonenumbers.phonenumberutil.NumberParseException as e:
-            raise ValueError(f"Invalid phone number format: {e}")
         except Exception as e:
             raise ValueError(f"Error processing contact data: {str(e)}")
\ No newline at end of file
@@ -1,5 +1,5 @@
 
-import phonenumbers
+from app.utils.PhoneNumberNormalizer import phone_number_normalizer
 from app.annotations.models.Contact import Contact
 from app.annotations.models.ContactAttributeLink import ContactAttributeLink
 from app.annotations.models.ContactTagLink import ContactTagLink
@@ -29,8 +29,8 @@ class UpdateContact:
         if contact.client_id != client.id:
             raise BadRequestException("Contact does not belong to the user")
         
-        parsed_number = phonenumbers.parse(body.phone_number, None)
-        country_code = f"+{parsed_number.country_code}"
+        parsed_number = phone_number_normalizer.normalize(body.phone_number, require_valid=False)
+        country_code = parsed_number.country_code
         national_number = parsed_number.national_number
         
         attribute_links = []
@@ -2,10 +2,15 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.logs.LoggingBaseMiddleWare import  LoggingMiddleware
 from app.core.logs.logger_config import configure_structlog
+from app.core.metrics.MetricsMiddleware import MetricsMiddleware
+from app.core.metrics.metrics import metrics_endpoint
+from app.core.storage.UnitOfWorkMiddleware import UnitOfWorkMiddleware
+from app.core.tracing.TracingMiddleware import TracingMiddleware
+from app.core.tracing.tracer import configure_tracing
 from socketio import ASGIApp
 from starlette.middleware.sessions import SessionMiddleware
 from app.core.config.appstartup import lifespan
-from app.core.config.container import Container
+from app.core.config.container import get_container
 from app.core.config.settings import settings
 from app.core.exceptions.GlobalException import GlobalException
 from fastapi.middleware.gzip import GZipMiddleware
@@ -19,6 +24,14 @@ configure_structlog(
     service_name="whatsapp-service"
 )
 
+configure_tracing(
+    service_name="whatsapp-service",
+    exporter=settings.TRACE_EXPORTER,
+    file_path=settings.TRACE_FILE_PATH,
+    otlp_endpoint=settings.TRACE_OTLP_ENDPOINT,
+    sample_rate=settings.TRACE_SAMPLE_RATE
+)
+
 fastapi = FastAPI(
     lifespan=lifespan,
     title="ProgGate API",
@@ -31,10 +44,12 @@ fastapi = FastAPI(
     openapi_version="3.1.0" 
 )
 
-container = Container()
+container = get_container()
 container.socket_message_gateway()      
 sio_server = container.sio()  
 system_log_service = container.system_log_service()     
+log_shipper = container.log_shipper()
+fastapi.state.log_shipper = log_shipper
 error_handler = container.error_handler()
 container.wire(modules=[__name__])
 
@@ -54,7 +69,13 @@ fastapi.add_middleware(
     allow_headers=["*"],
 )
 
-fastapi.add_middleware(LoggingMiddleware,system_log_service=system_log_service, log_level=settings.APP_PROFILE)
+fastapi.add_middleware(
+    LoggingMiddleware,
+    system_log_service=system_log_service,
+    log_level=settings.APP_PROFILE,
+    log_shipper=log_shipper,
+    sample_rate=settings.HTTP_LOG_SAMPLE_RATE
+)
 
 fastapi.add_exception_handler(HTTPException, error_handler.handle_http_exception)
 fastapi.add_exception_handler(GlobalException, error_handler.handle_global_exception)
@@ -65,6 +86,10 @@ fastapi.add_exception_handler(
 )
 
 fastapi.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
+fastapi.add_middleware(UnitOfWorkMiddleware)
+fastapi.add_middleware(MetricsMiddleware)
+fastapi.add_middleware(TracingMiddleware)
+fastapi.add_route("/metrics", metrics_endpoint(settings.METRICS_AUTH_TOKEN), include_in_schema=False)
 fastapi.include_router(api_router_v1, prefix="/api/v1")
 fastapi.include_router(rabbitmq_router)
 
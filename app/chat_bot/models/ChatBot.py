@@ -20,6 +20,13 @@ class FlowNodeButtons(BaseModel):
     id : str
     next_node_id: Optional[str] = None
 
+class FlowNodeIdProjection(BaseModel):
+    id: str = Field(alias="_id")
+
+class FlowNodeBodyProjection(BaseModel):
+    id: str = Field(alias="_id")
+    body: Optional[Dict[str, Any]] = None
+
 class FlowNode(Document, BaseModelNoNone):
     id: str = Field(..., alias="_id")
     chat_bot_id:UUID = Indexed()
@@ -31,6 +38,7 @@ class FlowNode(Document, BaseModelNoNone):
     next_nodes: Optional[str] = None
     position: Optional[Dict[str, float]] = None
     service_hook: Optional[ServiceHook] = None
+    content_hash: Optional[str] = None
 
     created_at: datetime = Field(
         default_factory=DateTimeHelper.now_utc
@@ -1,4 +1,6 @@
 from typing import Optional, Dict, Any
+import msgspec
+from app.core.codec.records import ChatbotContext
 from app.core.storage.redis import AsyncRedisService
 from app.utils.DateTimeHelper import DateTimeHelper
 from app.utils.RedisHelper import RedisHelper
@@ -9,14 +11,9 @@ class ChatbotContextService:
         self.redis_service = redis_service
         self.context_ttl = 86400
     
-    async def get_chatbot_context(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+    async def get_chatbot_context(self, conversation_id: str) -> Optional[ChatbotContext]:
         key = RedisHelper.redis_chatbot_context_key(conversation_id)
-        context_data = await self.redis_service.get(key)
-        
-        if not context_data:
-            return None
-            
-        return context_data
+        return await self.redis_service.get(key, type=ChatbotContext)
 
     async def set_chatbot_context(
         self, 
@@ -26,14 +23,15 @@ class ChatbotContextService:
         previous_node_id: Optional[str] = None,
         additional_data: Optional[Dict[str, Any]] = None
     ) -> None:
-        context = {
-            "chatbot_id": chatbot_id,
-            "current_node_id": current_node_id,
-            "previous_node_id": previous_node_id,
-            "created_at": DateTimeHelper.now_utc(),
-            "updated_at": DateTimeHelper.now_utc(),
-            **(additional_data or {})
-        }
+        context = ChatbotContext(
+            chatbot_id=chatbot_id,
+            current_node_id=current_node_id,
+            previous_node_id=previous_node_id,
+            created_at=DateTimeHelper.now_utc(),
+            updated_at=DateTimeHelper.now_utc(),
+        )
+        if additional_data:
+            context = msgspec.structs.replace(context, **additional_data)
         
         key = RedisHelper.redis_chatbot_context_key(conversation_id)
         await self.redis_service.set(
@@ -17,6 +17,7 @@ from app.chat_bot.v1.use_case.MakeChatBotDefault import MakeChatBotDefault
 from app.chat_bot.v1.use_case.TriggerChatBot import TriggerChatBot
 from app.core.config.container import Container
 from app.core.exceptions.custom_exceptions.ClientExceptionHandler import ClientException
+from app.core.exceptions.custom_exceptions.ConflictException import ConflictException
 from app.core.exceptions.custom_exceptions.DataBaseException import DataBaseException
 from app.core.exceptions.custom_exceptions.UnAuthorizedException import UnAuthorizedException
 from app.core.security.JwtUtility import get_current_user
@@ -92,7 +93,7 @@ async def create_chat_bot(
     "/add_flow_node",
     responses={
         **generate_responses(
-            [UnAuthorizedException, DataBaseException, ClientException]
+            [UnAuthorizedException, DataBaseException, ClientException, ConflictException]
         )
     },
 )
@@ -112,6 +113,8 @@ async def add_chat_bot_flow_node(
         return response
     except UnAuthorizedException as e:
         raise e
+    except ConflictException as e:
+        raise e
     except DataBaseException as e:
         raise e
     except ClientException as e:
@@ -1,21 +1,26 @@
 from asyncio.log import logger
 from base64 import b64decode
 from io import BytesIO
+import hashlib
 import io
+import json
 from typing import Any, Dict, List
 
 from fastapi import UploadFile
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
 import uuid6
-from app.chat_bot.models.ChatBot import FlowNode, ServiceHook
+from app.chat_bot.models.ChatBot import FlowNode, FlowNodeIdProjection, ServiceHook
 from app.chat_bot.models.schema.chat_bot_body.DynamicChatBotRequest import DynamicChatBotRequest
 from app.chat_bot.models.schema.chat_bot_body.DynamicFlowNodBodyRequest import ContentItem, MessageContentNodeRequest, QuestionContentNodeRequest
 from app.chat_bot.models.schema.chat_bot_body.DynamicFlowNodeRequest import DynamicFlowNodeRequest
 from app.chat_bot.models.schema.interactive_body.DynamicInteractiveMessageRequest import DynamicInteractiveMessageRequest
 from app.chat_bot.services.ChatBotService import ChatBotService
 
+from app.core.exceptions.custom_exceptions.ConflictException import ConflictException
 from app.core.repository.MongoRepository import MongoCRUD
 from app.core.schemas.BaseResponse import ApiResponse
 from app.core.services.S3Service import S3Service
+from app.utils.DateTimeHelper import DateTimeHelper
 from app.utils.enums.FlowNodeType import FlowNodeType
 from app.utils.enums.InteractiveMessageEnum import HeaderType, InteractiveType
 from app.utils.enums.MessageContentType import MessageContentType
@@ -23,6 +28,10 @@ from app.whatsapp.business_profile.v1.services.BusinessProfileService import Bus
 from app.whatsapp.media.external_services.WhatsAppMediaApi import WhatsAppMediaApi
 
 
+# WhatsApp keeps uploaded media for 30 days; ids older than this are uploaded again.
+MEDIA_ID_TTL_SECONDS = 25 * 24 * 60 * 60
+
+
 class AddFlowNode:
     def __init__(
         self,
@@ -41,6 +50,7 @@ class AddFlowNode:
         self.aws_region = aws_region
         self.aws_s3_bucket_name = aws_s3_bucket_name
         self.mongo_crud_chat_bot = mongo_crud_chat_bot
+        self._media_cache: Dict[str, Dict[str, Any]] = {}
     
     async def execute(
         self,
@@ -51,15 +61,106 @@ class AddFlowNode:
             request_body.chatbot_id, 
         )
         
-        await self._delete_existing_flow_nodes(chat_bot_id=chat_bot.id)
+        submitted_ids = [node.id for node in request_body.nodes]
+        submitted_id_set = set(submitted_ids)
+        if len(submitted_id_set) < len(submitted_ids):
+            raise ConflictException("Flow node ids must be unique")
+        # Node ids are the documents' _id: one used by another chatbot must not be overwritten.
+        taken = await self.mongo_crud_chat_bot.find_many(
+            {"_id": {"$in": submitted_ids}, "chat_bot_id": {"$ne": chat_bot.id}},
+            limit=0,
+            projection=FlowNodeIdProjection
+        )
+        if taken:
+            raise ConflictException(
+                "Flow node ids already used by another chatbot",
+                details={"node_ids": [node.id for node in taken]}
+            )
+        
+        existing_nodes = await self.mongo_crud_chat_bot.find_many({"chat_bot_id": chat_bot.id}, limit=0)
+        existing_by_id = {node.id: node for node in existing_nodes}
+        
+        now = DateTimeHelper.now_utc()
+        self._media_cache = self._build_media_cache(existing_nodes)
+        operations = []
+        kept_nodes: List[FlowNode] = []
+        replaced_nodes: List[FlowNode] = []
+        unchanged_count = 0
         
         for node in request_body.nodes:
+            content_hash = self._compute_node_hash(node)
+            existing_node = existing_by_id.get(node.id)
+            
+            if existing_node and existing_node.content_hash == content_hash and not self._has_expired_media(existing_node):
+                kept_nodes.append(existing_node)
+                unchanged_count += 1
+                if existing_node.position != node.position:
+                    operations.append(UpdateOne(
+                        {"_id": node.id, "chat_bot_id": chat_bot.id},
+                        {"$set": {"position": node.position, "updated_at": now}}
+                    ))
+                continue
+            
             domain_node : FlowNode = await self.dispatch_nodes(node, business_profile_id)
             domain_node.chat_bot_id = chat_bot.id
-            await self.mongo_crud_chat_bot.create(domain_node)
+            domain_node.content_hash = content_hash
+            domain_node.updated_at = now
+            if existing_node:
+                domain_node.created_at = existing_node.created_at
+                replaced_nodes.append(existing_node)
+            kept_nodes.append(domain_node)
+            
+            operations.append(ReplaceOne(
+                {"_id": node.id, "chat_bot_id": chat_bot.id},
+                self.mongo_crud_chat_bot.to_mongo(domain_node),
+                upsert=True
+            ))
+        
+        removed_nodes = [node for node in existing_nodes if node.id not in submitted_id_set]
+        if removed_nodes:
+            operations.append(DeleteMany({
+                "chat_bot_id": chat_bot.id,
+                "_id": {"$nin": submitted_ids}
+            }))
+        
+        result = await self.mongo_crud_chat_bot.bulk_write(operations)
+        logger.debug(
+            f"Saved flow for chatbot {chat_bot.id}: "
+            f"{result.upserted_count + result.modified_count if result else 0} nodes written, "
+            f"{result.deleted_count if result else 0} removed, "
+            f"{unchanged_count} unchanged"
+        )
+        
+        await self._delete_unreferenced_media(
+            stale_nodes=replaced_nodes + removed_nodes,
+            current_nodes=kept_nodes
+        )
         
         return ApiResponse.success_response(data=None,message="added successfully" ,status_code=204)
     
+    def _compute_node_hash(self, node: DynamicFlowNodeRequest) -> str:
+        node_data = node.model_dump(exclude={"position"})
+        encoded = json.dumps(node_data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+    
+    def _build_media_cache(self, nodes: List[FlowNode]) -> Dict[str, Dict[str, Any]]:
+        media_cache = {}
+        for node in nodes:
+            for media_content in self._extract_media_from_node(node):
+                media_hash = media_content.get("content_hash")
+                if media_hash:
+                    media_cache[media_hash] = media_content
+        return media_cache
+    
+    @staticmethod
+    def _media_id_expired(media_content: Dict[str, Any]) -> bool:
+        # Media saved before uploads were timestamped counts as expired.
+        uploaded_at = media_content.get("media_uploaded_at") or 0
+        return DateTimeHelper.now_utc().timestamp() - uploaded_at > MEDIA_ID_TTL_SECONDS
+    
+    def _has_expired_media(self, node: FlowNode) -> bool:
+        return any(self._media_id_expired(media_content) for media_content in self._extract_media_from_node(node))
+    
     async def dispatch_nodes(self, node: DynamicFlowNodeRequest,business_id : str) -> FlowNode:
         content_payload = None
         service_hook = None
@@ -394,12 +495,20 @@ class AddFlowNode:
             logger.error(f"Failed to get bytes value: {str(e)}")
             raise ValueError(f"Failed to get bytes value from BytesIO: {str(e)}")
             
+        media_hash = hashlib.sha256(bytes_value).hexdigest()
+        cache_key = f"{media_hash}:{mime_type}"
+        cached_media = self._media_cache.get(cache_key)
+        if cached_media and not self._media_id_expired(cached_media):
+            logger.debug(f"Reusing uploaded media for hash {media_hash}")
+            return dict(cached_media)
+            
         upload_file = UploadFile(
             filename=file_name,
             file=io.BytesIO(bytes_value),  
         )
         
         business_profile = await self.business_service.get(business_id)
+        media_uploaded_at = DateTimeHelper.now_utc().timestamp()
         
         try:
             logger.debug("Uploading media to WhatsApp")
@@ -415,6 +524,12 @@ class AddFlowNode:
             logger.error(f"Failed to upload media to WhatsApp: {str(e)}")
             raise ValueError(f"Failed to upload media to WhatsApp: {str(e)}")
         
+        if cached_media:
+            # Only the WhatsApp id expired; the S3 copy is still the same file.
+            result = {**cached_media, "media_id": media_id, "media_uploaded_at": media_uploaded_at}
+            self._media_cache[cache_key] = result
+            return dict(result)
+        
         content_type = mime_type.split('/')[0] if mime_type else "unknown"
         
         try:
@@ -437,11 +552,14 @@ class AddFlowNode:
             "media_id": media_id,
             "file_name": file_name,
             "content_type": content_type,
-            "mime_type": mime_type
+            "mime_type": mime_type,
+            "content_hash": cache_key,
+            "media_uploaded_at": media_uploaded_at
         }
+        self._media_cache[cache_key] = result
         
         logger.debug(f"Media upload completed successfully: {result}")
-        return result
+        return dict(result)
 
     def _decode_base64_media(self, base64_data: str) -> BytesIO:
 
@@ -456,58 +574,48 @@ class AddFlowNode:
             raise ValueError(f"Failed to decode base64 data: {str(e)}")
         
 
-    async def _delete_existing_flow_nodes(self, chat_bot_id: str) -> None:
+    async def _delete_unreferenced_media(self, stale_nodes: List[FlowNode], current_nodes: List[FlowNode]) -> None:
+        if not stale_nodes:
+            return
+        
+        referenced_keys = set()
+        for node in current_nodes:
+            referenced_keys.update(self._extract_s3_keys_from_node(node))
+        
+        s3_keys_to_delete = []
+        for node in stale_nodes:
+            for s3_key in self._extract_s3_keys_from_node(node):
+                if s3_key not in referenced_keys and s3_key not in s3_keys_to_delete:
+                    s3_keys_to_delete.append(s3_key)
+        
+        if s3_keys_to_delete:
+            logger.debug(f"Deleting {len(s3_keys_to_delete)} unreferenced S3 media files")
+            await self._delete_s3_media_files(s3_keys_to_delete)
 
-        try:
-            logger.debug(f"Starting deletion of existing flow nodes for chatbot {chat_bot_id}")
-            
-            existing_nodes = await self.mongo_crud_chat_bot.find_many({"chat_bot_id": chat_bot_id})
-            
-            if not existing_nodes:
-                logger.debug(f"No existing flow nodes found for chatbot {chat_bot_id}")
-                return
-            
-            logger.debug(f"Found {len(existing_nodes)} existing flow nodes to delete")
-            
-            s3_keys_to_delete = []
-            
-            for node in existing_nodes:
-                s3_keys_from_node = self._extract_s3_keys_from_node(node)
-                s3_keys_to_delete.extend(s3_keys_from_node)
-            
-            if s3_keys_to_delete:
-                logger.debug(f"Deleting {len(s3_keys_to_delete)} S3 media files")
-                await self._delete_s3_media_files(s3_keys_to_delete)
-            
-            delete_result = await self.mongo_crud_chat_bot.delete_many({"chat_bot_id": chat_bot_id})
-            logger.debug(f"Deleted {delete_result.deleted_count if delete_result else 0} flow nodes from database")
-            
-            logger.debug("Successfully completed deletion of existing flow nodes and media")
-            
-        except Exception as e:
-            logger.error(f"Error deleting existing flow nodes for chatbot {chat_bot_id}: {str(e)}")
+    def _extract_media_from_node(self, node: FlowNode) -> List[Dict[str, Any]]:
+        media_items = []
+    
+        if not node.body:
+            return media_items
+    
+        for item in node.body.get("content_items", []):
+            if item.get("type") in ["image", "video", "document", "audio"]:
+                content = item.get("content") or {}
+                if content.get("s3_key"):
+                    media_items.append(content)
+    
+        header_meta = node.body.get("header", {})
+        if isinstance(header_meta, dict) and header_meta.get("s3_key"):
+            media_items.append({key: value for key, value in header_meta.items() if key != "type"})
+    
+        return media_items
 
     def _extract_s3_keys_from_node(self, node: FlowNode) -> List[str]:
         s3_keys = []
     
         try:
-            if not node.body:
-                return s3_keys
-    
-            content_items = node.body.get("content_items", [])
-            for item in content_items:
-                if item.get("type") in ["image", "video", "document", "audio"]:
-                    content = item.get("content", {})
-                    s3_key = content.get("s3_key")
-                    if s3_key:
-                        s3_keys.append(s3_key)
-    
-            header_meta = node.body.get("header", {})
-            if isinstance(header_meta, dict):
-                s3_key = header_meta.get("s3_key")
-                if s3_key:
-                    s3_keys.append(s3_key)
-    
+            for media_content in self._extract_media_from_node(node):
+                s3_keys.append(media_content["s3_key"])
         except Exception as e:
             logger.error(f"Error extracting S3 keys from node {getattr(node, 'id', None)}: {str(e)}")
     
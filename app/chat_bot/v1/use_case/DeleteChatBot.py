@@ -1,5 +1,5 @@
 from typing import List
-from app.chat_bot.models.ChatBot import FlowNode
+from app.chat_bot.models.ChatBot import FlowNode, FlowNodeBodyProjection
 from app.chat_bot.services.ChatBotService import ChatBotService
 
 from app.core.exceptions.custom_exceptions.ForbiddenException import ForbiddenException
@@ -34,7 +34,11 @@ class DeleteChatBot:
         try:
             self.logger.debug(f"Starting deletion of existing flow nodes for chatbot {chat_bot_id}")
             
-            existing_nodes = await self.mongo_crud_chat_bot.find_many({"chat_bot_id": chat_bot_id})
+            existing_nodes = await self.mongo_crud_chat_bot.find_many(
+                {"chat_bot_id": chat_bot_id},
+                limit=0,
+                projection=FlowNodeBodyProjection
+            )
             
             if not existing_nodes:
                 self.logger.debug(f"No existing flow nodes found for chatbot {chat_bot_id}")
@@ -53,14 +57,14 @@ class DeleteChatBot:
                 await self._delete_s3_media_files(s3_keys_to_delete)
             
             delete_result = await self.mongo_crud_chat_bot.delete_many({"chat_bot_id": chat_bot_id})
-            self.logger.debug(f"Deleted {delete_result.deleted_count if delete_result else 0} flow nodes from database")
+            self.logger.debug(f"Deleted {delete_result} flow nodes from database")
             
             self.logger.debug("Successfully completed deletion of existing flow nodes and media")
             
         except Exception as e:
             self.logger.error(f"Error deleting existing flow nodes for chatbot {chat_bot_id}: {str(e)}")
 
-    def _extract_s3_keys_from_node(self, node: FlowNode) -> List[str]:
+    def _extract_s3_keys_from_node(self, node: FlowNodeBodyProjection) -> List[str]:
         s3_keys = []
     
         try:
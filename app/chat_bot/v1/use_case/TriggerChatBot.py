@@ -3,6 +3,7 @@ from app.annotations.services.ContactService import ContactService
 from app.chat_bot.models.ChatBotMeta import ChatBotMeta
 from app.chat_bot.models.schema.request.TriggerChatBotRequest import TriggerChatBotRequest
 from app.chat_bot.services.ChatBotService import ChatBotService
+from app.core.codec.messages import TriggerChatbotPayload
 from app.core.exceptions.GlobalException import GlobalException
 from app.core.schemas.BaseResponse import ApiResponse
 from app.events.pub.ChatBotTriggerPublisher import ChatBotTriggerPublisher
@@ -38,14 +39,14 @@ class TriggerChatBot:
             
             contact : Contact = await self.contact_service.get_by_business_profile_and_contact_number(business_profile.phone_number, request_body.recipient_number)
             
-            publisher_data = {
-                "chatbot_id": str(chat_bot.id),
-                "conversation_id": str(conversation.id),
-                "recipient_number": request_body.recipient_number,
-                "business_phone_number_id": business_profile.phone_number_id,
-                "business_token": business_profile.access_token,
-                "contact_id": str(contact.id)
-            }
+            publisher_data = TriggerChatbotPayload(
+                chatbot_id=str(chat_bot.id),
+                conversation_id=str(conversation.id),
+                recipient_number=request_body.recipient_number,
+                business_phone_number_id=business_profile.phone_number_id,
+                business_token=business_profile.access_token,
+                contact_id=str(contact.id)
+            )
             
             await self.trigger_publisher.trigger_chatbot_event(data_body=publisher_data)
 
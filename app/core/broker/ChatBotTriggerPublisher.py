@@ -1,7 +1,9 @@
 from aio_pika import ExchangeType, Message, RobustConnection
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 import uuid6
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from aio_pika.pool import Pool
 from aio_pika.abc import AbstractChannel, AbstractRobustExchange
 
@@ -23,13 +25,13 @@ class ChatBotTriggerPublisher:
                 max_size=8
             )
     
-    async def publish_chatbot_event(self, payload: dict, routing_key: str = "trigger_chatbot_event"):
+    async def publish_chatbot_event(self, payload: TaskMessage, routing_key: str = "trigger_chatbot_event"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"]},
+            headers={"task": payload.task},
         )
         async with self._channel_pool.acquire() as channel:
             exchange : AbstractRobustExchange = await channel.declare_exchange(
@@ -37,18 +39,16 @@ class ChatBotTriggerPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
     
     async def trigger_chatbot_event(self, conversation_id:str , chatbot_id: str):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.trigger_chatbot_task",
-            "args": [{
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.trigger_chatbot_task",
+            args=[{
                 "conversation_id": conversation_id,
                 "chatbot_id": chatbot_id
             }],
-            "kwargs": {},
-            "retries": 5,
-            "eta": None
-        }
+            retries=5
+        )
         await self.publish_chatbot_event(payload)
\ No newline at end of file
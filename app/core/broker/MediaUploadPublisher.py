@@ -1,8 +1,10 @@
 import uuid6
 from aio_pika import ExchangeType, Message, RobustConnection
 from aio_pika.pool import Pool
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from app.whatsapp.broadcast.models.schema.BroadCastTemplate import TemplateObject
 from app.whatsapp.template.models.schema.SendTemplateRequest import SendTemplateRequest
 
@@ -24,13 +26,13 @@ class MediaUploadPublisher:
                 max_size=8
             )
 
-    async def publish_message(self, payload: dict, routing_key: str = "upload_media_event"):
+    async def publish_message(self, payload: TaskMessage, routing_key: str = "upload_media_event"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"]},
+            headers={"task": payload.task},
         )
         async with self._channel_pool.acquire() as channel:
             exchange = await channel.declare_exchange(
@@ -38,17 +40,15 @@ class MediaUploadPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
 
     async def upload_media(self, file_path: str,file_id: str):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.upload_media_task",
-            "args": [{
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.upload_media_task",
+            args=[{
                 "file_id": file_id
             }],
-            "kwargs": {},
-            "retries": 5,
-            "eta": None
-        }
+            retries=5
+        )
         await self.publish_message(payload)
\ No newline at end of file
@@ -3,8 +3,10 @@ from typing import Any
 import uuid6
 from aio_pika import ExchangeType, Message, RobustConnection
 from aio_pika.pool import Pool
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from app.whatsapp.broadcast.models.schema.BroadCastTemplate import BroadCastTemplate, TemplateObject
 from app.whatsapp.template.models.schema.SendTemplateRequest import SendTemplateRequest
 
@@ -26,13 +28,13 @@ class MessageBroadcastPublisher:
                 max_size=8
             )
 
-    async def publish_message(self, payload: dict, routing_key: str = "broadcast_messages"):
+    async def publish_message(self, payload: TaskMessage, routing_key: str = "broadcast_messages"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"]},
+            headers={"task": payload.task},
         )
         async with self._channel_pool.acquire() as channel:
             exchange = await channel.declare_exchange(
@@ -40,14 +42,14 @@ class MessageBroadcastPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
 
     async def broadcast_message(self, message_body: TemplateObject, contact_number: str, user_id: str,
                                 business_number: str, bussiness_token: str, business_number_id: str):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.template_broadcast",
-            "args": [{
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.template_broadcast",
+            args=[{
                 "user_id": user_id,
                 "business_number": business_number,
                 "content": SendTemplateRequest(
@@ -59,10 +61,8 @@ class MessageBroadcastPublisher:
                 "business_token": bussiness_token,
                 "business_number_id": business_number_id
             }],
-            "kwargs": {},
-            "retries": 5,
-            "eta": None
-        }
+            retries=5
+        )
         await self.publish_message(payload)
 
     async def publish_many( self, *, payloads: BroadCastTemplate, user_id: str, business_number: str,
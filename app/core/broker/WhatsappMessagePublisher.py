@@ -3,8 +3,10 @@ from typing import Any
 import uuid6
 from aio_pika import ExchangeType, Message, RobustConnection
 from aio_pika.pool import Pool
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 
 
 class WhatsappMessagePublisher:
@@ -25,13 +27,13 @@ class WhatsappMessagePublisher:
                 max_size=8
             )
 
-    async def publish_message(self, payload: dict, routing_key: str = "chat_messages"):
+    async def publish_message(self, payload: TaskMessage, routing_key: str = "chat_messages"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"]},
+            headers={"task": payload.task},
         )
         async with self._channel_pool.acquire() as channel:
             exchange = await channel.declare_exchange(
@@ -39,17 +41,14 @@ class WhatsappMessagePublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
 
     async def send_message(self, message_body: dict[str, Any]):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.status_whatsapp_message",
-            "args": [message_body],
-            "kwargs": {},
-            "retries": 0,
-            "eta": None
-        }
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.status_whatsapp_message",
+            args=[message_body]
+        )
         await self.publish_message(payload)
 
     async def send_multiple_messages(self, message_body: dict[str, Any], count: int):
@@ -0,0 +1,85 @@
+"""msgpack and JSON codec shared by the API and the Celery worker.
+
+Everything written to Redis or published to RabbitMQ goes through these encoders, so both
+processes agree on one wire format: msgspec msgpack, with UUIDs as strings and timezone-aware
+datetimes as msgpack timestamps. Values written before this codec used extension types 1
+(ISO datetime) and 2 (UUID), which the decoders still understand.
+
+Pass `type=` to decode straight into a `msgspec.Struct` (see `app.core.codec.records` and
+`app.core.codec.messages`); without it values decode to builtins. Only msgspec and the
+standard library are imported so the worker can use this module.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Type, TypeVar, Union
+
+import msgspec
+
+T = TypeVar("T")
+
+LEGACY_DATETIME_EXT = 1
+LEGACY_UUID_EXT = 2
+
+DecodeError = msgspec.DecodeError
+ValidationError = msgspec.ValidationError
+
+
+def _ext_hook(code: int, data: memoryview) -> Any:
+    if code == LEGACY_DATETIME_EXT:
+        value = datetime.fromisoformat(bytes(data).decode())
+        return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    if code == LEGACY_UUID_EXT:
+        return bytes(data).decode()
+    return msgspec.msgpack.Ext(code, bytes(data))
+
+
+def _json_enc_hook(obj: Any) -> Any:
+    # Matches the `json.dumps(default=str)` the Redis services used for JSON values.
+    return str(obj)
+
+
+_msgpack_encoder = msgspec.msgpack.Encoder()
+_json_encoder = msgspec.json.Encoder(enc_hook=_json_enc_hook)
+_msgpack_decoders: Dict[Any, msgspec.msgpack.Decoder] = {Any: msgspec.msgpack.Decoder(ext_hook=_ext_hook)}
+_json_decoders: Dict[Any, msgspec.json.Decoder] = {Any: msgspec.json.Decoder()}
+
+
+def _msgpack_decoder(type: Any) -> msgspec.msgpack.Decoder:
+    decoder = _msgpack_decoders.get(type)
+    if decoder is None:
+        decoder = _msgpack_decoders[type] = msgspec.msgpack.Decoder(type, ext_hook=_ext_hook)
+    return decoder
+
+
+def _json_decoder(type: Any) -> msgspec.json.Decoder:
+    decoder = _json_decoders.get(type)
+    if decoder is None:
+        decoder = _json_decoders[type] = msgspec.json.Decoder(type)
+    return decoder
+
+
+def encode(value: Any) -> bytes:
+    return _msgpack_encoder.encode(value)
+
+
+def decode(raw: Union[bytes, bytearray, memoryview], type: Optional[Type[T]] = None) -> T:
+    if type is None:
+        return _msgpack_decoders[Any].decode(raw)
+    try:
+        return _msgpack_decoder(type).decode(raw)
+    except ValidationError:
+        # Typed decoders only run `ext_hook` where the schema says Any, so a value holding the
+        # legacy extension types is decoded untyped and then converted.
+        return msgspec.convert(_msgpack_decoders[Any].decode(raw), type)
+
+
+def encode_json(value: Any) -> bytes:
+    return _json_encoder.encode(value)
+
+
+def decode_json(raw: Union[bytes, str], type: Optional[Type[T]] = None) -> T:
+    return _json_decoder(Any if type is None else type).decode(raw)
+
+
+def to_builtins(value: Any) -> Any:
+    """Structs to dicts (and datetimes to ISO strings) for code that still expects plain data."""
+    return msgspec.to_builtins(value)
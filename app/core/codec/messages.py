@@ -0,0 +1,83 @@
+"""Payloads exchanged over RabbitMQ between the API and the Celery worker.
+
+The API publishes Celery protocol-1 bodies (`TaskMessage`) straight to the task queues, with
+one of the payload structs below as the first argument. Celery hands task arguments to the
+worker as decoded builtins, so the worker reads the same fields by name.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import msgspec
+
+
+class TaskMessage(msgspec.Struct):
+    id: str
+    task: str
+    args: List[Any] = msgspec.field(default_factory=list)
+    kwargs: Dict[str, Any] = msgspec.field(default_factory=dict)
+    retries: int = 0
+    eta: Optional[str] = None
+
+
+class StatusBatchPayload(msgspec.Struct):
+    statuses: List[Dict[str, Any]]
+
+
+class TemplateBroadcastPayload(msgspec.Struct, kw_only=True):
+    user_id: str
+    business_number: str
+    business_token: str
+    business_number_id: str
+    original_template_body: Dict[str, Any]
+    whatsapp_message_body: Dict[str, Any]
+
+
+class TemplateBroadcastBatchPayload(TemplateBroadcastPayload, kw_only=True):
+    numbers: List[str]
+    # Set on retries: progress of the batch, so nothing already sent is sent again.
+    sent: Optional[List[Dict[str, Any]]] = None
+    persisted: Optional[List[List[str]]] = None
+    deferred: Optional[List[str]] = None
+
+
+class TriggerChatbotPayload(msgspec.Struct, kw_only=True):
+    conversation_id: str
+    chatbot_id: str
+    business_token: str
+    business_phone_number_id: str
+    recipient_number: str
+    contact_id: Optional[str] = None
+
+
+class FlowNodePayload(msgspec.Struct, kw_only=True):
+    conversation_id: str
+    current_node_id: str
+    business_data: Dict[str, Any]
+    button_id: Optional[str] = None
+    user_response: Optional[str] = None
+    chatbot_id: Optional[str] = None
+
+
+class ChatbotReplyEventPayload(msgspec.Struct, kw_only=True):
+    """Published by the worker on `chatbot_replies_exchange` for every chatbot message sent."""
+
+    conversation_id: str
+    chatbot_id: str
+    message_id: str
+    message_type: str
+    message_status: str
+    created_at: str
+    content: Dict[str, Any]
+    business_data: Optional[Dict[str, Any]] = None
+    is_from_contact: bool = False
+    event_type: str = "chatbot_reply"
+    timestamp: Optional[str] = None
+    is_final_node: bool = False
+    wa_message_id: Optional[str] = None
+    member_id: Optional[str] = None
+    current_node_id: Optional[str] = None
+    published_at: Optional[float] = None
+
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now(timezone.utc).isoformat()
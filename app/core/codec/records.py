@@ -0,0 +1,50 @@
+"""Records the API and the worker keep in Redis, decoded with `decode(raw, type=...)`.
+
+Field names are the wire names already in use, so values written as plain dicts before these
+types existed still decode. Unknown fields are ignored.
+"""
+from datetime import datetime
+from typing import Optional, Union
+
+import msgspec
+
+
+class SocketSession(msgspec.Struct, omit_defaults=True):
+    """`chat:user:user_info:{sid}`, written by the Socket.IO gateway on connect."""
+
+    user_id: str = msgspec.field(name="userId")
+    business_profile_id: str
+    connected_at: Optional[str] = None
+    worker_id: Union[int, str, None] = None
+
+
+class LastMessage(msgspec.Struct):
+    """`teaminbox:conversation:{id}:last_message`, shown in the inbox list."""
+
+    last_message: Optional[str] = None
+    last_message_time: Optional[str] = None
+
+
+class ChatbotContext(msgspec.Struct, omit_defaults=True):
+    """`chatbot:conversation:{id}`: where a conversation is in its chatbot flow."""
+
+    chatbot_id: Optional[str] = None
+    current_node_id: Optional[str] = None
+    conversation_id: Optional[str] = None
+    previous_node_id: Optional[str] = None
+    node_type: Optional[str] = None
+    waiting_for_response: bool = False
+    waiting_since: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class BusinessData(msgspec.Struct, omit_defaults=True):
+    """`chatbot:business_data:conversation:{id}`: what the worker needs to reply for a business."""
+
+    business_token: Optional[str] = None
+    business_phone_number_id: Optional[str] = None
+    recipient_number: Optional[str] = None
+    contact_id: Optional[str] = None
+    client_id: Optional[str] = None
+    chatbot_id: Optional[str] = None
@@ -0,0 +1,150 @@
+"""Creates the Postgres schema and seeds the demo roles, client, team, business profile and users.
+
+Run it once per deploy, before the API starts, instead of in every worker's startup:
+
+    python -m app.core.config.bootstrap
+
+Setting BOOTSTRAP_ON_STARTUP runs it from the app lifespan instead, which is only meant for a
+single local worker.
+"""
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.future import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config.settings import settings
+from app.core.storage.postgres import PostgresDatabase
+from app.user_management.user.models.Client import Client
+from app.user_management.auth.models.Role import Role
+from app.user_management.user.models.User import User
+from app.user_management.user.models.Team import Team
+from app.utils.enums.RoleEnum import RoleEnum
+from app.utils.encryption import get_hash
+from app.whatsapp.business_profile.v1.models.BusinessProfile import BusinessProfile
+
+ROLES = [
+    "ADMINISTRATOR",
+    "AUTOMATION_MANAGER",
+    "BROADCAST_MANAGER",
+    "DEVELOPER",
+    "DASHBOARD_VIEWER",
+    "TEMPLATE_MANAGER",
+    "BILLING_MANAGER",
+    "OPERATOR",
+    "Contact_MANAGER"
+]
+
+# Indexes declared on models after their table already existed: create_all only builds the
+# indexes of tables it creates, so existing databases get them here.
+LATE_INDEXES = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_messages_whatsapp_message_id ON messages (whatsapp_message_id)",
+]
+
+
+async def seed(db: AsyncSession) -> None:
+    # Create roles
+    async def get_or_create_role(role_name: str) -> Role:
+        result = await db.exec(
+            select(Role).filter_by(role_name=RoleEnum(role_name))
+        )
+        role = result.scalar_one_or_none()
+        if not role:
+            role = Role(
+                role_name=RoleEnum(role_name),
+                description=f"{role_name} role",
+            )
+            db.add(role)
+            await db.flush()
+        return role
+    # Initialize roles
+    for role_name in ROLES:
+        await get_or_create_role(role_name)
+    # Create or get client
+    result = await db.exec(select(Client))
+    client = result.scalar_one_or_none()
+    if not client:
+        client = Client(client_id=100)
+        db.add(client)
+        await db.flush()
+    # Create or get team
+    result = await db.exec(select(Team).filter_by(name="Example Team"))
+    team = result.scalar_one_or_none()
+    if not team:
+        team = Team(
+            name="Example Team",
+            description="A demo team for all 7 users",
+            client_id=client.id,
+            is_default=True,
+        )
+        db.add(team)
+        await db.flush()
+    # Create or get business profile
+    result = await db.exec(
+        select(BusinessProfile).filter_by(business_id="904055570973681")
+    )
+    business_profile = result.scalar_one_or_none()
+    if not business_profile:
+        business_profile = BusinessProfile(
+            business_id="904055570973681",
+            app_id="670614906139142",
+            phone_number="+15551546858",
+            phone_number_id="558569350676631",
+            whatsapp_business_account_id="1691192741820643",
+            access_token="EAAJh67NC8gYBO237KkRZCbYanv1YAIYLxJOX8h8jufguMqY1JgVpa9ZAJE9eoFHLtZBLduFZCpv9SQWym5Va4ZBzebFAbXHjVyuYNjFM1cdekWZAsnj4cN9Sk8hZB1KzmaGjZCMOiTtyQs9G571p0ZC1PBmAQH6TAq4PiEhQgzLk8jWoHndqMhqqZBcAjZCLZAekE1OSZCEXXZAnLHD5KgGltwek4XSz3SU4SiAWntTRWGHBT5r37IInoZD",
+            client_id=client.id,
+        )
+        db.add(business_profile)
+        await db.flush()
+    # Create users
+    result = await db.exec(select(User))
+    users = result.scalars().all()
+    emails_in_use = {u.email for u in users}
+    for i, role_name in enumerate(ROLES, start=1):
+        user_email = f"user{i}@example.com"
+        if user_email in emails_in_use:
+            continue
+        result = await db.exec(
+            select(Role).filter_by(role_name=RoleEnum(role_name))
+        )
+        user_role = result.scalar_one()
+        new_user = User(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email=user_email,
+            phone_number=f"+96279112204{i}",
+            password=get_hash(f"Password{i}"),
+            is_base_admin=(role_name == "ADMINISTRATOR"),
+            online_status=True,
+            client_id=client.id,
+        )
+        new_user.roles.append(user_role)
+        new_user.teams.append(team)
+        db.add(new_user)
+    await db.commit()
+
+
+async def create_late_indexes(db_instance: PostgresDatabase) -> None:
+    # CONCURRENTLY keeps the table writable while the index builds, but cannot run in a transaction.
+    async with db_instance._engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in LATE_INDEXES:
+            await conn.execute(text(statement))
+
+
+async def bootstrap(db_instance: PostgresDatabase) -> None:
+    await db_instance.init_db()
+    await create_late_indexes(db_instance)
+    async with db_instance._session_factory() as db:
+        await seed(db)
+
+
+async def main() -> None:
+    # Only Postgres is needed here, so the container (and every service it imports) is skipped.
+    db_instance = PostgresDatabase(settings.POSTGRES_DATABASE_URL)
+    try:
+        await bootstrap(db_instance)
+    finally:
+        await db_instance._engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,3 +1,4 @@
+from functools import cache
 from app.core.config.container_imports import *
 
 class Container(containers.DeclarativeContainer):
@@ -51,27 +52,14 @@ class Container(containers.DeclarativeContainer):
     )
     
     #----- AWS Config -----
-    boto_config = providers.Singleton(
-        BotoConfig,
-        region_name=config.AWS_REGION,
-        signature_version='v4',
-        retries={'max_attempts': 5, 'mode': 'standard'}
-    )
-    
-    aws_session = providers.Singleton(
-        boto3.Session,
+    s3_bucket_client = providers.Singleton(
+        create_s3_client,
         aws_access_key_id=config.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=config.AWS_SECRET_ACCESS_KEY,
         region_name=config.AWS_REGION
     )
-    
-    s3_bucket_client = providers.Singleton(
-        lambda session, boto_cfg: session.client('s3', config=boto_cfg),
-        session=aws_session,
-        boto_cfg=boto_config
-    )
     transfer_config = providers.Singleton(
-        TransferConfig,
+        create_transfer_config,
         multipart_threshold=1024 * 25,
         max_concurrency=10,
         multipart_chunksize=1024 * 25,
@@ -90,13 +78,11 @@ class Container(containers.DeclarativeContainer):
     )
     
     #----- STORAGE Config -----
-    psql = providers.Singleton(PostgresDatabase, db_url = config.POSTGRES_DATABASE_URL)
-    session = providers.Factory(
-        lambda db_instance: db_instance.create_session(),        
-        db_instance=psql
-    )
+    psql = providers.Singleton(PostgresDatabase, db_url = config.POSTGRES_DATABASE_URL, replica_url = config.POSTGRES_REPLICA_DATABASE_URL)
+    # Repositories share the request's unit of work (one connection) when one is open.
+    session = providers.Factory(SessionScope, db=psql)
 
-    http_client = providers.Singleton(httpx.AsyncClient, timeout=120)
+    http_client = providers.Singleton(create_async_client)
 
     mongo_db = providers.Singleton(MongoDB, db_url = config.MONGO_URI, db_name = config.MONGO_DB)
     
@@ -106,6 +92,9 @@ class Container(containers.DeclarativeContainer):
     )
     mongo_crud_message = providers.Singleton(MongoCRUD, model = Message) 
     mongo_crud_template = providers.Singleton(MongoCRUD, model = Template) 
+    # Message history and template listing may read from secondaries
+    mongo_crud_message_listing = providers.Singleton(MongoCRUD, model = Message, read_preference = config.MONGO_LISTING_READ_PREFERENCE)
+    mongo_crud_template_listing = providers.Singleton(MongoCRUD, model = Template, read_preference = config.MONGO_LISTING_READ_PREFERENCE)
     mongo_crud_chat_bot = providers.Singleton(MongoCRUD, model=FlowNode)
     mongo_crud_logger = providers.Singleton(MongoCRUD, model=Logger)
     
@@ -134,7 +123,7 @@ class Container(containers.DeclarativeContainer):
         namespace="",
         default_ttl=config.REDIS_TTL,
         use_msgpack=True,
-        
+        cluster=config.REDIS_CLUSTER,
     )
     
     #----- pub/sub -----
@@ -182,7 +171,11 @@ class Container(containers.DeclarativeContainer):
     note_service = providers.Factory(NoteService, repository = note_repository)
     chat_bot_service = providers.Factory(ChatBotService, repository = chat_bot_repository)
     chat_bot_context_service = providers.Singleton(ChatbotContextService, redis_service = async_redis_service)
+    conversation_window_service = providers.Singleton(ConversationWindowService, redis_service = async_redis_service)
+    unread_counter_service = providers.Singleton(UnreadCounterService, redis_service = async_redis_service)
+    conversation_change_log = providers.Singleton(ConversationChangeLog, redis_service = async_redis_service, max_entries = config.CONVERSATION_CHANGE_LOG_MAX_ENTRIES)
     system_log_service = providers.Singleton(SystemLogService, log_publisher = system_logs_publisher)
+    log_shipper = providers.Singleton(LogShipper, system_log_service = system_log_service)
 
     http_client = providers.Singleton(
         EnhancedHTTPClient,
@@ -202,8 +195,12 @@ class Container(containers.DeclarativeContainer):
         SocketMessageGateway,
         sio=sio,
         redis=async_redis_service,
-        business_profile_service=business_profile_service
+        business_profile_service=business_profile_service,
+        window_service=conversation_window_service,
+        unread_counters=unread_counter_service,
+        change_log=conversation_change_log,
     )   
+    chatbot_reply_dispatcher = providers.Singleton(ChatbotReplyDispatcher, socket_message = socket_message_gateway, lanes = config.CHATBOT_REPLY_LANES)
     
     #----- USER USE CASES -----
     user_create_user = providers.Factory(CreateUser, user_service = user_service, team_service = team_service, role_service = role_service)
@@ -239,7 +236,7 @@ class Container(containers.DeclarativeContainer):
     tag_get_tag_by_contact = providers.Factory(GetTagByContact, tag_service = tag_service)
     
     #----- WHATSAPP TEMPLATE USE CASES -----
-    whatsapp_template_get_templates = providers.Factory(GetTemplates, user_service = user_service,template_mongo_crud = mongo_crud_template)
+    whatsapp_template_get_templates = providers.Factory(GetTemplates, user_service = user_service,template_mongo_crud = mongo_crud_template_listing)
     whatsapp_template_create_template = providers.Factory(CreateTemplate, whatsapp_template_api = whatsapp_template_api, user_service = user_service, business_profile_service = business_profile_service , mongo_crud = mongo_crud_template, template_service = template_service)
     whatsapp_template_delete_template = providers.Factory(DeleteTemplate, whatsapp_template_api = whatsapp_template_api, user_service = user_service, business_profile_service = business_profile_service, template_service = template_service, mongo_crud = mongo_crud_template)
     
@@ -253,18 +250,20 @@ class Container(containers.DeclarativeContainer):
     
     
     #----- MESSAGE USE CASES -----
-    get_conversation_messages = providers.Factory(GetConversationMessages, conversation_service = conversation_service,user_service = user_service, mongo_crud = mongo_crud_message)
-    whatsapp_message_text_message = providers.Factory(TextMessage, whatsapp_message_api=whatsapp_message_api, user_service=user_service, business_profile_service=business_profile_service, message_service=message_service, conversation_service=conversation_service,contact_service=contact_service,redis_service=async_redis_service,mongo_crud=mongo_crud_message)  
-    whatsapp_message_template_message = providers.Factory(TemplateMessage, whatsapp_message_api=whatsapp_message_api, user_service=user_service, business_profile_service=business_profile_service, template_service=template_service, conversation_service=conversation_service,contact_service=contact_service,assignment_service=assignment_service,redis_service=async_redis_service,mongo_crud_message=mongo_crud_message, mongo_crud_template=mongo_crud_template, message_service=message_service)
-    whatsapp_message_media_message = providers.Factory(MediaMessage, whatsapp_message_api = whatsapp_message_api, whatsapp_media_api = whatsapp_media_api, user_service = user_service, business_profile_service = business_profile_service, message_service = message_service, conversation_service = conversation_service, contact_service = contact_service, assignment_service = assignment_service, s3_bucket_service = s3_bucket_service, aws_region = config.AWS_REGION, aws_s3_bucket_name = config.S3_BUCKET_NAME, redis_service = async_redis_service ,mongo_crud = mongo_crud_message)
-    whatsapp_message_reply_with_reaction = providers.Factory(ReplyWithReactionMessage, whatsapp_message_api = whatsapp_message_api, user_service = user_service, business_profile_service = business_profile_service, contact_service = contact_service, conversation_service = conversation_service,message_service = message_service, mongo_crud = mongo_crud_message, redis_service = async_redis_service)
-    whatsapp_message_location_message = providers.Factory(LocationMessage, whatsapp_message_api = whatsapp_message_api, user_service = user_service, business_profile_service = business_profile_service, redis_service = async_redis_service, contact_service = contact_service, message_service = message_service, mongo_crud = mongo_crud_message, conversation_service = conversation_service)
+    get_conversation_messages = providers.Factory(GetConversationMessages, conversation_service = conversation_service,user_service = user_service, mongo_crud = mongo_crud_message_listing)
+    whatsapp_message_text_message = providers.Factory(TextMessage, whatsapp_message_api=whatsapp_message_api, user_service=user_service, business_profile_service=business_profile_service, message_service=message_service, conversation_service=conversation_service,contact_service=contact_service,redis_service=async_redis_service,mongo_crud=mongo_crud_message, change_log=conversation_change_log)  
+    whatsapp_message_template_message = providers.Factory(TemplateMessage, whatsapp_message_api=whatsapp_message_api, user_service=user_service, business_profile_service=business_profile_service, template_service=template_service, conversation_service=conversation_service,contact_service=contact_service,assignment_service=assignment_service,redis_service=async_redis_service,mongo_crud_message=mongo_crud_message, mongo_crud_template=mongo_crud_template, message_service=message_service, change_log=conversation_change_log)
+    whatsapp_message_media_message = providers.Factory(MediaMessage, whatsapp_message_api = whatsapp_message_api, whatsapp_media_api = whatsapp_media_api, user_service = user_service, business_profile_service = business_profile_service, message_service = message_service, conversation_service = conversation_service, contact_service = contact_service, assignment_service = assignment_service, s3_bucket_service = s3_bucket_service, aws_region = config.AWS_REGION, aws_s3_bucket_name = config.S3_BUCKET_NAME, redis_service = async_redis_service ,mongo_crud = mongo_crud_message, change_log = conversation_change_log)
+    whatsapp_message_reply_with_reaction = providers.Factory(ReplyWithReactionMessage, whatsapp_message_api = whatsapp_message_api, user_service = user_service, business_profile_service = business_profile_service, contact_service = contact_service, conversation_service = conversation_service,message_service = message_service, mongo_crud = mongo_crud_message, redis_service = async_redis_service, change_log = conversation_change_log)
+    whatsapp_message_location_message = providers.Factory(LocationMessage, whatsapp_message_api = whatsapp_message_api, user_service = user_service, business_profile_service = business_profile_service, redis_service = async_redis_service, contact_service = contact_service, message_service = message_service, mongo_crud = mongo_crud_message, conversation_service = conversation_service, change_log = conversation_change_log)
     
     #----- Team Inbox USE CASES -----
-    get_conversations = providers.Factory(GetUserConversations, conversation_service = conversation_service, user_service = user_service, contact_service = contact_service, message_service = message_service, redis = async_redis_service)
-    create_new_conversation = providers.Factory(CreateNewConversation, conversation_service = conversation_service, contact_service = contact_service, client_service = client_service, team_service = team_service, user_service = user_service, message_service = message_service, whatsapp_message_api = whatsapp_message_api, assignment_service = assignment_service, business_profile_service = business_profile_service, mongo_crud = mongo_crud_message, mongo_template = mongo_crud_template, redis_service = async_redis_service)
-    update_conversation_status = providers.Factory(UpdateConversationStatus, conversation_service = conversation_service, socket_gateway = socket_message_gateway)
-    assigned_user_to_conversation = providers.Factory(AssignedUserToConversation, conversation_service = conversation_service, user_service = user_service, message_crud = mongo_crud_message, message_service = message_service, assignment_service = assignment_service, socket_gateway = socket_message_gateway)
+    get_conversations = providers.Factory(GetUserConversations, conversation_service = conversation_service, user_service = user_service, contact_service = contact_service, message_service = message_service, redis = async_redis_service, window_service = conversation_window_service, unread_counters = unread_counter_service)
+    get_unread_total = providers.Factory(GetUnreadTotal, unread_counters = unread_counter_service)
+    get_conversation_changes = providers.Factory(GetConversationChanges, user_service = user_service, conversation_service = conversation_service, change_log = conversation_change_log, get_conversations = get_conversations)
+    create_new_conversation = providers.Factory(CreateNewConversation, conversation_service = conversation_service, contact_service = contact_service, client_service = client_service, team_service = team_service, user_service = user_service, message_service = message_service, whatsapp_message_api = whatsapp_message_api, assignment_service = assignment_service, business_profile_service = business_profile_service, mongo_crud = mongo_crud_message, mongo_template = mongo_crud_template, redis_service = async_redis_service, change_log = conversation_change_log)
+    update_conversation_status = providers.Factory(UpdateConversationStatus, conversation_service = conversation_service, socket_gateway = socket_message_gateway, change_log = conversation_change_log)
+    assigned_user_to_conversation = providers.Factory(AssignedUserToConversation, conversation_service = conversation_service, user_service = user_service, message_crud = mongo_crud_message, message_service = message_service, assignment_service = assignment_service, socket_gateway = socket_message_gateway, change_log = conversation_change_log)
 
     #----- Notes -----
     note_create_note = providers.Factory(CreateNote, note_service = note_service, user_service = user_service, contact_service = contact_service)
@@ -294,13 +293,16 @@ class Container(containers.DeclarativeContainer):
     broadcast_schedule_broadcast = providers.Factory(BroadcastScheduler, broadcast_service = broadcast_service, user_service = user_service,contact_service = contact_service,bussiness_service = business_profile_service, redis = async_redis_service, message_publisher = message_broadcast_publisher, mongo_crud_template = mongo_crud_template) 
     broadcast_cancel_broadcast = providers.Factory(CancelBroadcast, broadcast_service = broadcast_service, redis_service = async_redis_service)
     broadcast_broadcast_config = providers.Singleton(BroadcastConfig,redis_service = async_redis_service, broadcast_scheduler = broadcast_schedule_broadcast)
+    leader_election = providers.Singleton(LeaderElection, redis_service = async_redis_service, lease_ttl = config.LEADER_LEASE_TTL_SECONDS, renew_interval = config.LEADER_RENEW_INTERVAL_SECONDS)
+    conversation_expiry_sweeper = providers.Singleton(ConversationExpirySweeper, window_service = conversation_window_service, conversation_service = conversation_service, socket_message = socket_message_gateway, interval = config.CONVERSATION_EXPIRY_SWEEP_INTERVAL, batch_size = config.CONVERSATION_EXPIRY_SWEEP_BATCH_SIZE)
     
     #----- Operations -----
-    save_message_document = providers.Factory(SaveMessage, message_service = message_service,message_repo = mongo_crud_message, redis_service = async_redis_service)
+    save_message_document = providers.Factory(SaveMessage, message_service = message_service,message_repo = mongo_crud_message, redis_service = async_redis_service, change_log = conversation_change_log)
 
    
     #----- RealTime -----
     template_hook = providers.Singleton(TemplateHook, template_service = template_service, client_service = client_service, business_profile_service = business_profile_service, mongo_crud = mongo_crud_template, wa_template_api = whatsapp_template_api)
+    message_status_pipeline = providers.Singleton(MessageStatusPipeline, message_publisher = message_publisher, mongo_message = mongo_crud_message, socket_message = socket_message_gateway)
     message_hook = providers.Singleton(
         MessageHook, 
         message_service = message_service,
@@ -323,6 +325,8 @@ class Container(containers.DeclarativeContainer):
         socket_message = socket_message_gateway, 
         s3_service = s3_bucket_service,
         message_hook_received_publisher = message_hook_received_publisher, 
+        message_status_pipeline = message_status_pipeline,
+        window_service = conversation_window_service,
         aws_s3_bucket = config.S3_BUCKET_NAME, 
         aws_region = config.AWS_REGION
         )
@@ -339,3 +343,13 @@ class Container(containers.DeclarativeContainer):
     #----- error and logger -----
     error_handler = providers.Singleton(ErrorHandler, log_service = system_log_service)    
 
+
+
+@cache
+def get_container() -> Container:
+    """The process's container, built and wired on first use and shared by the app and its lifespan.
+
+    Every `Container()` re-wires all modules and gets its own singletons (engine, Redis pool,
+    HTTP client), so nothing else should instantiate it.
+    """
+    return Container()
@@ -41,7 +41,8 @@ from app.core.exceptions.ErrorHandler import ErrorHandler
 from app.core.logs.LogCRUD import LogCRUD
 from app.core.logs.LoggingBaseMiddleWare import LoggingMiddleware
 from app.core.logs.SystemLogService import SystemLogService
-from app.core.services.HTTPClient import EnhancedHTTPClient
+from app.core.logs.LogShipper import LogShipper
+from app.core.services.HTTPClient import EnhancedHTTPClient, create_async_client
 from app.events.pub.ChatBotTriggerPublisher import ChatBotTriggerPublisher
 from app.events.pub.ChatbotFlowPublisher import ChatbotFlowPublisher
 from app.chat_bot.v1.use_case.MakeChatBotDefault import MakeChatBotDefault
@@ -52,11 +53,13 @@ from app.events.pub.SystemLogsPublisher import SystemLogsPublisher
 from app.events.pub.WhatsappMessagePublisher import  WhatsappMessagePublisher
 
 from app.core.repository.MongoRepository import MongoCRUD
-from app.core.services.S3Service import S3Service
+from app.core.services.S3Service import S3Service, create_s3_client, create_transfer_config
 from app.core.storage.redis import AsyncRedisService
 from app.events.pub.test_everything import TestPublisher
 from app.real_time.socketio.socket_gateway import SocketMessageGateway
 from app.real_time.webhook.services.MessageHook import MessageHook
+from app.real_time.webhook.services.MessageStatusPipeline import MessageStatusPipeline
+from app.events.sub.ChatbotReplyDispatcher import ChatbotReplyDispatcher
 from app.real_time.webhook.services.TemplateHook import TemplateHook
 from app.real_time.webhook.services.WebhookDispatcher import WebhookDispatcher
 from app.user_management.user.repositories.UserRepository import UserRepository
@@ -65,6 +68,7 @@ from app.user_management.user.v1.use_case.EditTeam import EditTeam
 from app.whatsapp.broadcast.repositories.BroadCastRepository import BroadcastRepository
 from app.whatsapp.broadcast.services.BroadCastService import BroadcastService
 from app.whatsapp.broadcast.use_case.BroadcastConfig import BroadcastConfig
+from app.core.services.LeaderElection import LeaderElection
 from app.whatsapp.broadcast.use_case.BroadcastScheduler import BroadcastScheduler
 from app.whatsapp.broadcast.use_case.CancelBroadcast import CancelBroadcast
 from app.whatsapp.broadcast.use_case.GetBroadcasts import GetBroadcasts
@@ -90,10 +94,16 @@ from app.whatsapp.team_inbox.repositories.ConversationRepository import Conversa
 from app.whatsapp.team_inbox.repositories.MessageRepository import MessageRepository
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
+from app.whatsapp.team_inbox.services.ConversationWindowService import ConversationWindowService
+from app.whatsapp.team_inbox.services.UnreadCounterService import UnreadCounterService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
+from app.whatsapp.team_inbox.operations.ConversationExpirySweeper import ConversationExpirySweeper
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.whatsapp.team_inbox.v1.use_case.AssignedUserToConversation import AssignedUserToConversation
 from app.whatsapp.team_inbox.v1.use_case.GetConversationMessages import GetConversationMessages
 from app.whatsapp.team_inbox.v1.use_case.GetUserConversations import GetUserConversations
+from app.whatsapp.team_inbox.v1.use_case.GetUnreadTotal import GetUnreadTotal
+from app.whatsapp.team_inbox.v1.use_case.GetConversationChanges import GetConversationChanges
 from app.whatsapp.team_inbox.v1.use_case.CreateNewConversation import CreateNewConversation
 from app.whatsapp.team_inbox.v1.use_case.LocationMessage import LocationMessage
 from app.whatsapp.team_inbox.v1.use_case.MediaMessage import MediaMessage
@@ -119,7 +129,7 @@ from app.user_management.auth.v1.use_case.TokenRefresh import TokenRefresh
 from app.user_management.auth.v1.use_case.UserLogin import UserLogin
 from app.user_management.auth.v1.use_case.UserLogout import UserLogout
 from app.core.config.settings import Settings
-from app.core.storage.postgres import PostgresDatabase, create_session
+from app.core.storage.postgres import PostgresDatabase, SessionScope, create_session
 from app.user_management.user.repositories.ClientRepository import ClientRepository
 from app.user_management.user.repositories.TeamRepository import TeamRepository
 from app.user_management.user.services.ClientService import ClientService
@@ -135,10 +145,7 @@ from app.user_management.user.v1.use_case.GetUsersByClientId import GetUsersByCl
 from app.whatsapp. business_profile.v1.repository.BusinessProfileRepository import BusinessProfileRepository
 from app.whatsapp.template.external_services.WhatsAppTemplateApi import WhatsAppTemplateApi
 from app.whatsapp.template.v1.usecase.GetTemplates import GetTemplates
-from botocore.config import Config as BotoConfig
-from boto3.s3.transfer import TransferConfig
 from socketio import AsyncServer,AsyncRedisManager
 from app.core.logs.loggers import Logger
 from app.core.storage.MongoDB import MongoDB
-import boto3
 import httpx
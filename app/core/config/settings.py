@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -24,6 +25,7 @@ class Settings(BaseSettings):
     REDIS_DB: int
     CACHE_URL: str
     REDIS_TTL: int
+    REDIS_CLUSTER: bool = False
 
     # Rate Limit
     RATE_LIMIT: int
@@ -31,6 +33,7 @@ class Settings(BaseSettings):
 
     # WhatsApp API
     WHATSAPP_API_VERSION: str
+    WHATSAPP_API_BASE_URL: str = "https://graph.facebook.com"
     WHATSAPP_WEBHOOK_VERIFY_TOKEN: str
     
     SESSION_SECRET_KEY: str
@@ -42,12 +45,16 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_DATABASE_URL_CELERY: str
+    # Optional streaming replica for listing queries (inbox, contacts, users, broadcasts)
+    POSTGRES_REPLICA_DATABASE_URL: Optional[str] = None
 
     # Mongo DB
     MONGO_USER: str
     MONGO_PASSWORD: str
     MONGO_DB: str
     MONGO_URI: str
+    # Read preference for message history and template listing, e.g. "secondaryPreferred"
+    MONGO_LISTING_READ_PREFERENCE: str = "primary"
     
     # RabbitMQ
     RABBITMQ_HOST: str
@@ -56,6 +63,40 @@ class Settings(BaseSettings):
     RABBITMQ_DEFAULT_USER: str
     RABBITMQ_DEFAULT_PASS: str
     RABBITMQ_URI: str
+    CHATBOT_REPLY_PREFETCH: int = 64
+    CHATBOT_REPLY_LANES: int = 8
+
+    # Conversations whose 24h customer-service window closed are expired in batches on this interval
+    CONVERSATION_EXPIRY_SWEEP_INTERVAL: float = 60.0
+    CONVERSATION_EXPIRY_SWEEP_BATCH_SIZE: int = 500
+
+    # Conversations kept per business in the inbox change log; clients with an older version token resync
+    CONVERSATION_CHANGE_LOG_MAX_ENTRIES: int = 10000
+
+    # Singleton jobs (broadcast listener, expiry sweeper) run in whichever worker holds this lease
+    LEADER_LEASE_TTL_SECONDS: int = 15
+    LEADER_RENEW_INTERVAL_SECONDS: float = 5.0
+
+    # Create tables and seed demo data in the app lifespan; deployments run
+    # `python -m app.core.config.bootstrap` once instead
+    BOOTSTRAP_ON_STARTUP: bool = False
+
+    # Requests and socket events over this many Postgres statements, or repeating one statement
+    # this often (N+1), are logged with the statement
+    DB_QUERY_COUNT_WARN_THRESHOLD: int = 50
+    DB_REPEATED_QUERY_WARN_THRESHOLD: int = 10
+
+    # Share of ordinary (fast, successful, non-GET) requests shipped to the system log
+    HTTP_LOG_SAMPLE_RATE: float = 0.01
+
+    # Bearer token Prometheus sends to scrape /metrics; unset hides the endpoint
+    METRICS_AUTH_TOKEN: Optional[str] = None
+
+    # Tracing: "none", "file" (JSON lines) or "otlp" (OTLP/HTTP JSON collector)
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_SAMPLE_RATE: float = 1.0
     
     CORS_ORIGIN_URL: str
 
@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from app.core.logs.SystemLogService import SystemLogService
+from app.core.logs.logger import get_logger
+
+logger = get_logger("LogShipper")
+
+LOG_SHIPPER_CAPACITY = 10_000
+MAX_SHIP_BATCH_SIZE = 50
+
+
+class LogShipper:
+    """Moves request logs off the request path.
+
+    `submit` never waits: records go into a bounded queue that a background task drains into
+    SystemLogService. When the broker falls behind and the queue fills up, new records are
+    dropped and counted instead of slowing responses down.
+    """
+
+    def __init__(
+        self,
+        system_log_service: SystemLogService,
+        capacity: int = LOG_SHIPPER_CAPACITY,
+        max_batch_size: int = MAX_SHIP_BATCH_SIZE,
+    ):
+        self.system_log_service = system_log_service
+        self.capacity = capacity
+        self.max_batch_size = max_batch_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.shipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self._dropped_reported = 0
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def _ensure_started(self) -> None:
+        if self._worker is not None and not self._worker.done():
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.capacity)
+        self._worker = asyncio.create_task(self._run(), name="log-shipper")
+
+    async def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            results = await asyncio.gather(
+                *(self.system_log_service.log_business_event(**record) for record in batch),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    self.failed += 1
+                else:
+                    self.shipped += 1
+            for _ in batch:
+                self._queue.task_done()
+
+            if self.dropped - self._dropped_reported >= 1000:
+                self._dropped_reported = self.dropped
+                await logger.awarning("Log shipper queue full, dropping request logs", dropped=self.dropped)
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        if self._queue is None or self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            await logger.awarning("Log shipper drain timed out", pending=self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "shipped": self.shipped,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
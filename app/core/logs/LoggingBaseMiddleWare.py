@@ -1,37 +1,51 @@
 from contextvars import ContextVar
+import random
 import time
-from typing import Set
-import uuid6
-from structlog.contextvars import bind_contextvars, clear_contextvars
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from typing import Any, Dict, Optional, Set
+from starlette.datastructures import Headers, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.logs.LogShipper import LogShipper
 from app.core.logs.SystemLogService import SystemLogService
 from app.core.logs.logger import get_logger
-from app.utils.enums.LogLevel import LogLevel
 
 request_id_ctx: ContextVar[str] = ContextVar('request_id', default='SYSTEM')
 correlation_id_ctx: ContextVar[str] = ContextVar('correlation_id', default='GLOBAL')
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    
-    def __init__(self, app, system_log_service: SystemLogService, log_level: str = "WARNING"):
-        super().__init__(app)
+SLOW_REQUEST_MS = 1000
+
+class LoggingMiddleware:
+    """Pure ASGI request logger.
+
+    Errors, slow requests and everything in DEBUG are always logged; other write requests
+    are sampled. Records are handed to a LogShipper, so the response never waits on the broker.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        system_log_service: SystemLogService,
+        log_level: str = "WARNING",
+        log_shipper: Optional[LogShipper] = None,
+        sample_rate: float = 0.01,
+    ):
+        self.app = app
         self.logger = get_logger("HTTP")
         self.log_level = log_level.upper()
         self.system_log_service = system_log_service
-        
+        self.log_shipper = log_shipper or LogShipper(system_log_service)
+        self.sample_rate = sample_rate
+
         self.skip_paths: Set[str] = {
-            "/health", 
-            "/ping", 
+            "/health",
+            "/ping",
             "/metrics",
             "/favicon.ico",
             "/docs",
             "/redoc",
             "/openapi.json"
         }
-        
+
         self.reduced_logging_paths: Set[str] = {
             "/health",
             "/metrics"
@@ -40,95 +54,98 @@ class LoggingMiddleware(BaseHTTPMiddleware):
     def should_log_request(self, path: str, method: str) -> bool:
         if any(path.startswith(skip) for skip in self.skip_paths):
             return False
-        
+
         if method != "GET":
             return True
-            
+
         return self.log_level == "DEBUG"
 
     def should_log_response(self, path: str, status_code: int, duration_ms: int) -> bool:
         if status_code >= 400:
             return True
-            
-        if duration_ms > 1000:
+
+        if duration_ms > SLOW_REQUEST_MS:
             return True
-            
+
         if any(path.startswith(sensitive) for sensitive in self.reduced_logging_paths):
             return False
-            
+
         return self.log_level == "DEBUG"
 
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or any(scope["path"].startswith(skip) for skip in self.skip_paths):
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            response = await call_next(request)
-            duration_ms = (time.time() - start_time) * 1000
-            
-            try:
-                await self.system_log_service.log_business_event(
-                    event_type="http_request",
-                    message=f"{request.method} {request.url.path} - {response.status_code} ({round(duration_ms, 2)}ms)",
-                    level="info",
-                    user_id=getattr(request.state, 'user_id', None) if hasattr(request, 'state') else None,
-                    request_id=getattr(request.state, 'request_id', None) if hasattr(request, 'state') else request.headers.get("X-Request-ID"),
-                    correlation_id=getattr(request.state, 'correlation_id', None) if hasattr(request, 'state') else request.headers.get("X-Correlation-ID"),
-                    context={
-                        "method": request.method,
-                        "path": str(request.url.path),
-                        "status_code": response.status_code,
-                        "duration_ms": round(duration_ms, 2),
-                        "client_ip": request.client.host if request.client else None,
-                        "user_agent": request.headers.get("user-agent"),
-                        "query_params": dict(request.query_params) if request.query_params else None,
-                        "content_type": request.headers.get("content-type")
-                    }
-                )
-                
-            except Exception as log_error:
-                print(f"Failed to log request: {log_error}") 
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            duration_ms = (time.time() - start_time) * 1000
-            
-            try:
-                if hasattr(self.system_log_service, 'log_business_event'):
-                    log_service = self.system_log_service
-                else:
-                    log_service = self.system_log_service()
-                
-                await log_service.log_business_event(
-                    event_type="http_error",
-                    message=f"HTTP Error: {request.method} {request.url.path} - {type(e).__name__}: {str(e)}",
-                    level="error",
-                    user_id=getattr(request.state, 'user_id', None) if hasattr(request, 'state') else None,
-                    request_id=getattr(request.state, 'request_id', None) if hasattr(request, 'state') else request.headers.get("X-Request-ID"),
-                    correlation_id=getattr(request.state, 'correlation_id', None) if hasattr(request, 'state') else request.headers.get("X-Correlation-ID"),
-                    context={
-                        "method": request.method,
-                        "path": str(request.url.path),
-                        "error": str(e),
-                        "error_type": type(e).__name__,
-                        "duration_ms": round(duration_ms, 2),
-                        "client_ip": request.client.host if request.client else None,
-                        "user_agent": request.headers.get("user-agent")
-                    }
-                )
-                
-            except Exception as log_error:
-                print(f"Failed to log error: {log_error}") 
-            
-            raise e
-
-    def _get_client_ip(self, request: Request) -> str:
-        forwarded_for = request.headers.get("X-Forwarded-For")
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            self._ship(scope, "http_error", "error",
+                f"HTTP Error: {scope['method']} {scope['path']} - {type(e).__name__}: {str(e)}",
+                {
+                    "error": str(e),
+                    "error_type": type(e).__name__,
+                    "duration_ms": round(duration_ms, 2),
+                }
+            )
+            raise
+
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        path, method = scope["path"], scope["method"]
+        if not self.should_log_response(path, status_code, duration_ms):
+            if not self.should_log_request(path, method) or random.random() >= self.sample_rate:
+                return
+
+        self._ship(scope, "http_request", "info",
+            f"{method} {path} - {status_code} ({round(duration_ms, 2)}ms)",
+            {
+                "status_code": status_code,
+                "duration_ms": round(duration_ms, 2),
+                "query_params": dict(QueryParams(scope["query_string"])) if scope.get("query_string") else None,
+            }
+        )
+
+    def _ship(self, scope: Scope, event_type: str, level: str, message: str, context: Dict[str, Any]) -> None:
+        headers = Headers(scope=scope)
+        state = scope.get("state") or {}
+        try:
+            self.log_shipper.submit({
+                "event_type": event_type,
+                "message": message,
+                "level": level,
+                "user_id": state.get("user_id"),
+                "request_id": state.get("request_id") or headers.get("X-Request-ID"),
+                "correlation_id": state.get("correlation_id") or headers.get("X-Correlation-ID"),
+                "context": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    **context,
+                    "client_ip": self._get_client_ip(scope, headers),
+                    "user_agent": headers.get("user-agent"),
+                    "content_type": headers.get("content-type"),
+                },
+            })
+        except Exception as log_error:
+            self.logger.error("Failed to queue request log", error=str(log_error))
+
+    def _get_client_ip(self, scope: Scope, headers: Headers) -> str:
+        forwarded_for = headers.get("X-Forwarded-For")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
-        
-        real_ip = request.headers.get("X-Real-IP")
+
+        real_ip = headers.get("X-Real-IP")
         if real_ip:
             return real_ip
-        
-        return request.client.host if request.client else "unknown"
\ No newline at end of file
+
+        client = scope.get("client")
+        return client[0] if client else "unknown"
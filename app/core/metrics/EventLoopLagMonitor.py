@@ -0,0 +1,53 @@
+import asyncio
+import time
+from typing import Optional
+
+from app.core.logs.logger import get_logger
+from app.core.metrics.metrics import EVENT_LOOP_LAG_MAX_SECONDS, EVENT_LOOP_LAG_SECONDS
+
+logger = get_logger("EventLoopLagMonitor")
+
+
+class EventLoopLagMonitor:
+    """Sleeps for a fixed interval and records how much later than asked the loop woke it up.
+
+    Anything that blocks the loop (sync I/O, heavy CPU in a handler) shows up here before it
+    shows up as request latency.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 20, warn_threshold: float = 0.25) -> None:
+        self.interval = interval
+        self.window = window
+        self.warn_threshold = warn_threshold
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="event-loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        worst = 0.0
+        samples = 0
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            EVENT_LOOP_LAG_SECONDS.observe(lag)
+            worst = max(worst, lag)
+            samples += 1
+            if samples >= self.window:
+                EVENT_LOOP_LAG_MAX_SECONDS.set(worst)
+                if worst >= self.warn_threshold:
+                    await logger.awarning("Event loop lag above threshold", max_lag_seconds=round(worst, 3))
+                worst = 0.0
+                samples = 0
@@ -0,0 +1,41 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_IN_PROGRESS
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and labels it with the matched route template
+    (`/api/v1/message/{message_id}`, not the concrete path) to keep label cardinality bounded."""
+
+    def __init__(self, app: ASGIApp, skip_paths: frozenset = frozenset({"/metrics"})) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            # The router stores the matched route on the scope it was handed.
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            ).observe(time.perf_counter() - started)
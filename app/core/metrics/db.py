@@ -0,0 +1,20 @@
+"""Database call metrics shared by the API and the Celery worker.
+
+Both processes import these from here so the series are registered once per process, with the
+same buckets, and a dashboard can put API and worker latency of the same backend side by side.
+"""
+from prometheus_client import Counter, Histogram
+
+DB_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DB_CALL_SECONDS = Histogram(
+    "db_call_duration_seconds",
+    "Latency of Postgres, Mongo and Redis calls.",
+    ["backend", "operation"],
+    buckets=DB_LATENCY_BUCKETS,
+)
+DB_CALL_ERRORS = Counter(
+    "db_call_errors_total",
+    "Failed Postgres, Mongo and Redis calls.",
+    ["backend", "operation"],
+)
@@ -0,0 +1,93 @@
+"""Latency hooks for the Postgres, Mongo and Redis clients used by the API.
+
+Postgres and Mongo calls made inside a traced request are also recorded as child spans.
+"""
+import time
+
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import ClusterPipeline
+from redis.exceptions import RedisClusterException
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.metrics.metrics import DB_CALL_ERRORS, DB_CALL_SECONDS, observe_latency
+from app.core.tracing.tracer import record_span
+
+
+def _statement_verb(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def instrument_sqlalchemy(engine: AsyncEngine, backend: str = "postgres") -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+        context._trace_started_ns = time.time_ns()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        verb = _statement_verb(statement)
+        DB_CALL_SECONDS.labels(backend, verb).observe(time.perf_counter() - context._metrics_started)
+        record_span(f"{backend} {verb}", context._trace_started_ns, attributes={"db.statement": statement[:300]}, kind="client")
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        DB_CALL_ERRORS.labels(backend, _statement_verb(exception_context.statement or "")).inc()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Passed to the Mongo client through `event_listeners`; the driver reports the
+    server round trip of every command, including the ones Beanie issues."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        DB_CALL_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+        self._record_span(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        DB_CALL_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+        DB_CALL_ERRORS.labels("mongo", event.command_name).inc()
+        self._record_span(event, error=str(event.failure))
+
+    def _record_span(self, event, error=None) -> None:
+        end_ns = time.time_ns()
+        record_span(f"mongo {event.command_name}", end_ns - event.duration_micros * 1000, end_ns,
+                    {"db.name": event.database_name}, kind="client", error=error)
+
+
+class InstrumentedPipeline(aioredis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with observe_latency("redis", "PIPELINE"):
+            return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        with observe_latency("redis", str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class InstrumentedClusterPipeline(ClusterPipeline):
+    async def execute(self, raise_on_error: bool = True, allow_redirections: bool = True):
+        with observe_latency("redis", "PIPELINE"):
+            return await super().execute(raise_on_error, allow_redirections)
+
+
+class InstrumentedRedisCluster(aioredis.RedisCluster):
+    async def execute_command(self, *args, **kwargs):
+        with observe_latency("redis", str(args[0]).upper()):
+            return await super().execute_command(*args, **kwargs)
+
+    def pipeline(self, transaction=None, shard_hint=None) -> InstrumentedClusterPipeline:
+        if shard_hint or transaction:
+            raise RedisClusterException("Cluster pipelines are not transactional and take no shard hint")
+        return InstrumentedClusterPipeline(self)
@@ -0,0 +1,160 @@
+"""Prometheus metrics shared by every API process.
+
+When PROMETHEUS_MULTIPROC_DIR is set (it must be, before the first import, whenever uvicorn
+or gunicorn runs more than one worker) prometheus_client writes samples to mmap files in that
+directory and `/metrics` aggregates all of them, so a scrape sees the whole API and not just
+the worker that happened to answer it.
+"""
+import hmac
+import os
+import re
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.metrics.db import DB_CALL_ERRORS, DB_CALL_SECONDS
+from app.core.tracing.tracer import inject, start_span
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template.",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "API requests currently being served.",
+    multiprocess_mode="livesum",
+)
+
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a sleeping sampler.",
+    buckets=LATENCY_BUCKETS,
+)
+EVENT_LOOP_LAG_MAX_SECONDS = Gauge(
+    "event_loop_lag_max_seconds",
+    "Worst event loop lag seen in the last sampling window.",
+    multiprocess_mode="max",
+)
+
+DB_QUERIES_PER_UNIT_OF_WORK = Histogram(
+    "db_queries_per_unit_of_work",
+    "Postgres statements run by one HTTP request or socket event.",
+    ["method", "route"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+)
+
+RABBITMQ_PUBLISH_SECONDS = Histogram(
+    "rabbitmq_publish_duration_seconds",
+    "Time from publish to broker confirm (channels are opened with publisher_confirms).",
+    ["exchange", "routing_key", "outcome"],
+    buckets=LATENCY_BUCKETS,
+)
+
+SOCKETIO_CONNECTIONS = Gauge(
+    "socketio_connections",
+    "Authenticated Socket.IO connections.",
+    multiprocess_mode="livesum",
+)
+SOCKETIO_EMITS = Counter(
+    "socketio_emits_total",
+    "Socket.IO emits by event and kind of room.",
+    ["event", "room_kind"],
+)
+
+_UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$")
+
+
+def room_kind(room) -> str:
+    """Collapses a room name to a bounded label: conversation ids are UUIDs, business rooms are
+    phone number ids, and everything else is a single socket's sid."""
+    if room is None:
+        return "broadcast"
+    room = str(room)
+    if _UUID_RE.match(room):
+        return "conversation"
+    if room.isdigit():
+        return "business"
+    return "session"
+
+
+@contextmanager
+def observe_latency(backend: str, operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DB_CALL_ERRORS.labels(backend, operation).inc()
+        raise
+    finally:
+        DB_CALL_SECONDS.labels(backend, operation).observe(time.perf_counter() - started)
+
+
+async def publish_confirmed(exchange, message, routing_key: str):
+    """exchange.publish() on a confirming channel only returns once the broker acked.
+
+    The message also carries the current trace context so the consumer continues the trace.
+    """
+    started = time.perf_counter()
+    outcome = "ack"
+    try:
+        with start_span(f"amqp.publish {routing_key}", {"messaging.destination": exchange.name}, kind="producer"):
+            inject(message.headers)
+            message.headers.setdefault("published_at", time.time())
+            return await exchange.publish(message, routing_key=routing_key)
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        RABBITMQ_PUBLISH_SECONDS.labels(exchange.name, routing_key, outcome).observe(time.perf_counter() - started)
+
+
+def is_multiprocess() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def metrics_registry() -> CollectorRegistry:
+    if not is_multiprocess():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead() -> None:
+    """Drops this process's live gauges so connection counts don't outlive the worker."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_endpoint(auth_token: Optional[str]):
+    """The /metrics route; scrapers must send `Authorization: Bearer <auth_token>`.
+
+    Without a configured token the route answers 404, so metrics are never public by default.
+    """
+    expected = f"Bearer {auth_token}".encode() if auth_token else None
+
+    async def endpoint(request: Request) -> Response:
+        if expected is None:
+            return Response(status_code=404)
+        if not hmac.compare_digest(request.headers.get("authorization", "").encode(), expected):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+    return endpoint
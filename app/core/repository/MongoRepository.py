@@ -1,14 +1,26 @@
 from typing import TypeVar, Generic, Type, List, Optional, Dict, Any, Union
 from datetime import datetime, timezone
 from pydantic import BaseModel
-from beanie import Document
+from beanie import BulkWriter, Document, UpdateResponse
+from beanie.odm.utils.encoder import Encoder
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
 from fastapi import HTTPException, status
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+from pymongo.results import BulkWriteResult
 
 T = TypeVar('T', bound=Document)
+P = TypeVar('P', bound=BaseModel)
 
 class MongoCRUD(Generic[T]):
-    def __init__(self, model: Type[T]):
+    def __init__(self, model: Type[T], read_preference: Optional[str] = None):
+        """`read_preference` (e.g. "secondaryPreferred") applies to `find_many` and `count`, for
+        instances used by listing endpoints that can read from secondaries."""
         self.model = model
+        self.read_preference = (
+            make_read_preference(read_pref_mode_from_name(read_preference), None)
+            if read_preference and read_preference != "primary" else None
+        )
             
     async def create(self, data: T) -> T:
         try:    
@@ -23,15 +35,16 @@ class MongoCRUD(Generic[T]):
     async def get_by_id(self, id: Any) -> Optional[T]:
         return await self.model.get(id)
     
-    async def find_one(self, query: Dict[str, Any]) -> Optional[T]:
-        return await self.model.find_one(query)
+    async def find_one(self, query: Dict[str, Any], projection: Optional[Type[P]] = None) -> Optional[Union[T, P]]:
+        return await self.model.find_one(query, projection_model=projection)
     
     async def find_many(self, 
                     query: Dict[str, Any] = None, 
                     skip: int = 0, 
                     limit: int = 100,
-                    sort: List[tuple] = None) -> List[T]:
-        find_query = self.model.find(query or {})
+                    sort: List[tuple] = None,
+                    projection: Optional[Type[P]] = None) -> List[Union[T, P]]:
+        find_query = self.model.find(query or {}, projection_model=projection)
         
         if skip:
             find_query = find_query.skip(skip)
@@ -41,64 +54,74 @@ class MongoCRUD(Generic[T]):
         if sort:
             for field, direction in sort:
                 find_query = find_query.sort((field, direction))
+
+        if self.read_preference is not None:
+            # Beanie has no per-query read preference; run its query on a collection handle with one.
+            cursor = self._collection().find(
+                filter=find_query.get_filter_query(),
+                sort=find_query.sort_expressions,
+                projection=get_projection(find_query.projection_model),
+                skip=find_query.skip_number,
+                limit=find_query.limit_number,
+            )
+            return [parse_obj(find_query.projection_model, document) for document in await cursor.to_list(None)]
                 
         return await find_query.to_list()
+
+    def _collection(self):
+        collection = self.model.get_motor_collection()
+        if self.read_preference is not None:
+            collection = collection.with_options(read_preference=self.read_preference)
+        return collection
+    
+    async def find_one_and_update(self,
+                query: Dict[str, Any],
+                update: Dict[str, Any],
+                return_new: bool = True) -> Optional[T]:
+        response_type = UpdateResponse.NEW_DOCUMENT if return_new else UpdateResponse.OLD_DOCUMENT
+        return await self.model.find_one(query).update(update, response_type=response_type)
     
     async def update(self, 
                 id: Any, 
                 data: Union[Dict[str, Any], BaseModel],
-                partial: bool = True) -> Optional[T]:
-        document = await self.get_by_id(id)
-        if not document:
-            return None
-            
+                partial: bool = True,
+                return_new: bool = True) -> Optional[T]:
         if isinstance(data, BaseModel):
             data_dict = data.dict(exclude_unset=True) if partial else data.dict()
         else:
-            data_dict = data
-            
+            data_dict = dict(data)
+        
+        data_dict.pop("id", None)
+        data_dict.pop("_id", None)
         data_dict["updated_at"] = datetime.now(tz=timezone.utc)
         
-        if partial:
-            await document.update({"$set": data_dict})
-        else:
-            for key, value in data_dict.items():
-                setattr(document, key, value)
-            await document.save()
-            
-        return await self.get_by_id(id)
+        return await self.find_one_and_update({"_id": id}, {"$set": data_dict}, return_new=return_new)
     
     async def delete(self, id: Any) -> bool:
-        document = await self.get_by_id(id)
-        if not document:
-            return False
-            
-        await document.delete()
-        return True
+        result = await self.model.find_one({"_id": id}).delete()
+        return bool(result and result.deleted_count)
+    
     async def delete_many(self, query: Dict[str, Any], use_hooks: bool = False) -> int:
         if use_hooks:
             documents = await self.model.find(query).to_list()
-            deleted_count = 0
-            for doc in documents:
-                await doc.delete()
-                deleted_count += 1
-            return deleted_count
+            if not documents:
+                return 0
+            async with BulkWriter(ordered=False, object_class=self.model) as bulk_writer:
+                for doc in documents:
+                    await doc.delete(bulk_writer=bulk_writer)
+            return len(documents)
         else:
             result = await self.model.find(query).delete()
             return result.deleted_count
 
     async def soft_delete(self, id: Any, field_name: str = "is_active") -> bool:
-        document = await self.get_by_id(id)
-        if not document:
-            return False
-            
-        await document.update({
+        result = await self.model.find_one({"_id": id}).update({
             "$set": {
                 field_name: False,
                 "updated_at": datetime.now(tz=timezone.utc)
             }
         })
-        return True
+        return bool(result and result.matched_count)
     
     async def bulk_create(self, items: List[Dict[str, Any]]) -> List[T]:
 
@@ -129,12 +152,22 @@ class MongoCRUD(Generic[T]):
         result = await self.model.find(query).delete()
         return result.deleted_count
     
+    async def bulk_write(self, operations: List[Any], ordered: bool = False) -> Optional[BulkWriteResult]:
+        if not operations:
+            return None
+        return await self.model.get_motor_collection().bulk_write(operations, ordered=ordered)
+
+    def to_mongo(self, document: T) -> Dict[str, Any]:
+        return Encoder(to_db=True).encode(document)
+
     async def count(self, query: Dict[str, Any] = None) -> int:
+        if self.read_preference is not None:
+            return await self._collection().count_documents(self.model.find(query or {}).get_filter_query())
         return await self.model.find(query or {}).count()
     
     async def exists(self, query: Dict[str, Any]) -> bool:
-        count = await self.count(query)
-        return count > 0
+        document = await self.model.get_motor_collection().find_one(query, {"_id": 1})
+        return document is not None
         
     async def search(self, 
                 search_text: str, 
@@ -2,11 +2,12 @@ from app.core.config.settings import settings
 
 
 API_VERSION = settings.WHATSAPP_API_VERSION
+API_BASE_URL = settings.WHATSAPP_API_BASE_URL
 
 
 class BaseWhatsAppBusinessApi:
     def __init__(self):
-        self.base_url = f"https://graph.facebook.com/{API_VERSION}"
+        self.base_url = f"{API_BASE_URL}/{API_VERSION}"
 
     def _get_headers(self, access_token, content_type=None):
         if content_type:
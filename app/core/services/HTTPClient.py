@@ -1,35 +1,156 @@
+import asyncio
+import importlib.util
+import random
+import re
+import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
 from fastapi import Request
 import httpx
 
 from app.core.exceptions.GlobalException import GlobalException
 from app.core.logs.SystemLogService import SystemLogService
+from app.core.tracing.tracer import start_span
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 40
+MAX_CONNECTIONS_PER_HOST = 50
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=5.0, write=60.0, pool=5.0)
+
+SUCCESS_LOG_SAMPLE_RATE = 0.01
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_SECONDS = 30.0
+
+_ID_SEGMENT = re.compile(r"/(?:\d+|[0-9a-fA-F-]{16,})(?=/|$)")
+
+_current_request: ContextVar[Optional[Request]] = ContextVar("http_client_request", default=None)
+_current_user_id: ContextVar[Optional[str]] = ContextVar("http_client_user_id", default=None)
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """Pooled client for Graph API traffic; HTTP/2 is used when the `h2` package is installed."""
+    return httpx.AsyncClient(
+        timeout=REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+
+
+class LatencyHistogram:
+    """Cumulative latency buckets for one endpoint"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        for index, bound in enumerate(self.buckets):
+            if elapsed_ms <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after consecutive failures, lets one probe through after the cool-down"""
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, recovery_timeout: float = CIRCUIT_RECOVERY_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.recovery_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+        # A probe that never reported back (e.g. cancelled) does not block the host forever.
+        now = time.monotonic()
+        if self._probe_started_at is None or now - self._probe_started_at >= self.recovery_timeout:
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probe_started_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probe_started_at = None
 
 
 class EnhancedHTTPClient:
     """Enhanced HTTP client wrapper with automatic error logging"""
     
-    def __init__(self, client: httpx.AsyncClient, log_service: SystemLogService):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        log_service: SystemLogService,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        success_log_sample_rate: float = SUCCESS_LOG_SAMPLE_RATE,
+    ):
         self.client = client
         self.log_service = log_service
-        self._current_request: Optional[Request] = None
-        self._current_user_id: Optional[str] = None
+        self.max_connections_per_host = max_connections_per_host
+        self.success_log_sample_rate = success_log_sample_rate
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[str, LatencyHistogram] = {}
+
+    @property
+    def _current_request(self) -> Optional[Request]:
+        return _current_request.get()
+
+    @property
+    def _current_user_id(self) -> Optional[str]:
+        return _current_user_id.get()
 
     @asynccontextmanager
     async def request_context(self, request: Optional[Request] = None, user_id: Optional[str] = None):
         """Context manager to set request context for logging"""
-        old_request = self._current_request
-        old_user_id = self._current_user_id
-        
-        self._current_request = request
-        self._current_user_id = user_id
+        request_token = _current_request.set(request)
+        user_id_token = _current_user_id.set(user_id)
         
         try:
             yield self
         finally:
-            self._current_request = old_request
-            self._current_user_id = old_user_id
+            _current_request.reset(request_token)
+            _current_user_id.reset(user_id_token)
 
     async def get(self, url: str, **kwargs) -> httpx.Response:
         """GET request with enhanced error handling"""
@@ -53,11 +174,31 @@ class EnhancedHTTPClient:
 
     async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
         """Internal request method with error handling and logging"""
+        host = httpx.URL(str(url)).host
+        breaker = self._breakers.setdefault(host, CircuitBreaker())
+        if not breaker.allow_request():
+            raise GlobalException(
+                message=f"External service unavailable: circuit open for {host}",
+                status_code=503,
+                error_code="EXTERNAL_SERVICE_UNAVAILABLE",
+                details={"service": host, "circuit": breaker.state}
+            )
+
+        started_at = time.perf_counter()
         try:
-            response = await self.client.request(method, url, **kwargs)
+            with start_span(self._endpoint_key(method, url), {"http.host": host}, kind="client") as span:
+                async with self._host_limit(host):
+                    response = await self.client.request(method, url, **kwargs)
+                span.set_attribute("http.status_code", response.status_code)
+            self._observe_latency(method, url, started_at)
+            
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
             
-            # Log successful external API calls for important endpoints
-            if self._should_log_success(url, response.status_code):
+            # Log a sample of successful external API calls for important endpoints
+            if response.is_success and self._should_log_success(url, response.status_code):
                 await self.log_service.log_business_event(
                     event_type="external_api_success",
                     message=f"External API call successful: {method} {url}",
@@ -92,6 +233,8 @@ class EnhancedHTTPClient:
             )
             
         except httpx.RequestError as exc:
+            breaker.record_failure()
+            self._observe_latency(method, url, started_at)
             # Log network/connection errors
             await self.log_service.log_external_api_error(
                 api_name=f"External API ({exc.request.url.host if exc.request else 'unknown'})",
@@ -192,18 +335,43 @@ class EnhancedHTTPClient:
 
     def _should_log_success(self, url: str, status_code: int) -> bool:
         """Determine if successful requests should be logged"""
-        # Only log success for important endpoints
+        # Only log a sample of successes for important endpoints
         important_endpoints = [
             "whatsapp", "facebook", "payment", "auth", "webhook"
         ]
         
-        return any(endpoint in str(url).lower() for endpoint in important_endpoints)
+        if not any(endpoint in str(url).lower() for endpoint in important_endpoints):
+            return False
+        return random.random() < self.success_log_sample_rate
 
     def _get_response_time(self, response: httpx.Response) -> Optional[int]:
         """Extract response time if available"""
         try:
-            # httpx doesn't provide response time directly, but you can calculate it
-            # if you stored the start time before the request
-            return None  # Implement if needed
+            return int(response.elapsed.total_seconds() * 1000)
         except:
-            return None
\ No newline at end of file
+            return None
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return limit
+
+    @staticmethod
+    def _endpoint_key(method: str, url: str) -> str:
+        parsed = httpx.URL(str(url))
+        return f"{method} {parsed.host}{_ID_SEGMENT.sub('/{id}', parsed.path)}"
+
+    def _observe_latency(self, method: str, url: str, started_at: float) -> None:
+        key = self._endpoint_key(method, url)
+        histogram = self._latency.get(key)
+        if histogram is None:
+            histogram = self._latency[key] = LatencyHistogram()
+        histogram.observe((time.perf_counter() - started_at) * 1000)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Latency histograms per endpoint and circuit state per host"""
+        return {
+            "latency": {key: histogram.snapshot() for key, histogram in self._latency.items()},
+            "circuits": {host: breaker.state for host, breaker in self._breakers.items()},
+        }
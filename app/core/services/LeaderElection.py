@@ -0,0 +1,117 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, List, Optional, Tuple
+from app.core.logs.logger import get_logger
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+
+logger = get_logger("LeaderElection")
+
+LEASE_TTL_SECONDS = 15
+RENEW_INTERVAL_SECONDS = 5.0
+
+ACQUIRE_SCRIPT = """
+return redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2])
+"""
+
+# Renew and release only act on a lease this process still holds; a lease that already expired
+# and was taken by another process is left alone.
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+Job = Tuple[Callable[[], Awaitable[None]], Callable[[], Awaitable[None]]]
+
+
+class LeaderElection:
+    """Runs registered jobs in exactly one process of the deployment, through a Redis lease.
+
+    Every worker competes for the lease; the holder starts the jobs and renews the lease every
+    `renew_interval`. If it cannot renew (lost lease, Redis unreachable) it stops its jobs, and
+    once the lease lapses after `lease_ttl` another worker takes over.
+    """
+
+    def __init__(
+        self,
+        redis_service: AsyncRedisService,
+        name: str = "api",
+        lease_ttl: int = LEASE_TTL_SECONDS,
+        renew_interval: float = RENEW_INTERVAL_SECONDS,
+    ) -> None:
+        self.key = RedisHelper.redis_leader_lease_key(name)
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+        self.is_leader = False
+        self._jobs: List[Job] = []
+        self._task: Optional[asyncio.Task] = None
+        self._acquire = redis_service.register_script(ACQUIRE_SCRIPT)
+        self._renew = redis_service.register_script(RENEW_SCRIPT)
+        self._release = redis_service.register_script(RELEASE_SCRIPT)
+
+    def register(self, start: Callable[[], Awaitable[None]], stop: Callable[[], Awaitable[None]]) -> None:
+        self._jobs.append((start, stop))
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="leader-election")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._step_down()
+            try:
+                await self._release(keys=[self.key], args=[self.token])
+            except Exception as e:
+                await logger.awarning("Could not release leader lease", error=str(e))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self.is_leader:
+                    if not await self._renew(keys=[self.key], args=[self.token, self.lease_ttl * 1000]):
+                        await logger.awarning("Leader lease lost", token=self.token)
+                        await self._step_down()
+                elif await self._acquire(keys=[self.key], args=[self.token, self.lease_ttl * 1000]):
+                    await self._take_over()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await logger.aexception("Leader election round failed", error=str(e))
+                if self.is_leader:
+                    # Without a confirmed lease another worker may take over; stop before it does.
+                    await self._step_down()
+            await asyncio.sleep(self.renew_interval)
+
+    async def _take_over(self) -> None:
+        self.is_leader = True
+        await logger.ainfo("Acquired leader lease", token=self.token, jobs=len(self._jobs))
+        for start, _ in self._jobs:
+            await start()
+
+    async def _step_down(self) -> None:
+        self.is_leader = False
+        for _, stop in reversed(self._jobs):
+            try:
+                await stop()
+            except Exception as e:
+                await logger.aexception("Failed to stop leader job", error=str(e))
+        await logger.ainfo("Stepped down as leader", token=self.token)
@@ -1,13 +1,43 @@
 import os
 import uuid6
 from datetime import datetime, timezone
-from botocore.exceptions import ClientError
-from boto3.s3.transfer import TransferConfig
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from boto3.s3.transfer import TransferConfig
+
+# boto3/botocore take ~100 ms to import; they are loaded when the first S3 client is built
+# instead of when the container module is imported.
+
+
+def create_s3_client(aws_access_key_id: str, aws_secret_access_key: str, region_name: str):
+    import boto3
+    from botocore.config import Config as BotoConfig
+
+    session = boto3.Session(
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name,
+    )
+    return session.client(
+        's3',
+        config=BotoConfig(
+            region_name=region_name,
+            signature_version='v4',
+            retries={'max_attempts': 5, 'mode': 'standard'},
+        ),
+    )
+
+
+def create_transfer_config(**kwargs) -> "TransferConfig":
+    from boto3.s3.transfer import TransferConfig
+
+    return TransferConfig(**kwargs)
 
 
 class S3Service:
 
-    def __init__(self, s3_client , bucket_name: str,transfer_config: TransferConfig, aws_region:str, aws_s3_bucket_name:str, tmp_dir: str = "./tmp"):
+    def __init__(self, s3_client , bucket_name: str,transfer_config: "TransferConfig", aws_region:str, aws_s3_bucket_name:str, tmp_dir: str = "./tmp"):
         self.s3_client  = s3_client
         self.bucket = bucket_name
         self.aws_region = aws_region
@@ -21,6 +51,8 @@ class S3Service:
         return f"{uuid6.uuid7().hex}{prefix}-{filename}"
 
     def _head_object(self, key: str) -> None:
+        from botocore.exceptions import ClientError
+
         try:
             self.s3_client.head_object(Bucket=self.bucket, Key=key)
         except ClientError as e:
@@ -1,7 +1,12 @@
-from typing import List, Type
+from typing import Dict, List, Type
 from beanie import Document, init_beanie
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from app.core.logs.logger import get_logger
+from app.core.metrics.instrumentation import MongoCommandMetrics
+
+logger = get_logger("MongoDB")
+
 
 class MongoDB:
     def __init__(self, db_url:str,db_name:str) -> None:
@@ -14,7 +19,8 @@ class MongoDB:
             socketTimeoutMS=2000,
             connectTimeoutMS=2000,
             serverSelectionTimeoutMS=2000,
-            uuidRepresentation="standard"
+            uuidRepresentation="standard",
+            event_listeners=[MongoCommandMetrics()]
         )
         
         
@@ -28,3 +34,20 @@ class MongoDB:
         except Exception as e:
             raise
 
+    async def verify_indexes(self, document_models: List[Type[Document]]) -> Dict[str, List[List[tuple]]]:
+        missing_indexes: Dict[str, List[List[tuple]]] = {}
+        
+        for model in document_models:
+            collection = model.get_motor_collection()
+            index_information = await collection.index_information()
+            existing_keys = [list(info["key"]) for info in index_information.values()]
+            
+            for index in model.get_settings().indexes or []:
+                declared_keys = list(index.index.document["key"].items())
+                if declared_keys not in existing_keys:
+                    missing_indexes.setdefault(collection.name, []).append(declared_keys)
+        
+        for collection_name, keys in missing_indexes.items():
+            await logger.awarning("Declared indexes missing on collection", collection=collection_name, indexes=[str(k) for k in keys])
+        
+        return missing_indexes
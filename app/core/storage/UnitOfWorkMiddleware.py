@@ -0,0 +1,51 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config.settings import settings
+from app.core.logs.logger import get_logger
+from app.core.metrics.metrics import DB_QUERIES_PER_UNIT_OF_WORK
+from app.core.storage.postgres import UnitOfWork, unit_of_work
+
+logger = get_logger("UnitOfWork")
+
+
+async def report_unit_of_work(work: UnitOfWork, method: str, route: str) -> None:
+    """Records the statement count and logs requests that look like N+1 query patterns."""
+    DB_QUERIES_PER_UNIT_OF_WORK.labels(method, route).observe(work.query_count)
+    repeated = work.repeated_statements(settings.DB_REPEATED_QUERY_WARN_THRESHOLD)
+    if repeated or work.query_count >= settings.DB_QUERY_COUNT_WARN_THRESHOLD:
+        statement, count = repeated[0] if repeated else work.statements.most_common(1)[0]
+        await logger.awarning(
+            "Many Postgres statements in one unit of work",
+            method=method,
+            route=route,
+            query_count=work.query_count,
+            top_statement=statement[:300],
+            top_statement_count=count,
+        )
+
+
+class UnitOfWorkMiddleware:
+    """Runs each HTTP request in one Postgres unit of work and returns its statement count in
+    `X-DB-Query-Count` (the count when the response started)."""
+
+    def __init__(self, app: ASGIApp, skip_paths: frozenset = frozenset({"/metrics", "/health"})) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        async with unit_of_work() as work:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (b"x-db-query-count", str(work.query_count).encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                await report_unit_of_work(work, scope["method"], getattr(route, "path", "unmatched"))
@@ -1,18 +1,36 @@
+import asyncio
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
 from sqlmodel import SQLModel
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.ext.asyncio import create_async_engine , async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine , async_sessionmaker
+
+from app.core.metrics.instrumentation import instrument_sqlalchemy
+
+def _create_engine(db_url: str, backend: str) -> AsyncEngine:
+    engine = create_async_engine(
+        db_url,
+        echo=False,
+        pool_size=10,
+        max_overflow=5,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+    )
+    instrument_sqlalchemy(engine, backend)
+    return engine
+
 
 class PostgresDatabase:
-    def __init__(self, db_url: str) -> None:
-        self._engine = create_async_engine(
-            db_url,
-            echo=False,
-            pool_size=10,
-            max_overflow=5,
-            pool_timeout=30,
-            pool_recycle=1800,
-            pool_pre_ping=True,
-        )
+    def __init__(self, db_url: str, replica_url: Optional[str] = None) -> None:
+        self._engine = _create_engine(db_url, "postgres")
+        # Listing queries opt in to the replica through `SessionScope.replica()`; without a
+        # replica URL they run on the primary like everything else.
+        self._replica_engine = _create_engine(replica_url, "postgres_replica") if replica_url else None
         
         self._session_factory = async_sessionmaker(
             bind=self._engine, 
@@ -21,14 +39,25 @@ class PostgresDatabase:
             autoflush=False, 
             expire_on_commit=False
         )
+
+    @property
+    def has_replica(self) -> bool:
+        return self._replica_engine is not None
         
-    def create_session(self) -> AsyncSession:
+    def create_session(self, replica: bool = False) -> AsyncSession:
+        if replica and self.has_replica:
+            return self._session_factory(bind=self._replica_engine)
         return self._session_factory()
     
     async def init_db(self) -> None:
         async with self._engine.begin() as conn:
             await conn.run_sync(SQLModel.metadata.create_all)
 
+    async def dispose(self) -> None:
+        await self._engine.dispose()
+        if self._replica_engine is not None:
+            await self._replica_engine.dispose()
+
 async def create_session(db_instance: PostgresDatabase):
     session = db_instance.create_session()
     try:
@@ -38,4 +67,155 @@ async def create_session(db_instance: PostgresDatabase):
         await session.rollback()
         raise
     finally:
-        await session.close()
\ No newline at end of file
+        await session.close()
+
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar("postgres_unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """Postgres work of one HTTP request or socket event.
+
+    Repository calls made from the task that opened it share one session per database. The
+    session holds a pooled connection only while a transaction is open: it is handed back when
+    a call commits and at the latest when the outermost call ends, so awaits on Meta, S3 or
+    RabbitMQ between calls do not keep a connection out of the pool. Each call still commits or
+    discards its own work and hands back detached objects as before. Statements are counted on
+    every connection the sessions use, to spot N+1 patterns.
+
+    Replica reads get a second session, on the replica. Once the unit of work has written to
+    the primary they go to the primary instead, so a request reads its own writes.
+    """
+
+    def __init__(self) -> None:
+        self.owner = asyncio.current_task()
+        self.closed = False
+        self.query_count = 0
+        self.statements: Counter = Counter()
+        self.depth = 0
+        self.wrote = False
+        self._sessions: Dict[Tuple[int, bool], AsyncSession] = {}
+
+    def is_active(self) -> bool:
+        # Tasks spawned during the request inherit the context var but may outlive the request or
+        # run concurrently with it; they get their own sessions.
+        return not self.closed and asyncio.current_task() is self.owner
+
+    async def session_for(self, db: PostgresDatabase, replica: bool = False) -> AsyncSession:
+        replica = replica and db.has_replica and not self.wrote
+        session = self._sessions.get((id(db), replica))
+        if session is None:
+            session = db.create_session(replica)
+            listener = self._count_statement if replica else self._count_primary_statement
+            event.listen(session.sync_session, "after_begin", lambda _session, _transaction, connection:
+                         self._watch(connection, listener))
+            self._sessions[(id(db), replica)] = session
+        return session
+
+    @staticmethod
+    def _watch(connection, listener) -> None:
+        # Each transaction checks out a connection of its own; count the statements run on it.
+        if not event.contains(connection, "before_cursor_execute", listener):
+            event.listen(connection, "before_cursor_execute", listener)
+
+    async def release(self) -> None:
+        """End of the outermost repository call: detach its objects and end its transaction.
+
+        The call committed what it meant to keep, so closing the session only rolls back what
+        it left open (reads included) and returns its connection to the pool.
+        """
+        for session in self._sessions.values():
+            await session.close()
+
+    def repeated_statements(self, min_count: int) -> List[Tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= min_count]
+
+    def _count_statement(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.query_count += 1
+        self.statements[statement] += 1
+
+    def _count_primary_statement(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self._count_statement(conn, cursor, statement, parameters, context, executemany)
+        if statement.lstrip()[:6].upper() != "SELECT":
+            self.wrote = True
+
+    async def close(self, commit: bool) -> None:
+        self.closed = True
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            try:
+                if commit:
+                    await session.commit()
+                else:
+                    await session.rollback()
+            finally:
+                await session.close()
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[UnitOfWork]:
+    """Binds a unit of work to the current task; nested calls join the one already open."""
+    current = _current_unit_of_work.get()
+    if current is not None and current.is_active():
+        yield current
+        return
+
+    work = UnitOfWork()
+    token = _current_unit_of_work.set(work)
+    committed = False
+    try:
+        yield work
+        committed = True
+    finally:
+        _current_unit_of_work.reset(token)
+        await work.close(commit=committed)
+
+
+class SessionScope:
+    """What repositories get as `session`; `async with` it yields the session to use.
+
+    Inside a unit of work that is the unit's session: when the outermost repository call exits
+    its loaded objects are detached, what it left uncommitted is rolled back and its connection
+    goes back to the pool. Outside one it is a session of the repository's own that is closed on
+    exit, as before.
+    """
+
+    def __init__(self, db: PostgresDatabase, replica: bool = False) -> None:
+        self._db = db
+        self._replica = replica
+        self._session: Optional[AsyncSession] = None
+        self._replica_scope: Optional["SessionScope"] = None
+
+    def replica(self) -> "SessionScope":
+        """Scope for read-only listing queries that can run on the read replica."""
+        if self._replica:
+            return self
+        if self._replica_scope is None:
+            self._replica_scope = SessionScope(self._db, replica=True)
+        return self._replica_scope
+
+    @staticmethod
+    def _active_unit_of_work() -> Optional[UnitOfWork]:
+        work = _current_unit_of_work.get()
+        return work if work is not None and work.is_active() else None
+
+    async def __aenter__(self) -> AsyncSession:
+        work = self._active_unit_of_work()
+        if work is not None:
+            session = await work.session_for(self._db, self._replica)
+            work.depth += 1
+            return session
+        if self._session is None:
+            self._session = self._db.create_session(self._replica)
+        return await self._session.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        work = self._active_unit_of_work()
+        if work is None:
+            await self._session.__aexit__(exc_type, exc, tb)
+            return
+        work.depth -= 1
+        if work.depth:
+            # A repository calling another; the outermost call still uses the objects.
+            return
+        await work.release()
@@ -1,13 +1,10 @@
-from datetime import datetime
 import json
-import msgpack
 from typing import Any, Dict, List, Optional, Set, Union
 import redis
 import redis.asyncio as aioredis
-from uuid import UUID as NativeUUID
-from asyncpg.pgproto.pgproto import UUID as PgUUID
 
-from app.utils.DateTimeHelper import DateTimeHelper
+from app.core.codec import codec
+from app.core.metrics.instrumentation import InstrumentedRedis, InstrumentedRedisCluster
 
 class RedisService:
     def __init__(
@@ -32,38 +29,20 @@ class RedisService:
             decode_responses=not use_msgpack,
         )
 
-    _DATETIME_EXT = 1
-    _UUID_EXT = 2 
-    
-    def _encode_custom(self, obj):
-        if isinstance(obj, datetime):
-            dt = DateTimeHelper.ensure_utc(obj)
-            return msgpack.ExtType(self._DATETIME_EXT, dt.isoformat().encode())
-        if isinstance(obj, (NativeUUID, PgUUID)):
-            return msgpack.ExtType(self._UUID_EXT, str(obj).encode())
-        raise TypeError
-    
-    def _decode_custom(self, code, data):
-        if code == self._DATETIME_EXT:
-            return DateTimeHelper.ensure_utc(datetime.fromisoformat(data.decode()))
-        if code == self._UUID_EXT:
-            return data.decode()  
-        return msgpack.ExtType(code, data)
-
     def _key(self, key: str) -> str:
         ns = f"{self.namespace}:" if self.namespace and not self.namespace.endswith(":") else self.namespace
         return f"{ns}{key}"
 
     def _serialize(self, value: Any) -> bytes:
-        return msgpack.packb(value, use_bin_type=True, default=self._encode_custom)
+        return codec.encode(value)
 
     def _deserialize(self, raw: Union[bytes, str, None]) -> Any:
         if raw is None:
             return None
         if isinstance(raw, (bytes, bytearray)):
             try:
-                return msgpack.unpackb(raw, raw=False, ext_hook=self._decode_custom)
-            except Exception:
+                return codec.decode(raw)
+            except codec.DecodeError:
                 try:
                     return raw.decode()
                 except Exception:
@@ -182,16 +161,13 @@ class RedisService:
         return self._client.keys(self._key(pattern))
 
 
-from datetime import datetime
-import json
-import msgpack
-from typing import Any, Dict, List, Optional, Set, Union
+import asyncio
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar, Union
 import redis
 import redis.asyncio as aioredis
-from uuid import UUID as NativeUUID
-from asyncpg.pgproto.pgproto import UUID as PgUUID
+from redis.crc import key_slot
 
-from app.utils.DateTimeHelper import DateTimeHelper
+T = TypeVar("T")
 
 class AsyncRedisService:
     def __init__(
@@ -203,101 +179,58 @@ class AsyncRedisService:
         namespace: str = "",
         default_ttl: int = 30 * 24 * 60 * 60,
         use_msgpack: bool = True,
+        cluster: bool = False,
     ):
         self.namespace = namespace
         self.default_ttl = default_ttl
         self.use_msgpack = use_msgpack
+        self.cluster = cluster
         self._DATETIME_KEY = "__datetime__"         
-        self._client = aioredis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            password=password,
-            decode_responses=not use_msgpack,
-        )
-
-    _DATETIME_EXT = 1
-    _UUID_EXT = 2 
-    
-    def _encode_custom(self, obj):
-        if isinstance(obj, datetime):
-            dt = DateTimeHelper.ensure_utc(obj)
-            return msgpack.ExtType(self._DATETIME_EXT, dt.isoformat().encode())
-        if isinstance(obj, (NativeUUID, PgUUID)):
-            return msgpack.ExtType(self._UUID_EXT, str(obj).encode())
-        raise TypeError
-    
-    def _decode_custom(self, code, data):
-        if code == self._DATETIME_EXT:
-            return DateTimeHelper.ensure_utc(datetime.fromisoformat(data.decode()))
-        if code == self._UUID_EXT:
-            return data.decode()  
-        return msgpack.ExtType(code, data)
+        if cluster:
+            # Cluster mode has no numbered databases; the other nodes are discovered from this one.
+            self._client = InstrumentedRedisCluster(
+                host=host,
+                port=port,
+                password=password,
+                decode_responses=not use_msgpack,
+            )
+        else:
+            self._client = InstrumentedRedis(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                decode_responses=not use_msgpack,
+            )
 
     def _key(self, key: str) -> str:
         ns = f"{self.namespace}:" if self.namespace and not self.namespace.endswith(":") else self.namespace
         return f"{ns}{key}"
 
-    def _serialize(self, value: Any, use_json: bool = False) -> Union[bytes, str]:
-        if use_json:
-            return json.dumps(value, default=str)  
-        else:
-            return msgpack.packb(value, use_bin_type=True, default=self._encode_custom)
+    def _serialize(self, value: Any, use_json: bool = False) -> bytes:
+        return codec.encode_json(value) if use_json else codec.encode(value)
 
-    def _deserialize(self, raw: Union[bytes, str, None], use_json: bool = False) -> Any:
+    def _deserialize(self, raw: Union[bytes, str, None], use_json: bool = False, type: Optional[Type[T]] = None) -> Any:
         if raw is None:
             return None
-            
-        if use_json:
-            if isinstance(raw, str):
-                try:
-                    return json.loads(raw)
-                except (json.JSONDecodeError, TypeError):
-                    return raw
-            elif isinstance(raw, (bytes, bytearray)):
-                try:
-                    decoded = raw.decode('utf-8')
-                    return json.loads(decoded)
-                except (UnicodeDecodeError, json.JSONDecodeError, TypeError):
-                    return raw.decode('utf-8', errors='ignore')
-            return raw
-        else:
-            if isinstance(raw, (bytes, bytearray)):
-                try:
-                    return msgpack.unpackb(raw, raw=False, ext_hook=self._decode_custom)
-                except Exception:
-                    try:
-                        return raw.decode()
-                    except Exception:
-                        return raw
-            if isinstance(raw, str):
-                try:
-                    return json.loads(raw)
-                except Exception:
-                    return raw
-            return raw
-
-    def _smart_deserialize(self, raw: Union[bytes, str, None]) -> Any:
+        # A client with decode_responses hands back str, which can only be JSON.
+        use_json = use_json or isinstance(raw, str)
+        try:
+            return codec.decode_json(raw, type) if use_json else codec.decode(raw, type)
+        except codec.DecodeError:
+            if type is not None:
+                raise
+            # Values not written by this service (bare strings set by hand or by other tools).
+            return raw.decode('utf-8', errors='ignore') if isinstance(raw, (bytes, bytearray)) else raw
+
+    def _decode_counter_field(self, raw: Union[bytes, str, None]) -> Any:
+        """Fields of counter hashes: HINCRBY leaves bare integers, other fields hold JSON."""
         if raw is None:
             return None
-            
-        if isinstance(raw, (bytes, bytearray)):
-            try:
-                decoded_str = raw.decode('utf-8')
-                if decoded_str.isdigit() or (decoded_str.startswith('-') and decoded_str[1:].isdigit()):
-                    return int(decoded_str)
-            except (UnicodeDecodeError, ValueError):
-                pass
-        
         try:
-            return self._deserialize(raw, use_json=False)
-        except Exception:
-            try:
-                return self._deserialize(raw, use_json=True)
-            except Exception:
-                if isinstance(raw, (bytes, bytearray)):
-                    return raw.decode('utf-8', errors='ignore')
-                return raw
+            return int(raw)
+        except ValueError:
+            return self._deserialize(raw, use_json=True)
 
     async def set(
         self,
@@ -324,13 +257,9 @@ class AsyncRedisService:
         data = self._serialize(value, use_json=use_json)
         return await self._client.set(full_key, data, ex=ex, nx=nx, xx=xx)
 
-    async def get(self, key: str, use_json: bool = False) -> Any:
+    async def get(self, key: str, use_json: bool = False, type: Optional[Type[T]] = None) -> Any:
         raw = await self._client.get(self._key(key))
-        return self._deserialize(raw, use_json=use_json)
-
-    async def get_smart(self, key: str) -> Any:
-        raw = await self._client.get(self._key(key))
-        return self._smart_deserialize(raw)
+        return self._deserialize(raw, use_json=use_json, type=type)
 
     async def delete(self, *keys: str) -> int:
         full = [self._key(k) for k in keys]
@@ -370,9 +299,17 @@ class AsyncRedisService:
         cleaned: dict[str, Any] = {}
         for k, v in raw.items():
             skey = k.decode() if isinstance(k, (bytes, bytearray)) else k
-            cleaned[skey] = self._smart_deserialize(v)
+            cleaned[skey] = self._decode_counter_field(v)
         return cleaned
 
+    async def hmget_smart(self, key: str, fields: Iterable[str]) -> List[Any]:
+        """Counter-hash fields in order (None when missing), decoded like `hgetall_smart`."""
+        fields = [str(f) for f in fields]
+        if not fields:
+            return []
+        raw = await self._client.hmget(self._key(key), fields)
+        return [self._decode_counter_field(v) for v in raw]
+
     async def lpush(self, key: str, *values: Any, use_json: bool = False) -> int:
         if use_json:
             vals = [self._serialize(v, use_json=True) for v in values]
@@ -397,6 +334,49 @@ class AsyncRedisService:
     async def pipeline(self) -> aioredis.client.Pipeline:
         return self._client.pipeline()
 
+    def group_by_slot(self, keys: Iterable[str]) -> Dict[int, List[str]]:
+        """Groups keys by cluster hash slot; without a cluster everything is one group.
+
+        Keys of one entity share the `{id}` hash tag, so they always land in the same group.
+        """
+        if not self.cluster:
+            return {0: list(keys)}
+        groups: Dict[int, List[str]] = {}
+        for key in keys:
+            groups.setdefault(key_slot(self._key(key).encode()), []).append(key)
+        return groups
+
+    async def mget(self, *keys: str, use_json: bool = False, type: Optional[Type[T]] = None) -> List[Any]:
+        """Values of `keys` in order, None for missing ones; one MGET per hash slot, sent concurrently."""
+        if not keys:
+            return []
+        groups = list(self.group_by_slot(dict.fromkeys(keys)).values())
+        replies = await asyncio.gather(*(self._client.mget([self._key(k) for k in group]) for group in groups))
+        values = {key: raw for group, raw_values in zip(groups, replies) for key, raw in zip(group, raw_values)}
+        return [self._deserialize(values[key], use_json=use_json, type=type) for key in keys]
+
+    async def hgetall_many(self, *keys: str) -> List[Dict[str, Any]]:
+        """HGETALL of every key with `hgetall_smart` decoding; one pipeline per hash slot."""
+        if not keys:
+            return []
+
+        async def fetch(group: List[str]) -> List[Any]:
+            pipe = self._client.pipeline(transaction=False)
+            for key in group:
+                pipe.hgetall(self._key(key))
+            return await pipe.execute()
+
+        groups = list(self.group_by_slot(dict.fromkeys(keys)).values())
+        replies = await asyncio.gather(*(fetch(group) for group in groups))
+        hashes = {key: raw for group, raw_hashes in zip(groups, replies) for key, raw in zip(group, raw_hashes)}
+        return [
+            {
+                (k.decode() if isinstance(k, (bytes, bytearray)) else k): self._decode_counter_field(v)
+                for k, v in hashes[key].items()
+            }
+            for key in keys
+        ]
+
     async def flush_db(self) -> bool:
         return await self._client.flushdb()
 
@@ -446,29 +426,62 @@ class AsyncRedisService:
             key_str = str(k)
             serialized_fields[key_str] = self._serialize(v, use_json=use_json)
             
-        return await self._client.xadd(
+        stream_id = await self._client.xadd(
             name=self._key(key),
             fields=serialized_fields,
             id=id,
             maxlen=maxlen,
             approximate=approximate
         )
-
-    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
-        result = await self._client.hincrby(self._key(key), field, amount)
+        return stream_id.decode() if isinstance(stream_id, (bytes, bytearray)) else stream_id
+
+    async def xrange(self, key: str, min: str = '-', max: str = '+', count: Optional[int] = None, use_json: bool = False) -> List[Tuple[str, Dict[str, Any]]]:
+        """Entries between `min` and `max` (inclusive; prefix an id with "(" to exclude it), oldest first."""
+        entries = await self._client.xrange(self._key(key), min=min, max=max, count=count)
+        result = []
+        for stream_id, fields in entries:
+            decoded_fields = {}
+            for k, v in fields.items():
+                skey = k.decode() if isinstance(k, (bytes, bytearray)) else k
+                decoded_fields[skey] = self._deserialize(v, use_json=use_json)
+            result.append((stream_id.decode() if isinstance(stream_id, (bytes, bytearray)) else stream_id, decoded_fields))
         return result
 
-    async def hset_unread_consistent(self, key: str, mapping: Dict[str, Any]) -> int:
+    # Sorted set members are plain strings (ids), so they can be compared and removed by value
+    # from Lua scripts; only scores carry data.
+    async def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False, xx: bool = False, gt: bool = False) -> int:
+        return await self._client.zadd(self._key(key), {str(m): s for m, s in mapping.items()}, nx=nx, xx=xx, gt=gt)
 
-        processed_mapping = {}
-        
-        for field, value in mapping.items():
-            if field == 'unread_count' and isinstance(value, (int, float)):
-                processed_mapping[field] = int(value)
-            else:
-                processed_mapping[field] = self._serialize(value, use_json=True)
-        
-        return await self._client.hset(self._key(key), mapping=processed_mapping)
+    async def zscore(self, key: str, member: str) -> Optional[float]:
+        return await self._client.zscore(self._key(key), str(member))
+
+    async def zmscore(self, key: str, members: Iterable[str]) -> List[Optional[float]]:
+        members = [str(m) for m in members]
+        if not members:
+            return []
+        return await self._client.zmscore(self._key(key), members)
+
+    async def zrangebyscore(self, key: str, min: Union[float, str], max: Union[float, str], start: Optional[int] = None, num: Optional[int] = None) -> List[str]:
+        raw = await self._client.zrangebyscore(self._key(key), min, max, start=start, num=num)
+        return [m.decode() if isinstance(m, (bytes, bytearray)) else m for m in raw]
+
+    async def zrem(self, key: str, *members: str) -> int:
+        if not members:
+            return 0
+        return await self._client.zrem(self._key(key), *[str(m) for m in members])
+
+    def register_script(self, script: str):
+        """Registers a Lua script once; the returned coroutine function runs it with namespaced KEYS.
 
-    async def hgetall_unread_consistent(self, key: str) -> Dict[str, Any]:
-        return await self.hgetall_smart(key)
\ No newline at end of file
+        Scripts are sent by SHA (EVALSHA) and reloaded transparently after a SCRIPT FLUSH or failover.
+        """
+        registered = self._client.register_script(script)
+
+        async def run(keys: Iterable[str] = (), args: Iterable[Any] = ()) -> Any:
+            return await registered(keys=[self._key(k) for k in keys], args=list(args))
+
+        return run
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        result = await self._client.hincrby(self._key(key), field, amount)
+        return result
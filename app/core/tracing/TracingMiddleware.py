@@ -0,0 +1,38 @@
+from starlette.datastructures import Headers
+from structlog.contextvars import bind_contextvars
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.tracing.tracer import extract, start_span
+
+
+class TracingMiddleware:
+    """Opens the server span of a request, continuing the caller's trace when it sent a
+    `traceparent`, and returns the trace id in `X-Trace-Id`."""
+
+    def __init__(self, app: ASGIApp, skip_paths: frozenset = frozenset({"/metrics", "/health"})) -> None:
+        self.app = app
+        self.skip_paths = skip_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        parent = extract(Headers(scope=scope))
+        with start_span(f"HTTP {scope['method']}", {"http.method": scope["method"], "http.target": scope["path"]},
+                        parent=parent, kind="server") as span:
+            bind_contextvars(trace_id=span.context.trace_id)
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    message["headers"] = [*message.get("headers", []), (b"x-trace-id", span.context.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    span.name = f"HTTP {scope['method']} {route.path}"
+                    span.set_attribute("http.route", route.path)
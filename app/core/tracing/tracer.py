@@ -0,0 +1,373 @@
+"""Minimal distributed tracing shared by the API and the Celery worker.
+
+Context travels as a W3C `traceparent` header (`00-<trace id>-<span id>-<flags>`) on HTTP
+requests, AMQP messages and Celery task headers. Finished spans are batched by a background
+thread and written either as JSON lines to a file or as OTLP/HTTP JSON to a local collector
+(Jaeger, Tempo or the OpenTelemetry collector all accept it on :4318/v1/traces).
+
+Only the standard library is used so the worker can import this module without the API's
+dependencies.
+"""
+import json
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+TRACEPARENT_HEADER = "traceparent"
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    def to_traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+@dataclass
+class Span:
+    name: str
+    context: SpanContext
+    parent_id: Optional[str] = None
+    kind: str = "internal"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self, service_name: str) -> Dict[str, Any]:
+        return {
+            "service": service_name,
+            "name": self.name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def parse_traceparent(value: Optional[Any]) -> Optional[SpanContext]:
+    if isinstance(value, bytes):
+        value = value.decode(errors="ignore")
+    if not value or not isinstance(value, str):
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        sampled = bool(int(parts[3], 16) & 1)
+    except ValueError:
+        return None
+    return SpanContext(trace_id=parts[1], span_id=parts[2], sampled=sampled)
+
+
+def extract(carrier: Optional[Mapping[str, Any]]) -> Optional[SpanContext]:
+    if not carrier:
+        return None
+    return parse_traceparent(carrier.get(TRACEPARENT_HEADER))
+
+
+def inject(carrier: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Adds the current span's traceparent to `carrier` (AMQP or Celery headers) and returns it."""
+    carrier = {} if carrier is None else carrier
+    span = _current_span.get()
+    if span is not None:
+        carrier[TRACEPARENT_HEADER] = span.context.to_traceparent()
+    return carrier
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.context.trace_id if span else None
+
+
+class SpanExporter:
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+class FileSpanExporter(SpanExporter):
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as output:
+            for span in spans:
+                output.write(json.dumps(span, default=str) + "\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    _KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+
+    def __init__(self, endpoint: str, timeout: float = 3.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _attribute(self, key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _span(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": self._KINDS.get(span["kind"], 1),
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(span["end_ns"]),
+            "attributes": [self._attribute(k, v) for k, v in span["attributes"].items() if v is not None],
+            "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+        }
+        if span["parent_id"]:
+            encoded["parentSpanId"] = span["parent_id"]
+        return encoded
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        by_service: Dict[str, List[Dict[str, Any]]] = {}
+        for span in spans:
+            by_service.setdefault(span["service"], []).append(self._span(span))
+        body = {"resourceSpans": [
+            {
+                "resource": {"attributes": [self._attribute("service.name", service)]},
+                "scopeSpans": [{"scope": {"name": "whatsapp-service"}, "spans": encoded}],
+            }
+            for service, encoded in by_service.items()
+        ]}
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+class SpanProcessor:
+    """Batches finished spans on a daemon thread so recording never blocks the caller.
+
+    The thread is (re)started lazily per process, which keeps it working in forked Celery
+    pool processes.
+    """
+
+    def __init__(self, exporter: SpanExporter, max_queue: int = 10_000, batch_size: int = 256, interval: float = 2.0):
+        self.exporter = exporter
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, span: Dict[str, Any]) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid is not None and self._pid != os.getpid():
+                # Forked child: spans queued by the parent belong to the parent's exporter.
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._export(self._take_batch(timeout=self.interval))
+
+    def _take_batch(self, timeout: Optional[float]) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            batch.append(self._queue.get(timeout=timeout))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _export(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception:
+            # Tracing must never take the service down; the spans of this batch are lost.
+            self.dropped += len(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Exports everything submitted so far, including a batch the thread is still sending."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            self._export(self._take_batch(timeout=0.05))
+
+
+class Tracer:
+    def __init__(self, service_name: str = "whatsapp-service", processor: Optional[SpanProcessor] = None, sample_rate: float = 1.0):
+        self.service_name = service_name
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def _new_context(self, parent: Optional[SpanContext]) -> SpanContext:
+        if parent is not None:
+            return SpanContext(trace_id=parent.trace_id, span_id=secrets.token_hex(8), sampled=parent.sampled)
+        return SpanContext(
+            trace_id=secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            sampled=random.random() < self.sample_rate,
+        )
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+    ) -> Iterator[Span]:
+        """Starts a child of `parent`, or of the current span when no parent is given."""
+        if parent is None:
+            active = _current_span.get()
+            parent = active.context if active else None
+        span = Span(
+            name=name,
+            context=self._new_context(parent),
+            parent_id=parent.span_id if parent else None,
+            kind=kind,
+            attributes=dict(attributes or {}),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if self.processor is not None and span.context.sampled:
+                self.processor.submit(span.to_dict(self.service_name))
+
+
+    def record_span(
+        self,
+        name: str,
+        start_ns: int,
+        end_ns: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent: Optional[SpanContext] = None,
+        kind: str = "internal",
+        error: Optional[str] = None,
+    ) -> None:
+        """Records a span after the fact, for work timed by hooks or shared by a batch."""
+        if parent is None:
+            active = _current_span.get()
+            if active is None:
+                return
+            parent = active.context
+        if self.processor is None or not parent.sampled:
+            return
+        span = Span(
+            name=name,
+            context=self._new_context(parent),
+            parent_id=parent.span_id,
+            kind=kind,
+            attributes=dict(attributes or {}),
+            start_ns=start_ns,
+            end_ns=end_ns or time.time_ns(),
+            error=error,
+        )
+        self.processor.submit(span.to_dict(self.service_name))
+
+
+_tracer = Tracer()
+
+
+def configure_tracing(
+    service_name: str,
+    exporter: str = "none",
+    file_path: str = "traces.jsonl",
+    otlp_endpoint: str = "http://localhost:4318/v1/traces",
+    sample_rate: float = 1.0,
+) -> Tracer:
+    """`exporter` is "none", "file" or "otlp". With "none" spans still propagate context
+    (so downstream services keep the trace id) but nothing is recorded."""
+    processor = None
+    if exporter == "file":
+        processor = SpanProcessor(FileSpanExporter(file_path))
+    elif exporter == "otlp":
+        processor = SpanProcessor(OTLPHttpSpanExporter(otlp_endpoint))
+    _tracer.service_name = service_name
+    _tracer.processor = processor
+    _tracer.sample_rate = sample_rate
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def start_span(name: str, attributes: Optional[Dict[str, Any]] = None, parent: Optional[SpanContext] = None, kind: str = "internal"):
+    return _tracer.start_span(name, attributes=attributes, parent=parent, kind=kind)
+
+
+def record_span(
+    name: str,
+    start_ns: int,
+    end_ns: Optional[int] = None,
+    attributes: Optional[Dict[str, Any]] = None,
+    parent: Optional[SpanContext] = None,
+    kind: str = "internal",
+    error: Optional[str] = None,
+) -> None:
+    _tracer.record_span(name, start_ns, end_ns, attributes=attributes, parent=parent, kind=kind, error=error)
@@ -1,8 +1,10 @@
 from asyncio.log import logger
 from aio_pika import ExchangeType, Message, RobustConnection
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage, TriggerChatbotPayload
 import uuid6
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from aio_pika.pool import Pool
 from aio_pika.abc import AbstractChannel, AbstractRobustExchange
 
@@ -24,13 +26,13 @@ class ChatBotTriggerPublisher:
                 max_size=8
             )
     
-    async def publish_chatbot_event(self, payload: dict, routing_key: str = "trigger_chatbot_event"):
+    async def publish_chatbot_event(self, payload: TaskMessage, routing_key: str = "trigger_chatbot_event"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"], "id": payload["id"]},
+            headers={"task": payload.task, "id": payload.id},
         )
         async with self._channel_pool.acquire() as channel:
             exchange : AbstractRobustExchange = await channel.declare_exchange(
@@ -38,15 +40,13 @@ class ChatBotTriggerPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
     
-    async def trigger_chatbot_event(self, data_body: dict):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.trigger_chatbot_task",
-            "args": [data_body],
-            "kwargs": {},
-            "retries": 5,
-            "eta": None
-        }
+    async def trigger_chatbot_event(self, data_body: TriggerChatbotPayload):
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.trigger_chatbot_task",
+            args=[data_body],
+            retries=5
+        )
         await self.publish_chatbot_event(payload)
\ No newline at end of file
@@ -1,8 +1,10 @@
 from typing import Any
 from aio_pika import ExchangeType, Message, RobustConnection
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 import uuid6
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from aio_pika.pool import Pool
 from aio_pika.abc import AbstractChannel, AbstractRobustExchange
 
@@ -24,13 +26,13 @@ class MessageHookReceivedPublisher:
                 max_size=8
             )
     
-    async def _publish_message_hook_received(self, payload: dict, routing_key: str = "message_hook_received_event"):
+    async def _publish_message_hook_received(self, payload: TaskMessage, routing_key: str = "message_hook_received_event"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"], "id": payload["id"]},
+            headers={"task": payload.task, "id": payload.id},
         )
         async with self._channel_pool.acquire() as channel:
             exchange : AbstractRobustExchange = await channel.declare_exchange(
@@ -38,15 +40,13 @@ class MessageHookReceivedPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
     
     async def publish_message(self, message_body: dict[str, Any],conversation_id: str = None, recipient_number: str = None):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.process_received_message_task",
-            "args": [message_body,conversation_id,recipient_number],
-            "kwargs": {},
-            "retries": 5,
-            "eta": None
-        }
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.process_received_message_task",
+            args=[message_body,conversation_id,recipient_number],
+            retries=5
+        )
         await self._publish_message_hook_received(payload)
\ No newline at end of file
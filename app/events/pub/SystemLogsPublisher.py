@@ -2,8 +2,10 @@ from typing import Any
 import uuid6
 from aio_pika import ExchangeType, Message, RobustConnection
 from aio_pika.pool import Pool
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from aio_pika.abc import AbstractChannel, AbstractRobustExchange
 
 class SystemLogsPublisher:
@@ -24,13 +26,13 @@ class SystemLogsPublisher:
                 max_size=8
             )
 
-    async def publish_message(self, payload: dict, routing_key: str = "system_logs_event"):
+    async def publish_message(self, payload: TaskMessage, routing_key: str = "system_logs_event"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"], "id": payload["id"]},
+            headers={"task": payload.task, "id": payload.id},
         )
         async with self._channel_pool.acquire() as channel:
             exchange : AbstractRobustExchange = await channel.declare_exchange(
@@ -38,15 +40,12 @@ class SystemLogsPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
 
     async def publish(self, message_body: dict[str, Any]):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.system_logs_handler_task",
-            "args": [message_body],
-            "kwargs": {},
-            "retries": 0,
-            "eta": None
-        }
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.system_logs_handler_task",
+            args=[message_body]
+        )
         await self.publish_message(payload)
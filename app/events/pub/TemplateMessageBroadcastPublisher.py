@@ -2,11 +2,15 @@ import asyncio
 import uuid6
 from aio_pika import ExchangeType, Message, RobustConnection
 from aio_pika.pool import Pool
-import msgspec
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage, TemplateBroadcastBatchPayload, TemplateBroadcastPayload
 from app.core.broker.RabbitMQBroker import RabbitMQBroker
+from app.core.metrics.metrics import publish_confirmed
 from app.whatsapp.broadcast.models.schema.BroadCastTemplate import BroadCastTemplate, TemplateObject
 from app.whatsapp.template.models.schema.SendTemplateRequest import SendTemplateRequest
 
+BROADCAST_CHUNK_SIZE = 100
+
 class TemplateMessageBroadcastPublisher:
     def __init__(self, connection: RabbitMQBroker):
         self._broker = connection
@@ -25,13 +29,13 @@ class TemplateMessageBroadcastPublisher:
                 max_size=8
             )
 
-    async def publish_message(self, payload: dict, routing_key: str = "broadcast_messages"):
+    async def publish_message(self, payload: TaskMessage, routing_key: str = "broadcast_messages"):
         await self.setup()
         msg = Message(
-            body=msgspec.msgpack.encode(payload),
+            body=codec.encode(payload),
             content_type='application/msgpack',
             delivery_mode=2,
-            headers={"task": payload["task"], "id": payload["id"]},
+            headers={"task": payload.task, "id": payload.id},
         )
         async with self._channel_pool.acquire() as channel:
             exchange = await channel.declare_exchange(
@@ -39,45 +43,67 @@ class TemplateMessageBroadcastPublisher:
                 self._exchange_type,
                 durable=True
             )
-            await exchange.publish(msg, routing_key=routing_key)
+            await publish_confirmed(exchange, msg, routing_key)
 
     async def broadcast_message(self, whatsapp_message_body: TemplateObject,original_template_body : dict, contact_number: str, user_id: str,
                                 business_number: str, bussiness_token: str, business_number_id: str):
-        payload = {
-            "id": str(uuid6.uuid7()),
-            "task": "my_celery.tasks.template_broadcast",
-            "args": [{
-                "user_id": user_id,
-                "business_number": business_number,
-                "original_template_body": original_template_body,
-                "whatsapp_message_body": SendTemplateRequest(
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.template_broadcast",
+            args=[TemplateBroadcastPayload(
+                user_id=user_id,
+                business_number=business_number,
+                original_template_body=original_template_body,
+                whatsapp_message_body=SendTemplateRequest(
                     messaging_product="whatsapp",
                     to=contact_number,
                     type="template",
                     template=whatsapp_message_body.model_dump()
                 ).model_dump(),
-                "business_token": bussiness_token,
-                "business_number_id": business_number_id
-            }],
-            "kwargs": {},
-            "retries": 2,
-            "eta": None
-        }
+                business_token=bussiness_token,
+                business_number_id=business_number_id
+            )],
+            retries=2
+        )
+        await self.publish_message(payload)
+
+    async def broadcast_batch(self, whatsapp_message_body: TemplateObject, original_template_body: dict, contact_numbers: list[str],
+                              user_id: str, business_number: str, bussiness_token: str, business_number_id: str):
+        payload = TaskMessage(
+            id=str(uuid6.uuid7()),
+            task="my_celery.tasks.template_broadcast_batch",
+            args=[TemplateBroadcastBatchPayload(
+                user_id=user_id,
+                business_number=business_number,
+                original_template_body=original_template_body,
+                whatsapp_message_body=SendTemplateRequest(
+                    messaging_product="whatsapp",
+                    to=contact_numbers[0],
+                    type="template",
+                    template=whatsapp_message_body.model_dump()
+                ).model_dump(),
+                numbers=contact_numbers,
+                business_token=bussiness_token,
+                business_number_id=business_number_id
+            )],
+            retries=2
+        )
         await self.publish_message(payload)
 
     async def publish_many( self, *, payloads: BroadCastTemplate, user_id: str, business_number: str,
-                            bussiness_token: str, business_number_id: str):
+                            bussiness_token: str, business_number_id: str, chunk_size: int = BROADCAST_CHUNK_SIZE):
+        numbers = list(payloads.list_of_numbers)
         tasks = [
-            self.broadcast_message(
+            self.broadcast_batch(
                 whatsapp_message_body=payloads.whatsapp_template_body,
                 original_template_body=payloads.original_template_body,
-                contact_number=number,
+                contact_numbers=numbers[index:index + chunk_size],
                 user_id=user_id,
                 business_number=business_number,
                 bussiness_token=bussiness_token,
                 business_number_id=business_number_id
             )
-            for number in payloads.list_of_numbers
+            for index in range(0, len(numbers), chunk_size)
         ]
         await asyncio.gather(*tasks, return_exceptions=False)
         return {"status": "success"}
@@ -1,13 +1,18 @@
 from fastapi import Depends
-import msgspec
-from faststream.rabbit.fastapi import RabbitRouter
-from faststream.rabbit import RabbitQueue,RabbitExchange ,ExchangeType
+from faststream.rabbit.fastapi import RabbitMessage, RabbitRouter
+from faststream.rabbit import Channel, RabbitQueue,RabbitExchange ,ExchangeType
+from app.core.codec import codec
 from app.core.config.container import Container
 from app.core.config.settings import settings
 from dependency_injector.wiring import Provide, inject
 from app.core.logs.logger import get_logger
-from app.real_time.socketio.socket_gateway import SocketMessageGateway
+from app.core.tracing.tracer import extract, record_span
+from app.events.sub.ChatbotReplyDispatcher import ChatbotReplyDispatcher
 
+# A single in-order consumer only decodes and hands replies to the dispatcher lanes, which keeps
+# per-conversation ordering while the socket emits run concurrently. Acks are manual: the
+# dispatcher acks a reply once it was emitted, so the subscriber channel's prefetch bounds the
+# replies not yet emitted and must be large enough to keep every lane busy.
 rabbitmq_router : RabbitRouter = RabbitRouter(f"{settings.RABBITMQ_URI}",max_consumers=1)
 
 logger = get_logger(__name__)
@@ -15,14 +20,14 @@ logger = get_logger(__name__)
 @rabbitmq_router.subscriber(
     queue=RabbitQueue(name="chatbot_replies_queue", durable=True, routing_key="chatbot_replies_event"),
     exchange=RabbitExchange(name="chatbot_replies_exchange", type=ExchangeType.DIRECT, durable=True),
-    consume_args={
-        "prefetch_count": 1,  
-        "prefetch_size": 0,
-    }
+    channel=Channel(prefetch_count=settings.CHATBOT_REPLY_PREFETCH),
+    no_ack=True,
 )
 @inject
-async def handle_chatbot_reply_event(payload: dict, socketio : SocketMessageGateway = Depends(Provide[Container.socket_message_gateway])):
+async def handle_chatbot_reply_event(payload: dict, message: RabbitMessage, dispatcher : ChatbotReplyDispatcher = Depends(Provide[Container.chatbot_reply_dispatcher])):
     message_body = None
+    submitted = False
+    trace_parent = extract(message.headers)
     try:
         logger.info("Received chatbot reply payload", payload_type=type(payload).__name__)
 
@@ -34,7 +39,7 @@ async def handle_chatbot_reply_event(payload: dict, socketio : SocketMessageGate
             logger.debug("Using direct payload", payload_key_present=False)
 
         if isinstance(raw_payload, bytes):
-            message_body = msgspec.msgpack.decode(raw_payload)
+            message_body = codec.decode(raw_payload)
             logger.info("Successfully decoded msgpack payload", 
                        conversation_id=message_body.get("conversation_id"),
                        message_type=message_body.get("message_type"))
@@ -86,9 +91,14 @@ async def handle_chatbot_reply_event(payload: dict, socketio : SocketMessageGate
             },
             "business_data": message_body.get("business_data", {})
         }
-        await socketio.emit_chatbot_reply_message(payload=socket_message)
+        published_at = message_body.get("published_at")
+        if trace_parent is not None and published_at:
+            record_span("amqp.queue chatbot_replies_queue", int(published_at * 1_000_000_000),
+                        parent=trace_parent, kind="consumer", attributes={"conversation_id": conversation_id})
+        await dispatcher.submit(socket_message, published_at=published_at, trace=trace_parent, message=message)
+        submitted = True
         
-        logger.info(f"Successfully processed chatbot reply for conversation {conversation_id}")
+        logger.info(f"Successfully queued chatbot reply for conversation {conversation_id}")
         
         if event_type == "chatbot_init":
             logger.info(f"Chatbot initialized for conversation {conversation_id}")
@@ -101,12 +111,16 @@ async def handle_chatbot_reply_event(payload: dict, socketio : SocketMessageGate
         
         return {"status": "success", "message": "Chatbot reply processed successfully"}
         
-    except msgspec.DecodeError as e:
+    except codec.DecodeError as e:
         logger.error(f"Failed to decode msgpack payload: {str(e)}")
         return {"status": "error", "message": "Invalid payload format"}
     except Exception as e:
         logger.error(f"Error processing chatbot reply: {str(e)}")
         return {"status": "error", "message": f"Processing failed: {str(e)}"}
+    finally:
+        # Replies that never reached a lane are settled here, as before.
+        if not submitted:
+            await message.ack()
     
 
 @rabbitmq_router.subscriber(
@@ -0,0 +1,151 @@
+import asyncio
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+from faststream.rabbit.fastapi import RabbitMessage
+from app.core.logs.logger import get_logger
+from app.core.tracing.tracer import SpanContext, record_span
+from app.real_time.socketio.socket_gateway import SocketMessageGateway
+
+logger = get_logger("ChatbotReplyDispatcher")
+
+CHATBOT_REPLY_LANES = 8
+LANE_CAPACITY = 256
+MAX_EMIT_BATCH_SIZE = 50
+LAG_REPORT_INTERVAL_SECONDS = 30.0
+
+
+class ChatbotReplyDispatcher:
+    """Fans chatbot replies out over async lanes keyed by conversation.
+
+    A conversation always hashes to the same lane, so its replies are emitted in the order
+    they were consumed while different conversations are emitted concurrently. A submitted
+    message is acked only once its reply was emitted, so replies still waiting in a lane when
+    the process dies are redelivered by RabbitMQ.
+    """
+
+    def __init__(
+        self,
+        socket_message: SocketMessageGateway,
+        lanes: int = CHATBOT_REPLY_LANES,
+        lane_capacity: int = LANE_CAPACITY,
+        max_batch_size: int = MAX_EMIT_BATCH_SIZE,
+        report_interval: float = LAG_REPORT_INTERVAL_SECONDS,
+    ):
+        self.socket_message = socket_message
+        self.lane_count = max(1, lanes)
+        self.lane_capacity = lane_capacity
+        self.max_batch_size = max_batch_size
+        self.report_interval = report_interval
+
+        self._lanes: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+
+        self._emitted = 0
+        self._batches = 0
+        self._lag_last = 0.0
+        self._lag_max = 0.0
+        self._lag_total = 0.0
+        self._lag_samples = 0
+        self._last_report = time.monotonic()
+
+    def lane_for(self, conversation_id: str) -> int:
+        return zlib.crc32(str(conversation_id).encode()) % self.lane_count
+
+    async def submit(
+        self,
+        payload: Dict[str, Any],
+        published_at: Optional[float] = None,
+        trace: Optional[SpanContext] = None,
+        message: Optional[RabbitMessage] = None,
+    ) -> None:
+        self._ensure_started()
+        lane = self._lanes[self.lane_for(payload.get("conversation_id"))]
+        # Blocks when the lane is full so a slow socket side holds back the consumer.
+        await lane.put((payload, published_at, trace, time.time_ns(), message))
+
+    def _ensure_started(self) -> None:
+        if not self._lanes:
+            self._lanes = [asyncio.Queue(maxsize=self.lane_capacity) for _ in range(self.lane_count)]
+            self._workers = [asyncio.create_task(self._run_lane(index)) for index in range(self.lane_count)]
+            return
+        # A lane whose worker died is restarted on its own queue, keeping the replies it holds.
+        for index, worker in enumerate(self._workers):
+            if worker.done():
+                if not worker.cancelled() and worker.exception() is not None:
+                    logger.error("Chatbot reply lane stopped, restarting", lane=index, error=str(worker.exception()))
+                self._workers[index] = asyncio.create_task(self._run_lane(index))
+
+    async def _run_lane(self, index: int) -> None:
+        lane = self._lanes[index]
+        while True:
+            batch = [await lane.get()]
+            while len(batch) < self.max_batch_size and not lane.empty():
+                batch.append(lane.get_nowait())
+
+            emit_started = time.time_ns()
+            error = None
+            try:
+                await self.socket_message.emit_chatbot_reply_messages(payloads=[item[0] for item in batch])
+            except Exception as e:
+                error = str(e)
+                await logger.aexception("Failed to emit chatbot reply batch", lane=index, error=str(e))
+            finally:
+                self._record_batch(batch)
+                self._record_spans(batch, index, emit_started, error)
+                await self._settle(batch, index, error)
+                for _ in batch:
+                    lane.task_done()
+
+            if time.monotonic() - self._last_report >= self.report_interval:
+                self._last_report = time.monotonic()
+                await logger.ainfo("Chatbot reply lane metrics", **self.metrics())
+
+    async def _settle(self, batch: List[tuple], lane: int, error: Optional[str]) -> None:
+        """Acks the batch's messages once emitted; a failed emit is requeued so RabbitMQ delivers it again."""
+        for *_, message in batch:
+            if message is None:
+                continue
+            try:
+                if error is None:
+                    await message.ack()
+                else:
+                    await message.nack(requeue=True)
+            except Exception as e:
+                await logger.aexception("Failed to settle chatbot reply message", lane=lane, error=str(e))
+
+    def _record_batch(self, batch: List[tuple]) -> None:
+        now = time.time()
+        self._batches += 1
+        self._emitted += len(batch)
+        for _, published_at, _, _, _ in batch:
+            if published_at is None:
+                continue
+            lag = max(0.0, now - published_at)
+            self._lag_last = lag
+            self._lag_max = max(self._lag_max, lag)
+            self._lag_total += lag
+            self._lag_samples += 1
+
+    def _record_spans(self, batch: List[tuple], lane: int, emit_started: int, error: Optional[str]) -> None:
+        emit_ended = time.time_ns()
+        for _, _, trace, queued_at, _ in batch:
+            if trace is None:
+                continue
+            record_span("dispatcher.lane_wait", queued_at, emit_started, {"lane": lane}, parent=trace)
+            record_span("socketio.emit chatbot_reply", emit_started, emit_ended,
+                        {"lane": lane, "batch.size": len(batch)}, parent=trace, kind="producer", error=error)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "lanes": self.lane_count,
+            "queued": [lane.qsize() for lane in self._lanes],
+            "emitted": self._emitted,
+            "batches": self._batches,
+            "lag_last_seconds": round(self._lag_last, 3),
+            "lag_max_seconds": round(self._lag_max, 3),
+            "lag_avg_seconds": round(self._lag_total / self._lag_samples, 3) if self._lag_samples else 0.0,
+        }
+
+    async def drain(self) -> None:
+        await asyncio.gather(*(lane.join() for lane in self._lanes))
@@ -1,17 +1,41 @@
 import asyncio
 from datetime import datetime
 import os
-from typing import Dict, Optional, Set
+from typing import Dict, List, Optional, Set
 from socketio import AsyncServer
+import msgspec
 
+from app.core.codec.records import SocketSession
 from app.core.logs.logger import get_logger
+from app.core.metrics.metrics import SOCKETIO_CONNECTIONS, SOCKETIO_EMITS, room_kind
 from app.core.exceptions.GlobalException import GlobalException
 from app.core.exceptions.custom_exceptions.TokenValidityException import TokenValidityException
 from app.core.security.JwtUtility import JwtTokenUtils
+from app.core.storage.postgres import unit_of_work
 from app.core.storage.redis import AsyncRedisService
+from app.core.storage.UnitOfWorkMiddleware import report_unit_of_work
 from app.utils.Helper import Helper
 from app.utils.RedisHelper import RedisHelper
 from app.whatsapp.business_profile.v1.services.BusinessProfileService import BusinessProfileService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
+from app.whatsapp.team_inbox.services.ConversationWindowService import ConversationWindowService
+from app.whatsapp.team_inbox.services.UnreadCounterService import UnreadCounterService
+
+# Events a reconnecting client can replay instead of reloading its inbox. Streams are
+# trimmed (approximately) to these lengths; a client further behind than the stream
+# retains, or than STREAM_REPLAY_WINDOW events, gets `resync_required` instead.
+STREAM_REPLAY_WINDOW = 200
+BUSINESS_STREAM_MAXLEN = 5000
+CONVERSATION_STREAM_MAXLEN = 1000
+
+
+def _parse_stream_id(stream_id) -> Optional[tuple]:
+    try:
+        milliseconds, _, sequence = str(stream_id).partition("-")
+        return int(milliseconds), int(sequence or 0)
+    except ValueError:
+        return None
+
 
 class SocketMessageGateway:
     
@@ -19,24 +43,111 @@ class SocketMessageGateway:
         self, 
         sio: AsyncServer,
         redis: AsyncRedisService,
-        business_profile_service: BusinessProfileService
+        business_profile_service: BusinessProfileService,
+        window_service: ConversationWindowService,
+        unread_counters: UnreadCounterService,
+        change_log: ConversationChangeLog,
     ) -> None:
         self.sio = sio
         self.redis = redis
         self.business_profile_service = business_profile_service
+        self.window_service = window_service
+        self.unread_counters = unread_counters
+        self.change_log = change_log
         self.logger = get_logger("SocketMessageGateway")
         self.worker_id = os.getpid() if hasattr(os, 'getpid') else 'unknown'
+        self._connected_sids: Set[str] = set()
         
         self._register_handlers()
 
     def _register_handlers(self):
-        self.sio.on('connect', handler=self._on_connect)
-        self.sio.on('disconnect', handler=self._on_disconnect)
-        self.sio.on('join_business_group', handler=self._on_join_business_group)
-        self.sio.on('leave_business_group', handler=self._on_leave_business_group)
-        self.sio.on('join_conversation', handler=self._on_join_conversation)
-        self.sio.on('leave_conversation', handler=self._on_leave_conversation)
-        self.sio.on('mark_as_read', handler=self._on_mark_as_read)
+        self.sio.on('connect', handler=self._in_unit_of_work('connect', self._on_connect))
+        self.sio.on('disconnect', handler=self._in_unit_of_work('disconnect', self._on_disconnect))
+        self.sio.on('join_business_group', handler=self._in_unit_of_work('join_business_group', self._on_join_business_group))
+        self.sio.on('leave_business_group', handler=self._in_unit_of_work('leave_business_group', self._on_leave_business_group))
+        self.sio.on('join_conversation', handler=self._in_unit_of_work('join_conversation', self._on_join_conversation))
+        self.sio.on('leave_conversation', handler=self._in_unit_of_work('leave_conversation', self._on_leave_conversation))
+        self.sio.on('mark_as_read', handler=self._in_unit_of_work('mark_as_read', self._on_mark_as_read))
+
+    def _in_unit_of_work(self, event: str, handler):
+        """Runs a socket event in one Postgres unit of work, as HTTP requests are."""
+        async def run(*args):
+            async with unit_of_work() as work:
+                try:
+                    return await handler(*args)
+                finally:
+                    await report_unit_of_work(work, "SOCKET", event)
+        return run
+
+    async def _emit(self, event: str, data=None, room=None, **kwargs):
+        SOCKETIO_EMITS.labels(event, room_kind(room)).inc()
+        await self.sio.emit(event, data, room=room, **kwargs)
+
+    async def _record_event(self, stream_key: str, maxlen: int, event: str, data: dict, logger) -> Optional[str]:
+        try:
+            return await self.redis.xadd(stream_key, {"event": event, "data": data}, maxlen=maxlen, use_json=True)
+        except Exception as e:
+            await logger.awarning("Could not record event for replay", socket_event=event, error=str(e))
+            return None
+
+    async def _emit_business_event(self, event: str, data: dict, phone_number_id: str, logger):
+        """Emits to the business room and appends the event to its replay stream."""
+        stream_id = await self._record_event(
+            RedisHelper.redis_business_events_stream_key(phone_number_id), BUSINESS_STREAM_MAXLEN, event, data, logger
+        )
+        await self._emit(event=event, data={**data, "stream_id": stream_id}, room=str(phone_number_id))
+        return stream_id
+
+    async def _emit_conversation_event(self, event: str, data: dict, conversation_id: str, logger):
+        """Emits to the conversation room and appends the event to its replay stream."""
+        stream_id = await self._record_event(
+            RedisHelper.redis_conversation_messages_stream_key(conversation_id), CONVERSATION_STREAM_MAXLEN, event, data, logger
+        )
+        await self._emit(event=event, data={**data, "stream_id": stream_id}, room=str(conversation_id))
+        return stream_id
+
+    async def _replay_stream(self, sid: str, stream_key: str, last_stream_id: str, scope: dict, logger) -> bool:
+        """Sends the events recorded after `last_stream_id` as one `stream_replay`.
+
+        The room must already be joined so nothing published meanwhile is lost; events
+        may then arrive both live and replayed, and clients drop duplicates by `stream_id`.
+        Returns False and emits `resync_required` when the gap cannot be replayed.
+        """
+        last_position = _parse_stream_id(last_stream_id)
+        reason = None
+        events = []
+        if last_position is None:
+            reason = "invalid_stream_id"
+        else:
+            oldest = await self.redis.xrange(stream_key, count=1)
+            if oldest and _parse_stream_id(oldest[0][0]) > last_position and last_position != (0, 0):
+                # Anything between the client's id and the oldest retained entry was trimmed.
+                reason = "stream_trimmed"
+            else:
+                entries = await self.redis.xrange(
+                    stream_key, min=f"({last_stream_id}", count=STREAM_REPLAY_WINDOW + 1, use_json=True
+                )
+                if len(entries) > STREAM_REPLAY_WINDOW:
+                    reason = "window_exceeded"
+                else:
+                    events = [
+                        {"event": fields.get("event"), "data": fields.get("data"), "stream_id": stream_id}
+                        for stream_id, fields in entries
+                        if fields.get("event")
+                    ]
+
+        if reason:
+            await self._emit("resync_required", {**scope, "reason": reason}, room=sid)
+            await logger.ainfo("Client must resync", reason=reason, last_stream_id=last_stream_id, **scope)
+            return False
+
+        await self._emit("stream_replay", {
+            **scope,
+            "events": events,
+            "last_stream_id": events[-1]["stream_id"] if events else last_stream_id,
+        }, room=sid)
+        await logger.ainfo("Replayed missed events", count=len(events), **scope)
+        return True
 
     def _get_logger(self, sid: str, user_id: str = "", **kwargs):
         return self.logger.with_context(
@@ -70,7 +181,7 @@ class SocketMessageGateway:
     async def _get_user_business_group(self, sid: str) -> Optional[str]:
         session = await self._get_session_data_redis(sid)
         if session:
-            business_profile_id = session.get("business_profile_id")
+            business_profile_id = session.business_profile_id
             if business_profile_id:
                 return await self._get_business_profile_phone_number_id(business_profile_id)
         return None
@@ -90,24 +201,23 @@ class SocketMessageGateway:
         )
         await self.redis.sadd(RedisHelper.redis_conversation_members_key(conversation_id), sid)
         await self.redis.expire(RedisHelper.redis_conversation_members_key(conversation_id), 3600)
+        await self.redis.sadd(RedisHelper.redis_socket_user_conversations_key(sid), conversation_id)
+        await self.redis.expire(RedisHelper.redis_socket_user_conversations_key(sid), 3600)
 
     async def _remove_user_from_conversation(self, sid: str, conversation_id: str):
         await self.redis.delete(RedisHelper.redis_conversation_user_session_key(conversation_id, sid))
         await self.redis.srem(RedisHelper.redis_conversation_members_key(conversation_id), sid)
+        await self.redis.srem(RedisHelper.redis_socket_user_conversations_key(sid), conversation_id)
 
     async def _get_user_conversations(self, sid: str) -> Set[str]:
+        # Tracked per socket instead of scanning every conversation's members with KEYS,
+        # which only reaches one node of a Redis Cluster.
         conversations = set()
         try:
-            conversation_keys = await self.redis.keys("chat:conversation:*:members")
-            
-            for key in conversation_keys:
-                parts = key.split(':')
-                if len(parts) >= 3:
-                    conversation_id = parts[2].strip('{}')
-                    is_member = await self.redis.sismember(key, sid)
-                    if is_member:
-                        conversations.add(conversation_id)
-                        
+            conversations = {
+                str(conversation_id)
+                for conversation_id in await self.redis.smembers(RedisHelper.redis_socket_user_conversations_key(sid))
+            }
         except Exception as e:
             self.logger.error(f"Error getting user conversations for {sid}: {e}")
             
@@ -119,7 +229,7 @@ class SocketMessageGateway:
             
             session = await self._get_session_data_redis(sid)
             if session:
-                business_profile_id = session.get("business_profile_id")
+                business_profile_id = session.business_profile_id
                 if business_profile_id:
                     phone_number_id = await self._get_business_profile_phone_number_id(business_profile_id)
                     if phone_number_id:
@@ -127,18 +237,19 @@ class SocketMessageGateway:
             
             for conversation_id in conversations:
                 await self._remove_user_from_conversation(sid, conversation_id)
+            await self.redis.delete(RedisHelper.redis_socket_user_conversations_key(sid))
             
         except Exception as e:
             self.logger.error(f"Error cleaning up user state for {sid}: {e}")
             
     async def _save_session_data_redis(self, sid: str, user_id: str, business_profile_id: str, claims: dict, logger):
         try:
-            session_data = {
-                "userId": user_id,
-                "business_profile_id": business_profile_id,
-                "connected_at": datetime.now().isoformat(),
-                "worker_id": self.worker_id,
-            }
+            session_data = SocketSession(
+                user_id=user_id,
+                business_profile_id=business_profile_id,
+                connected_at=datetime.now().isoformat(),
+                worker_id=self.worker_id,
+            )
             
             # Replace pipeline with direct calls
             await self.redis.set(RedisHelper.redis_socket_user_session_key(sid), session_data, ttl=3600)
@@ -151,14 +262,15 @@ class SocketMessageGateway:
             await logger.aerror("Error saving session data", error=str(e))
             raise
 
-    async def _get_session_data_redis(self, sid: str) -> Optional[Dict]:
+    async def _get_session_data_redis(self, sid: str) -> Optional[SocketSession]:
         try:
-            session_data = await self.redis.get(RedisHelper.redis_socket_user_session_key(sid))
+            session_data = await self.redis.get(RedisHelper.redis_socket_user_session_key(sid), type=SocketSession)
             if session_data:
                 return session_data
             
             try:
-                return await self.sio.get_session(sid)
+                # The local session holds the token claims, which carry the same userId/business_profile_id.
+                return msgspec.convert(await self.sio.get_session(sid), SocketSession)
             except KeyError:
                 return None
                 
@@ -181,7 +293,7 @@ class SocketMessageGateway:
                 await logger.ainfo("Found existing session on potentially different worker", old_session=old_sid)
                 
                 try:
-                    await self.sio.emit("force_disconnect", {"reason": "New session started"}, room=old_sid)
+                    await self._emit("force_disconnect", {"reason": "New session started"}, room=old_sid)
                     await asyncio.sleep(0.1)
                     
                     await self._cleanup_session_data(old_sid, user_id)
@@ -204,7 +316,7 @@ class SocketMessageGateway:
                 claims = JwtTokenUtils.verify_token(token)
             except TokenValidityException as e:
                 await logger.awarning("Token verification failed", error=str(e))
-                await self.sio.emit(
+                await self._emit(
                     "token_expired",
                     {"message": "Token expired, please login again."},
                     room=sid
@@ -222,8 +334,24 @@ class SocketMessageGateway:
             
             await self._save_session_data_redis(sid, user_id, business_profile_id, claims, logger)
             
-            await self.sio.emit("session", {"session": sid}, room=sid)
+            await self._emit("session", {"session": sid}, room=sid)
+            self._connected_sids.add(sid)
+            SOCKETIO_CONNECTIONS.inc()
             await logger.ainfo("Socket connection established successfully")
+
+            last_stream_id = auth.get("last_stream_id")
+            if last_stream_id:
+                # A resuming client rejoins its business group and catches up in the same round trip.
+                phone_number_id = await self._get_business_profile_phone_number_id(business_profile_id)
+                if phone_number_id:
+                    await self._join_business_group_internal(sid, phone_number_id, user_id, business_profile_id, logger)
+                    await self._replay_stream(
+                        sid,
+                        RedisHelper.redis_business_events_stream_key(phone_number_id),
+                        last_stream_id,
+                        {"phone_number_id": phone_number_id},
+                        logger,
+                    )
             
         except Exception as e:
             await logger.aexception("Unhandled error in socket connection", error=str(e))
@@ -231,10 +359,13 @@ class SocketMessageGateway:
 
     async def _on_disconnect(self, sid: str):
         logger = self._get_logger(sid, component='socket_disconnect')
+        if sid in self._connected_sids:
+            self._connected_sids.discard(sid)
+            SOCKETIO_CONNECTIONS.dec()
         
         try:
             session = await self._get_session_data_redis(sid)
-            user_id = session.get("userId") if session else None
+            user_id = session.user_id if session else None
             
             if user_id:
                 logger = self._get_logger(sid, user_id)
@@ -272,24 +403,34 @@ class SocketMessageGateway:
             conversation_id = data.get('conversation_id')
             if not conversation_id:
                 await logger.awarning("Join conversation failed - missing conversation_id")
-                await self.sio.emit('error', {'message': 'conversation_id required'}, room=sid)
+                await self._emit('error', {'message': 'conversation_id required'}, room=sid)
                 return False
                 
             session = await self._get_session_data_redis(sid)
-            user_id = session.get("userId") if session else None
-            business_profile_id = session.get("business_profile_id") if session else None
+            user_id = session.user_id if session else None
+            business_profile_id = session.business_profile_id if session else None
             
             if not user_id or not business_profile_id:
                 await logger.aerror("Join conversation failed - invalid session data")
-                await self.sio.emit('error', {'message': 'Invalid session'}, room=sid)
+                await self._emit('error', {'message': 'Invalid session'}, room=sid)
                 return False
             
             logger = self._get_logger(sid, user_id, conversation_id=conversation_id, business_profile_id=business_profile_id)
             await self._join_conversation_internal(sid, conversation_id, user_id, business_profile_id, logger)
+
+            last_stream_id = data.get('last_stream_id')
+            if last_stream_id:
+                await self._replay_stream(
+                    sid,
+                    RedisHelper.redis_conversation_messages_stream_key(conversation_id),
+                    last_stream_id,
+                    {"conversation_id": str(conversation_id)},
+                    logger,
+                )
             
         except Exception as e:
             await logger.aexception("Error joining conversation", conversation_id=data.get('conversation_id'))
-            await self.sio.emit('error', {'message': 'Failed to join conversation'}, room=sid)
+            await self._emit('error', {'message': 'Failed to join conversation'}, room=sid)
             return False
 
     async def _join_conversation_internal(self, sid: str, conversation_id: str, user_id: str, business_profile_id: str, logger):
@@ -301,9 +442,9 @@ class SocketMessageGateway:
             await self.redis.sadd(RedisHelper.redis_conversation_members_key(conversation_id), sid)
             await self.redis.expire(RedisHelper.redis_conversation_members_key(conversation_id), 3600)
             
-            conversation_data = await self._get_conversation_state(conversation_id, logger)
+            conversation_data = await self._get_conversation_state(conversation_id, business_profile_id, logger)
             
-            await self.sio.emit('conversation_joined', {
+            await self._emit('conversation_joined', {
                 'conversation_id': conversation_id,
                 **conversation_data
             }, room=sid)
@@ -320,14 +461,14 @@ class SocketMessageGateway:
             conversation_id = data.get('conversation_id')
             if not conversation_id:
                 await logger.awarning("Leave conversation failed - missing conversation_id")
-                await self.sio.emit('error', {'message': 'conversation_id required'}, room=sid)
+                await self._emit('error', {'message': 'conversation_id required'}, room=sid)
                 return False
             
             await self._leave_conversation_internal(sid, conversation_id, logger)
             
         except Exception as e:
             await logger.aexception("Error leaving conversation", conversation_id=data.get('conversation_id'))
-            await self.sio.emit('error', {'message': 'Failed to leave conversation'}, room=sid)
+            await self._emit('error', {'message': 'Failed to leave conversation'}, room=sid)
             return False
 
     async def _leave_conversation_internal(self, sid: str, conversation_id: str, logger=None):
@@ -343,7 +484,7 @@ class SocketMessageGateway:
             if members_count == 0:
                 await self.redis.delete(RedisHelper.redis_conversation_members_key(conversation_id))
 
-            await self.sio.emit('conversation_left', {
+            await self._emit('conversation_left', {
                 'conversation_id': conversation_id
             }, room=sid)
             
@@ -358,18 +499,28 @@ class SocketMessageGateway:
         
         try:
             session = await self._get_session_data_redis(sid)
-            user_id = session.get("userId") if session else None
-            business_profile_id = session.get("business_profile_id") if session else None
+            user_id = session.user_id if session else None
+            business_profile_id = session.business_profile_id if session else None
             
             if not business_profile_id:
                 await logger.aerror("Missing business profile ID for business group join")
-                await self.sio.emit("error", {"message": "Missing business profile ID"}, room=sid)
+                await self._emit("error", {"message": "Missing business profile ID"}, room=sid)
                 return
             
             logger = self._get_logger(sid, user_id, business_profile_id=business_profile_id)
             
             phone_number_id = await self._get_business_profile_phone_number_id(business_profile_id)
             await self._join_business_group_internal(sid, phone_number_id, user_id, business_profile_id, logger)
+
+            last_stream_id = (data or {}).get("last_stream_id")
+            if last_stream_id:
+                await self._replay_stream(
+                    sid,
+                    RedisHelper.redis_business_events_stream_key(phone_number_id),
+                    last_stream_id,
+                    {"phone_number_id": phone_number_id},
+                    logger,
+                )
             
         except GlobalException as e:
             await logger.aexception("Error joining business group", error=str(e))
@@ -383,7 +534,7 @@ class SocketMessageGateway:
             await self.redis.sadd(RedisHelper.redis_business_members_key(phone_number_id), sid)
             await self.redis.expire(RedisHelper.redis_business_members_key(phone_number_id), 3600)
 
-            await self.sio.emit('business_group_joined', {
+            await self._emit('business_group_joined', {
                 'phone_number_id': phone_number_id
             }, room=sid)
 
@@ -403,7 +554,7 @@ class SocketMessageGateway:
             
         try:
             session = await self._get_session_data_redis(sid)
-            business_profile_id = session.get("business_profile_id") if session else None
+            business_profile_id = session.business_profile_id if session else None
             
             if not business_profile_id:
                 await logger.awarning("No business profile ID found for leaving business group")
@@ -419,7 +570,7 @@ class SocketMessageGateway:
             if members_count == 0:
                 await self.redis.delete(RedisHelper.redis_business_members_key(phone_number_id))
     
-            await self.sio.emit('business_group_left', {
+            await self._emit('business_group_left', {
                 'phone_number_id': phone_number_id
             }, room=sid)
             
@@ -437,38 +588,37 @@ class SocketMessageGateway:
             
             if not conversation_id or not last_read_message_id:
                 await logger.awarning("Mark as read failed - missing required fields")
-                await self.sio.emit('error', {
+                await self._emit('error', {
                     'message': 'conversation_id and last_read_message_id required'
                 }, room=sid)
                 return
         
             session = await self._get_session_data_redis(sid)
-            user_id = session.get("userId") if session else None
-            business_profile_id = session.get("business_profile_id") if session else None
+            user_id = session.user_id if session else None
+            business_profile_id = session.business_profile_id if session else None
             
             logger = self._get_logger(sid, user_id, conversation_id=conversation_id, last_read_message_id=last_read_message_id)
             
             phone_number_id = await self._get_business_profile_phone_number_id(business_profile_id)
-            unread_key = RedisHelper.redis_business_conversation_unread_key(conversation_id)
         
-            await self.redis.hset_unread_consistent(
-                unread_key, 
-                mapping={"unread_count": 0, "last_read_message_id": last_read_message_id}
-            )
+            unread = await self.unread_counters.reset(business_profile_id, conversation_id, last_read_message_id)
+            if unread.conversation:
+                await self.change_log.record(business_profile_id, conversation_id)
         
             response_data = {
                 "conversation_id": conversation_id, 
                 "unread_count": 0, 
+                "unread_total": unread.total,
                 "last_read_message_id": last_read_message_id
             }
             
-            await self.sio.emit("unread_status_updated", data=response_data, room=phone_number_id)
+            await self._emit_business_event("unread_status_updated", response_data, phone_number_id, logger)
             await logger.ainfo("Messages marked as read successfully")
             
         except Exception as e:
             await logger.aexception("Error marking messages as read", error=str(e))
 
-    async def emit_received_message(self, message: dict, phone_number_id: str, conversation_id: str = None):
+    async def emit_received_message(self, message: dict, phone_number_id: str, conversation_id: str = None, business_profile_id: str = None):
         logger = self._get_logger("system", component="message_emit", 
                                 phone_number_id=phone_number_id, 
                                 conversation_id=str(conversation_id),
@@ -481,26 +631,7 @@ class SocketMessageGateway:
             
             await logger.adebug("Processing received message for emission")
             
-            message_for_stream = {
-                "wa_message_id": str(message.get("message_id")),
-                "created_at": message.get("timestamp"),
-                "message_type": message.get("type"),
-                "content": message.get("content"), 
-                "context": message.get("context") if message.get("context") else "",
-                "is_from_contact": "true",  
-                "message_status": "received", 
-                "conversation_id": str(conversation_id),
-            }
-            
-            redis_stream_message_id = await self.redis.xadd(
-                RedisHelper.redis_conversation_messages_stream_key(conversation_id),
-                message_for_stream,
-                use_json=True
-            )
-            
-            await logger.adebug("Message added to Redis stream", stream_id=redis_stream_message_id)
-            
-            unread_data = await self._update_unread_count(conversation_id, logger)
+            unread_data = await self._update_unread_count(conversation_id, business_profile_id, logger)
             
             last_message_content = Helper._get_last_message_content(message_data=message)
             business_data = {
@@ -508,10 +639,11 @@ class SocketMessageGateway:
                 "last_message_content": last_message_content, 
                 "last_message_time": f"{message.get('timestamp')}", 
                 "is_chat_bot": False,
-                "unread_count": unread_data['unread_count']
+                "unread_count": unread_data['unread_count'],
+                "unread_total": unread_data['unread_total']
             }
             
-            await self.sio.emit(event="business_message_received", data=business_data, room=phone_number_id)
+            await self._emit_business_event("business_message_received", business_data, phone_number_id, logger)
             
             if conversation_id:
                 message_data = {
@@ -524,11 +656,23 @@ class SocketMessageGateway:
                         "is_from_contact": True,
                         "message_status": "delivered",
                         "conversation_id": str(conversation_id),
-                        "redis_stream_id": redis_stream_message_id
                     },
                     "conversation_id": str(conversation_id)
                 }
-                await self.sio.emit(event="conversation_message_received", data=message_data, room=str(conversation_id))
+                stream_id = await self._record_event(
+                    RedisHelper.redis_conversation_messages_stream_key(conversation_id),
+                    CONVERSATION_STREAM_MAXLEN,
+                    "conversation_message_received",
+                    message_data,
+                    logger,
+                )
+                await logger.adebug("Message added to Redis stream", stream_id=stream_id)
+                message_data["message"]["redis_stream_id"] = stream_id
+                await self._emit(
+                    event="conversation_message_received",
+                    data={**message_data, "stream_id": stream_id},
+                    room=str(conversation_id)
+                )
             
             await logger.ainfo("Message emitted successfully to all recipients")
             
@@ -536,24 +680,22 @@ class SocketMessageGateway:
             await logger.aexception("Error emitting received message", error=str(e))
 
     async def emit_chatbot_reply_message(self, payload: dict):
-        try:        
-            logger = self._get_logger(
-                "system",
-                component="chatbot_reply",
-                conversation_id=payload.get("conversation_id")
-            )
-        
+        await self.emit_chatbot_reply_messages(payloads=[payload])
+
+    async def emit_chatbot_reply_messages(self, payloads: List[dict]):
+        """Emit chatbot replies in order; last-message state is written once per conversation."""
+        logger = self._get_logger("system", component="chatbot_reply", count=len(payloads))
+
+        latest_by_conversation: Dict[str, tuple] = {}
+        for payload in payloads:
             try:
                 conversation_id = payload.get("conversation_id")
                 message_body = payload.get("message", {})
-                business_data = payload.get("business_data", {})
-    
+
                 if not conversation_id:
                     await logger.awarning("Cannot emit chatbot reply - no conversation ID")
-                    return
-        
-                await logger.adebug("Processing chatbot reply message")
-        
+                    continue
+
                 message_data = {
                     "message": {
                         "_id": message_body.get("id"),
@@ -569,42 +711,46 @@ class SocketMessageGateway:
                     },
                     "conversation_id": str(conversation_id)
                 }
+                await self._emit_conversation_event(
+                    "conversation_message_received", message_data, conversation_id, logger
+                )
+                latest_by_conversation[str(conversation_id)] = (payload, message_data)
+            except Exception as e:
+                await logger.aexception("Error emitting chatbot reply message", error=str(e),
+                                        conversation_id=payload.get("conversation_id"))
+
+        for conversation_id, (payload, message_data) in latest_by_conversation.items():
+            try:
+                message_body = payload.get("message", {})
+                business_data = payload.get("business_data", {})
+
                 last_message_content = Helper._get_last_message_content(message_data=message_data)
                 
                 redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message=last_message_content,last_message_time=f"{message_body.get("created_at")}")
-                await self.redis.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation_id)),value= redis_last_message)
+                await self.redis.set(key=RedisHelper.redis_conversation_last_message_key(conversation_id),value= redis_last_message)
+                
+                business_phone_number_id = business_data.get("business_phone_number_id")
+                business_profile_id = await self._get_phone_number_business_profile_id(business_phone_number_id)
+                if business_profile_id:
+                    await self.change_log.record(business_profile_id, conversation_id)
                 
-                last_message_content = message_body.get("content")
-                last_message_time = message_body.get("created_at")
-    
                 business_message_data = {
-                    "conversation_id": str(conversation_id),
-                    "last_message_content": last_message_content,
-                    "last_message_time": f"{last_message_time}",
+                    "conversation_id": conversation_id,
+                    "last_message_content": message_body.get("content"),
+                    "last_message_time": f"{message_body.get("created_at")}",
                     "is_chat_bot": True,
                     "unread_count": ""
                 }
     
-                business_phone_number_id = business_data.get("business_phone_number_id")
                 if business_phone_number_id:
-                    await self.sio.emit(
-                        event="business_message_received",
-                        data=business_message_data,
-                        room=str(business_phone_number_id)
+                    await self._emit_business_event(
+                        "business_message_received", business_message_data, business_phone_number_id, logger
                     )
-                    
-                await self.sio.emit(
-                    event="conversation_message_received",
-                    data=message_data,
-                    room=str(conversation_id)
-                )
-                
-                await logger.ainfo("Chatbot reply message emitted successfully")
-        
             except Exception as e:
-                await logger.aexception("Error emitting chatbot reply message", error=str(e))
-        except Exception as e:
-            await logger.aexception("Error emitting chatbot reply message", error=str(e))
+                await logger.aexception("Error emitting chatbot reply summary", error=str(e),
+                                        conversation_id=conversation_id)
+
+        await logger.adebug("Chatbot reply messages emitted", conversations=len(latest_by_conversation))
 
     async def emit_chatbot_triggered_status (self, conversation_id: str, business_profile_id: str,chatbot_triggered: bool):    
 
@@ -617,14 +763,15 @@ class SocketMessageGateway:
         
         try:
             
-            await self.sio.emit(
-                event="chatbot_triggered",
-                data={
+            await self._emit_business_event(
+                "chatbot_triggered",
+                {
                     "conversation_id": str(conversation_id),
                     "business_profile_id": str(business_profile_id),
                     "chatbot_triggered": chatbot_triggered
                 },
-                room = business_profile_phone_number_id
+                business_profile_phone_number_id,
+                logger,
             )
             
             await logger.ainfo("Chatbot triggered message emitted successfully")
@@ -647,12 +794,38 @@ class SocketMessageGateway:
                 "timestamp": datetime.now().isoformat()
             }
             
-            await self.sio.emit(event="whatsapp_message_status", data=data, room=str(conversation_id))
+            await self._emit_conversation_event("whatsapp_message_status", data, conversation_id, logger)
             await logger.adebug("Message status emitted successfully")
                         
         except Exception as e:
             await logger.aexception("Error emitting message status", error=str(e))
 
+    async def emit_message_statuses(self, conversation_id: str, statuses: List[Dict[str, str]]):
+        logger = self._get_logger("system", component="message_status_batch",
+                                conversation_id=conversation_id,
+                                count=len(statuses))
+        
+        try:
+            data = {
+                "conversation_id": str(conversation_id),
+                "statuses": statuses,
+                "timestamp": datetime.now().isoformat()
+            }
+            
+            await self._emit_conversation_event("whatsapp_message_status_batch", data, conversation_id, logger)
+            # Clients that predate the batch event still listen for one event per message.
+            for status in statuses:
+                await self._emit_conversation_event("whatsapp_message_status", {
+                    "conversation_id": str(conversation_id),
+                    "status": status["status"],
+                    "message_id": status["message_id"],
+                    "timestamp": data["timestamp"],
+                }, conversation_id, logger)
+            await logger.adebug("Message statuses emitted successfully")
+                        
+        except Exception as e:
+            await logger.aexception("Error emitting message statuses", error=str(e))
+
     async def emit_conversation_assignment(self, user_id: str, conversation_id: str, assigned_to: str, assignment_message: dict):
         logger = self._get_logger("system", component="conversation_assignment",
                                 conversation_id=str(conversation_id),
@@ -671,7 +844,7 @@ class SocketMessageGateway:
                 await logger.awarning("Skip assignment emit - no session data found")
                 return
             
-            business_profile_id = session.get("business_profile_id")
+            business_profile_id = session.business_profile_id
             if not business_profile_id:
                 await logger.awarning("Skip assignment emit - no business profile ID")
                 return
@@ -682,10 +855,8 @@ class SocketMessageGateway:
                 return
                 
             business_data = {"conversation_id": str(conversation_id)}
-            await self.sio.emit(
-                event="conversation_assignment_businessgroup", 
-                data=business_data, 
-                room=phone_number_id
+            await self._emit_business_event(
+                "conversation_assignment_businessgroup", business_data, phone_number_id, logger
             )
     
             conversation_data = {
@@ -693,10 +864,8 @@ class SocketMessageGateway:
                 "assigned_to": str(assigned_to),
                 "assignment_message": assignment_message
             }
-            await self.sio.emit(
-                "conversation_assignment_chat", 
-                conversation_data, 
-                room=str(conversation_id)
+            await self._emit_conversation_event(
+                "conversation_assignment_chat", conversation_data, conversation_id, logger
             )
     
             await logger.ainfo("Conversation assignment emitted successfully")
@@ -722,7 +891,7 @@ class SocketMessageGateway:
                 await logger.awarning("Skip status emit - no session data found")
                 return
                 
-            business_profile_id = session.get("business_profile_id")
+            business_profile_id = session.business_profile_id
             if not business_profile_id:
                 await logger.awarning("Skip status emit - no business profile ID")
                 return
@@ -731,20 +900,16 @@ class SocketMessageGateway:
             
             if phone_number_id:
                 business_data = {"conversation_id": str(conversation_id), "status": status}
-                await self.sio.emit(
-                    event="conversation_status_business_group", 
-                    data=business_data, 
-                    room=phone_number_id
+                await self._emit_business_event(
+                    "conversation_status_business_group", business_data, phone_number_id, logger
                 )
             
             conversation_data = {
                 "conversation_id": str(conversation_id),
                 "status": status
             }
-            await self.sio.emit(
-                "conversation_status_chat", 
-                conversation_data, 
-                room=str(conversation_id)
+            await self._emit_conversation_event(
+                "conversation_status_chat", conversation_data, conversation_id, logger
             )
                 
             await logger.ainfo("Conversation status emitted successfully")
@@ -752,6 +917,24 @@ class SocketMessageGateway:
         except Exception as e:
             await logger.aexception("Error emitting conversation status", error=str(e))
             
+    async def emit_conversation_expired(self, conversation_id: str, status: Optional[str], phone_number_id: Optional[str]):
+        """Status events for a conversation closed by the expiry sweeper (no user session to look up)."""
+        logger = self._get_logger("system", component="conversation_expired",
+                                conversation_id=str(conversation_id),
+                                status=status)
+
+        try:
+            data = {"conversation_id": str(conversation_id), "status": status, "is_conversation_expired": True}
+            if phone_number_id:
+                await self._emit_business_event("conversation_status_business_group", data, phone_number_id, logger)
+                business_profile_id = await self._get_phone_number_business_profile_id(phone_number_id)
+                if business_profile_id:
+                    await self.change_log.record(business_profile_id, conversation_id)
+            await self._emit_conversation_event("conversation_status_chat", data, conversation_id, logger)
+
+        except Exception as e:
+            await logger.aexception("Error emitting conversation expiry", error=str(e))
+
     async def emit_create_new_conversation(self, conversation_data: dict, business_profile_id: str):
         logger = self._get_logger("system", component="new_conversation",
                                 business_profile_id=business_profile_id,
@@ -761,11 +944,7 @@ class SocketMessageGateway:
             phone_number_id = await self._get_business_profile_phone_number_id(business_profile_id)
             
             if phone_number_id:
-                await self.sio.emit(
-                    event="new_conversation", 
-                    data=conversation_data, 
-                    room=phone_number_id
-                )
+                await self._emit_business_event("new_conversation", conversation_data, phone_number_id, logger)
                 await logger.ainfo("New conversation emitted successfully", phone_number_id=phone_number_id)
             else:
                 await logger.awarning("Cannot emit new conversation - no phone number ID")
@@ -773,32 +952,27 @@ class SocketMessageGateway:
         except Exception as e:
             await logger.aexception("Error emitting new conversation", error=str(e))
 
-    async def _get_conversation_state(self, conversation_id: str, logger) -> dict:
+    async def _get_conversation_state(self, conversation_id: str, business_profile_id: str, logger) -> dict:
         try:
-            redis_expiration_time = await self.redis.get(
-                RedisHelper.redis_conversation_expired_key(conversation_id)
-            )
+            expires_at = await self.window_service.expires_at(conversation_id)
             
             conversation_expiration_time = None
             is_conversation_expired = True
             
-            if redis_expiration_time:
-                conversation_expiration_time = Helper.conversation_expiration_calculate(redis_expiration_time)
+            if expires_at:
+                conversation_expiration_time = Helper.conversation_expiration_calculate(expires_at)
                 is_conversation_expired = False
             
-            unread_key = RedisHelper.redis_business_conversation_unread_key(conversation_id)
-            unread_status = await self.redis.hgetall_unread_consistent(unread_key)
-            unread_count = self._extract_unread_count(unread_status)
-            
-            await self.redis.hset_unread_consistent(
-                unread_key,
-                {'unread_count': 0, 'last_read_message_id': '0-0'}
-            )
+            # Joining a conversation reads it; the count that was cleared is reported.
+            unread = await self.unread_counters.reset(business_profile_id, conversation_id)
+            if unread.conversation:
+                await self.change_log.record(business_profile_id, conversation_id)
             
             return {
                 'expiration_time': conversation_expiration_time,
                 'is_conversation_expired': is_conversation_expired,
-                'unread_count': unread_count
+                'unread_count': unread.conversation,
+                'unread_total': unread.total
             }
             
         except Exception as e:
@@ -806,7 +980,8 @@ class SocketMessageGateway:
             return {
                 'expiration_time': None,
                 'is_conversation_expired': True,
-                'unread_count': 0
+                'unread_count': 0,
+                'unread_total': 0
             }
 
     async def _get_business_profile_phone_number_id(self, business_profile_id: str):
@@ -837,43 +1012,34 @@ class SocketMessageGateway:
             await logger.aexception("Unexpected error getting business profile", error=str(e))
             return None
 
-    async def _update_unread_count(self, conversation_id: str, logger) -> dict:
+    async def _get_phone_number_business_profile_id(self, phone_number_id: Optional[str]) -> Optional[str]:
+        """Reverse of `_get_business_profile_phone_number_id`, for events that only carry the phone number."""
+        if not phone_number_id:
+            return None
+        cache_key = RedisHelper.redis_phone_number_business_profile_id_key(phone_number_id)
+        business_profile_id = await self.redis.get(cache_key)
+        if business_profile_id:
+            return business_profile_id
+        try:
+            business_profile = await self.business_profile_service.get_by_phone_number_id(phone_number_id)
+        except GlobalException:
+            return None
+        await self.redis.set(cache_key, str(business_profile.id), ttl=86400)
+        return str(business_profile.id)
+
+    async def _update_unread_count(self, conversation_id: str, business_profile_id: str, logger) -> dict:
         try:
-            unread_key = RedisHelper.redis_business_conversation_unread_key(conversation_id)
             members_count = await self.redis.scard(RedisHelper.redis_conversation_members_key(conversation_id))
             
+            # Nobody has the conversation open, so the message stays unread. The change log
+            # entry is written by SaveMessage once the message (and its last-message row) is stored.
             if members_count <= 0:
-                await self.redis.hincrby(unread_key, 'unread_count', 1)
-                await self.redis.hset_unread_consistent(unread_key, {'last_read_message_id': '0-0'})
-            
-            updated_unread_status = await self.redis.hgetall_unread_consistent(unread_key)
-            updated_unread_count = self._extract_unread_count(updated_unread_status)
+                unread = await self.unread_counters.increment(business_profile_id, conversation_id)
+            else:
+                unread = await self.unread_counters.get(business_profile_id, conversation_id)
             
-            return {'unread_count': updated_unread_count}
+            return {'unread_count': unread.conversation, 'unread_total': unread.total}
             
         except Exception as e:
             await logger.aerror("Error updating unread count", error=str(e))
-            return {'unread_count': 0}
-
-    def _extract_unread_count(self, unread_status: dict) -> int:
-        if not unread_status:
-            return 0
-        
-        unread_count_raw = unread_status.get('unread_count', 0)
-        
-        try:
-            if isinstance(unread_count_raw, int):
-                return unread_count_raw
-            elif isinstance(unread_count_raw, str):
-                if unread_count_raw.isdigit():
-                    return int(unread_count_raw)
-                elif unread_count_raw.replace('.', '', 1).isdigit():
-                    return int(float(unread_count_raw))
-                else:
-                    return 0
-            elif isinstance(unread_count_raw, (float, bytes)):
-                return int(unread_count_raw)
-            else:
-                return 0
-        except (ValueError, TypeError):
-            return 0
\ No newline at end of file
+            return {'unread_count': 0, 'unread_total': 0}
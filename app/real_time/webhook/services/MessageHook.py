@@ -7,30 +7,33 @@ from app.events.pub.ChatBotTriggerPublisher import ChatBotTriggerPublisher
 from app.user_management.user.models.Client import Client
 from app.utils.Helper import Helper
 from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from app.annotations.services.ContactService import ContactService
-from app.chat_bot.models.ChatBot import FlowNode
+from app.chat_bot.models.ChatBot import FlowNode, FlowNodeIdProjection
 from app.chat_bot.services.ChatbotContextService import ChatbotContextService
 from app.events.pub.ChatbotFlowPublisher import ChatbotFlowPublisher
 from app.events.pub.MessageReceivedPublisher import MessageHookReceivedPublisher
 from app.events.pub.WhatsappMessagePublisher import WhatsappMessagePublisher
+from app.core.codec.messages import FlowNodePayload, TriggerChatbotPayload
+from app.core.codec.records import ChatbotContext
 from app.core.logs.logger import get_logger
 from app.core.repository.MongoRepository import MongoCRUD
 from app.core.storage.redis import AsyncRedisService
 from app.real_time.socketio.socket_gateway import SocketMessageGateway
+from app.real_time.webhook.services.MessageStatusPipeline import MessageStatusPipeline
 from app.user_management.user.models.Team import Team
 from app.user_management.user.services.ClientService import ClientService
 from app.user_management.user.services.TeamService import TeamService
-from app.utils.RedisHelper import RedisHelper
 from app.whatsapp.business_profile.v1.models.BusinessProfile import BusinessProfile
 from app.whatsapp.business_profile.v1.services.BusinessProfileService import BusinessProfileService
 from app.whatsapp.team_inbox.models.schema.response.ConversationWithContact import ConversationWithContact
 from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.ConversationTeamLink import ConversationTeamLink
-from app.whatsapp.team_inbox.models.Message import Message
+from app.whatsapp.team_inbox.models.Message import Message, MessageContentProjection
 from app.whatsapp.team_inbox.operations.SaveMessage import SaveMessage
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
+from app.whatsapp.team_inbox.services.ConversationWindowService import ConversationWindowService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.core.services.S3Service import S3Service
 from app.whatsapp.media.external_services.WhatsAppMediaApi import WhatsAppMediaApi
@@ -60,6 +63,8 @@ class MessageHook:
         mongo_flow: MongoCRUD[FlowNode],
         s3_service: S3Service,
         message_hook_received_publisher: MessageHookReceivedPublisher,
+        message_status_pipeline: MessageStatusPipeline,
+        window_service: ConversationWindowService,
         aws_s3_bucket: str,
         aws_region: str,
     ):
@@ -81,6 +86,8 @@ class MessageHook:
         self.mongo_flow = mongo_flow
         self.s3_service = s3_service
         self.message_hook_received_publisher = message_hook_received_publisher
+        self.message_status_pipeline = message_status_pipeline
+        self.window_service = window_service
         self.aws_s3_bucket = aws_s3_bucket
         self.aws_region = aws_region
         self.chatbot_context_service = chatbot_context_service
@@ -153,7 +160,8 @@ class MessageHook:
                 data["type"] = "button_interactive"
 
             await self.socket_message.emit_received_message(
-                message=data, phone_number_id=phone_id, conversation_id=str(conversation.id)
+                message=data, phone_number_id=phone_id, conversation_id=str(conversation.id),
+                business_profile_id=str(profile.id)
             )
 
             await logger.adebug("Message data processed", message_type=msg_type)
@@ -163,7 +171,8 @@ class MessageHook:
             await self._set_conversation_expiration(conversation.id, logger)
                         
             await self.save_message.process_message(
-                message_data=data, conversation_id=conversation.id, contact_id=conversation.contact_id
+                message_data=data, conversation_id=conversation.id, contact_id=conversation.contact_id,
+                business_profile_id=profile.id
             )
             
 
@@ -193,22 +202,22 @@ class MessageHook:
                 await logger.adebug("No chatbot context found for conversation")
                 return  
                 
-            if chatbot_context.get("waiting_for_response") and chatbot_context.get("node_type") == "question":
-                current_node_id = chatbot_context.get("current_node_id")
-                chatbot_id = chatbot_context.get("chatbot_id")
+            if chatbot_context.waiting_for_response and chatbot_context.node_type == "question":
+                current_node_id = chatbot_context.current_node_id
+                chatbot_id = chatbot_context.chatbot_id
                 
                 text_content = msg.get("text", {}).get("body", "")
                 
                 business_data = await self._get_business_data_for_conversation(conversation, msg, logger)
                 
-                flow_payload = {
-                    "conversation_id": str(conversation.id),
-                    "current_node_id": current_node_id,
-                    "user_response": text_content,
-                    "business_data": business_data
-                }
+                flow_payload = FlowNodePayload(
+                    conversation_id=str(conversation.id),
+                    current_node_id=current_node_id,
+                    user_response=text_content,
+                    business_data=business_data
+                )
                 
-                await self.chatbot_flow_publisher.publish_flow_node_event(flow_payload)
+                await self.chatbot_flow_publisher.flow_node_event(flow_payload)
                 await logger.adebug("Published chatbot flow event for text response", 
                                 text_preview=text_content[:50])
                 
@@ -225,33 +234,33 @@ class MessageHook:
                 chat_bot_id = conversation.chatbot_id
                 
                 if not chatbot_context:
-                    first_node : FlowNode = await self.mongo_flow.find_one(query= {
+                    first_node : FlowNodeIdProjection = await self.mongo_flow.find_one(query= {
                         "chat_bot_id": chat_bot_id,
                         "is_first": True
-                    })
+                    }, projection=FlowNodeIdProjection)
                     await self.chatbot_context_service.set_chatbot_context(
                         conversation_id = str(conversation.id), 
                         chatbot_id = chat_bot_id,
                         current_node_id = first_node.id
                         
                     )
-                    chatbot_context = {
-                        "current_node_id": first_node.id,
-                        "chatbot_id": chat_bot_id
-                    }
+                    chatbot_context = ChatbotContext(
+                        current_node_id=first_node.id,
+                        chatbot_id=chat_bot_id
+                    )
                     
-                current_node_id = chatbot_context.get("current_node_id")
-                chatbot_id = chatbot_context.get("chatbot_id")
+                current_node_id = chatbot_context.current_node_id
+                chatbot_id = chatbot_context.chatbot_id
                 
                 if not current_node_id or not chatbot_id:
                     await logger.adebug("Invalid chatbot context for conversation")
                     return
                 
-                flow_node_by_button_id: FlowNode = await self.mongo_flow.find_one({
+                flow_node_by_button_id: FlowNodeIdProjection = await self.mongo_flow.find_one({
                     "chat_bot_id": UUID(chatbot_id) if isinstance(chatbot_id, str) else chatbot_id,
                     "type": "interactive_buttons", 
                     "buttons.id": button_id, 
-                })
+                }, projection=FlowNodeIdProjection)
                 
                 if not flow_node_by_button_id:
                     await logger.adebug("Flow node not found for button click", 
@@ -261,12 +270,12 @@ class MessageHook:
                     
                 business_data = await self._get_business_data_for_conversation(conversation, msg, logger)
                 
-                flow_payload = {
-                    "conversation_id": str(conversation.id),
-                    "current_node_id": flow_node_by_button_id.id,
-                    "button_id": button_id,
-                    "business_data": business_data
-                }
+                flow_payload = FlowNodePayload(
+                    conversation_id=str(conversation.id),
+                    current_node_id=flow_node_by_button_id.id,
+                    button_id=button_id,
+                    business_data=business_data
+                )
                 
                 await self.chatbot_flow_publisher.flow_node_event(flow_payload)
                 
@@ -417,7 +426,10 @@ class MessageHook:
 
             context_message_id = context.get("id")
             if context_message_id:
-                original_message = await self.mongo_message.find_one({"wa_message_id": context_message_id})
+                original_message = await self.mongo_message.find_one(
+                    {"wa_message_id": context_message_id},
+                    projection=MessageContentProjection
+                )
                 await logger.adebug("Looking up original message for context", original_message_id=context_message_id)
                 
                 if original_message:
@@ -456,8 +468,7 @@ class MessageHook:
                 await logger.adebug("No conversation for existing contact - triggering chatbot")
                 return True
             
-            expiration_key = RedisHelper.redis_conversation_expired_key(conversation.id)
-            is_active = await self.redis_service.exists(expiration_key)
+            is_active = await self.window_service.is_open(conversation.id)
             
             if not is_active:
                 await logger.adebug("Conversation expired - triggering chatbot")
@@ -486,18 +497,20 @@ class MessageHook:
         
         if convo:
             if not convo.is_open:
-                convo.is_open = True
-                convo = await self.conversation_service.update(convo.id, {"is_open": True})
+                reopened = {"is_open": True}
+                if convo.status == ConversationStatus.EXPIRED:
+                    reopened["status"] = ConversationStatus.OPEN
+                convo = await self.conversation_service.update(convo.id, reopened)
                 await logger.adebug("Reopened existing conversation", conversation_id=str(convo.id))
             
             if should_trigger:
-                await self.chatbot_trigger_publisher.trigger_chatbot_event({
-                    "conversation_id": str(convo.id),
-                    "chatbot_id": str(default_chatbot.id),
-                    "business_token": business_profile.access_token,
-                    "business_phone_number_id": business_profile.phone_number_id,
-                    "recipient_number": f"+{from_number}"
-                })
+                await self.chatbot_trigger_publisher.trigger_chatbot_event(TriggerChatbotPayload(
+                    conversation_id=str(convo.id),
+                    chatbot_id=str(default_chatbot.id),
+                    business_token=business_profile.access_token,
+                    business_phone_number_id=business_profile.phone_number_id,
+                    recipient_number=f"+{from_number}"
+                ))
                 
                 await logger.adebug("Triggered chatbot for existing conversation")
                 await self.socket_message.emit_chatbot_triggered_status(conversation_id=str(convo.id), business_profile_id=str(business_profile.id), chatbot_triggered=True)
@@ -556,22 +569,20 @@ class MessageHook:
         conversation_data = json.loads(conversation_body.model_dump_json())
         await self.socket_message.emit_create_new_conversation(conversation_data, str(business_profile.id))
         
-        await self.chatbot_trigger_publisher.trigger_chatbot_event({
-            "conversation_id": str(conversation_created.id),
-            "chatbot_id": str(default_chatbot.id),
-            "business_token": business_profile.access_token,
-            "business_phone_number_id": business_profile.phone_number_id,
-            "recipient_number": f"+{from_number}"
-        })
+        await self.chatbot_trigger_publisher.trigger_chatbot_event(TriggerChatbotPayload(
+            conversation_id=str(conversation_created.id),
+            chatbot_id=str(default_chatbot.id),
+            business_token=business_profile.access_token,
+            business_phone_number_id=business_profile.phone_number_id,
+            recipient_number=f"+{from_number}"
+        ))
         await logger.adebug("Created new conversation and triggered chatbot", conversation_id=str(conversation_created.id))
         await self.socket_message.emit_chatbot_triggered_status(conversation_id=str(conversation_created.id), business_profile_id=str(business_profile.id), chatbot_triggered=True)
         return conversation_created
 
     async def _set_conversation_expiration(self, conversation_id: Any, logger) -> None:
-        tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
-        key = RedisHelper.redis_conversation_expired_key(conversation_id)
-        await self.redis_service.set(key=key, value=tomorrow, ttl=86400)
-        await logger.adebug("Set conversation expiration", conversation_id=str(conversation_id))
+        expires_at = await self.window_service.open_window(conversation_id)
+        await logger.adebug("Set conversation expiration", conversation_id=str(conversation_id), expires_at=expires_at.isoformat())
 
     async def handle_statuses(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         statuses = payload.get("statuses", [])
@@ -579,39 +590,22 @@ class MessageHook:
         phone_id = meta.get("phone_number_id", "")
         
         logger = self._get_logger(phone_id=phone_id, operation='handle_statuses')
-        details = []
+        entries = []
         
         for st in statuses:
-            message_id = st.get("id")
-            status = st.get("status")
-            
-            entry = {
+            entries.append({
                 "metadata": {
                     "display_phone_number": meta.get("display_phone_number"),
                     "phone_number_id": meta.get("phone_number_id"),
                 },
-                "wa_message_id": message_id,
+                "wa_message_id": st.get("id"),
                 "recipient_id": st.get("recipient_id"),
-                "status": status,
+                "status": st.get("status"),
                 "timestamp": st.get("timestamp"),
-            }
-            await logger.adebug("Publishing status update", status=status)
-            
-            await self.message_publisher.send_message(entry)
-            message_document = await self.mongo_message.find_one({"wa_message_id": message_id})
-            
-            if message_document:
-                await logger.adebug("Emitting message status update", 
-                                        conversation_id=str(message_document.conversation_id),
-                                        status=status)
-                
-                await self.socket_message.emit_message_status(
-                    conversation_id=message_document.conversation_id, 
-                    status=status, 
-                    message_id=message_document.id
-                )
-            else:
-                await logger.awarning("Message document not found for status update")
+            })
+        
+        await logger.adebug("Queueing status updates", count=len(entries))
+        await self.message_status_pipeline.add(entries)
 
     def _extract_contact_info(self, contacts: List[Dict[str, Any]]) -> Dict[str, Any]:
         if not contacts:
@@ -0,0 +1,120 @@
+import asyncio
+import contextlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from app.core.logs.logger import get_logger
+from app.core.repository.MongoRepository import MongoCRUD
+from app.events.pub.WhatsappMessagePublisher import WhatsappMessagePublisher
+from app.real_time.socketio.socket_gateway import SocketMessageGateway
+from app.whatsapp.team_inbox.models.Message import Message, MessageStatusProjection
+
+logger = get_logger("MessageStatusPipeline")
+
+STATUS_FLUSH_WINDOW_SECONDS = 1.0
+MAX_BATCH_SIZE = 500
+
+STATUS_RANK = {
+    "sent": 1,
+    "delivered": 2,
+    "read": 3,
+    "failed": 4,
+}
+
+
+class MessageStatusPipeline:
+    def __init__(
+        self,
+        message_publisher: WhatsappMessagePublisher,
+        mongo_message: MongoCRUD[Message],
+        socket_message: SocketMessageGateway,
+        flush_window: float = STATUS_FLUSH_WINDOW_SECONDS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+    ):
+        self.message_publisher = message_publisher
+        self.mongo_message = mongo_message
+        self.socket_message = socket_message
+        self.flush_window = flush_window
+        self.max_batch_size = max_batch_size
+
+        # wa_message_id -> latest status entry seen in the current window
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def add(self, entries: List[Dict[str, Any]]) -> None:
+        for entry in entries:
+            wa_message_id = entry.get("wa_message_id")
+            if not wa_message_id:
+                continue
+            current = self._pending.get(wa_message_id)
+            if current is None or self._status_key(entry) >= self._status_key(current):
+                self._pending[wa_message_id] = entry
+
+        if len(self._pending) >= self.max_batch_size:
+            await self.flush()
+        elif self._pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.flush_window)
+        try:
+            # Shielded: close() cancelling the timer must not cut a flush that took the buffer.
+            await asyncio.shield(self.flush())
+        except Exception as e:
+            await logger.aexception("Failed to flush message statuses", error=str(e))
+
+    async def close(self) -> None:
+        """Flushes what is still buffered; called on shutdown so the last window is not lost."""
+        task, self._flush_task = self._flush_task, None
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        try:
+            await self.flush()
+        except Exception as e:
+            await logger.aexception("Failed to flush message statuses on shutdown", error=str(e))
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            statuses = list(pending.values())
+            await self.message_publisher.send_status_batch(statuses)
+            await self._emit_statuses(pending)
+
+            await logger.adebug("Flushed message statuses", count=len(statuses))
+
+    async def _emit_statuses(self, pending: Dict[str, Dict[str, Any]]) -> None:
+        message_documents: List[MessageStatusProjection] = await self.mongo_message.find_many(
+            {"wa_message_id": {"$in": list(pending.keys())}},
+            limit=0,
+            projection=MessageStatusProjection
+        )
+
+        statuses_by_conversation: Dict[str, List[Dict[str, str]]] = defaultdict(list)
+        for document in message_documents:
+            new_status = pending[document.wa_message_id]["status"]
+            # Meta does not order webhooks: a late "delivered" must not take a "read" back. An equal
+            # rank is still emitted, as the worker may have applied this batch before the read.
+            if STATUS_RANK.get(new_status, 0) < STATUS_RANK.get(document.message_status, 0):
+                continue
+            statuses_by_conversation[str(document.conversation_id)].append({
+                "message_id": str(document.id),
+                "status": new_status,
+            })
+
+        if len(message_documents) < len(pending):
+            await logger.awarning(
+                "Message documents not found for status updates",
+                missing=len(pending) - len(message_documents)
+            )
+
+        for conversation_id, statuses in statuses_by_conversation.items():
+            await self.socket_message.emit_message_statuses(conversation_id=conversation_id, statuses=statuses)
+
+    @staticmethod
+    def _status_key(entry: Dict[str, Any]) -> tuple:
+        return (STATUS_RANK.get(entry.get("status"), 0), int(entry.get("timestamp") or 0))
@@ -1,4 +1,9 @@
-from typing import Any, Dict
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from pymongo import UpdateOne
+from app.core.logs.logger import get_logger
 from app.core.repository.MongoRepository import MongoCRUD
 from app.user_management.user.models.Client import Client
 from app.user_management.user.services.ClientService import ClientService
@@ -9,67 +14,124 @@ from app.whatsapp.template.models.Template import Template
 from app.whatsapp.template.models.TemplateMeta import TemplateMeta
 from app.whatsapp.template.services.TemplateService import TemplateService
 
+logger = get_logger("TemplateHook")
+
+STATUS_FLUSH_WINDOW_SECONDS = 0.5
+
 
 class TemplateHook:
-    def __init__(self, template_service: TemplateService, client_service: ClientService, business_profile_service: BusinessProfileService, mongo_crud: MongoCRUD[Template], wa_template_api: WhatsAppTemplateApi):
+    def __init__(self, template_service: TemplateService, client_service: ClientService, business_profile_service: BusinessProfileService, mongo_crud: MongoCRUD[Template], wa_template_api: WhatsAppTemplateApi, flush_window: float = STATUS_FLUSH_WINDOW_SECONDS):
         self.template_service = template_service
         self.client_service = client_service
         self.business_profile_service = business_profile_service
         self.mongo_crud = mongo_crud
         self.wa_template_api = wa_template_api
+        self.flush_window = flush_window
+        
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
 
     async def handle_message_template_status_update(self, payload: Dict[str, Any]):
         
-        if "profile_id" in payload:
-            
-            templateMeta = await self.handle_get_template(payload["message_template_id"])
-            
-            if templateMeta:
-                
-                status = payload["event"] == templateMeta.status
-                if status:
-                    pass
-                else:
-                    templateMeta.status = payload["event"]
-                    await self.template_service.update(templateMeta.id, templateMeta)
-                    await self.mongo_crud.update(id=templateMeta.id, data=templateMeta)
-
-            else:
-                
-                business_profile = await self.handle_get_business_profile(payload["profile_id"])
-                if not business_profile:
-                    raise Exception("Business profile not found")
-                
-                client = await self.handle_get_client(business_profile.phone_number)
-                if not client:
-                    raise Exception("Client not found")
-                
-                template = await self.wa_template_api.get_template_by_id(
-                    access_token=business_profile.access_token,
-                    template_id=payload["message_template_id"],
-                )
-
-                template_meta = TemplateMeta(
-                    name=template["name"],
-                    language=template["language"],
-                    category=template["category"],
-                    template_wat_id=template["id"],
-                    status=template["status"],
-                    client_id=client.id,
-                )
-                template_created_data = await self.template_service.create(template_meta)
-                
-                template_doc = Template(
-                    id=template_created_data.id,
-                    name=template["name"],
-                    language=template["language"],
-                    category=template["category"],
-                    template_wat_id=template["id"],
-                    status=template["status"],
-                    components=template["components"],
-                )
-                await self.mongo_crud.create(template_doc)
-                
+        if "profile_id" not in payload:
+            return
+        
+        # Meta re-reviews arrive in bursts, only the latest event per template matters.
+        self._pending_updates[str(payload["message_template_id"])] = payload
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_window())
+
+    async def _flush_after_window(self):
+        await asyncio.sleep(self.flush_window)
+        try:
+            # Shielded: close() cancelling the timer must not cut a flush that took the buffer.
+            await asyncio.shield(self.flush_pending_updates())
+        except Exception as e:
+            await logger.aexception("Failed to flush template status updates", error=str(e))
+
+    async def close(self):
+        """Flushes buffered updates; called on shutdown so the last window is not lost."""
+        task, self._flush_task = self._flush_task, None
+        if task:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        try:
+            await self.flush_pending_updates()
+        except Exception as e:
+            await logger.aexception("Failed to flush template status updates on shutdown", error=str(e))
+
+    async def flush_pending_updates(self):
+        async with self._flush_lock:
+            pending_updates, self._pending_updates = self._pending_updates, {}
+            if not pending_updates:
+                return
+
+            # One UPDATE for the batch; it skips templates already at the reported status, so
+            # no cache of known statuses is needed (and none can go stale).
+            status_changes = await self.template_service.update_statuses_by_wa_id(
+                {template_wa_id: payload["event"] for template_wa_id, payload in pending_updates.items()}
+            )
+
+            if len(status_changes) < len(pending_updates):
+                existing = await self.template_service.get_existing_wa_ids(list(pending_updates))
+                for template_wa_id, payload in pending_updates.items():
+                    if template_wa_id in existing:
+                        continue
+                    try:
+                        await self.handle_create_template(payload)
+                    except Exception as e:
+                        await logger.aexception(
+                            "Failed to create template from status update",
+                            template_wa_id=template_wa_id,
+                            error=str(e)
+                        )
+
+            if status_changes:
+                now = datetime.now(timezone.utc).replace(tzinfo=None)
+                await self.mongo_crud.bulk_write([
+                    UpdateOne({"_id": template_id}, {"$set": {"status": template_status, "updated_at": now}})
+                    for template_id, template_status in status_changes.items()
+                ])
+
+            await logger.adebug("Flushed template status updates", updated=len(status_changes), received=len(pending_updates))
+
+    async def handle_create_template(self, payload: Dict[str, Any]):
+        business_profile = await self.handle_get_business_profile(payload["profile_id"])
+        if not business_profile:
+            raise Exception("Business profile not found")
+        
+        client = await self.handle_get_client(business_profile.phone_number)
+        if not client:
+            raise Exception("Client not found")
+        
+        template = await self.wa_template_api.get_template_by_id(
+            access_token=business_profile.access_token,
+            template_id=payload["message_template_id"],
+        )
+
+        template_meta = TemplateMeta(
+            name=template["name"],
+            language=template["language"],
+            category=template["category"],
+            template_wat_id=template["id"],
+            status=template["status"],
+            client_id=client.id,
+        )
+        template_created_data = await self.template_service.create(template_meta)
+        
+        template_doc = Template(
+            id=template_created_data.id,
+            name=template["name"],
+            language=template["language"],
+            category=template["category"],
+            template_wat_id=template["id"],
+            status=template["status"],
+            components=template["components"],
+        )
+        await self.mongo_crud.create(template_doc)
 
     async def handle_get_business_profile(self, profile_id: str) -> BusinessProfile:
         business_profile = await self.business_profile_service.get_by_whatsapp_business_account_id(profile_id)
@@ -82,8 +144,3 @@ class TemplateHook:
         if not client:
             raise Exception("Client not found")
         return client
-    
-    async def handle_get_template(self, template_wa_id: str) -> TemplateMeta:
-        template = await self.template_service.get_template_by_wa_id(str(template_wa_id))
-        return template
-
@@ -1,4 +1,5 @@
 from app.core.logs.logger import get_logger
+from app.core.tracing.tracer import start_span
 from app.real_time.webhook.services.TemplateHook import TemplateHook
 from fastapi import HTTPException, logger, status
 
@@ -22,7 +23,8 @@ class WebhookDispatcher:
             handler_method = getattr(service, f"handle_{field}", None)
 
             if handler_method:
-                await handler_method(payload)
+                with start_span(f"webhook.{field}", {"webhook.field": field}):
+                    await handler_method(payload)
             else:
                 raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Handler method not found for field: {field}")
             
@@ -29,7 +29,7 @@ class UserRepository(BaseRepository[User]):
     async def get_users_by_client_id(
         self, client_id: str, query: str, page: int, limit: int, sort_by: Optional[SortByCreatedAt]
     ) -> Dict[str, Union[List[User], int]]:
-        async with self.session as db_session:
+        async with self.session.replica() as db_session:
             try:
                 base_query = select(self.model).where(self.model.client_id == client_id)
                 
@@ -1,9 +1,10 @@
 from __future__ import annotations
 import ast
-import phonenumbers
-from phonenumbers import NumberParseException
 from datetime import datetime, timezone, tzinfo
 from typing import Any, Dict, Optional
+
+from app.utils.PhoneNumberNormalizer import phone_number_normalizer
+
 class Helper:
     
     @staticmethod
@@ -11,13 +12,8 @@ class Helper:
 
         if not number.startswith("+"):
             number = f"+{number.lstrip('+')}"         
-        try:
-            parsed = phonenumbers.parse(number, None) 
-        except NumberParseException as exc:
-            raise ValueError(f"Invalid phone number: {exc}") from exc
-        if not phonenumbers.is_valid_number(parsed):   
-            raise ValueError("Invalid phone number")
-        return f"+{parsed.country_code}", str(parsed.national_number)
+        parsed = phone_number_normalizer.normalize(number)
+        return parsed.country_code, parsed.national_number
     
     @staticmethod
     def to_utc_aware(dt: datetime, *, assume_tz: Optional[tzinfo] = None) -> datetime:
@@ -0,0 +1,74 @@
+"""Phone number parsing with a bounded LRU cache in front of libphonenumber.
+
+`phonenumbers.parse` walks the region metadata on every call, and the same numbers come back
+again and again: every webhook from a contact, every row of a re-uploaded contact sheet, every
+recipient of a recurring broadcast. A normalizer parses a number once and keeps the E.164 form,
+country code, national number and validity together, so one lookup answers all four.
+
+Only `phonenumbers` and the standard library are imported, so the Celery worker shares the
+module-level `phone_number_normalizer` with the API.
+"""
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Union
+
+import phonenumbers
+from phonenumbers import NumberParseException, PhoneNumberFormat
+
+DEFAULT_CACHE_SIZE = 65536
+
+
+class PhoneNumber(NamedTuple):
+    e164: str
+    country_code: str
+    national_number: str
+    is_valid: bool
+
+
+class PhoneNumberNormalizer:
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        # Parse failures are cached too (as the error message), so a bad number in a list
+        # costs one parse no matter how often it repeats.
+        self._parse = lru_cache(maxsize=maxsize)(self._parse_uncached)
+
+    @staticmethod
+    def _parse_uncached(number: str) -> Union[PhoneNumber, str]:
+        try:
+            parsed = phonenumbers.parse(number, None)
+        except NumberParseException as exc:
+            return str(exc)
+        return PhoneNumber(
+            e164=phonenumbers.format_number(parsed, PhoneNumberFormat.E164),
+            country_code=f"+{parsed.country_code}",
+            national_number=str(parsed.national_number),
+            is_valid=phonenumbers.is_valid_number(parsed),
+        )
+
+    def normalize(self, number: str, require_valid: bool = True) -> PhoneNumber:
+        """Parses an international number ("+962791234567"); raises ValueError when it can't."""
+        result = self._parse(number)
+        if isinstance(result, str):
+            raise ValueError(f"Invalid phone number: {result}")
+        if require_valid and not result.is_valid:
+            raise ValueError("Invalid phone number")
+        return result
+
+    def try_normalize(self, number: str, require_valid: bool = True) -> Optional[PhoneNumber]:
+        result = self._parse(number)
+        if isinstance(result, str) or (require_valid and not result.is_valid):
+            return None
+        return result
+
+    def normalize_many(self, numbers: Iterable[str], require_valid: bool = True) -> List[Optional[PhoneNumber]]:
+        """`try_normalize` for every number, in order; duplicates within the batch are looked up once."""
+        numbers = list(numbers)
+        unique = {number: self.try_normalize(number, require_valid) for number in dict.fromkeys(numbers)}
+        return [unique[number] for number in numbers]
+
+    def cache_info(self):
+        return self._parse.cache_info()
+
+    def cache_clear(self) -> None:
+        self._parse.cache_clear()
+
+
+phone_number_normalizer = PhoneNumberNormalizer()
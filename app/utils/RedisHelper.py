@@ -1,3 +1,11 @@
+import zlib
+
+from app.core.codec.records import LastMessage
+
+# Both the API and the Celery worker hash conversations onto these shards: keep them equal.
+CONVERSATION_EXPIRY_INDEX_SHARDS = 16
+
+
 class RedisHelper:
     ############################################ app
     @staticmethod
@@ -8,6 +16,10 @@ class RedisHelper:
     def redis_roles() -> str:
         return f"auth_roles"
     
+    @staticmethod
+    def redis_leader_lease_key(name: str) -> str:
+        return f"app:leader:{{{name}}}:lease"
+    
     @staticmethod
     def redis_client_buiness_data_key(client_id: str) -> str:
         return f"auth:client:{{{client_id}}}:business_profile_data"
@@ -29,13 +41,24 @@ class RedisHelper:
     def redis_conversation_expired_key(conversation_id: str) -> str:
         return f"teaminbox:conversation:{{{conversation_id}}}:closed_session"
     
+    @staticmethod
+    def redis_conversation_expiry_index_key(conversation_id: str) -> str:
+        # Sorted set: member = conversation id, score = epoch second its 24h window closes.
+        # Split in shards (hash-tagged apart) so one key is not a hot slot in cluster mode.
+        shard = zlib.crc32(str(conversation_id).encode()) % CONVERSATION_EXPIRY_INDEX_SHARDS
+        return RedisHelper.redis_conversation_expiry_index_shard_key(shard)
+
+    @staticmethod
+    def redis_conversation_expiry_index_shard_key(shard: int) -> str:
+        return f"teaminbox:conversation_expiry_index:{{{shard}}}"
+    
     @staticmethod
     def redis_conversation_last_message_key(conversation_id: str) -> str:
         return f"teaminbox:conversation:{{{conversation_id}}}:last_message"
     
     @staticmethod
-    def redis_conversation_last_message_data(last_message: str,last_message_time: str) -> dict:
-        return {"last_message": last_message, "last_message_time": last_message_time}
+    def redis_conversation_last_message_data(last_message: str,last_message_time: str) -> LastMessage:
+        return LastMessage(last_message=last_message, last_message_time=last_message_time)
     
     ############################################## broadcast
     
@@ -57,10 +80,18 @@ class RedisHelper:
     def redis_business_phone_number_id_key(business_profile_id: str) -> str:
         return f"business_phone_number_id:{{{business_profile_id}}}"
     
+    @staticmethod
+    def redis_phone_number_business_profile_id_key(phone_number_id: str) -> str:
+        return f"phone_number_business_profile_id:{{{phone_number_id}}}"
+    
     @staticmethod
     def redis_socket_user_session_key(sid: str) -> str:
         return f"chat:user:user_info:{{{sid}}}"
     
+    @staticmethod
+    def redis_socket_user_conversations_key(sid: str) -> str:
+        return f"chat:user:{{{sid}}}:conversations"
+    
     @staticmethod
     def redis_session_business_key(sid: str) -> str:
         return f"chat:business_group:user_sid:{{{sid}}}"
@@ -77,6 +108,10 @@ class RedisHelper:
     def redis_business_members_key(phone_number_id: str) -> str:
         return f"chat:business_group:{{{phone_number_id}}}:members"
     
+    @staticmethod
+    def redis_business_events_stream_key(phone_number_id: str) -> str:
+        return f"chat:business_group:{{{phone_number_id}}}:events_stream"
+    
     @staticmethod
     def redis_business_room_key(phone_number_id: str) -> str:
         return f"chat:business_group:{{{phone_number_id}}}:room"
@@ -101,29 +136,44 @@ class RedisHelper:
     def redis_business_conversation_unread_key(conversation_id: str) -> str:
         return f"chat:conversation:{{{conversation_id}}}:unread"
     
+    @staticmethod
+    def redis_business_unread_counters_key(business_profile_id: str) -> str:
+        # Hash: one field per conversation with unread messages, plus the business total.
+        return f"chat:business:{{{business_profile_id}}}:unread_counters"
+    
+    @staticmethod
+    def redis_business_conversation_changes_key(business_profile_id: str) -> str:
+        # ZSET: conversation id scored by the version of its latest change.
+        return f"chat:business:{{{business_profile_id}}}:conversation_changes"
+    
+    @staticmethod
+    def redis_business_conversation_changes_state_key(business_profile_id: str) -> str:
+        # Hash: current version and the highest version trimmed from the change log.
+        return f"chat:business:{{{business_profile_id}}}:conversation_changes_state"
+    
     ############################################## chatbot
     
     @staticmethod
     def redis_chatbot_context_key(conversation_id: str) -> str:
-        return f"chatbot:conversation:{conversation_id}"
+        return f"chatbot:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_button_key(chatbot_id: str, current_node_id: str, btn_id: str) -> str:
-        return f"chatbot:{chatbot_id}:node:{current_node_id}:buttons:{btn_id}"
+        return f"chatbot:{{{chatbot_id}}}:node:{current_node_id}:buttons:{btn_id}"
     
     @staticmethod
     def redis_chatbot_contact_data_key(conversation_id: str) -> str:
-        return f"chatbot:contact_data:conversation:{conversation_id}"
+        return f"chatbot:contact_data:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_business_data_by_conversation_key(conversation_id: str) -> str:
-        return f"chatbot:business_data:conversation:{conversation_id}"
+        return f"chatbot:business_data:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_flow_state_key(conversation_id: str) -> str:
-        return f"chatbot:flow_state:conversation:{conversation_id}"
+        return f"chatbot:flow_state:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_node_transitions_key(chatbot_id: str, node_id: str) -> str:
-        return f"chatbot:{chatbot_id}:node:{node_id}:transitions"
+        return f"chatbot:{{{chatbot_id}}}:node:{node_id}:transitions"
     
\ No newline at end of file
@@ -1,19 +1,16 @@
 from typing import List
-import phonenumbers
+
+from app.utils.PhoneNumberNormalizer import phone_number_normalizer
 
 
 def validate_phone_number(value: str) -> str:
-    try:
-        phone_number = phonenumbers.parse(value, None)
-        if not phonenumbers.is_valid_number(phone_number):
-            raise ValueError("Invalid phone number format.")
-    except phonenumbers.NumberParseException:
+    if phone_number_normalizer.try_normalize(value) is None:
         raise ValueError("Invalid phone number format.")
     return value
 
 def validate_phone_list(numbers: List[str]) -> List[str]:
-    for num in numbers:
-        validate_phone_number(num)  
+    if None in phone_number_normalizer.normalize_many(numbers):
+        raise ValueError("Invalid phone number format.")
     return numbers
 
 
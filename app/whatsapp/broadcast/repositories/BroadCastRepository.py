@@ -24,7 +24,7 @@ class BroadcastRepository(BaseRepository[BroadCast]):
         search: str,
         sort_by: SortByCreatedAt
     ):
-        async with self.session as db_session:
+        async with self.session.replica() as db_session:
             try:
                 query = (
                     select(BroadCast)
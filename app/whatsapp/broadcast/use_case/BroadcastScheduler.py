@@ -17,7 +17,6 @@ from app.whatsapp.broadcast.services.BroadCastService import BroadcastService
 from app.whatsapp.business_profile.v1.models.BusinessProfile import BusinessProfile
 from app.whatsapp.business_profile.v1.services.BusinessProfileService import BusinessProfileService
 from app.whatsapp.template.models.Template import Template
-from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
 
 logger = get_logger(__name__)
 class BroadcastScheduler:
@@ -118,6 +117,7 @@ class BroadcastScheduler:
             raise    
 
     async def _execute_broadcast(self, broadcast: BroadCast, parameters: list[str] = None) -> None:
+        from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
         try:
             await self.broadcast_service.update(
                 broadcast.id, 
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from pydantic import Field
+from pydantic import BaseModel, Field
 from app.core.schemas.BaseModelNoNone import BaseModelNoNone
 from beanie import Document, Insert, Replace, before_event
 from pymongo import ASCENDING, DESCENDING, IndexModel
@@ -9,6 +9,29 @@ from pymongo import ASCENDING, DESCENDING, IndexModel
 from app.utils.DateTimeHelper import DateTimeHelper
 
 
+class MessageStatusProjection(BaseModel):
+    id: UUID = Field(alias="_id")
+    conversation_id: UUID
+    wa_message_id: Optional[str] = None
+    message_status: Optional[str] = None
+
+class MessageContentProjection(BaseModel):
+    id: UUID = Field(alias="_id")
+    content: Optional[dict] = None
+
+class MessageListProjection(BaseModelNoNone):
+    id: UUID = Field(alias="_id")
+    message_type: str
+    message_status: Optional[str] = None
+    conversation_id: UUID
+    wa_message_id: Optional[str] = None
+    content: Optional[dict] = None
+    context: Optional[dict] = None
+    is_from_contact: Optional[bool] = None
+    member_id: Optional[UUID] = None
+    chat_bot_id: Optional[UUID] = None
+    created_at: datetime
+
 class Message(Document, BaseModelNoNone):
     id: UUID = Field(alias="_id")
     message_type: str
@@ -35,22 +58,18 @@ class Message(Document, BaseModelNoNone):
     class Settings:
         name = "messages"
         indexes = [
+            # history paging: {conversation_id, created_at/_id cursor} sorted by created_at, _id desc
             [
                 ("conversation_id", ASCENDING),
                 ("created_at", DESCENDING),
                 ("_id", DESCENDING),
             ],
-            [("conversation_id", ASCENDING)],
+            # reply context and status lookups
             [("wa_message_id", ASCENDING)],
-
             IndexModel(
                 [("chat_bot_id", ASCENDING)], 
                 sparse=True  
             ),
-            IndexModel(
-                [("wa_message_id", ASCENDING)], 
-                sparse=True  
-            )
         ]
 
     class Config:
@@ -12,7 +12,7 @@ class MessageMeta(BaseEntity, table=True):
     )
     message_type: str = Field(nullable=False)
     message_status: str = Field(default=None,nullable=True)
-    whatsapp_message_id: str = Field(nullable=True)
+    whatsapp_message_id: str = Field(nullable=True, index=True)
     is_from_contact: bool = Field(nullable=False,default=False)
     member_id: UUID = Field(foreign_key="users.id", nullable=True, index=True)
     chat_bot_id: UUID = Field(foreign_key="chat_bots.id", nullable=True,ondelete="SET NULL")
@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import List
+
+from app.whatsapp.team_inbox.models.schema.response.ConversationWithContact import ConversationWithContact
+
+class ConversationChanges(BaseModel):
+    version: int
+    changed: List[ConversationWithContact] = []
+    has_more: bool = False
+    resync_required: bool = False
@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+from typing import Dict, Optional
+from uuid import UUID
+from app.core.logs.logger import get_logger
+from app.real_time.socketio.socket_gateway import SocketMessageGateway
+from app.whatsapp.team_inbox.services.ConversationService import ConversationService
+from app.whatsapp.team_inbox.services.ConversationWindowService import ConversationWindowService
+
+logger = get_logger("ConversationExpirySweeper")
+
+SWEEP_INTERVAL_SECONDS = 60.0
+SWEEP_BATCH_SIZE = 500
+
+
+class ConversationExpirySweeper:
+    """Closes conversations whose 24h window has passed, a batch at a time.
+
+    It runs in the worker holding the leader lease. Claiming from the expiry index is atomic,
+    so a second sweeper during a leadership handover splits the work instead of repeating it.
+    """
+
+    def __init__(
+        self,
+        window_service: ConversationWindowService,
+        conversation_service: ConversationService,
+        socket_message: SocketMessageGateway,
+        interval: float = SWEEP_INTERVAL_SECONDS,
+        batch_size: int = SWEEP_BATCH_SIZE,
+    ) -> None:
+        self.window_service = window_service
+        self.conversation_service = conversation_service
+        self.socket_message = socket_message
+        self.interval = interval
+        self.batch_size = batch_size
+        self._sweep_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if not self._sweep_task or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._sweep_task:
+            self._sweep_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._sweep_task
+            self._sweep_task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                await logger.aexception("Conversation expiry sweep failed", error=str(e))
+            await asyncio.sleep(self.interval)
+
+    async def sweep(self) -> int:
+        """Runs batches until nothing is left to expire; returns how many conversations were closed."""
+        closed = 0
+        while True:
+            claimed = await self.window_service.claim_expired(limit=self.batch_size)
+            if not claimed:
+                return closed
+            closed += await self._expire_batch(claimed)
+            if len(claimed) < self.batch_size:
+                return closed
+
+    async def _expire_batch(self, claimed: Dict[str, float]) -> int:
+        try:
+            # A message may have reopened a window between the claim and now; those stay open.
+            reopened = await self.window_service.expires_at_many(claimed)
+            conversation_ids = [UUID(c) for c, expires_at in zip(claimed, reopened) if expires_at is None]
+            rows = await self.conversation_service.expire_conversations(conversation_ids)
+        except Exception:
+            # Nothing was closed: put the windows back so a later sweep claims them again.
+            await self.window_service.restore(claimed)
+            raise
+
+        for conversation_id, status, phone_number_id in rows:
+            await self.socket_message.emit_conversation_expired(
+                conversation_id=str(conversation_id), status=status.value if status else None, phone_number_id=phone_number_id
+            )
+
+        await logger.ainfo("Expired conversations", claimed=len(claimed), closed=len(rows))
+        return len(rows)
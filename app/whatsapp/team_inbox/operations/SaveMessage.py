@@ -8,6 +8,7 @@ from app.utils.Helper import Helper
 from app.utils.RedisHelper import RedisHelper
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 
 
@@ -16,11 +17,13 @@ class SaveMessage:
         self,
         message_service: MessageService,
         message_repo: MongoCRUD[Message],
-        redis_service: AsyncRedisService
+        redis_service: AsyncRedisService,
+        change_log: ConversationChangeLog
     ) -> None:
         self.message_service = message_service
         self.message_repo = message_repo
         self.redis_service = redis_service
+        self.change_log = change_log
         self.logger = get_logger("SaveMessageProcess")
 
     async def process_message(
@@ -28,6 +31,7 @@ class SaveMessage:
         message_data: Dict[str, Any],
         conversation_id: UUID,
         contact_id: UUID,
+        business_profile_id: Optional[UUID] = None,
     ) -> Optional[MessageMeta]:
         try:
             meta = await self._create_message_meta(message_data, conversation_id,contact_id)
@@ -48,6 +52,8 @@ class SaveMessage:
             
             redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message=last_message_content,last_message_time=f"{meta.created_at}")
             await self.redis_service.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation_id)),value= redis_last_message)
+            if business_profile_id:
+                await self.change_log.record(business_profile_id, conversation_id)
             
             return meta
         except Exception:
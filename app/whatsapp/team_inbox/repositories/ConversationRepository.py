@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import List, Optional, Sequence
 from uuid import UUID
-from sqlalchemy import desc, func, or_
+from sqlalchemy import desc, func, literal, or_, true, update
 from sqlmodel import asc, case, select
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import selectinload
@@ -53,11 +53,51 @@ class ConversationRepository(BaseRepository[Conversation]):
             except SQLAlchemyError as e:
                 raise DataBaseException(str(e))
 
+    async def expire_conversations(self, conversation_ids: Sequence[UUID]) -> List[tuple]:
+        """Closes the given conversations in one UPDATE; OPEN and PENDING ones become EXPIRED.
+
+        Returns (id, status, phone_number_id) for every conversation that was still open;
+        phone_number_id is None when the client has no business profile.
+        """
+        if not conversation_ids:
+            return []
+        async with self.session as db_session:
+            try:
+                statement = (
+                    update(Conversation)
+                    .where(Conversation.id.in_(conversation_ids), Conversation.is_open == true())
+                    .values(
+                        is_open=False,
+                        status=case(
+                            (
+                                Conversation.status.in_([ConversationStatus.OPEN, ConversationStatus.PENDING]),
+                                literal(ConversationStatus.EXPIRED, Conversation.status.type),
+                            ),
+                            else_=Conversation.status,
+                        ),
+                    )
+                    .returning(Conversation.id, Conversation.status, Conversation.client_id)
+                )
+                closed = (await db_session.exec(statement)).all()
+                await db_session.commit()
+                if not closed:
+                    return []
+
+                profiles = await db_session.exec(
+                    select(BusinessProfile.client_id, BusinessProfile.phone_number_id)
+                    .where(BusinessProfile.client_id.in_({row.client_id for row in closed}))
+                )
+                phone_number_ids = dict(profiles.all())
+                return [(row.id, row.status, phone_number_ids.get(row.client_id)) for row in closed]
+            except SQLAlchemyError as e:
+                raise DataBaseException(str(e))
+
     async def get_user_conversations(
         self, user_id: UUID, page: int = 1, limit: int = 10, search_term: Optional[str] = None, 
-        sort_by: Optional[str] = None, status_filter: Optional[str] = None
+        sort_by: Optional[str] = None, status_filter: Optional[str] = None, primary: bool = False
     ) -> dict:
-        async with self.session as db_session:
+        # `primary` is for delta-sync bootstraps, which must not miss changes the replica lags behind.
+        async with (self.session if primary else self.session.replica()) as db_session:
             try:
                 offset = (page - 1) * limit
 
@@ -147,6 +187,29 @@ class ConversationRepository(BaseRepository[Conversation]):
             except SQLAlchemyError as e:
                 raise DataBaseException(str(e))
 
+    async def get_user_conversations_by_ids(self, user_id: UUID, conversation_ids: Sequence[UUID]) -> List[Conversation]:
+        """The given conversations that are visible to the user through one of their teams.
+
+        Read from the primary: the change log has already moved past these changes, so a
+        lagging replica would hand out the old state at the new version.
+        """
+        if not conversation_ids:
+            return []
+        async with self.session as db_session:
+            try:
+                query = (
+                    select(Conversation)
+                    .join(ConversationTeamLink, Conversation.id == ConversationTeamLink.conversation_id)
+                    .join(UserTeam, UserTeam.team_id == ConversationTeamLink.team_id)
+                    .where(UserTeam.user_id == user_id, Conversation.id.in_(conversation_ids))
+                    .distinct()
+                    .options(selectinload(Conversation.conversation_link))
+                    .options(selectinload(Conversation.assignment))
+                )
+                return (await db_session.exec(query)).all()
+            except SQLAlchemyError as e:
+                raise DataBaseException(str(e))
+
     def _build_search_conditions(self, search_term: str):
         clean_search = search_term.lower().strip()
         phone_search = ''.join(c for c in clean_search if c.isdigit())
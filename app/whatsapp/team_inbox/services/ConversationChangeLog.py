@@ -0,0 +1,106 @@
+from typing import List, NamedTuple
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+
+CHANGE_LOG_MAX_ENTRIES = 10000
+
+# KEYS[1] = changes zset, KEYS[2] = state hash, ARGV = max entries, conversation ids.
+# Each conversation gets its own version, so a page of changes never splits one version.
+RECORD_SCRIPT = """
+local count = #ARGV - 1
+local version = redis.call('HINCRBY', KEYS[2], 'version', count)
+for i = 1, count do
+    redis.call('ZADD', KEYS[1], version - count + i, ARGV[i + 1])
+end
+local excess = redis.call('ZCARD', KEYS[1]) - tonumber(ARGV[1])
+if excess > 0 then
+    local newest_trimmed = redis.call('ZRANGE', KEYS[1], excess - 1, excess - 1, 'WITHSCORES')
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, excess - 1)
+    redis.call('HSET', KEYS[2], 'floor', newest_trimmed[2])
+end
+return version
+"""
+
+# KEYS[1] = changes zset, KEYS[2] = state hash, ARGV = since, limit.
+# Returns {version, floor, {id, version, ...}}; nothing is read for a token the log cannot serve.
+CHANGES_SCRIPT = """
+local state = redis.call('HMGET', KEYS[2], 'version', 'floor')
+local version = tonumber(state[1] or '0')
+local floor = tonumber(state[2] or '0')
+local since = tonumber(ARGV[1])
+if since > version or since < floor then
+    return {version, floor, {}}
+end
+return {version, floor, redis.call('ZRANGEBYSCORE', KEYS[1], '(' .. since, '+inf', 'WITHSCORES', 'LIMIT', 0, ARGV[2])}
+"""
+
+
+class ChangeLogPage(NamedTuple):
+    conversation_ids: List[str]
+    version: int
+    has_more: bool
+    resync_required: bool
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class ConversationChangeLog:
+    """Versioned log of which conversations of a business changed, for inbox delta sync.
+
+    Writers record a conversation after they change its status, assignment, last message or
+    unread count; the log keeps each conversation once, at the version of its latest change,
+    so it grows with the number of conversations, not with traffic. Past `max_entries` the
+    oldest are trimmed and tokens older than what was trimmed must resync.
+    """
+
+    def __init__(self, redis_service: AsyncRedisService, max_entries: int = CHANGE_LOG_MAX_ENTRIES):
+        self.redis_service = redis_service
+        self.max_entries = max_entries
+        self._record = redis_service.register_script(RECORD_SCRIPT)
+        self._changes = redis_service.register_script(CHANGES_SCRIPT)
+
+    @staticmethod
+    def _keys(business_profile_id) -> List[str]:
+        return [
+            RedisHelper.redis_business_conversation_changes_key(str(business_profile_id)),
+            RedisHelper.redis_business_conversation_changes_state_key(str(business_profile_id)),
+        ]
+
+    async def record(self, business_profile_id, *conversation_ids) -> int:
+        """Marks the conversations changed; returns the new version of the business's log."""
+        if not conversation_ids:
+            return await self.version(business_profile_id)
+        version = await self._record(
+            keys=self._keys(business_profile_id),
+            args=[self.max_entries, *(str(conversation_id) for conversation_id in conversation_ids)],
+        )
+        return int(version)
+
+    async def version(self, business_profile_id) -> int:
+        (value,) = await self.redis_service.hmget_smart(
+            RedisHelper.redis_business_conversation_changes_state_key(str(business_profile_id)), ["version"]
+        )
+        return int(value) if value is not None else 0
+
+    async def changes_since(self, business_profile_id, since: int, limit: int) -> ChangeLogPage:
+        """Conversations changed after version `since`, oldest change first, at most `limit`.
+
+        `version` is the token for the next call: the version of the last returned change when
+        more are pending, otherwise the current version of the log.
+        """
+        version, floor, flat = await self._changes(keys=self._keys(business_profile_id), args=[since, limit + 1])
+        version, floor = int(version), int(floor)
+        if since > version or since < floor:
+            return ChangeLogPage([], version, has_more=False, resync_required=True)
+
+        changes = [(_text(flat[index]), int(float(flat[index + 1]))) for index in range(0, len(flat), 2)]
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        return ChangeLogPage(
+            [conversation_id for conversation_id, _ in changes],
+            changes[-1][1] if has_more else version,
+            has_more=has_more,
+            resync_required=False,
+        )
@@ -1,4 +1,5 @@
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 from app.core.services.BaseService import BaseService
 from app.utils.Helper import Helper
 from app.whatsapp.team_inbox.models.Conversation import Conversation
@@ -18,5 +19,11 @@ class ConversationService(BaseService[Conversation]):
     async def find_by_contact_and_client_id(self, contact_phone_number: str, client_id: str) -> Conversation:
         return await self.repository.find_by_contact_and_client_id(str(contact_phone_number), client_id)
     
-    async def get_user_conversations(self, user_id: str, page: int = 1, limit: int = 10, search_term: Optional[str] = None,sort_by: Optional[str] = None, status_filter: Optional[str] = None ) -> dict:
-        return await self.repository.get_user_conversations(user_id, page, limit, search_term, sort_by, status_filter)
\ No newline at end of file
+    async def get_user_conversations(self, user_id: str, page: int = 1, limit: int = 10, search_term: Optional[str] = None,sort_by: Optional[str] = None, status_filter: Optional[str] = None, primary: bool = False) -> dict:
+        return await self.repository.get_user_conversations(user_id, page, limit, search_term, sort_by, status_filter, primary)
+    
+    async def get_user_conversations_by_ids(self, user_id: str, conversation_ids: List[UUID]) -> List[Conversation]:
+        return await self.repository.get_user_conversations_by_ids(user_id, conversation_ids)
+    
+    async def expire_conversations(self, conversation_ids: List[UUID]) -> List[tuple]:
+        return await self.repository.expire_conversations(conversation_ids)
@@ -0,0 +1,134 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import CONVERSATION_EXPIRY_INDEX_SHARDS, RedisHelper
+
+WINDOW_SECONDS = 24 * 60 * 60
+
+# Removes up to ARGV[2] members scored at or before ARGV[1] and returns them with their scores.
+# Running the range and the removal as one script means two sweepers never claim the same
+# conversation, and a window reopened (re-scored) a moment earlier is no longer in range.
+CLAIM_EXPIRED_SCRIPT = """
+local claimed = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, tonumber(ARGV[2]))
+local ids = {}
+for i = 1, #claimed, 2 do
+    ids[#ids + 1] = claimed[i]
+end
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return claimed
+"""
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+class ConversationWindowService:
+    """The 24h customer-service window of every conversation, kept in sharded Redis sorted sets.
+
+    Reads for a page of conversations cost one ZMSCORE per shard it touches, and expired windows
+    can be found by score instead of waiting for per-conversation keys to lapse.
+    """
+
+    def __init__(self, redis_service: AsyncRedisService, window_seconds: int = WINDOW_SECONDS):
+        self.redis_service = redis_service
+        self.window_seconds = window_seconds
+        self._claim_expired = redis_service.register_script(CLAIM_EXPIRED_SCRIPT)
+
+    @staticmethod
+    def _by_shard(conversation_ids: Iterable[str]) -> Dict[str, List[str]]:
+        shards: Dict[str, List[str]] = {}
+        for conversation_id in conversation_ids:
+            shards.setdefault(RedisHelper.redis_conversation_expiry_index_key(conversation_id), []).append(conversation_id)
+        return shards
+
+    async def _index(self, expirations: Dict[str, float], nx: bool = False) -> None:
+        shards = self._by_shard(expirations)
+        await asyncio.gather(*(
+            self.redis_service.zadd(key, {conversation_id: expirations[conversation_id] for conversation_id in ids}, nx=nx)
+            for key, ids in shards.items()
+        ))
+
+    async def open_window(self, conversation_id, now: Optional[datetime] = None) -> datetime:
+        expires_at = (now or datetime.now(timezone.utc)) + timedelta(seconds=self.window_seconds)
+        await self._index({str(conversation_id): expires_at.timestamp()})
+        return expires_at
+
+    async def expires_at_many(self, conversation_ids: Iterable, now: Optional[datetime] = None) -> List[Optional[datetime]]:
+        """When each conversation's window closes, in order; None for windows already closed."""
+        conversation_ids = [str(conversation_id) for conversation_id in conversation_ids]
+        shards = self._by_shard(dict.fromkeys(conversation_ids))
+        replies = await asyncio.gather(*(self.redis_service.zmscore(key, ids) for key, ids in shards.items()))
+        scores = {
+            conversation_id: score
+            for ids, shard_scores in zip(shards.values(), replies)
+            for conversation_id, score in zip(ids, shard_scores)
+        }
+
+        now = now or datetime.now(timezone.utc)
+        missing = [conversation_id for conversation_id, score in scores.items() if score is None]
+        legacy = await self._legacy_expirations(missing, now) if missing else {}
+
+        result: List[Optional[datetime]] = []
+        for conversation_id in conversation_ids:
+            score = scores[conversation_id]
+            expires_at = datetime.fromtimestamp(score, timezone.utc) if score is not None else legacy.get(conversation_id)
+            result.append(expires_at if expires_at and expires_at > now else None)
+        return result
+
+    async def expires_at(self, conversation_id, now: Optional[datetime] = None) -> Optional[datetime]:
+        return (await self.expires_at_many([conversation_id], now))[0]
+
+    async def is_open(self, conversation_id, now: Optional[datetime] = None) -> bool:
+        return await self.expires_at(conversation_id, now) is not None
+
+    async def claim_expired(self, now: Optional[datetime] = None, limit: int = 500) -> Dict[str, float]:
+        """Takes up to `limit` conversations whose window has closed out of the index.
+
+        Returns each claimed id with the score it had, so `restore` can put it back if closing
+        the conversations fails.
+        """
+        now = now or datetime.now(timezone.utc)
+        claimed: Dict[str, float] = {}
+        for shard in range(CONVERSATION_EXPIRY_INDEX_SHARDS):
+            if len(claimed) >= limit:
+                break
+            flat = await self._claim_expired(
+                keys=[RedisHelper.redis_conversation_expiry_index_shard_key(shard)], args=[now.timestamp(), limit - len(claimed)]
+            )
+            claimed.update((_text(flat[index]), float(flat[index + 1])) for index in range(0, len(flat), 2))
+        return claimed
+
+    async def restore(self, claimed: Dict[str, float]) -> None:
+        """Returns claimed windows to the index at their original score. NX keeps a window that a
+        new message reopened since the claim."""
+        if claimed:
+            await self._index(claimed, nx=True)
+
+    async def _legacy_expirations(self, conversation_ids: List[str], now: datetime) -> Dict[str, datetime]:
+        """Windows opened before the index existed live in per-conversation keys (24h TTL); they
+        are copied into the index on first read, so this path dies out a day after rollout.
+
+        The API stored the closing time itself; the Celery worker stored "active" and left the
+        closing time to the key's TTL.
+        """
+        keys = [RedisHelper.redis_conversation_expired_key(conversation_id) for conversation_id in conversation_ids]
+        values = await self.redis_service.mget(*keys)
+        found: Dict[str, datetime] = {}
+        by_ttl = []
+        for conversation_id, key, value in zip(conversation_ids, keys, values):
+            if isinstance(value, datetime):
+                found[conversation_id] = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+            elif value is not None:
+                by_ttl.append((conversation_id, key))
+        if by_ttl:
+            ttls = await asyncio.gather(*(self.redis_service.ttl(key) for _, key in by_ttl))
+            found.update(
+                (conversation_id, now + timedelta(seconds=ttl)) for (conversation_id, _), ttl in zip(by_ttl, ttls) if ttl > 0
+            )
+        if found:
+            await self._index({conversation_id: value.timestamp() for conversation_id, value in found.items()}, nx=True)
+        return found
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+
+TOTAL_FIELD = "__total__"
+# Field of the per-conversation hash that held the count before the business hash existed.
+LEGACY_COUNT_FIELD = "unread_count"
+
+# KEYS[1] = business counters hash, ARGV = conversation id, amount, total field.
+INCREMENT_SCRIPT = """
+local count = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+local total = redis.call('HINCRBY', KEYS[1], ARGV[3], ARGV[2])
+return {count, total}
+"""
+
+# KEYS[1] = business counters hash, ARGV = conversation id, total field. Returns the count that was cleared.
+RESET_SCRIPT = """
+local count = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+local total
+if count ~= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    total = redis.call('HINCRBY', KEYS[1], ARGV[2], -count)
+else
+    total = tonumber(redis.call('HGET', KEYS[1], ARGV[2]) or '0')
+end
+return {count, total}
+"""
+
+# KEYS[1] = per-conversation unread hash, ARGV = legacy count field. Reads and deletes the field in
+# one step, so a legacy count is claimed by exactly one caller.
+CLAIM_LEGACY_SCRIPT = """
+local count = redis.call('HGET', KEYS[1], ARGV[1])
+if count then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+end
+return count
+"""
+
+
+def _legacy_count(raw) -> int:
+    # HINCRBY left bare integers, the removed JSON helper wrote JSON numbers; both parse as int.
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return 0
+
+
+class UnreadCounts(NamedTuple):
+    conversation: int
+    total: int
+
+
+class UnreadCounterService:
+    """Unread message counters of a business's conversations and their total.
+
+    All counters of a business live in one hash (field per conversation with unread messages,
+    plus the total), so increment and reset update both atomically in one script, a page of
+    counts is one HMGET and the inbox badge is one field read.
+
+    Counts written before the business hash existed sit in `unread_count` of the conversation's
+    own hash. They are moved into the business hash the first time the conversation is counted,
+    read or marked read, so badges carry over and the total picks them up as they are moved.
+    """
+
+    def __init__(self, redis_service: AsyncRedisService):
+        self.redis_service = redis_service
+        self._increment = redis_service.register_script(INCREMENT_SCRIPT)
+        self._reset = redis_service.register_script(RESET_SCRIPT)
+        self._claim_legacy = redis_service.register_script(CLAIM_LEGACY_SCRIPT)
+
+    async def _claim_legacy_count(self, conversation_id) -> int:
+        raw = await self._claim_legacy(
+            keys=[RedisHelper.redis_business_conversation_unread_key(str(conversation_id))], args=[LEGACY_COUNT_FIELD]
+        )
+        return _legacy_count(raw)
+
+    async def _fold_legacy(self, business_profile_id, conversation_ids: List[str]) -> Dict[str, int]:
+        """Moves legacy counts of the conversations into the business hash; returns the new counts.
+
+        One pipelined read finds the conversations that still have one, only those are claimed.
+        """
+        hashes = await self.redis_service.hgetall_many(
+            *[RedisHelper.redis_business_conversation_unread_key(conversation_id) for conversation_id in conversation_ids]
+        )
+        holding = [
+            conversation_id for conversation_id, fields in zip(conversation_ids, hashes) if LEGACY_COUNT_FIELD in fields
+        ]
+        claimed = await asyncio.gather(*(self._claim_legacy_count(conversation_id) for conversation_id in holding))
+        folded = {}
+        for conversation_id, legacy in zip(holding, claimed):
+            if legacy:
+                folded[conversation_id] = (await self._add(business_profile_id, conversation_id, legacy)).conversation
+        return folded
+
+    async def _add(self, business_profile_id, conversation_id, amount: int) -> UnreadCounts:
+        count, total = await self._increment(
+            keys=[RedisHelper.redis_business_unread_counters_key(str(business_profile_id))],
+            args=[str(conversation_id), amount, TOTAL_FIELD],
+        )
+        return UnreadCounts(int(count), int(total))
+
+    async def increment(self, business_profile_id, conversation_id, amount: int = 1) -> UnreadCounts:
+        return await self._add(business_profile_id, conversation_id, amount + await self._claim_legacy_count(conversation_id))
+
+    async def reset(self, business_profile_id, conversation_id, last_read_message_id: Optional[str] = None) -> UnreadCounts:
+        """Marks the conversation read; `conversation` in the result is the count that was cleared."""
+        # A legacy count was never part of the total, so it is only reported as cleared.
+        legacy = await self._claim_legacy_count(conversation_id)
+        count, total = await self._reset(
+            keys=[RedisHelper.redis_business_unread_counters_key(str(business_profile_id))],
+            args=[str(conversation_id), TOTAL_FIELD],
+        )
+        if last_read_message_id:
+            await self.redis_service.hset(
+                RedisHelper.redis_business_conversation_unread_key(conversation_id),
+                {"last_read_message_id": last_read_message_id},
+                use_json=True,
+            )
+        return UnreadCounts(int(count) + legacy, int(total))
+
+    async def get(self, business_profile_id, conversation_id) -> UnreadCounts:
+        count, total = await self.redis_service.hmget_smart(
+            RedisHelper.redis_business_unread_counters_key(str(business_profile_id)), [str(conversation_id), TOTAL_FIELD]
+        )
+        if not isinstance(count, int) and await self._fold_legacy(business_profile_id, [str(conversation_id)]):
+            return await self.get(business_profile_id, conversation_id)
+        return UnreadCounts(count if isinstance(count, int) else 0, total if isinstance(total, int) else 0)
+
+    async def counts(self, business_profile_id, conversation_ids: Iterable) -> List[int]:
+        """Unread counts for a page of conversations, in order, from one HMGET.
+
+        Conversations without a count also get the pipelined legacy read of `_fold_legacy`.
+        """
+        conversation_ids = [str(conversation_id) for conversation_id in conversation_ids]
+        values = await self.redis_service.hmget_smart(
+            RedisHelper.redis_business_unread_counters_key(str(business_profile_id)), conversation_ids
+        )
+        missing = [conversation_id for conversation_id, value in zip(conversation_ids, values) if not isinstance(value, int)]
+        folded = await self._fold_legacy(business_profile_id, missing) if missing else {}
+        return [
+            value if isinstance(value, int) else folded.get(conversation_id, 0)
+            for conversation_id, value in zip(conversation_ids, values)
+        ]
+
+    async def total(self, business_profile_id) -> int:
+        (value,) = await self.redis_service.hmget_smart(
+            RedisHelper.redis_business_unread_counters_key(str(business_profile_id)), [TOTAL_FIELD]
+        )
+        return value if isinstance(value, int) else 0
@@ -8,6 +8,8 @@ from app.whatsapp.team_inbox.models.schema.request.ConversationUserAssignRequest
 from app.whatsapp.team_inbox.models.schema.request.UpdateConversationStatusRequest import UpdateConversationStatusRequest
 from app.whatsapp.team_inbox.v1.schemas.request.CreateConversationRequest import CreateConversationRequest
 from app.whatsapp.team_inbox.v1.use_case.GetUserConversations import GetUserConversations
+from app.whatsapp.team_inbox.v1.use_case.GetConversationChanges import GetConversationChanges
+from app.whatsapp.team_inbox.v1.use_case.GetUnreadTotal import GetUnreadTotal
 from app.whatsapp.team_inbox.v1.use_case.AssignedUserToConversation import AssignedUserToConversation
 from app.whatsapp.team_inbox.v1.use_case.CreateNewConversation import CreateNewConversation
 from app.whatsapp.team_inbox.v1.use_case.UpdateConversationStatus import UpdateConversationStatus
@@ -39,16 +41,45 @@ async def get_conversations(
                                 search_terms: Optional[str] = Query(None, description="Search term for filtering"),
                                 sort_by: Optional[str] = Query(None, description="Sort by: 'status' or default (latest_message)"),
                                 status_filter: Optional[str] = Query(None, description="Filter by status: 'open', 'pending', 'solved', 'broadcast', 'expired'"),
+                                consistent: bool = Query(False, description="Read from the primary; use it to load the pages after taking a conversation_changes token"),
                                 get_conversations: GetUserConversations = Depends(Provide[Container.get_conversations]),
                                 ):
         try:
-                result = await get_conversations.excute(token["userId"], page, limit, search_terms, sort_by, status_filter)
+                result = await get_conversations.excute(token["userId"], token["business_profile_id"], page, limit, search_terms, sort_by, status_filter, consistent)
                 return result
         except GlobalException as e:
                 raise e
         except Exception as e:
                 raise e
 
+@router.get("/conversation_changes")
+@inject
+async def get_conversation_changes(
+                                token: str = Depends(get_current_user),
+                                since: Optional[int] = Query(None, ge=0, description="Version token from the previous call; omit to get the current version"),
+                                limit: int = Query(50, ge=1, le=200, description="Maximum changed conversations to return"),
+                                get_conversation_changes: GetConversationChanges = Depends(Provide[Container.get_conversation_changes]),
+                                ):
+        try:
+                return await get_conversation_changes.execute(token["userId"], token["business_profile_id"], since, limit)
+        except GlobalException as e:
+                raise e
+        except Exception as e:
+                raise e
+
+@router.get("/unread_total")
+@inject
+async def get_unread_total(
+                                token: str = Depends(get_current_user),
+                                get_unread_total: GetUnreadTotal = Depends(Provide[Container.get_unread_total]),
+                                ):
+        try:
+                return await get_unread_total.execute(token["business_profile_id"])
+        except GlobalException as e:
+                raise e
+        except Exception as e:
+                raise e
+
 @router.put("/update_conversation_status")
 @inject 
 async def update_conversation_status(
@@ -57,7 +88,7 @@ async def update_conversation_status(
         update_conversation_status: UpdateConversationStatus = Depends(Provide[Container.update_conversation_status]),
 ):
         try:
-                update_conversation_status = await update_conversation_status.execute(token["userId"],body_request.conversation_id, body_request.status)
+                update_conversation_status = await update_conversation_status.execute(token["userId"],body_request.conversation_id, body_request.status, token["business_profile_id"])
                 return update_conversation_status
         except GlobalException as e:
                 raise e
@@ -72,7 +103,7 @@ async def assign_user_to_conversation(
         assigned_user_to_conversation: AssignedUserToConversation = Depends(Provide[Container.assigned_user_to_conversation]),
 ):
         try:
-                return await assigned_user_to_conversation.execute(token["userId"],body_request.user_id, body_request.conversation_id)
+                return await assigned_user_to_conversation.execute(token["userId"],body_request.user_id, body_request.conversation_id, token["business_profile_id"])
         except GlobalException as e:
                 raise e
         except Exception as e:
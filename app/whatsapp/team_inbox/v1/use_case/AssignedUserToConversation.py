@@ -10,6 +10,7 @@ from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
 from app.whatsapp.team_inbox.services.MessageService import MessageService
@@ -22,7 +23,8 @@ class AssignedUserToConversation:
         message_crud: MongoCRUD[Message],
         message_service:MessageService,
         assignment_service:AssignmentService,
-        socket_gateway:SocketMessageGateway
+        socket_gateway:SocketMessageGateway,
+        change_log: ConversationChangeLog
         ):
         self.conversation_service = conversation_service
         self.user_service = user_service
@@ -30,9 +32,10 @@ class AssignedUserToConversation:
         self.message_service = message_service
         self.assignment_service = assignment_service
         self.socket_gateway = socket_gateway
+        self.change_log = change_log
         self.logger = get_logger("MessageHook")
         
-    async def execute(self, assigned_by: str, assigned_to: str,conversation_id: str):
+    async def execute(self, assigned_by: str, assigned_to: str,conversation_id: str, business_profile_id: str):
         
         user : User = await self.user_service.get(assigned_by)
         assigned_to_user : User = await self.user_service.get(assigned_to)
@@ -76,6 +79,7 @@ class AssignedUserToConversation:
             member_id=user.id
         )
         await self.message_crud.create(message_document)
+        await self.change_log.record(business_profile_id, conversation.id)
         
         assignment_message_data = json.loads(
             message_document.model_dump_json(exclude_none=True)
@@ -23,13 +23,13 @@ from app.whatsapp.team_inbox.models.ConversationTeamLink import ConversationTeam
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.whatsapp.team_inbox.utils.conversation_status import ConversationStatus
 from app.whatsapp.team_inbox.v1.schemas.request.CreateConversationRequest import CreateConversationRequest
 from app.whatsapp.template.models.Template import Template
 from app.whatsapp.template.models.schema.SendTemplateRequest import SendTemplateRequest
-from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
 
 class CreateNewConversation:
     def __init__(self,
@@ -44,7 +44,8 @@ class CreateNewConversation:
                 business_profile_service: BusinessProfileService,
                 mongo_crud: MongoCRUD,
                 mongo_template: MongoCRUD,
-                redis_service : AsyncRedisService
+                redis_service : AsyncRedisService,
+                change_log: ConversationChangeLog
                 ):
         self.conversation_service = conversation_service
         self.contact_service = contact_service
@@ -58,9 +59,11 @@ class CreateNewConversation:
         self.mongo_crud = mongo_crud
         self.mongo_template = mongo_template
         self.redis_service = redis_service
+        self.change_log = change_log
       
       
     async def excute(self, user_id: str ,request_body: CreateConversationRequest):
+        from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
         
         user: User = await self.user_service.get(user_id)
         full_number = f"{request_body.contact_country_code}{request_body.contact_phone_number}"
@@ -166,6 +169,8 @@ class CreateNewConversation:
                 ttl=None
             )
         
+        await self.change_log.record(business_profile.id, new_conversation.id)
+        
         return ApiResponse.success_response(data="Conversation Created successfully")
     
     async def handle_response_messages(self, payload: Dict[str, Any]):
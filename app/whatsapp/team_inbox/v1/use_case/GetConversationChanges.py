@@ -0,0 +1,60 @@
+from typing import Optional
+from uuid import UUID
+from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
+from app.core.schemas.BaseResponse import ApiResponse
+from app.user_management.user.services.UserService import UserService
+from app.whatsapp.team_inbox.models.schema.response.ConversationChanges import ConversationChanges
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
+from app.whatsapp.team_inbox.services.ConversationService import ConversationService
+from app.whatsapp.team_inbox.v1.use_case.GetUserConversations import GetUserConversations
+
+
+class GetConversationChanges:
+    """Delta sync for the inbox list: the conversations changed since a client's version token.
+
+    A client asks without a token first, then loads its pages with GetUserConversations reading
+    the primary (`consistent=true`): a lagging replica could miss changes at or below the token,
+    and those would never come back. It then polls with the version it got; changes made while
+    it loaded come back again, which is harmless. Only conversations the user can see are
+    returned, so ids of other teams' conversations never reach the client; `resync_required`
+    means the token cannot be served and the list must be reloaded.
+    """
+
+    def __init__(
+        self,
+        user_service: UserService,
+        conversation_service: ConversationService,
+        change_log: ConversationChangeLog,
+        get_conversations: GetUserConversations,
+    ):
+        self.user_service = user_service
+        self.conversation_service = conversation_service
+        self.change_log = change_log
+        self.get_conversations = get_conversations
+
+    async def execute(self, user_id: str, business_profile_id: str, since: Optional[int] = None, limit: int = 50):
+        user = await self.user_service.get(user_id)
+        if not user:
+            raise EntityNotFoundException("User not found")
+
+        if since is None:
+            version = await self.change_log.version(business_profile_id)
+            return ApiResponse(data=ConversationChanges(version=version), message="Conversation changes version retrieved successfully")
+
+        page = await self.change_log.changes_since(business_profile_id, since, limit)
+        if page.resync_required:
+            return ApiResponse(data=ConversationChanges(version=page.version, resync_required=True), message="Conversation list must be reloaded")
+
+        changed_ids = [UUID(conversation_id) for conversation_id in page.conversation_ids]
+        visible = {
+            conversation.id: conversation
+            for conversation in await self.conversation_service.get_user_conversations_by_ids(user_id, changed_ids)
+        }
+        changed = await self.get_conversations.build_rows(
+            business_profile_id, [visible[conversation_id] for conversation_id in changed_ids if conversation_id in visible]
+        )
+
+        return ApiResponse(
+            data=ConversationChanges(version=page.version, changed=changed, has_more=page.has_more),
+            message="Conversation changes retrieved successfully",
+        )
@@ -5,7 +5,7 @@ from uuid import UUID
 from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
 from app.core.repository.MongoRepository import MongoCRUD
 from app.user_management.user.services.UserService import UserService
-from app.whatsapp.team_inbox.models.Message import Message
+from app.whatsapp.team_inbox.models.Message import Message, MessageListProjection
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 
 class GetConversationMessages:
@@ -43,7 +43,7 @@ class GetConversationMessages:
 
         sort = [("created_at", -1), ("_id", -1)]
         messages = await self.mongo_crud.find_many(
-            query=query, limit=limit, sort=sort
+            query=query, limit=limit, sort=sort, projection=MessageListProjection
         )
 
         if messages:
@@ -0,0 +1,11 @@
+from app.core.schemas.BaseResponse import ApiResponse
+from app.whatsapp.team_inbox.services.UnreadCounterService import UnreadCounterService
+
+
+class GetUnreadTotal:
+    def __init__(self, unread_counters: UnreadCounterService):
+        self.unread_counters = unread_counters
+
+    async def execute(self, business_profile_id: str):
+        total = await self.unread_counters.total(business_profile_id)
+        return ApiResponse(data={"unread_total": total}, message="Unread total retrieved successfully")
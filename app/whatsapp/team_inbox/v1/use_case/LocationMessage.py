@@ -16,6 +16,7 @@ from app.whatsapp.team_inbox.external_services.WhatsAppMessageApi import WhatsAp
 from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.whatsapp.team_inbox.v1.schemas.request.LocationMessageRequest import LocationMessageRequest
@@ -29,12 +30,14 @@ class LocationMessage:
                     contact_service: ContactService,
                     message_service: MessageService,
                     mongo_crud: MongoCRUD[Message],
-                    conversation_service: ConversationService
+                    conversation_service: ConversationService,
+                    change_log: ConversationChangeLog
                     ):
         self.whatsapp_message_api = whatsapp_message_api
         self.user_service = user_service
         self.business_profile_service = business_profile_service
         self.redis_service = redis_service
+        self.change_log = change_log
         self.contact_service = contact_service
         self.message_service = message_service
         self.mongo_crud = mongo_crud
@@ -107,6 +110,7 @@ class LocationMessage:
                 redis_last_message,
                 ttl=None
                 )
+            await self.change_log.record(business_profile.id, conversation.id)
             
             redis_chatbot_context = RedisHelper.redis_chatbot_context_key(conversation_id=str(conversation.id))
             await self.redis_service.delete(redis_chatbot_context)
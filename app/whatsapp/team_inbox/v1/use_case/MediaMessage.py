@@ -23,6 +23,7 @@ from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 
@@ -39,7 +40,8 @@ class MediaMessage:
                 aws_region:str, 
                 aws_s3_bucket_name:str,
                 redis_service : AsyncRedisService,
-                mongo_crud: MongoCRUD[Message]):
+                mongo_crud: MongoCRUD[Message],
+                change_log: ConversationChangeLog):
         
         self.whatsapp_message_api = whatsapp_message_api
         self.whatsapp_media_api = whatsapp_media_api
@@ -53,6 +55,7 @@ class MediaMessage:
         self.aws_region = aws_region
         self.aws_s3_bucket_name = aws_s3_bucket_name
         self.redis_service = redis_service
+        self.change_log = change_log
         self.mongo_crud = mongo_crud
         
 
@@ -154,6 +157,7 @@ class MediaMessage:
             
             redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message=content_type ,last_message_time=f"{message_created_data.created_at}")
             await self.redis_service.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation.id)),value= redis_last_message,ttl=None)            
+            await self.change_log.record(business_profile.id, conversation.id)
             
             redis_chatbot_context = RedisHelper.redis_chatbot_context_key(conversation_id=str(conversation.id))
             await self.redis_service.delete(redis_chatbot_context)
@@ -16,6 +16,7 @@ from app.core.exceptions.custom_exceptions.EntityNotFoundException import Entity
 from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 
@@ -27,7 +28,8 @@ class ReplyWithReactionMessage:
                 conversation_service: ConversationService,
                 message_service: MessageService,
                 mongo_crud: MongoCRUD[Message],
-                redis_service : AsyncRedisService):
+                redis_service : AsyncRedisService,
+                change_log: ConversationChangeLog):
         self.whatsapp_message_api = whatsapp_message_api
         self.user_service = user_service
         self.business_profile_service = business_profile_service
@@ -36,6 +38,7 @@ class ReplyWithReactionMessage:
         self.message_service = message_service
         self.mongo_crud = mongo_crud
         self.redis_service = redis_service
+        self.change_log = change_log
 
             
     async def execute(self, user_id: str,
@@ -102,6 +105,7 @@ class ReplyWithReactionMessage:
             await self.mongo_crud.create(message_document)
             redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message=f"reacted with emoji {message_content["emoji"]}",last_message_time=f"{message_created_data.created_at}")
             await self.redis_service.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation.id)),value= redis_last_message)
+            await self.change_log.record(business_profile.id, conversation.id)
         return ApiResponse.success_response(data="Message stored successfully")
     
     
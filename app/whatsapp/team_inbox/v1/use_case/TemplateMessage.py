@@ -17,12 +17,12 @@ from app.whatsapp.business_profile.v1.services.BusinessProfileService import Bus
 from app.whatsapp.team_inbox.external_services.WhatsAppMessageApi import WhatsAppMessageApi
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
 from app.whatsapp.team_inbox.services.AssignmentService import AssignmentService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.whatsapp.team_inbox.models.Message import Message
 from app.whatsapp.template.services.TemplateService import TemplateService
 from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
-from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
 
 
 class TemplateMessage:
@@ -36,12 +36,14 @@ class TemplateMessage:
                 template_service : TemplateService,
                 mongo_crud_message: MongoCRUD[Message],
                 mongo_crud_template: MongoCRUD[Template], 
+                change_log: ConversationChangeLog,
             
                 message_service: MessageService = MessageService):
         self.message_service = message_service
         self.mongo_crud_message = mongo_crud_message
         self.mongo_crud_template = mongo_crud_template
         self.redis_service = redis_service
+        self.change_log = change_log
         self.whatsapp_message_api = whatsapp_message_api
         self.user_service = user_service
         self.business_profile_service = business_profile_service
@@ -56,6 +58,7 @@ class TemplateMessage:
                         recipient_number: str,
                         parameters: Optional[List[str]] = None,
                         client_message_id: Optional[str] = None):
+        from app.whatsapp.template.utils.TemplateBuilder import TemplateBuilder
         
         
         user: User = await self.user_service.get(user_id)
@@ -120,6 +123,7 @@ class TemplateMessage:
             
             redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message="template",last_message_time=f"{message_created_data.created_at}")
             await self.redis_service.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation.id)),value= redis_last_message,ttl=None)
+            await self.change_log.record(business_profile.id, conversation.id)
             
             redis_chatbot_context = RedisHelper.redis_chatbot_context_key(conversation_id=str(conversation.id))
             await self.redis_service.delete(redis_chatbot_context)
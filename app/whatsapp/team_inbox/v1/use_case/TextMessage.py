@@ -15,6 +15,7 @@ from app.whatsapp.business_profile.v1.services.BusinessProfileService import Bus
 from app.whatsapp.team_inbox.external_services.WhatsAppMessageApi import WhatsAppMessageApi
 from app.whatsapp.team_inbox.models.Conversation import Conversation
 from app.whatsapp.team_inbox.models.MessageMeta import MessageMeta
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.services.MessageService import MessageService
 from app.whatsapp.team_inbox.models.Message import Message
@@ -29,9 +30,11 @@ class TextMessage:
                 conversation_service: ConversationService,
                 contact_service: ContactService,
                 redis_service : AsyncRedisService,
-                mongo_crud: MongoCRUD[Message]):
+                mongo_crud: MongoCRUD[Message],
+                change_log: ConversationChangeLog):
         self.mongo_crud = mongo_crud
         self.redis_service = redis_service
+        self.change_log = change_log
         self.whatsapp_message_api = whatsapp_message_api
         self.user_service = user_service
         self.business_profile_service = business_profile_service
@@ -105,6 +108,7 @@ class TextMessage:
             
             redis_last_message = RedisHelper.redis_conversation_last_message_data(last_message = message_content["text_body"] , last_message_time=f"{message_created_data.created_at}")
             await self.redis_service.set(key=RedisHelper.redis_conversation_last_message_key(str(conversation.id)),value= redis_last_message,ttl=None)
+            await self.change_log.record(business_profile.id, conversation.id)
             
             redis_chatbot_context = RedisHelper.redis_chatbot_context_key(conversation_id=str(conversation.id))
             await self.redis_service.delete(redis_chatbot_context)
@@ -3,17 +3,19 @@ from app.core.exceptions.custom_exceptions.EntityNotFoundException import Entity
 from app.core.schemas.BaseResponse import ApiResponse
 from app.real_time.socketio.socket_gateway import SocketMessageGateway
 from app.whatsapp.team_inbox.models.Conversation import Conversation
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
 from app.whatsapp.team_inbox.services.ConversationService import ConversationService
 from app.whatsapp.team_inbox.utils.conversation_status import ConversationStatus
 
 
 class UpdateConversationStatus:
-    def __init__(self, conversation_service: ConversationService,socket_gateway:SocketMessageGateway):
+    def __init__(self, conversation_service: ConversationService,socket_gateway:SocketMessageGateway, change_log: ConversationChangeLog):
         self.conversation_service = conversation_service
         self.socket_gateway = socket_gateway
+        self.change_log = change_log
 
     
-    async def execute(self,user_id: str, conversation_id: str, status: ConversationStatus):
+    async def execute(self,user_id: str, conversation_id: str, status: ConversationStatus, business_profile_id: str):
         
         conversation : Conversation = await self.conversation_service.get(conversation_id)
         
@@ -24,5 +26,6 @@ class UpdateConversationStatus:
             raise BadRequestException(f"Status already {status}")
         
         await self.conversation_service.update(conversation_id, {"status": status.name})
+        await self.change_log.record(business_profile_id, conversation_id)
         await self.socket_gateway.emit_conversation_status(user_id, conversation_id, status.name)
         return ApiResponse(data={"conversation_id": conversation_id, "status": status}, message="Status updated successfully")
\ No newline at end of file
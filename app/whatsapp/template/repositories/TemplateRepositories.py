@@ -1,5 +1,8 @@
 from app.core.exceptions.custom_exceptions.DataBaseException import DataBaseException
 from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
+from typing import Dict, List, Set
+from uuid import UUID
+from sqlalchemy import case, update
 from sqlmodel import select
 from app.whatsapp.template.models.TemplateMeta import TemplateMeta
 from app.core.repository.BaseRepository import BaseRepository
@@ -13,9 +16,9 @@ class TemplateRepository(BaseRepository[TemplateMeta]):
 
     async def get_template_by_id(self, id: str) -> TemplateMeta:
         try:
-            async with self.session:
+            async with self.session as db_session:
                 query = select(TemplateMeta).where(TemplateMeta.id == id)
-                result = await self.session.exec(query)
+                result = await db_session.exec(query)
                 template = result.first()
                 if not template:
                     raise EntityNotFoundException("Template not found")
@@ -25,12 +28,43 @@ class TemplateRepository(BaseRepository[TemplateMeta]):
 
     async def get_template_by_wa_id(self, wa_id: str) -> TemplateMeta:
         try:
-            async with self.session:
+            async with self.session as db_session:
                 query = select(TemplateMeta).where(TemplateMeta.template_wat_id == wa_id)
-                result = await self.session.exec(query)
+                result = await db_session.exec(query)
                 template = result.first()
                 if not template:
                     raise EntityNotFoundException("Template not found")
                 return template
         except SQLAlchemyError as e:
-            raise DataBaseException(str(e))
\ No newline at end of file
+            raise DataBaseException(str(e))
+
+    async def update_statuses_by_wa_id(self, statuses: Dict[str, str]) -> Dict[UUID, str]:
+        """One UPDATE for the whole batch; only templates whose status really changes are written.
+
+        Returns the id and new status of every template it changed.
+        """
+        new_status = case(statuses, value=TemplateMeta.template_wat_id)
+        try:
+            async with self.session as db_session:
+                result = await db_session.exec(
+                    update(TemplateMeta)
+                    .where(TemplateMeta.template_wat_id.in_(list(statuses)))
+                    .where(TemplateMeta.status.is_distinct_from(new_status))
+                    .values(status=new_status)
+                    .returning(TemplateMeta.id, TemplateMeta.status)
+                )
+                changed = {template_id: template_status for template_id, template_status in result.all()}
+                await db_session.commit()
+                return changed
+        except SQLAlchemyError as e:
+            raise DataBaseException(str(e))
+
+    async def get_existing_wa_ids(self, wa_ids: List[str]) -> Set[str]:
+        try:
+            async with self.session as db_session:
+                result = await db_session.exec(
+                    select(TemplateMeta.template_wat_id).where(TemplateMeta.template_wat_id.in_(wa_ids))
+                )
+                return set(result.all())
+        except SQLAlchemyError as e:
+            raise DataBaseException(str(e))
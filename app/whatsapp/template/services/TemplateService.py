@@ -1,3 +1,5 @@
+from typing import Dict, List, Set
+from uuid import UUID
 from app.core.exceptions.custom_exceptions.EntityNotFoundException import EntityNotFoundException
 from app.core.services.BaseService import BaseService
 from app.whatsapp.template.models.TemplateMeta import TemplateMeta
@@ -20,4 +22,13 @@ class TemplateService(BaseService[TemplateMeta]):
         if not template:
             raise EntityNotFoundException("Template not found")
         return template
-        
\ No newline at end of file
+
+    async def update_statuses_by_wa_id(self, statuses: Dict[str, str]) -> Dict[UUID, str]:
+        if not statuses:
+            return {}
+        return await self.repository.update_statuses_by_wa_id(statuses)
+
+    async def get_existing_wa_ids(self, wa_ids: List[str]) -> Set[str]:
+        if not wa_ids:
+            return set()
+        return await self.repository.get_existing_wa_ids(wa_ids)
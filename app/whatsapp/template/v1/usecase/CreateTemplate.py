@@ -15,9 +15,6 @@ from app.whatsapp.template.models.Template import Template
 from app.whatsapp.template.models.TemplateMeta import TemplateMeta
 from app.core.repository.MongoRepository import MongoCRUD
 from app.whatsapp.template.models.schema.template_body.DynamicTemplateRequest import DynamicTemplateRequest
-from app.whatsapp.template.models.schema.template_builder.AuthenticationTemplateBuilder import AuthenticationTemplateBuilder
-from app.whatsapp.template.models.schema.template_builder.TemplateValidator import TemplateValidator
-from app.whatsapp.template.models.schema.template_builder.WhatsAppTemplateBuilder import WhatsAppTemplateBuilder
 from app.whatsapp.template.services.TemplateService import TemplateService
 
 
@@ -39,7 +36,11 @@ class CreateTemplate:
     
     
     async def execute(self, user_id: str, template_request: DynamicTemplateRequest):
-        
+        # The builders are only needed when a template is created, not at startup.
+        from app.whatsapp.template.models.schema.template_builder.AuthenticationTemplateBuilder import AuthenticationTemplateBuilder
+        from app.whatsapp.template.models.schema.template_builder.TemplateValidator import TemplateValidator
+        from app.whatsapp.template.models.schema.template_builder.WhatsAppTemplateBuilder import WhatsAppTemplateBuilder
+
         validation_errors = TemplateValidator.validate_template(template_request)
         if validation_errors:
             raise BadRequestException(
@@ -0,0 +1,165 @@
+"""Local stand-in for graph.facebook.com used by the benchmark stack.
+
+Run with `uvicorn benchmarks.graph_simulator:app --port 9000` and point the API and the
+Celery worker at it with WHATSAPP_API_BASE_URL=http://<host>:9000.
+
+Behaviour is driven by environment variables:
+    GRAPH_SIM_LATENCY_MS          mean added latency per call (default 120)
+    GRAPH_SIM_JITTER_MS           uniform jitter around the mean (default 40)
+    GRAPH_SIM_ERROR_RATE          share of calls answered with a 500 (default 0)
+    GRAPH_SIM_RATE_LIMIT_RATE     share of calls answered with a 429 (default 0)
+    GRAPH_SIM_STATUS_WEBHOOK_URL  when set, sent/delivered/read statuses for every outbound
+                                  message are posted back to this webhook URL
+    GRAPH_SIM_STATUS_DELAY_MS     delay between those status callbacks (default 300)
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.payloads import status_webhook
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+LATENCY_MS = _env_float("GRAPH_SIM_LATENCY_MS", 120)
+JITTER_MS = _env_float("GRAPH_SIM_JITTER_MS", 40)
+ERROR_RATE = _env_float("GRAPH_SIM_ERROR_RATE", 0)
+RATE_LIMIT_RATE = _env_float("GRAPH_SIM_RATE_LIMIT_RATE", 0)
+STATUS_WEBHOOK_URL = os.getenv("GRAPH_SIM_STATUS_WEBHOOK_URL")
+STATUS_DELAY_MS = _env_float("GRAPH_SIM_STATUS_DELAY_MS", 300)
+
+app = FastAPI(title="Graph API simulator")
+stats: Counter = Counter()
+started_at = time.monotonic()
+_callback_client: Optional[httpx.AsyncClient] = None
+
+
+async def _simulate_network() -> Optional[JSONResponse]:
+    delay = max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000
+    await asyncio.sleep(delay)
+
+    roll = random.random()
+    if roll < RATE_LIMIT_RATE:
+        stats["rate_limited"] += 1
+        return JSONResponse(status_code=429, content={"error": {
+            "message": "(#130429) Rate limit hit",
+            "type": "OAuthException",
+            "code": 130429,
+            "fbtrace_id": uuid.uuid4().hex,
+        }})
+    if roll < RATE_LIMIT_RATE + ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse(status_code=500, content={"error": {
+            "message": "An unexpected error has occurred. Please retry your request later.",
+            "type": "OAuthException",
+            "code": 2,
+            "fbtrace_id": uuid.uuid4().hex,
+        }})
+    return None
+
+
+async def _post_statuses(phone_number_id: str, recipient: str, wa_message_id: str) -> None:
+    global _callback_client
+    if _callback_client is None:
+        _callback_client = httpx.AsyncClient(timeout=10)
+    for status in ("sent", "delivered", "read"):
+        await asyncio.sleep(STATUS_DELAY_MS / 1000)
+        try:
+            await _callback_client.post(STATUS_WEBHOOK_URL, json=status_webhook(
+                phone_number_id=phone_number_id,
+                recipient=recipient,
+                wa_message_id=wa_message_id,
+                status=status,
+            ))
+            stats["status_callbacks"] += 1
+        except httpx.HTTPError:
+            stats["status_callback_errors"] += 1
+
+
+@app.post("/{version}/{phone_number_id}/messages")
+async def send_message(version: str, phone_number_id: str, request: Request):
+    failure = await _simulate_network()
+    if failure is not None:
+        return failure
+
+    body: Dict[str, Any] = await request.json()
+    recipient = str(body.get("to", ""))
+    wa_message_id = f"wamid.SIM{uuid.uuid4().hex.upper()}"
+    stats[f"messages:{body.get('type', 'unknown')}"] += 1
+    stats["messages"] += 1
+
+    if STATUS_WEBHOOK_URL and body.get("type") != "reaction":
+        asyncio.create_task(_post_statuses(phone_number_id, recipient, wa_message_id))
+
+    return {
+        "messaging_product": "whatsapp",
+        "contacts": [{"input": recipient, "wa_id": recipient.lstrip("+")}],
+        "messages": [{"id": wa_message_id}],
+    }
+
+
+@app.post("/{version}/{phone_number_id}/media")
+async def upload_media(version: str, phone_number_id: str):
+    failure = await _simulate_network()
+    if failure is not None:
+        return failure
+    stats["media_uploads"] += 1
+    return {"id": str(random.randint(10**15, 10**16 - 1))}
+
+
+@app.get("/{version}/{business_account_id}/message_templates")
+async def list_templates(version: str, business_account_id: str):
+    failure = await _simulate_network()
+    if failure is not None:
+        return failure
+    stats["template_reads"] += 1
+    return {"data": [], "paging": {"cursors": {"before": "", "after": ""}}}
+
+
+@app.post("/{version}/{business_account_id}/message_templates")
+async def create_template(version: str, business_account_id: str):
+    failure = await _simulate_network()
+    if failure is not None:
+        return failure
+    stats["template_writes"] += 1
+    return {"id": str(random.randint(10**15, 10**16 - 1)), "status": "PENDING", "category": "MARKETING"}
+
+
+@app.get("/__stats")
+async def get_stats():
+    return {"uptime_seconds": round(time.monotonic() - started_at, 1), **stats}
+
+
+@app.post("/__stats/reset")
+async def reset_stats():
+    stats.clear()
+    return {"status": "reset"}
+
+
+@app.api_route("/{version}/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+async def fallback(version: str, path: str, request: Request):
+    failure = await _simulate_network()
+    if failure is not None:
+        return failure
+    stats[f"other:{request.method}"] += 1
+    if request.method == "GET":
+        object_id = path.split("/")[0]
+        return {
+            "id": object_id,
+            "url": f"{request.base_url}media/{object_id}",
+            "mime_type": "image/jpeg",
+            "sha256": uuid.uuid4().hex,
+            "file_size": 1024,
+            "messaging_product": "whatsapp",
+        }
+    return {"success": True}
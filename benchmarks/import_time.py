@@ -0,0 +1,134 @@
+"""Import-time profile of the API process, from `python -X importtime`.
+
+Each run imports `--module` (default `app.app`, what uvicorn loads) in a fresh interpreter and
+keeps, per module, the fastest of `--runs` runs. The report lists the slowest modules by their
+own import time and by cumulative time (themselves plus what they pulled in), and the totals per
+package. No services are needed, only the settings the app reads at import.
+
+    python -m benchmarks.import_time --top 25
+    python -m benchmarks.import_time --budget-ms 3000 --forbid pandas,boto3
+
+`--budget-ms` and `--forbid` make the run exit non-zero when startup goes over budget or a
+module that should only load on demand (pandas for bulk upload, boto3 for media) is imported.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+DEFAULT_FORBIDDEN = "pandas,boto3,botocore"
+
+
+class ImportCost(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportCost]:
+    """Rows of `-X importtime` stderr; other lines (warnings, the header) are skipped."""
+    costs = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            costs.append(ImportCost(name.strip(), int(self_us), int(cumulative_us), (len(name) - len(name.lstrip())) // 2))
+        except ValueError:
+            continue
+    return costs
+
+
+def profile(module: str) -> List[ImportCost]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def fastest(runs: List[List[ImportCost]]) -> Dict[str, ImportCost]:
+    best: Dict[str, ImportCost] = {}
+    for costs in runs:
+        for cost in costs:
+            if cost.module not in best or cost.cumulative_us < best[cost.module].cumulative_us:
+                best[cost.module] = cost
+    return best
+
+
+def by_package(costs: Dict[str, ImportCost], depth: int) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for cost in costs.values():
+        totals[".".join(cost.module.split(".")[:depth])] += cost.self_us
+    return dict(totals)
+
+
+def print_table(title: str, rows: List[tuple]) -> None:
+    print(f"\n{title}")
+    print(f"{'ms':>9}  module")
+    for name, us in rows:
+        print(f"{us / 1000:>9.1f}  {name}")
+
+
+def main(args) -> int:
+    costs = fastest([profile(args.module) for _ in range(args.runs)])
+    total_us = costs[args.module].cumulative_us if args.module in costs else sum(c.self_us for c in costs.values())
+    print(f"import {args.module}: {total_us / 1000:.0f} ms, {len(costs)} modules (fastest of {args.runs} runs)")
+
+    ranked = sorted(costs.values(), key=lambda cost: cost.self_us, reverse=True)[: args.top]
+    print_table("slowest modules, own time", [(cost.module, cost.self_us) for cost in ranked])
+    ranked = sorted(
+        (cost for cost in costs.values() if cost.module != args.module),
+        key=lambda cost: cost.cumulative_us,
+        reverse=True,
+    )[: args.top]
+    print_table("slowest modules, with their imports", [(cost.module, cost.cumulative_us) for cost in ranked])
+    packages = sorted(by_package(costs, args.package_depth).items(), key=lambda item: item[1], reverse=True)
+    print_table(f"packages (first {args.package_depth} name parts)", packages[: args.top])
+
+    failures = []
+    if args.budget_ms and total_us / 1000 > args.budget_ms:
+        failures.append(f"startup import took {total_us / 1000:.0f} ms, budget is {args.budget_ms} ms")
+    forbidden = [name for name in args.forbid.split(",") if name and name in costs]
+    if forbidden:
+        failures.append(f"imported at startup but should load on demand: {', '.join(forbidden)}")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump(
+                {
+                    "module": args.module,
+                    "total_ms": total_us / 1000,
+                    "modules": {cost.module: [cost.self_us, cost.cumulative_us] for cost in costs.values()},
+                    "packages_ms": {name: us / 1000 for name, us in packages},
+                    "failures": failures,
+                },
+                output,
+                indent=2,
+            )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.app", help="module to import")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to profile; the fastest is kept per module")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--package-depth", type=int, default=2, help="name parts to group packages by")
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail if the whole import takes longer")
+    parser.add_argument("--forbid", default=DEFAULT_FORBIDDEN, help="comma-separated modules that must not load at import")
+    parser.add_argument("--json", help="also write the profile to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args()))
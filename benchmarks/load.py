@@ -0,0 +1,239 @@
+"""End-to-end load benchmark for the API, Celery worker and Socket.IO gateway.
+
+Expects the stack from benchmarks/docker-compose.bench.yml (or any deployment whose
+WHATSAPP_API_BASE_URL points at benchmarks.graph_simulator) and the seed data created on
+API startup.
+
+    python -m benchmarks.load --scenarios webhook_ingest,inbox_listing,outbound_send
+    python -m benchmarks.load --scenarios broadcast_fanout --template-id <uuid> --broadcast-size 1000
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import payloads
+
+SCENARIOS = ["webhook_ingest", "inbox_listing", "outbound_send", "broadcast_fanout"]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+    extra: Dict[str, float] = field(default_factory=dict)
+
+    def percentile(self, pct: float) -> float:
+        if not self.latencies_ms:
+            return 0.0
+        ordered = sorted(self.latencies_ms)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, float]:
+        completed = len(self.latencies_ms)
+        return {
+            "requests": completed + self.errors,
+            "errors": self.errors,
+            "throughput_rps": round(completed / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0,
+            "p50_ms": round(self.percentile(50), 1),
+            "p99_ms": round(self.percentile(99), 1),
+            **self.extra,
+        }
+
+
+async def run_load(
+    name: str,
+    total: int,
+    concurrency: int,
+    call: Callable[[int], Awaitable[httpx.Response]],
+) -> ScenarioResult:
+    result = ScenarioResult(name=name)
+    queue: asyncio.Queue = asyncio.Queue()
+    for index in range(total):
+        queue.put_nowait(index)
+
+    async def worker():
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await call(index)
+                if response.status_code >= 400:
+                    result.errors += 1
+                    continue
+            except httpx.HTTPError:
+                result.errors += 1
+                continue
+            result.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_seconds = time.perf_counter() - started_at
+    return result
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str, client_id: int) -> Dict[str, str]:
+    response = await client.post("/auth/login", json={"email": email, "password": password, "client_id": client_id})
+    response.raise_for_status()
+    token = response.json()["data"]["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def simulator_stats(simulator_url: Optional[str]) -> Dict[str, int]:
+    if not simulator_url:
+        return {}
+    async with httpx.AsyncClient(base_url=simulator_url, timeout=10) as client:
+        return (await client.get("/__stats")).json()
+
+
+async def webhook_ingest(client: httpx.AsyncClient, args) -> ScenarioResult:
+    async def call(index: int) -> httpx.Response:
+        sender = payloads.contact_number(args.contact_offset + index % args.contacts)
+        return await client.post("/webhook", json=payloads.inbound_text(sender))
+
+    return await run_load("webhook_ingest", args.requests, args.concurrency, call)
+
+
+async def inbox_listing(client: httpx.AsyncClient, args) -> ScenarioResult:
+    headers = await login(client, args.email, args.password, args.client_id)
+    conversations = (await client.get("/team_inbox/get_conversations", params={"limit": 20}, headers=headers)).json()
+    conversation_ids = [item.get("id") or item.get("conversation_id") for item in _items(conversations)]
+
+    async def call(index: int) -> httpx.Response:
+        if conversation_ids and index % 2:
+            return await client.get(
+                "/message/get_by_conversation",
+                params={"conversation_id": conversation_ids[index % len(conversation_ids)], "limit": 30},
+                headers=headers,
+            )
+        return await client.get("/team_inbox/get_conversations", params={"page": 1, "limit": 20}, headers=headers)
+
+    return await run_load("inbox_listing", args.requests, args.concurrency, call)
+
+
+async def outbound_send(client: httpx.AsyncClient, args) -> ScenarioResult:
+    headers = await login(client, args.email, args.password, args.client_id)
+
+    async def call(index: int) -> httpx.Response:
+        recipient = "+" + payloads.contact_number(args.contact_offset + index % args.contacts)
+        return await client.post("/message/text", headers=headers, json={
+            "message_body": f"Benchmark reply {index}",
+            "client_message_id": str(uuid.uuid4()),
+            "recipient_number": recipient,
+        })
+
+    return await run_load("outbound_send", args.requests, args.concurrency, call)
+
+
+async def broadcast_fanout(client: httpx.AsyncClient, args) -> ScenarioResult:
+    if not args.template_id:
+        raise SystemExit("broadcast_fanout needs --template-id of an approved template")
+    headers = await login(client, args.email, args.password, args.client_id)
+    before = (await simulator_stats(args.simulator_url)).get("messages:template", 0)
+
+    numbers = ["+" + payloads.contact_number(args.contact_offset + index) for index in range(args.broadcast_size)]
+    result = await run_load("broadcast_fanout", 1, 1, lambda _: client.post("/broadcast/publish", headers=headers, json={
+        "broadcast_name": f"bench-{uuid.uuid4().hex[:8]}",
+        "list_of_numbers": numbers,
+        "template_id": args.template_id,
+        "parameters": [],
+        "scheduled_time": None,
+        "is_now": True,
+    }))
+
+    # Fan-out completes asynchronously in Celery: wait until the simulator has seen every send.
+    started_at = time.perf_counter()
+    sent = 0
+    while args.simulator_url and time.perf_counter() - started_at < args.fanout_timeout:
+        sent = (await simulator_stats(args.simulator_url)).get("messages:template", 0) - before
+        if sent >= args.broadcast_size:
+            break
+        await asyncio.sleep(0.5)
+    fanout_seconds = time.perf_counter() - started_at
+    result.extra = {
+        "recipients": args.broadcast_size,
+        "delivered_to_graph": sent,
+        "fanout_seconds": round(fanout_seconds, 2),
+        "fanout_msgs_per_second": round(sent / fanout_seconds, 1) if fanout_seconds else 0.0,
+    }
+    return result
+
+
+def _items(response_body) -> list:
+    data = response_body.get("data", response_body) if isinstance(response_body, dict) else response_body
+    if isinstance(data, dict):
+        for key in ("conversations", "items", "results"):
+            if isinstance(data.get(key), list):
+                return data[key]
+        return []
+    return data if isinstance(data, list) else []
+
+
+RUNNERS = {
+    "webhook_ingest": webhook_ingest,
+    "inbox_listing": inbox_listing,
+    "outbound_send": outbound_send,
+    "broadcast_fanout": broadcast_fanout,
+}
+
+
+def print_report(results: List[ScenarioResult]) -> None:
+    columns = ["requests", "errors", "throughput_rps", "p50_ms", "p99_ms"]
+    print(f"{'scenario':<18}" + "".join(f"{column:>16}" for column in columns))
+    for result in results:
+        summary = result.summary()
+        print(f"{result.name:<18}" + "".join(f"{summary[column]:>16}" for column in columns))
+        for key, value in result.extra.items():
+            print(f"{'':<18}{key}: {value}")
+
+
+async def main(args) -> None:
+    results = []
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        for scenario in args.scenarios:
+            results.append(await RUNNERS[scenario](client, args))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({result.name: result.summary() for result in results}, output, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--simulator-url", default="http://localhost:9000")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS[:3]),
+                        type=lambda value: [item for item in value.split(",") if item])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--contacts", type=int, default=200, help="distinct contacts used by the scenarios")
+    parser.add_argument("--contact-offset", type=int, default=0)
+    parser.add_argument("--broadcast-size", type=int, default=1000)
+    parser.add_argument("--fanout-timeout", type=float, default=300)
+    parser.add_argument("--template-id")
+    parser.add_argument("--email", default="user1@example.com")
+    parser.add_argument("--password", default="Password1")
+    parser.add_argument("--client-id", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--json", help="also write the summary to this file")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
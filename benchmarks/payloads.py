@@ -0,0 +1,72 @@
+"""WhatsApp Cloud API webhook payloads shaped like the ones Meta delivers."""
+import random
+import time
+import uuid
+from typing import Any, Dict
+
+# Seed data created by app.core.config.appstartup
+WABA_ID = "1691192741820643"
+PHONE_NUMBER_ID = "558569350676631"
+DISPLAY_PHONE_NUMBER = "15551546858"
+
+FIRST_NAMES = ["Lina", "Omar", "Sara", "Yousef", "Maya", "Khaled", "Rana", "Adam"]
+TEXTS = [
+    "Hi, is my order on the way?",
+    "What are your opening hours?",
+    "I need to change my delivery address",
+    "Thanks!",
+    "Can I talk to an agent please",
+    "Do you ship to Amman?",
+]
+
+
+def _envelope(value: Dict[str, Any], field: str = "messages") -> Dict[str, Any]:
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": WABA_ID,
+            "changes": [{"value": value, "field": field}],
+        }],
+    }
+
+
+def _metadata(phone_number_id: str = PHONE_NUMBER_ID) -> Dict[str, str]:
+    return {"display_phone_number": DISPLAY_PHONE_NUMBER, "phone_number_id": phone_number_id}
+
+
+def contact_number(index: int) -> str:
+    """Stable, valid Jordanian mobile numbers so repeated runs reuse the same contacts."""
+    return f"96279{index % 10_000_000:07d}"
+
+
+def inbound_text(sender: str, text: str = None) -> Dict[str, Any]:
+    return _envelope({
+        "messaging_product": "whatsapp",
+        "metadata": _metadata(),
+        "contacts": [{"profile": {"name": random.choice(FIRST_NAMES)}, "wa_id": sender}],
+        "messages": [{
+            "from": sender,
+            "id": f"wamid.IN{uuid.uuid4().hex.upper()}",
+            "timestamp": str(int(time.time())),
+            "type": "text",
+            "text": {"body": text or random.choice(TEXTS)},
+        }],
+    })
+
+
+def status_webhook(phone_number_id: str, recipient: str, wa_message_id: str, status: str) -> Dict[str, Any]:
+    return _envelope({
+        "messaging_product": "whatsapp",
+        "metadata": _metadata(phone_number_id),
+        "statuses": [{
+            "id": wa_message_id,
+            "status": status,
+            "timestamp": str(int(time.time())),
+            "recipient_id": recipient.lstrip("+"),
+            "conversation": {
+                "id": uuid.uuid4().hex,
+                "origin": {"type": "service"},
+            },
+            "pricing": {"billable": True, "pricing_model": "CBP", "category": "service"},
+        }],
+    })
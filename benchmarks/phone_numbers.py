@@ -0,0 +1,90 @@
+"""Micro-benchmark for phone number normalization over a synthetic recipient corpus.
+
+The corpus mimics broadcast and import traffic: `--size` numbers drawn from `--unique` distinct
+mobile numbers across a handful of regions, with a small share of malformed entries. Each run
+compares plain `phonenumbers` calls with `PhoneNumberNormalizer` from a cold cache, a warm
+cache and through `normalize_many`. No services are needed.
+
+    python -m benchmarks.phone_numbers --size 100000 --unique 20000
+"""
+import argparse
+import json
+import random
+import time
+from typing import Callable, Dict, List
+
+import phonenumbers
+from phonenumbers import NumberParseException, PhoneNumberFormat, PhoneNumberType
+
+from app.utils.PhoneNumberNormalizer import PhoneNumberNormalizer
+
+REGIONS = ["JO", "SA", "AE", "EG", "US", "GB", "DE", "IN"]
+
+
+def build_corpus(size: int, unique: int, invalid_share: float, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    distinct = []
+    for index in range(unique):
+        if rng.random() < invalid_share:
+            distinct.append(f"+{rng.randint(1, 999)}{rng.randint(0, 9999)}")
+            continue
+        region = REGIONS[index % len(REGIONS)]
+        example = phonenumbers.example_number_for_type(region, PhoneNumberType.MOBILE)
+        national = str(example.national_number)
+        # Vary the subscriber digits so numbers differ while keeping the mobile prefix.
+        suffix = str(rng.randrange(10 ** 4)).zfill(4)
+        distinct.append(f"+{example.country_code}{national[:-4]}{suffix}")
+    return [rng.choice(distinct) for _ in range(size)]
+
+
+def parse_uncached(numbers: List[str]) -> None:
+    for number in numbers:
+        try:
+            parsed = phonenumbers.parse(number, None)
+        except NumberParseException:
+            continue
+        phonenumbers.format_number(parsed, PhoneNumberFormat.E164)
+        phonenumbers.is_valid_number(parsed)
+
+
+def timed(run: Callable[[], None]) -> float:
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def main(args) -> None:
+    corpus = build_corpus(args.size, args.unique, args.invalid_share, args.seed)
+    normalizer = PhoneNumberNormalizer(maxsize=args.cache_size)
+
+    results: Dict[str, float] = {"uncached": timed(lambda: parse_uncached(corpus))}
+    results["cached_cold"] = timed(lambda: [normalizer.try_normalize(number) for number in corpus])
+    results["cached_warm"] = timed(lambda: [normalizer.try_normalize(number) for number in corpus])
+    normalizer.cache_clear()
+    results["normalize_many_cold"] = timed(lambda: normalizer.normalize_many(corpus))
+
+    print(f"{len(corpus)} numbers, {len(set(corpus))} distinct, cache size {args.cache_size}")
+    print(f"{'run':<22}{'seconds':>10}{'numbers/s':>14}{'speedup':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<22}{seconds:>10.3f}{len(corpus) / seconds:>14.0f}{results['uncached'] / seconds:>9.1f}x")
+    info = normalizer.cache_info()
+    print(f"cache: hits={info.hits} misses={info.misses} currsize={info.currsize}")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"size": len(corpus), "distinct": len(set(corpus)), "seconds": results}, output, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="numbers in the corpus")
+    parser.add_argument("--unique", type=int, default=20_000, help="distinct numbers the corpus is drawn from")
+    parser.add_argument("--invalid-share", type=float, default=0.02)
+    parser.add_argument("--cache-size", type=int, default=65536)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="also write the timings to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    main(parse_args())
@@ -123,3 +123,141 @@ BEGIN
     );
 END;
 $$;
+
+
+CREATE OR REPLACE FUNCTION broadcast_messaging_batch(
+    p_contact_phones        TEXT[],
+    p_country_code_phones   TEXT[],
+    p_business_phone        TEXT,
+    p_whatsapp_message_ids  TEXT[],
+    p_user_id               UUID
+)
+RETURNS TABLE (
+    r_whatsapp_message_id  TEXT,
+    r_conversation_id      UUID,
+    r_message_id           UUID
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_client_id        UUID;
+    v_team_id          UUID;
+    v_assignment_id    UUID;
+    v_contact_source   TEXT := 'WHATSAPP';
+    ts_now             TIMESTAMP;
+BEGIN
+    ts_now := NOW() AT TIME ZONE 'UTC';
+
+    SELECT client_id INTO v_client_id
+    FROM business_profile
+    WHERE phone_number = p_business_phone
+    LIMIT 1;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Business profile not found for phone %', p_business_phone;
+    END IF;
+
+    SELECT id INTO v_assignment_id
+    FROM assignments
+    WHERE user_id = p_user_id
+    LIMIT 1;
+
+    SELECT id INTO v_team_id
+    FROM teams
+    WHERE client_id = v_client_id
+      AND is_default = TRUE
+    LIMIT 1;
+
+    -- Contacts that do not exist yet for this client
+    INSERT INTO contacts (
+        id, created_at, updated_at,
+        name, country_code, phone_number, source,
+        status, allow_broadcast, allow_sms,
+        client_id
+    )
+    SELECT
+        uuid_generate_v7(), ts_now, ts_now,
+        r.country_code || r.phone, r.country_code, r.phone, v_contact_source,
+        'valid', TRUE, TRUE,
+        v_client_id
+    FROM (
+        SELECT DISTINCT ON (i.phone) i.phone, i.country_code
+        FROM unnest(p_contact_phones, p_country_code_phones) AS i(phone, country_code)
+        ORDER BY i.phone
+    ) r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM contacts ct
+        WHERE ct.phone_number = r.phone
+          AND ct.client_id = v_client_id
+    );
+
+    -- Conversations for recipients that have none yet, each linked to the default team
+    WITH recipient_contacts AS (
+        SELECT DISTINCT ON (ct.phone_number) ct.id AS contact_id
+        FROM contacts ct
+        WHERE ct.client_id = v_client_id
+          AND ct.phone_number = ANY(p_contact_phones)
+        ORDER BY ct.phone_number, ct.created_at
+    ),
+    created AS (
+        INSERT INTO conversations (
+            id, created_at, updated_at,
+            status, contact_id, assignment_id, client_id,
+            is_open, chatbot_triggered
+        )
+        SELECT
+            uuid_generate_v7(), ts_now, ts_now,
+            'BROADCAST', rc.contact_id, v_assignment_id, v_client_id,
+            FALSE, TRUE
+        FROM recipient_contacts rc
+        WHERE NOT EXISTS (
+            SELECT 1 FROM conversations c
+            WHERE c.contact_id = rc.contact_id
+        )
+        RETURNING id
+    )
+    INSERT INTO conversation_team_link (id, created_at, updated_at, conversation_id, team_id)
+    SELECT uuid_generate_v7(), ts_now, ts_now, created.id, v_team_id
+    FROM created
+    WHERE v_team_id IS NOT NULL
+    ON CONFLICT DO NOTHING;
+
+    -- One message per recipient, returned as wa message id -> conversation/message ids
+    RETURN QUERY
+    WITH recipients AS (
+        SELECT i.phone, i.wa_message_id
+        FROM unnest(p_contact_phones, p_whatsapp_message_ids) AS i(phone, wa_message_id)
+    ),
+    recipient_contacts AS (
+        SELECT DISTINCT ON (ct.phone_number) ct.phone_number, ct.id AS contact_id
+        FROM contacts ct
+        WHERE ct.client_id = v_client_id
+          AND ct.phone_number = ANY(p_contact_phones)
+        ORDER BY ct.phone_number, ct.created_at
+    ),
+    recipient_conversations AS (
+        SELECT DISTINCT ON (c.contact_id) c.contact_id, c.id AS conversation_id
+        FROM conversations c
+        JOIN recipient_contacts rc ON rc.contact_id = c.contact_id
+        ORDER BY c.contact_id, c.created_at
+    ),
+    inserted AS (
+        INSERT INTO messages (
+            id, created_at, updated_at,
+            message_type, message_status,
+            whatsapp_message_id, is_from_contact,
+            member_id, contact_id, conversation_id
+        )
+        SELECT
+            uuid_generate_v7(), ts_now, ts_now,
+            'template', 'sent',
+            r.wa_message_id, FALSE,
+            p_user_id, rc.contact_id, rv.conversation_id
+        FROM recipients r
+        JOIN recipient_contacts rc ON rc.phone_number = r.phone
+        JOIN recipient_conversations rv ON rv.contact_id = rc.contact_id
+        RETURNING whatsapp_message_id, conversation_id, id
+    )
+    SELECT inserted.whatsapp_message_id::TEXT, inserted.conversation_id, inserted.id
+    FROM inserted;
+END;
+$$;
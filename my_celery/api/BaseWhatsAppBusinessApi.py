@@ -6,9 +6,10 @@ from my_celery.config.settings import settings
 
 
 API_VERSION = settings.WHATSAPP_API_VERSION
+API_BASE_URL = settings.WHATSAPP_API_BASE_URL
 
 
-base_url = f"https://graph.facebook.com/{API_VERSION}"
+base_url = f"{API_BASE_URL}/{API_VERSION}"
 
 client = http_session.http_session
 
@@ -1,7 +1,10 @@
 import requests
+from urllib.parse import urlsplit
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from app.core.tracing.tracer import start_span
+
 class RequestsSessionHandler:
     def __init__(self):
         self.session = requests.Session()
@@ -21,6 +24,11 @@ class RequestsSessionHandler:
         return headers
 
     def post(self, url: str, headers: dict, json: dict):
-        return self.session.post(url, headers=headers, json=json)
+        parts = urlsplit(url)
+        endpoint = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        with start_span(f"POST {endpoint}", {"http.host": parts.netloc, "http.target": parts.path}, kind="client") as span:
+            response = self.session.post(url, headers=headers, json=json)
+            span.set_attribute("http.status_code", response.status_code)
+            return response
     
 http_session = RequestsSessionHandler()
\ No newline at end of file
@@ -2,7 +2,8 @@ from kombu import Exchange, Queue
 from celery.utils.log import get_task_logger
 from kombu.serialization import register
 import structlog
-import msgspec
+
+from app.core.codec import codec
 
 whatsapp_exchange = Exchange("whatsapp_default_exchange", type="direct", durable=True)
 broadcast_exchange = Exchange("message_broadcast_exchange", type="direct", durable=True)
@@ -25,7 +26,9 @@ QUEUES = [
 
 TASK_ROUTES = {
     "my_celery.tasks.status_whatsapp_message": {"queue": "whatsapp_message_queue"},
+    "my_celery.tasks.status_whatsapp_messages_batch": {"queue": "whatsapp_message_queue"},
     "my_celery.tasks.template_broadcast": {"queue": "message_broadcast_queue"},
+    "my_celery.tasks.template_broadcast_batch": {"queue": "message_broadcast_queue"},
     "my_celery.tasks.trigger_chatbot_task": {"queue": "trigger_chatbot_queue"},
     "my_celery.tasks.handle_flow_node_task": {"queue": "chatbot_flow_queue"},
     "my_celery.tasks.process_received_message_task": {"queue": "message_hook_received_queue"},
@@ -35,7 +38,9 @@ TASK_ROUTES = {
 
 CELERY_TASK = [
     "my_celery.tasks.status_whatsapp_message", 
+    "my_celery.tasks.status_whatsapp_messages_batch",
     "my_celery.tasks.template_broadcast",
+    "my_celery.tasks.template_broadcast_batch",
     "my_celery.tasks.trigger_chatbot_task",
     "my_celery.tasks.handle_flow_node_task",
     "my_celery.tasks.process_received_message_task",
@@ -44,10 +49,10 @@ CELERY_TASK = [
     ]
 
 def msgpack_dumps(obj):
-    return msgspec.msgpack.encode(obj)
+    return codec.encode(obj)
 
 def msgpack_loads(s):
-    return msgspec.msgpack.decode(s)
+    return codec.decode(s)
 
 register(
     'msgpack',
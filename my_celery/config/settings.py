@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     REDIS_DB: int
     CACHE_URL: str
     REDIS_TTL: int
+    REDIS_CLUSTER: bool = False
 
     # Rate Limit
     RATE_LIMIT: int
@@ -31,6 +32,7 @@ class Settings(BaseSettings):
 
     # WhatsApp API
     WHATSAPP_API_VERSION: str
+    WHATSAPP_API_BASE_URL: str = "https://graph.facebook.com"
     WHATSAPP_WEBHOOK_VERIFY_TOKEN: str
     
     SESSION_SECRET_KEY: str
@@ -56,6 +58,15 @@ class Settings(BaseSettings):
     RABBITMQ_DEFAULT_USER: str
     RABBITMQ_DEFAULT_PASS: str
     RABBITMQ_URI: str
+
+    # Prometheus scrape port of the worker's main process
+    CELERY_METRICS_PORT: int = 9808
+
+    # Tracing: "none", "file" (JSON lines) or "otlp" (OTLP/HTTP JSON collector)
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE_PATH: str = "traces.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACE_SAMPLE_RATE: float = 1.0
     
     CORS_ORIGIN_URL: str
 
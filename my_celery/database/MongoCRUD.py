@@ -2,6 +2,8 @@ from typing import TypeVar, Generic, Type, List, Optional, Dict, Any, Union
 from datetime import datetime, timezone
 from pydantic import BaseModel
 from odmantic import Model, SyncEngine
+from pymongo import ReturnDocument
+from pymongo.results import BulkWriteResult
 from celery.utils.log import get_task_logger
 
 T = TypeVar("T", bound=Model)
@@ -69,12 +71,24 @@ class MongoCRUD(Generic[T]):
             logger.error("mongo_update_failed", error=str(e))
             raise
     
+    def find_one_and_update(
+        self,
+        filters: Dict[str, Any],
+        update: Dict[str, Any],
+        return_new: bool = True
+    ) -> Optional[T]:
+        document = self.engine.get_collection(self.model).find_one_and_update(
+            filters,
+            update,
+            return_document=ReturnDocument.AFTER if return_new else ReturnDocument.BEFORE
+        )
+        if document is None:
+            return None
+        return self.model.model_validate_doc(document)
+
     def delete(self, id: Any) -> bool:
-        instance = self.get_by_id(id)
-        if not instance:
-            return False
-        self.engine.delete(instance)
-        return True
+        result = self.engine.get_collection(self.model).delete_one({"_id": id})
+        return result.deleted_count > 0
 
     def bulk_create(self, items: List[Dict[str, Any]]) -> List[T]:
         instances: List[T] = []
@@ -92,6 +106,11 @@ class MongoCRUD(Generic[T]):
         )
         return result.modified_count
 
+    def bulk_write(self, operations: List[Any], ordered: bool = False) -> Optional[BulkWriteResult]:
+        if not operations:
+            return None
+        return self.engine.get_collection(self.model).bulk_write(operations, ordered=ordered)
+
     def bulk_delete(self, filters: Dict[str, Any]) -> int:
         result = self.engine.get_collection(self.model).delete_many(filters)
         return result.deleted_count
@@ -100,7 +119,7 @@ class MongoCRUD(Generic[T]):
         return self.engine.get_collection(self.model).count_documents(filters or {})
 
     def exists(self, filters: Dict[str, Any]) -> bool:
-        return self.count(filters) > 0
+        return self.engine.get_collection(self.model).find_one(filters, {"_id": 1}) is not None
 
     def search(
         self,
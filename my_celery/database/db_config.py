@@ -1,8 +1,12 @@
 from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from my_celery.config.settings import settings
+from my_celery.signals.metrics import instrument_sqlalchemy
+from my_celery.signals.tracing import trace_sqlalchemy
 
 psql_engine = create_engine(
     settings.POSTGRES_DATABASE_URL_CELERY,
@@ -14,10 +18,23 @@ psql_engine = create_engine(
     pool_recycle=3600,     
     pool_use_lifo=True     
 )
+instrument_sqlalchemy(psql_engine)
+trace_sqlalchemy(psql_engine)
 SessionLocal = sessionmaker(bind=psql_engine)
 
+_task_session: ContextVar[Optional[Session]] = ContextVar("task_session", default=None)
+_after_commit_callbacks: ContextVar[Optional[List[Callable[[], None]]]] = ContextVar("after_commit_callbacks", default=None)
+
 @contextmanager
 def get_db():
+    session = _task_session.get()
+    if session is not None:
+        # Inside a task unit of work: share its session, a savepoint keeps a failed helper
+        # from aborting the whole task transaction.
+        with session.begin_nested():
+            yield session
+        return
+
     db = SessionLocal()
     try:
         yield db
@@ -26,4 +43,43 @@ def get_db():
         db.rollback()
         raise
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@contextmanager
+def task_unit_of_work(commit_on: tuple = ()):
+    """One session for a whole task invocation, committed once when the task returns.
+
+    Exceptions listed in `commit_on` (e.g. Celery's Retry) still commit the work done so far.
+    """
+    if _task_session.get() is not None:
+        yield _task_session.get()
+        return
+
+    db = SessionLocal()
+    callbacks: List[Callable[[], None]] = []
+    session_token = _task_session.set(db)
+    callbacks_token = _after_commit_callbacks.set(callbacks)
+    try:
+        yield db
+        db.commit()
+    except commit_on:
+        db.commit()
+        raise
+    except:
+        db.rollback()
+        callbacks.clear()
+        raise
+    finally:
+        _task_session.reset(session_token)
+        _after_commit_callbacks.reset(callbacks_token)
+        db.close()
+        for callback in callbacks:
+            callback()
+
+def run_after_commit(callback: Callable[[], None]) -> None:
+    """Defers `callback` until the current task unit of work commits, or runs it now without one."""
+    callbacks = _after_commit_callbacks.get()
+    if callbacks is None:
+        callback()
+    else:
+        callbacks.append(callback)
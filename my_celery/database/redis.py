@@ -1,12 +1,12 @@
-from datetime import datetime
 import json
-import msgpack
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
 import redis
-from uuid import UUID as NativeUUID
-from asyncpg.pgproto.pgproto import UUID as PgUUID
+from redis.crc import key_slot
 
-from app.utils.DateTimeHelper import DateTimeHelper
+from app.core.codec import codec
+from my_celery.signals.metrics import InstrumentedRedis, InstrumentedRedisCluster
+
+T = TypeVar("T")
 
 class RedisService:
     def __init__(
@@ -18,51 +18,46 @@ class RedisService:
         namespace: str = "",
         default_ttl: int = 30 * 24 * 60 * 60,
         use_msgpack: bool = True,
+        cluster: bool = False,
     ):
         self.namespace = namespace
         self.default_ttl = default_ttl
         self.use_msgpack = use_msgpack
+        self.cluster = cluster
         self._DATETIME_KEY = "__datetime__"
-        self._client = redis.Redis(
-            host=host,
-            port=port,
-            db=db,
-            password=password,
-            decode_responses=not use_msgpack,
-        )
-
-    _DATETIME_EXT = 1
-    _UUID_EXT = 2 
-    
-    def _encode_custom(self, obj):
-        if isinstance(obj, datetime):
-            dt = DateTimeHelper.ensure_utc(obj)
-            return msgpack.ExtType(self._DATETIME_EXT, dt.isoformat().encode())
-        if isinstance(obj, (NativeUUID, PgUUID)):
-            return msgpack.ExtType(self._UUID_EXT, str(obj).encode())
-        raise TypeError
-    
-    def _decode_custom(self, code, data):
-        if code == self._DATETIME_EXT:
-            return DateTimeHelper.ensure_utc(datetime.fromisoformat(data.decode()))
-        if code == self._UUID_EXT:
-            return data.decode()  
-        return msgpack.ExtType(code, data)
+        if cluster:
+            # Cluster mode has no numbered databases; the other nodes are discovered from this one.
+            self._client = InstrumentedRedisCluster(
+                host=host,
+                port=port,
+                password=password,
+                decode_responses=not use_msgpack,
+            )
+        else:
+            self._client = InstrumentedRedis(
+                host=host,
+                port=port,
+                db=db,
+                password=password,
+                decode_responses=not use_msgpack,
+            )
 
     def _key(self, key: str) -> str:
         ns = f"{self.namespace}:" if self.namespace and not self.namespace.endswith(":") else self.namespace
         return f"{ns}{key}"
 
     def _serialize(self, value: Any) -> bytes:
-        return msgpack.packb(value, use_bin_type=True, default=self._encode_custom)
+        return codec.encode(value)
 
-    def _deserialize(self, raw: Union[bytes, str, None]) -> Any:
+    def _deserialize(self, raw: Union[bytes, str, None], type: Optional[Type[T]] = None) -> Any:
         if raw is None:
             return None
+        if type is not None:
+            return codec.decode(raw, type)
         if isinstance(raw, (bytes, bytearray)):
             try:
-                return msgpack.unpackb(raw, raw=False, ext_hook=self._decode_custom)
-            except Exception:
+                return codec.decode(raw)
+            except codec.DecodeError:
                 try:
                     return raw.decode()
                 except Exception:
@@ -96,10 +91,10 @@ class RedisService:
         data = self._serialize(value)
         return self._client.set(full_key, data, ex=ex, nx=nx, xx=xx)
     
-    def get(self, key: str) -> Any:
-        """Retrieve and deserialize a key."""
+    def get(self, key: str, type: Optional[Type[T]] = None) -> Any:
+        """Retrieve and deserialize a key, into `type` when given."""
         raw = self._client.get(self._key(key))
-        return self._deserialize(raw)
+        return self._deserialize(raw, type)
 
     
     def delete(self, *keys: str) -> int:
@@ -169,7 +164,34 @@ class RedisService:
         """Create a pipeline for batch commands."""
         return self._client.pipeline()
 
-    
+    def group_by_slot(self, keys: Iterable[str]) -> Dict[int, List[str]]:
+        """Group keys by cluster hash slot; without a cluster everything is one group."""
+        if not self.cluster:
+            return {0: list(keys)}
+        groups: Dict[int, List[str]] = {}
+        for key in keys:
+            groups.setdefault(key_slot(self._key(key).encode()), []).append(key)
+        return groups
+
+    def mget(self, *keys: str, type: Optional[Type[T]] = None) -> List[Any]:
+        """Values of keys in order (None when missing), one MGET per hash slot."""
+        if not keys:
+            return []
+        values = {}
+        for group in self.group_by_slot(dict.fromkeys(keys)).values():
+            raw_values = self._client.mget([self._key(k) for k in group])
+            values.update(zip(group, raw_values))
+        return [self._deserialize(values[key], type) for key in keys]
+
+    def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False, xx: bool = False, gt: bool = False) -> int:
+        """Add members (plain strings) with scores to a sorted set."""
+        return self._client.zadd(self._key(key), {str(m): s for m, s in mapping.items()}, nx=nx, xx=xx, gt=gt)
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        """Score of a sorted set member, None when absent."""
+        return self._client.zscore(self._key(key), str(member))
+
+
     def flush_db(self) -> bool:
         """Flush the entire database."""
         return self._client.flushdb()
@@ -1,7 +1,9 @@
 from typing import Optional, Dict, Any
 
+import msgspec
 import structlog
 
+from app.core.codec.records import BusinessData, ChatbotContext
 from my_celery.database.redis import RedisService
 from my_celery.utils.RedisHelper import RedisHelper
 from my_celery.utils.DateTimeHelper import DateTimeHelper
@@ -12,10 +14,10 @@ class ChatbotContextService:
         self.context_ttl = 3600
         self.logger = structlog.get_logger(__name__)
     
-    def get_chatbot_context(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+    def get_chatbot_context(self, conversation_id: str) -> Optional[ChatbotContext]:
         try:
             key = RedisHelper.redis_chatbot_context_key(conversation_id)
-            context = self.redis_client.get(key)
+            context = self.redis_client.get(key, type=ChatbotContext)
             
             if context:
                 self.logger.debug(f"Retrieved chatbot context for conversation {conversation_id}")
@@ -38,18 +40,18 @@ class ChatbotContextService:
         additional_data: Dict[str, Any] = None
     ) -> bool:
         try:
-            context = {
-                "conversation_id": conversation_id,
-                "chatbot_id": chatbot_id,
-                "current_node_id": current_node_id,
-                "node_type": node_type,
-                "waiting_for_response": waiting_for_response,
-                "created_at": DateTimeHelper.now_utc(),
-                "updated_at": DateTimeHelper.now_utc(),
-            }
+            context = ChatbotContext(
+                conversation_id=conversation_id,
+                chatbot_id=chatbot_id,
+                current_node_id=current_node_id,
+                node_type=node_type,
+                waiting_for_response=waiting_for_response,
+                created_at=DateTimeHelper.now_utc(),
+                updated_at=DateTimeHelper.now_utc(),
+            )
             
             if additional_data:
-                context.update(additional_data)
+                context = msgspec.structs.replace(context, **additional_data)
             
             key = RedisHelper.redis_chatbot_context_key(conversation_id)
             result = self.redis_client.set(key=key, value=context, ttl=self.context_ttl)
@@ -73,27 +75,25 @@ class ChatbotContextService:
         """Update current node and related context"""
         try:
             key = RedisHelper.redis_chatbot_context_key(conversation_id)
-            context = self.redis_client.get(key) or {}
+            context = self.redis_client.get(key, type=ChatbotContext) or ChatbotContext()
             
             # Update core fields
-            context.update({
+            changes: Dict[str, Any] = {
                 "current_node_id": new_current_node_id,
                 "updated_at": DateTimeHelper.now_utc(),
-            })
+            }
             
             # Update optional fields if provided
             if previous_node_id:
-                context["previous_node_id"] = previous_node_id
+                changes["previous_node_id"] = previous_node_id
             if chatbot_id:
-                context["chatbot_id"] = chatbot_id
+                changes["chatbot_id"] = chatbot_id
             if node_type is not None:
-                context["node_type"] = node_type
+                changes["node_type"] = node_type
             if waiting_for_response is not None:
-                context["waiting_for_response"] = waiting_for_response
-                if waiting_for_response:
-                    context["waiting_since"] = DateTimeHelper.now_utc()
-                else:
-                    context.pop("waiting_since", None)
+                changes["waiting_for_response"] = waiting_for_response
+                changes["waiting_since"] = DateTimeHelper.now_utc() if waiting_for_response else None
+            context = msgspec.structs.replace(context, **changes)
             
             result = self.redis_client.set(key=key, value=context, ttl=self.context_ttl)
             
@@ -122,13 +122,13 @@ class ChatbotContextService:
         """Clear waiting for response state"""
         try:
             key = RedisHelper.redis_chatbot_context_key(conversation_id)
-            context = self.redis_client.get(key) or {}
-            
-            context.update({
-                "waiting_for_response": False,
-                "updated_at": DateTimeHelper.now_utc(),
-            })
-            context.pop("waiting_since", None)
+            context = self.redis_client.get(key, type=ChatbotContext) or ChatbotContext()
+            context = msgspec.structs.replace(
+                context,
+                waiting_for_response=False,
+                waiting_since=None,
+                updated_at=DateTimeHelper.now_utc(),
+            )
             
             result = self.redis_client.set(key=key, value=context, ttl=self.context_ttl)
             self.logger.debug(f"Cleared waiting for response state for conversation {conversation_id}")
@@ -274,7 +274,8 @@ class ChatbotContextService:
         """Cache business data for conversation"""
         try:
             key = RedisHelper.redis_business_data_by_conversation_key(conversation_id)
-            result = self.redis_client.set(key=key, value=business_data, ttl=3600)  # 1 hour TTL
+            value = msgspec.convert(business_data, BusinessData)
+            result = self.redis_client.set(key=key, value=value, ttl=3600)  # 1 hour TTL
             
             self.logger.debug(f"Cached business data for conversation {conversation_id}")
             return result
@@ -287,12 +288,12 @@ class ChatbotContextService:
         """Get cached business data"""
         try:
             key = RedisHelper.redis_business_data_by_conversation_key(conversation_id)
-            business_data = self.redis_client.get(key)
-            
-            if business_data:
-                self.logger.debug(f"Retrieved cached business data for conversation {conversation_id}")
+            business_data = self.redis_client.get(key, type=BusinessData)
             
-            return business_data
+            if business_data is None:
+                return None
+            self.logger.debug(f"Retrieved cached business data for conversation {conversation_id}")
+            return msgspec.structs.asdict(business_data)
             
         except Exception as e:
             self.logger.error(f"Error getting business data: {e}")
@@ -308,8 +309,8 @@ class ChatbotContextService:
                 RedisHelper.redis_business_data_by_conversation_key(conversation_id),
             ]
             
-            for key in keys_to_delete:
-                self.redis_client.delete(key)
+            # All three share the conversation's hash tag, so this is a single DEL even on a cluster.
+            self.redis_client.delete(*keys_to_delete)
             
             self.logger.info(f"Cleared all chatbot context for conversation {conversation_id}")
             return True
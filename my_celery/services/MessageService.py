@@ -3,7 +3,7 @@ from sqlalchemy import text
 import structlog
 import uuid6
 from my_celery.tasks.publishers.message_publisher import publish_chatbot_reply_event
-from my_celery.models.schemas.ChatbotReplyEventPayload import ChatbotReplyEventPayload
+from app.core.codec.messages import ChatbotReplyEventPayload
 from my_celery.api.BaseWhatsAppBusinessApi import send_interactive_message, send_media_message, send_text_message
 from my_celery.database.db_config import get_db
 from my_celery.models.ChatBot import FlowNode
@@ -158,7 +158,6 @@ def _persist_outgoing_message(
             }
             result = session.execute(stmt, params)
             row = result.fetchone()
-            session.commit()
 
             if not row:
                 raise RuntimeError(f"Failed to insert SQL message for conversation {conversation_id}")
@@ -218,7 +217,7 @@ def _persist_outgoing_message(
             }
         )
         
-        publish_success = publish_chatbot_reply_event(reply_payload.to_dict())
+        publish_success = publish_chatbot_reply_event(reply_payload)
         logger.info(
             f"the publish has been sucessful {message_content}",
             sql_id=str(sql_id),
@@ -438,7 +437,7 @@ def _handle_operation_node(message_node: FlowNode, business_data: dict, conversa
             business_data=business_data,
             event_type="operation_executed"
         )
-        publish_chatbot_reply_event(operation_payload.to_dict())
+        publish_chatbot_reply_event(operation_payload)
     except Exception as e:
         logger.warning(
             "chatbot_reply_event_publish_failed",
@@ -24,6 +24,8 @@ from my_celery.models.ChatBot import FlowNode
 from my_celery.models.Message import Message
 from my_celery.database.db_config import psql_engine
 from my_celery.services.ChatbotContextService import ChatbotContextService
+from my_celery.signals.metrics import MongoCommandMetrics
+from my_celery.signals.tracing import MongoCommandTracing
 
 
 class WorkerContext:
@@ -100,7 +102,8 @@ class WorkerContext:
                 serverSelectionTimeoutMS=5000,
                 maxPoolSize=10,
                 minPoolSize=1,
-                appName=f"celery-worker-{self.worker_pid}"
+                appName=f"celery-worker-{self.worker_pid}",
+                event_listeners=[MongoCommandMetrics(), MongoCommandTracing()]
             )
             
             # Test connection
@@ -119,6 +122,7 @@ class WorkerContext:
                 port=settings.REDIS_PORT,
                 db=settings.REDIS_DB,
                 default_ttl=86400,
+                cluster=settings.REDIS_CLUSTER,
             )
             # Test connection
             self.redis_service._client.ping()
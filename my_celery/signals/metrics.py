@@ -0,0 +1,173 @@
+# my_celery/signals/metrics.py
+"""Prometheus metrics for the Celery worker.
+
+Prefork children record task runtimes and DB latency into PROMETHEUS_MULTIPROC_DIR; the main
+process serves the aggregate on CELERY_METRICS_PORT together with the depth of every queue in
+celery_config.QUEUES, read with a passive queue_declare at scrape time.
+"""
+import os
+import shutil
+import time
+from typing import Dict
+
+import redis
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+    worker_ready,
+)
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram, multiprocess, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from sqlalchemy import event
+
+from app.core.metrics.db import DB_CALL_ERRORS, DB_CALL_SECONDS
+from my_celery.config.celery_config import QUEUES, task_log
+from my_celery.config.settings import settings
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+CELERY_TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task runtime by task and final state.",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS,
+)
+
+_task_started: Dict[str, float] = {}
+
+
+def _multiprocess_dir() -> str:
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+
+
+class QueueDepthCollector:
+    """Reads message and consumer counts for every declared queue when Prometheus scrapes."""
+
+    def __init__(self, app, queues=QUEUES):
+        self.app = app
+        self.queues = queues
+
+    def collect(self):
+        depth = GaugeMetricFamily("celery_queue_depth", "Messages ready in a Celery queue.", labels=["queue"])
+        consumers = GaugeMetricFamily("celery_queue_consumers", "Consumers attached to a Celery queue.", labels=["queue"])
+        try:
+            with self.app.connection_for_read() as connection:
+                for queue in self.queues:
+                    # A passive declare of a missing queue closes its channel, so use one per queue.
+                    try:
+                        with connection.channel() as channel:
+                            _, message_count, consumer_count = queue.bind(channel).queue_declare(passive=True)
+                    except Exception as e:
+                        task_log.warning("queue_depth_unavailable", queue=queue.name, error=str(e))
+                        continue
+                    depth.add_metric([queue.name], message_count)
+                    consumers.add_metric([queue.name], consumer_count)
+        except Exception as e:
+            task_log.warning("queue_depth_broker_unreachable", error=str(e))
+        yield depth
+        yield consumers
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        DB_CALL_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        DB_CALL_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1_000_000)
+        DB_CALL_ERRORS.labels("mongo", event.command_name).inc()
+
+
+def _observe_redis_command(execute, args, options):
+    operation = str(args[0]).upper()
+    started = time.perf_counter()
+    try:
+        return execute(*args, **options)
+    except Exception:
+        DB_CALL_ERRORS.labels("redis", operation).inc()
+        raise
+    finally:
+        DB_CALL_SECONDS.labels("redis", operation).observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(redis.Redis):
+    def execute_command(self, *args, **options):
+        return _observe_redis_command(super().execute_command, args, options)
+
+
+class InstrumentedRedisCluster(redis.RedisCluster):
+    def execute_command(self, *args, **kwargs):
+        return _observe_redis_command(super().execute_command, args, kwargs)
+
+
+def _statement_verb(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def instrument_sqlalchemy(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        DB_CALL_SECONDS.labels("postgres", _statement_verb(statement)).observe(
+            time.perf_counter() - context._metrics_started
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        DB_CALL_ERRORS.labels("postgres", _statement_verb(exception_context.statement or "")).inc()
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **_):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_runtime(task_id=None, task=None, state=None, **_):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@worker_init.connect
+def reset_multiprocess_dir(**_):
+    """Runs in the main process before the pool forks: drop samples left by a previous run."""
+    path = _multiprocess_dir()
+    if not path:
+        return
+    # The directory is usually a tmpfs mount point: empty it rather than remove it.
+    os.makedirs(path, exist_ok=True)
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            os.unlink(entry.path)
+
+
+@worker_ready.connect
+def start_metrics_server(sender=None, **_):
+    if _multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        task_log.warning("PROMETHEUS_MULTIPROC_DIR is not set - pool process metrics will be missing")
+        registry = REGISTRY
+    registry.register(QueueDepthCollector(sender.app))
+    start_http_server(settings.CELERY_METRICS_PORT, registry=registry)
+    task_log.info(f"Metrics server listening on :{settings.CELERY_METRICS_PORT}")
+
+
+@worker_process_shutdown.connect
+def mark_pool_process_dead(pid=None, **_):
+    if _multiprocess_dir():
+        multiprocess.mark_process_dead(pid or os.getpid())
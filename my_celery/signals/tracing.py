@@ -0,0 +1,66 @@
+# my_celery/signals/tracing.py
+"""Continues API traces inside the worker.
+
+Task spans are opened by BaseTask from the `traceparent` header; this module injects the
+header into tasks published from inside a task, records Postgres and Mongo calls as child
+spans and flushes pending spans when a pool process exits.
+"""
+import time
+
+from celery.signals import before_task_publish, worker_process_shutdown
+from pymongo import monitoring
+from sqlalchemy import event
+
+from app.core.tracing.tracer import configure_tracing, inject, record_span
+from my_celery.config.settings import settings
+
+tracer = configure_tracing(
+    service_name="celery-worker",
+    exporter=settings.TRACE_EXPORTER,
+    file_path=settings.TRACE_FILE_PATH,
+    otlp_endpoint=settings.TRACE_OTLP_ENDPOINT,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+)
+
+PUBLISHED_AT_HEADER = "published_at"
+
+
+class MongoCommandTracing(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event, error=str(event.failure))
+
+    def _record(self, event, error=None) -> None:
+        end_ns = time.time_ns()
+        record_span(f"mongo {event.command_name}", end_ns - event.duration_micros * 1000, end_ns,
+                    {"db.name": event.database_name}, kind="client", error=error)
+
+
+def trace_sqlalchemy(engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._trace_started_ns = time.time_ns()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        record_span("postgres " + (statement.lstrip().split(None, 1) or ["QUERY"])[0].upper(),
+                    context._trace_started_ns, attributes={"db.statement": statement[:300]}, kind="client")
+
+
+@before_task_publish.connect
+def inject_trace_headers(headers=None, **_):
+    if headers is None:
+        return
+    inject(headers)
+    headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@worker_process_shutdown.connect
+def flush_spans(**_):
+    if tracer.processor is not None:
+        tracer.processor.flush()
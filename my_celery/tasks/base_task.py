@@ -5,27 +5,51 @@ import asyncio
 from functools import wraps
 from app.utils.DateTimeHelper import DateTimeHelper
 from celery import Task
+from contextlib import nullcontext
 import structlog
 from typing import Any, Callable
 from celery.exceptions import MaxRetriesExceededError, Retry
+from app.core.tracing.tracer import parse_traceparent, record_span, start_span
+from my_celery.database.db_config import task_unit_of_work
+from my_celery.signals.tracing import PUBLISHED_AT_HEADER
 
 RETRY_COUNTDOWN = 60  
 MAX_RETRIES = 5
 
+def is_rate_limited(exc: BaseException) -> bool:
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) == 429 or "rate limit" in str(exc).lower()
+
+
 class BaseTask(Task):
     abstract = True
     max_retries = MAX_RETRIES
     default_retry_delay = RETRY_COUNTDOWN
+    # Opt-in: run every get_db() of the task in one session and commit once at the end.
+    unit_of_work = False
 
     def __call__(self, *args, **kwargs):
         self.start_time = DateTimeHelper.now_utc()
-        self.logger = structlog.get_logger().bind(
-            task=self.name, task_id=self.request.id
-        )
+        parent = parse_traceparent(self.request.get("traceparent"))
+        published_at = self.request.get(PUBLISHED_AT_HEADER)
+        if parent is not None and published_at:
+            record_span(f"amqp.queue {self.name}", int(float(published_at) * 1_000_000_000),
+                        parent=parent, kind="consumer")
+
+        with start_span(f"celery.task {self.name}", {"task_id": self.request.id, "retries": self.request.retries},
+                        parent=parent, kind="consumer") as span:
+            self.logger = structlog.get_logger().bind(
+                task=self.name, task_id=self.request.id, trace_id=span.context.trace_id
+            )
+            return self._run_task(*args, **kwargs)
+
+    def _run_task(self, *args, **kwargs):
         self.logger.info("task_started", args=args, kwargs=kwargs)
 
         try:
-            result = super().__call__(*args, **kwargs)
+            scope = task_unit_of_work(commit_on=(Retry,)) if self.unit_of_work else nullcontext()
+            with scope:
+                result = super().__call__(*args, **kwargs)
 
             duration = (DateTimeHelper.now_utc() - self.start_time).total_seconds()
             self.logger.info("task_completed", duration=duration)
@@ -73,11 +97,10 @@ class BaseTask(Task):
     def retry_task(self, exc=None, countdown=None, **kwargs):
         self.logger = structlog.get_logger().bind(task=self.name, task_id=self.request.id)
         try:
-            if exc and "rate limit" in str(exc).lower():
-                retry_countdown = self.default_retry_delay * (2 ** self.request.retries)
-                retry_countdown += uniform(0, retry_countdown)  # jitter
-                self.logger.info("rate_limit_backoff", retry_countdown=int(retry_countdown))
-                return self.retry(exc=exc, countdown=int(retry_countdown), **kwargs)
+            if exc and is_rate_limited(exc):
+                retry_countdown = self.backoff_countdown()
+                self.logger.info("rate_limit_backoff", retry_countdown=retry_countdown)
+                return self.retry(exc=exc, countdown=retry_countdown, **kwargs)
 
             actual_countdown = countdown if countdown is not None else self.default_retry_delay
             return self.retry(exc=exc, countdown=actual_countdown, **kwargs)
@@ -90,6 +113,11 @@ class BaseTask(Task):
             )
             raise exc 
 
+    def backoff_countdown(self) -> int:
+        """Exponential backoff with jitter for the next retry of this task."""
+        retry_countdown = self.default_retry_delay * (2 ** self.request.retries)
+        return int(retry_countdown + uniform(0, retry_countdown))
+
     def run_async(self, coro_func):
         return asyncio.run(coro_func)
 
@@ -1,4 +1,5 @@
-from typing import Optional
+import time
+from typing import Any, Dict, Optional
 
 from sqlalchemy import text
 from sqlalchemy.exc import NoResultFound
@@ -6,7 +7,7 @@ import structlog
 from my_celery.celery_app import celery_app
 from my_celery.database.db_config import get_db
 from my_celery.models.ChatBot import FlowNode
-from my_celery.models.schemas.ChatbotReplyEventPayload import ChatbotReplyEventPayload
+from app.core.codec.messages import ChatbotReplyEventPayload
 from my_celery.tasks.base_task import BaseTask
 from my_celery.signals.lifecycle import get_chatbot_context_service, get_chatbot_crud
 from my_celery.services.MessageService import _persist_outgoing_message, message_node_handler
@@ -19,6 +20,10 @@ logger = structlog.get_logger(__name__)
 RETRY_COUNTDOWN = 60  
 MAX_RETRIES = 1
 
+FLOW_RUNNER_MAX_STEPS = 10
+FLOW_RUNNER_TIME_BUDGET_SECONDS = 15.0
+WAITING_NODE_TYPES = ["question", "interactive_buttons"]
+
 def conversation_end_triggered(conversation_id: str):
     try:
         chatbot_context_service : ChatbotContextService = get_chatbot_context_service()
@@ -177,12 +182,86 @@ def handle_flow_completion(conversation_id: str, current_node_id: str, business_
                 event_type="flow_completion"
             )
             
-            publish_chatbot_reply_event(completion_payload.to_dict())
+            publish_chatbot_reply_event(completion_payload)
             logger.info(f"Published fallback flow completion event for conversation: {conversation_id}")
         
     except Exception as e:
         logger.error(f"Failed to handle flow completion: {e}")
 
+def should_auto_advance(node: FlowNode) -> bool:
+    return node.type.value == "message" and not node.is_final
+
+def save_current_node(conversation_id: str, node: FlowNode, previous_node_id: str, business_data: dict):
+    """Points the chatbot context at `node` before it is sent, so a reply to it finds the context."""
+    try:
+        waiting_for_response = node.type.value in WAITING_NODE_TYPES
+        get_chatbot_context_service().update_current_node(
+            conversation_id=conversation_id,
+            new_current_node_id=node.id,
+            previous_node_id=previous_node_id,
+            chatbot_id=business_data["chatbot_id"],
+            node_type=node.type.value,
+            waiting_for_response=waiting_for_response
+        )
+        logger.info(f"Updated chatbot context: {previous_node_id} -> {node.id} (waiting: {waiting_for_response})")
+    except Exception as e:
+        logger.warning(f"Failed to update chatbot context: {e}")
+
+def run_auto_advancing_nodes(
+    node: FlowNode,
+    conversation_id: str,
+    business_data: dict,
+    max_steps: int = FLOW_RUNNER_MAX_STEPS,
+    time_budget: float = FLOW_RUNNER_TIME_BUDGET_SECONDS,
+) -> Dict[str, Any]:
+    """Send the message nodes that follow an already processed `node` inside the current task.
+
+    Stops at the first node that waits for the contact, at the end of the flow, when the step
+    or time budget is spent, or when sending a node fails. In the last two cases the caller
+    re-enqueues from `last_node` so nodes that were already sent are not sent again.
+    """
+    chatbot_crud = get_chatbot_crud()
+    started_at = time.monotonic()
+    run = {
+        "last_node": node,
+        "messages_created": 0,
+        "steps": 0,
+        "completed": False,
+        "budget_exhausted": False,
+        "step_failed": False,
+    }
+
+    while should_auto_advance(run["last_node"]):
+        current = run["last_node"]
+        if run["steps"] >= max_steps or time.monotonic() - started_at >= time_budget:
+            run["budget_exhausted"] = True
+            break
+
+        following = chatbot_crud.get_by_id(current.next_nodes) if current.next_nodes else None
+        if following is None:
+            logger.info(f"No next node after {current.id}, ending flow. conversation={conversation_id}")
+            handle_flow_completion(conversation_id, current.id, business_data)
+            run["completed"] = True
+            break
+
+        save_current_node(conversation_id, following, current.id, business_data)
+        try:
+            message_docs = message_node_handler(
+                message_node=following,
+                business_data=business_data,
+                conversation_id=conversation_id,
+            )
+        except Exception as e:
+            logger.error(f"Failed to process chained node {following.id}: {e}")
+            run["step_failed"] = True
+            break
+
+        run["messages_created"] += len(message_docs)
+        run["last_node"] = following
+        run["steps"] += 1
+
+    return run
+
 @celery_app.task(
     name="my_celery.tasks.handle_flow_node_task",
     bind=True,
@@ -225,21 +304,7 @@ def handle_flow_node_task(self, data):
         
         self.logger.info(f"Found next node: {next_node.id} (type: {next_node.type.value})")
         
-        try:
-            waiting_for_response = next_node.type.value in ["question", "interactive_buttons"]
-            
-            chatbot_context_service.update_current_node(
-                conversation_id=conversation_id,
-                new_current_node_id=next_node.id,
-                previous_node_id=current_node_id,
-                chatbot_id=business_data["chatbot_id"],
-                node_type=next_node.type.value,
-                waiting_for_response=waiting_for_response
-            )
-            self.logger.info(f"Updated chatbot context: {current_node_id} -> {next_node.id} (waiting: {waiting_for_response})")
-            
-        except Exception as e:
-            self.logger.warning(f"Failed to update chatbot context: {e}")
+        save_current_node(conversation_id, next_node, current_node_id, business_data)
         
         if button_id:
             try:
@@ -276,39 +341,41 @@ def handle_flow_node_task(self, data):
             self.retry(exc=e)
             return
 
-        should_continue_flow = (
-            next_node.type.value == "message"
-            and not next_node.is_final 
-        )
-        self.logger.info(f"Should continue flow: {next_node}")
-        if should_continue_flow:                
-            self.logger.info(f"Continuing flow automatically for node type: {next_node.type.value}")
+        run = run_auto_advancing_nodes(next_node, conversation_id, business_data)
+
+        last_node = run["last_node"]
+        self.logger.info(f"Flow run processed {run['steps'] + 1} nodes, stopped at {last_node.id} "
+                    f"(completed: {run['completed']}, budget_exhausted: {run['budget_exhausted']})")
+
+        resume_in_new_task = run["budget_exhausted"] or run["step_failed"]
+        if resume_in_new_task:
+            self.logger.info(f"Continuing flow from node {last_node.id} in a new task")
             next_payload = {
                 "conversation_id": conversation_id,
-                "current_node_id": next_node.id,
+                "current_node_id": last_node.id,
                 "business_data": business_data
             }
             handle_flow_node_task.delay(next_payload)
-        else:
-            if next_node.type.value == "message" and next_node.next_nodes is None:
+        elif not run["completed"]:
+            if last_node.type.value == "message" and last_node.next_nodes is None:
                 self.logger.info(
-                    f"Flow completed at node {next_node.id} "
-                    f"(type: {next_node.type.value}, final: {next_node.is_final})"
+                    f"Flow completed at node {last_node.id} "
+                    f"(type: {last_node.type.value}, final: {last_node.is_final})"
                 )
-                handle_flow_completion(conversation_id, next_node.id, business_data)
+                handle_flow_completion(conversation_id, last_node.id, business_data)
                 
-            elif next_node.type.value in ["question", "interactive_buttons"]:
-                self.logger.info(f"Flow paused at {next_node.type.value} node {next_node.id}, waiting for user response")
+            elif last_node.type.value in WAITING_NODE_TYPES:
+                self.logger.info(f"Flow paused at {last_node.type.value} node {last_node.id}, waiting for user response")
             else:
-                self.logger.info(f"Flow paused at node {next_node.id} (type: {next_node.type.value})")
+                self.logger.info(f"Flow paused at node {last_node.id} (type: {last_node.type.value})")
         
         return {
             "status": "success",
             "conversation_id": conversation_id,
-            "processed_node": next_node.id,
-            "node_type": next_node.type.value,
-            "messages_created": len(message_docs),
-            "flow_continues": should_continue_flow
+            "processed_node": last_node.id,
+            "node_type": last_node.type.value,
+            "messages_created": len(message_docs) + run["messages_created"],
+            "flow_continues": resume_in_new_task
         }
         
     except Exception as exc:
@@ -1,8 +1,13 @@
+import time
+from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+import msgspec
 from sqlalchemy import text
+
+from app.core.codec.records import BusinessData
 from my_celery.celery_app import celery_app
-from my_celery.database.db_config import get_db
+from my_celery.database.db_config import get_db, run_after_commit
 from my_celery.signals.lifecycle import get_chatbot_context_service, get_redis_service
 from my_celery.tasks.base_task import BaseTask
 from my_celery.tasks.trigger_chatbot_task import trigger_chatbot_task  
@@ -13,31 +18,62 @@ from my_celery.utils.RedisHelper import RedisHelper
 MAX_RETRIES = 5
 RETRY_COUNTDOWN = 60
 
+BUSINESS_DATA_QUERY = text("""
+    SELECT 
+        c.id as conversation_id,
+        c.contact_id,
+        c.client_id,
+        bp.access_token as business_token,
+        bp.phone_number_id,
+        CONCAT('+', co.country_code, co.phone_number) as recipient_number
+    FROM conversations c
+    JOIN clients cl ON c.client_id = cl.id
+    JOIN contacts co ON c.contact_id = co.id
+    LEFT JOIN business_profile bp ON cl.id = bp.client_id
+    WHERE c.id = :conversation_id
+""")
+
+CONVERSATION_QUERY = text("""
+    SELECT *
+    FROM conversations c
+    WHERE c.id = :conversation_id
+""")
+
+# Loads the contact, business profile and default chatbot in one round trip instead of one
+# query each.
+CHATBOT_TRIGGER_QUERY = text("""
+    SELECT 
+        c.contact_id,
+        c.client_id,
+        cb.id as chatbot_id,
+        bp.access_token as business_token,
+        bp.phone_number_id,
+        CONCAT('+', co.country_code, co.phone_number) as recipient_number
+    FROM conversations c
+    JOIN contacts co ON c.contact_id = co.id
+    LEFT JOIN business_profile bp ON c.client_id = bp.client_id
+    LEFT JOIN chat_bots cb ON c.client_id = cb.client_id AND cb.is_default = true
+    WHERE c.id = :conversation_id
+    LIMIT 1
+""")
+
+MARK_CHATBOT_TRIGGERED_STATEMENT = text("""
+    UPDATE conversations 
+    SET chatbot_triggered = true, chatbot_id = :chatbot_id
+    WHERE id = :conversation_id
+""")
+
 def _get_business_data_for_conversation(conversation_id: str, message_data: Dict[str, Any], logger) -> Dict[str, Any]:
     try:
         redis = get_redis_service()
         
-        if redis.exists(RedisHelper.redis_business_data_by_conversation_key(conversation_id)):
-            return redis.get(RedisHelper.redis_business_data_by_conversation_key(conversation_id))
+        cached = redis.get(RedisHelper.redis_business_data_by_conversation_key(conversation_id), type=BusinessData)
+        if cached is not None:
+            return msgspec.structs.asdict(cached)
         
         else:
             with get_db() as session:
-                stmt = text("""
-                    SELECT 
-                        c.id as conversation_id,
-                        c.contact_id,
-                        c.client_id,
-                        bp.access_token as business_token,
-                        bp.phone_number_id,
-                        CONCAT('+', co.country_code, co.phone_number) as recipient_number
-                    FROM conversations c
-                    JOIN clients cl ON c.client_id = cl.id
-                    JOIN contacts co ON c.contact_id = co.id
-                    LEFT JOIN business_profile bp ON cl.id = bp.client_id
-                    WHERE c.id = :conversation_id
-                """)
-                
-                result = session.execute(stmt, {"conversation_id": conversation_id})
+                result = session.execute(BUSINESS_DATA_QUERY, {"conversation_id": conversation_id})
                 row = result.fetchone()
                 
                 if not row:
@@ -46,16 +82,16 @@ def _get_business_data_for_conversation(conversation_id: str, message_data: Dict
                 metadata = message_data.get("metadata", {})
                 phone_id = metadata.get("phone_number_id") or row.phone_number_id
     
-                result_data = {
-                    "business_token": row.business_token,
-                    "business_phone_number_id": phone_id,
-                    "recipient_number": message_data.get("sender") or row.recipient_number,
-                    "contact_id": str(row.contact_id),
-                    "client_id": str(row.client_id)
-                }
+                result_data = BusinessData(
+                    business_token=row.business_token,
+                    business_phone_number_id=phone_id,
+                    recipient_number=message_data.get("sender") or row.recipient_number,
+                    contact_id=str(row.contact_id),
+                    client_id=str(row.client_id)
+                )
                 redis.set(RedisHelper.redis_business_data_by_conversation_key(conversation_id), result_data)
                 
-                return result_data
+                return msgspec.structs.asdict(result_data)
     except Exception as e:
         logger.error(f"Error getting business data for conversation {conversation_id}: {e}")
         raise
@@ -63,13 +99,7 @@ def _get_business_data_for_conversation(conversation_id: str, message_data: Dict
 def _get_conversation(conversation_id: str, logger) -> Dict[str, Any]:
     try:
         with get_db() as session:
-            stmt = text("""
-                SELECT *
-                FROM conversations c
-                WHERE c.id = :conversation_id
-            """)
-            
-            result = session.execute(stmt, {"conversation_id": conversation_id})
+            result = session.execute(CONVERSATION_QUERY, {"conversation_id": conversation_id})
             row = result.fetchone()
             
             if not row:
@@ -91,17 +121,10 @@ def _get_conversation(conversation_id: str, logger) -> Dict[str, Any]:
 def _mark_conversation_chatbot_triggered(conversation_id: str, chatbot_id: str, logger) -> None:
     try:
         with get_db() as session:
-            stmt = text("""
-                UPDATE conversations 
-                SET chatbot_triggered = true, chatbot_id = :chatbot_id
-                WHERE id = :conversation_id
-            """)
-            
-            session.execute(stmt, {
+            session.execute(MARK_CHATBOT_TRIGGERED_STATEMENT, {
                 "conversation_id": conversation_id,
                 "chatbot_id": chatbot_id
             })
-            session.commit()
             
             logger.debug(f"Marked conversation {conversation_id} as chatbot triggered with chatbot {chatbot_id}")
             
@@ -109,18 +132,40 @@ def _mark_conversation_chatbot_triggered(conversation_id: str, chatbot_id: str,
         logger.error(f"Failed to mark conversation {conversation_id} as chatbot triggered: {e}")
         raise
 
+def _conversation_window_expires_at(conversation_id: str) -> Optional[float]:
+    """Epoch second the conversation's 24h window closes, from the shared expiry index.
+
+    Windows opened before the index existed live in per-conversation keys: the API stored the
+    closing time, this worker stored "active" with a 24h TTL. Those are copied into the index.
+    """
+    redis = get_redis_service()
+    index_key = RedisHelper.redis_conversation_expiry_index_key(conversation_id)
+    expires_at = redis.zscore(index_key, conversation_id)
+    if expires_at is not None:
+        return expires_at
+
+    legacy_key = RedisHelper.redis_conversation_expired_key(conversation_id)
+    value = redis.get(legacy_key)
+    if isinstance(value, datetime):
+        expires_at = (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+    elif value is not None:
+        ttl = redis.ttl(legacy_key)
+        expires_at = time.time() + ttl if ttl > 0 else None
+    if expires_at is not None:
+        redis.zadd(index_key, {conversation_id: expires_at}, nx=True)
+    return expires_at
+
 def check_conversation_expiration(conversation_id: str, logger) -> bool:
 
     try:
-        redis = get_redis_service()
-        expiration_key = RedisHelper.redis_conversation_expired_key(conversation_id)
+        expires_at = _conversation_window_expires_at(conversation_id)
         
-        # If Redis key exists, conversation is ACTIVE (not expired)
-        if redis.exists(expiration_key):
-            logger.debug(f"Conversation {conversation_id} is active (Redis key exists) - NOT expired")
+        # A future score in the expiry index means the conversation is ACTIVE (not expired)
+        if expires_at is not None and expires_at > time.time():
+            logger.debug(f"Conversation {conversation_id} is active (window open in expiry index) - NOT expired")
             return False
         
-        logger.debug(f"No Redis expiration key found for conversation {conversation_id}, checking database")
+        logger.debug(f"No open window in expiry index for conversation {conversation_id}, checking database")
         
         conversation = _get_conversation(conversation_id, logger)
         
@@ -139,11 +184,11 @@ def check_conversation_expiration(conversation_id: str, logger) -> bool:
 def _set_conversation_expiration_in_redis(conversation_id: str, logger, ttl_hours: int = 24) -> None:
     try:
         redis = get_redis_service()
-        expiration_key = RedisHelper.redis_conversation_expired_key(conversation_id)
         
         ttl_seconds = ttl_hours * 3600
         
-        redis.set(expiration_key, "active", ex=ttl_seconds)
+        # NX: never move a window the webhook opened; the sweeper expires the entry when it lapses.
+        redis.zadd(RedisHelper.redis_conversation_expiry_index_key(conversation_id), {conversation_id: time.time() + ttl_seconds}, nx=True)
         
         logger.debug(f"Set conversation expiration in Redis for conversation {conversation_id} with TTL {ttl_hours} hours")
         
@@ -152,19 +197,14 @@ def _set_conversation_expiration_in_redis(conversation_id: str, logger, ttl_hour
 
 def get_conversation_time_remaining(conversation_id: str, logger) -> Optional[int]:
     try:
-        redis = get_redis_service()
-        expiration_key = RedisHelper.redis_conversation_expired_key(conversation_id)
+        expires_at = _conversation_window_expires_at(conversation_id)
+        remaining = int(expires_at - time.time()) if expires_at is not None else 0
         
-        ttl = redis.ttl(expiration_key)
-        
-        if ttl > 0:
-            logger.debug(f"Conversation {conversation_id} expires in {ttl} seconds")
-            return ttl
-        elif ttl == -1:
-            logger.warning(f"Conversation {conversation_id} key exists but has no expiration set")
-            return None
+        if remaining > 0:
+            logger.debug(f"Conversation {conversation_id} expires in {remaining} seconds")
+            return remaining
         else:  
-            logger.debug(f"Conversation {conversation_id} has no expiration key (expired or never set)")
+            logger.debug(f"Conversation {conversation_id} has no open window (expired or never set)")
             return None
             
     except Exception as e:
@@ -176,7 +216,7 @@ def should_trigger_chatbot(conversation_id: str, logger) -> bool:
         chatbot_context_service = get_chatbot_context_service()
         chatbot_context = chatbot_context_service.get_chatbot_context(conversation_id)
         
-        if chatbot_context and chatbot_context.get("waiting_for_response"):
+        if chatbot_context and chatbot_context.waiting_for_response:
             logger.debug(f"Chatbot context exists and waiting for response for conversation {conversation_id}")
             return False  
         
@@ -187,40 +227,33 @@ def should_trigger_chatbot(conversation_id: str, logger) -> bool:
         logger.error(f"Error determining chatbot trigger for conversation {conversation_id}: {e}")
         return False
     
-def get_default_chatbot(client_id, logger):
+def _get_chatbot_trigger_data(conversation_id: str, message_data: Dict[str, Any], logger) -> Dict[str, Any]:
+    """Conversation, default chatbot and business data in a single round trip."""
     try:
         with get_db() as session:
-            stmt = text("""
-                SELECT 
-                id, 
-                name, 
-                language, 
-                triggered, 
-                version, 
-                communicate_type, 
-                is_default, 
-                client_id, 
-                created_at, 
-                updated_at
-                FROM chat_bots
-                WHERE client_id = :client_id 
-                AND is_default = true
-            """)
-            
-            result = session.execute(stmt, {"client_id": client_id})
+            result = session.execute(CHATBOT_TRIGGER_QUERY, {"conversation_id": conversation_id})
             row = result.fetchone()
             
             if not row:
-                raise ValueError(f"Chatbot not found for client: {client_id}")
+                raise ValueError(f"Conversation not found: {conversation_id}")
             
-            result_data = {
-                "chatbot_id": row.id,
-                "name": row.name,
-                "client_id": str(row.client_id),
+            metadata = message_data.get("metadata", {})
+            business_data = BusinessData(
+                business_token=row.business_token,
+                business_phone_number_id=metadata.get("phone_number_id") or row.phone_number_id,
+                recipient_number=message_data.get("sender") or row.recipient_number,
+                contact_id=str(row.contact_id),
+                client_id=str(row.client_id)
+            )
+            get_redis_service().set(RedisHelper.redis_business_data_by_conversation_key(conversation_id), business_data)
+            
+            return {
+                "client_id": str(row.client_id) if row.client_id else None,
+                "chatbot_id": row.chatbot_id,
+                "business_data": msgspec.structs.asdict(business_data),
             }
-            return result_data
     except Exception as e:
-        logger.error(f"Error getting default chatbot for client {client_id}: {e}")
+        logger.error(f"Error getting chatbot trigger data for conversation {conversation_id}: {e}")
         raise
     
 def trigger_chatbot_for_conversation(conversation_id: str, message_data: Dict[str, Any], logger) -> bool:
@@ -228,21 +261,19 @@ def trigger_chatbot_for_conversation(conversation_id: str, message_data: Dict[st
     Trigger chatbot for a new/expired conversation
     """
     try:
-        conversation = _get_conversation(conversation_id, logger)
-        client_id = conversation.get("client_id")
+        trigger_data = _get_chatbot_trigger_data(conversation_id, message_data, logger)
+        client_id = trigger_data.get("client_id")
         
         if not client_id:
             logger.error(f"No client_id found for conversation {conversation_id}")
             return False
         
-        try:
-            default_chatbot = get_default_chatbot(client_id, logger)
-            chatbot_id = default_chatbot.get("chatbot_id")
-        except ValueError as e:
-            logger.warning(f"No default chatbot found for client {client_id}: {e}")
+        chatbot_id = trigger_data.get("chatbot_id")
+        if not chatbot_id:
+            logger.warning(f"No default chatbot found for client {client_id}")
             return False
         
-        business_data = _get_business_data_for_conversation(conversation_id, message_data, logger)
+        business_data = trigger_data["business_data"]
         business_data["chatbot_id"] = chatbot_id
         
         _mark_conversation_chatbot_triggered(conversation_id, chatbot_id, logger)
@@ -257,7 +288,7 @@ def trigger_chatbot_for_conversation(conversation_id: str, message_data: Dict[st
             "contact_id": business_data["contact_id"]
         }
         
-        trigger_chatbot_task.delay(flow_payload)
+        run_after_commit(lambda: trigger_chatbot_task.delay(flow_payload))
         logger.info(f"Successfully triggered chatbot {chatbot_id} for conversation {conversation_id}")
         
         return True
@@ -293,8 +324,8 @@ def _handle_text_response_to_chatbot(message_data: Dict[str, Any], conversation_
         
         logger.debug(f"Found chatbot context: {chatbot_context}")
         
-        is_waiting = chatbot_context.get("waiting_for_response", False)
-        node_type = chatbot_context.get("node_type")
+        is_waiting = chatbot_context.waiting_for_response
+        node_type = chatbot_context.node_type
         
         logger.debug(f"Context state - waiting_for_response: {is_waiting}, node_type: {node_type}")
         
@@ -310,8 +341,8 @@ def _handle_text_response_to_chatbot(message_data: Dict[str, Any], conversation_
         
         logger.info(f"Processing text response: '{text_content[:50]}...' for conversation {conversation_id}")
         
-        current_node_id = chatbot_context.get("current_node_id")
-        chatbot_id = chatbot_context.get("chatbot_id")     
+        current_node_id = chatbot_context.current_node_id
+        chatbot_id = chatbot_context.chatbot_id
 
         if not current_node_id or not chatbot_id:
             logger.warning(f"Invalid chatbot context for conversation {conversation_id} - missing node_id or chatbot_id")
@@ -363,7 +394,8 @@ def _handle_text_response_to_chatbot(message_data: Dict[str, Any], conversation_
     max_retries=MAX_RETRIES,
     retry_jitter=True,
     default_retry_delay=RETRY_COUNTDOWN,
-    acks_late=False
+    acks_late=False,
+    unit_of_work=True
 )
 def process_received_message_task(self, message_body: dict[str, Any], conversation_id: str = None, recipient_number: str = None):
     try:
@@ -1,8 +1,13 @@
+import time
 from typing import Any, Dict
 from celery import current_app
 from kombu import Exchange , Queue
+import msgspec
 import structlog
 
+from app.core.codec.messages import ChatbotReplyEventPayload
+from app.core.tracing.tracer import inject, start_span
+
 logger = structlog.get_logger()
 
 def publish_flow_node_event(payload: Dict[str, Any]) -> bool:
@@ -10,9 +15,11 @@ def publish_flow_node_event(payload: Dict[str, Any]) -> bool:
     try:
         flow_node_exchange = Exchange("chatbot_flow_exchange", type="direct", durable=True)
 
-        with current_app.producer_pool.acquire(block=True) as producer:
+        with current_app.producer_pool.acquire(block=True) as producer, \
+                start_span("amqp.publish chatbot_flow_event", kind="producer"):
             producer.publish(
                 payload,
+                headers=inject({}),
                 serializer="msgpack",
                 exchange=flow_node_exchange,
                 routing_key="chatbot_flow_event",
@@ -33,7 +40,7 @@ def publish_flow_node_event(payload: Dict[str, Any]) -> bool:
         return False
 
 
-def publish_chatbot_reply_event(payload: Dict[str, Any]) -> bool:
+def publish_chatbot_reply_event(payload: ChatbotReplyEventPayload) -> bool:
 
     try:
         chatbot_reply_exchange = Exchange("chatbot_replies_exchange", type="direct", durable=True)
@@ -44,9 +51,11 @@ def publish_chatbot_reply_event(payload: Dict[str, Any]) -> bool:
             durable=True, 
             delivery_mode=2
         )
-        with current_app.producer_pool.acquire(block=True) as producer:
+        with current_app.producer_pool.acquire(block=True) as producer, \
+                start_span("amqp.publish chatbot_replies_event", kind="producer"):
             producer.publish(
-                payload,
+                msgspec.structs.replace(payload, published_at=time.time()),
+                headers=inject({}),
                 serializer="msgpack",
                 exchange=chatbot_reply_exchange,
                 routing_key="chatbot_replies_event",
@@ -61,7 +70,7 @@ def publish_chatbot_reply_event(payload: Dict[str, Any]) -> bool:
                     "interval_max": 5.0
                 }
             )
-        logger.info(f"Successfully published chatbot reply for chat_id: {payload.get('conversation_id', 'unknown')}")
+        logger.info(f"Successfully published chatbot reply for chat_id: {payload.conversation_id}")
         return True
     except Exception as e:
         logger.error(f"Failed to publish chatbot reply event: {str(e)}")
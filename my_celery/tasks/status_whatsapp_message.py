@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 from my_celery.signals.lifecycle import get_message_crud
@@ -52,15 +53,18 @@ def status_whatsapp_message(self, data):
         self.logger.info("message_updated", message_id=message_id)
 
     try:
-        mongo_msg : Message = message_crud.get_by_id(message_id)
+        mongo_msg : Message = message_crud.find_one_and_update(
+            {"_id": message_id},
+            {"$set": {
+                "message_status": new_status,
+                "wa_message_id": wa_id,
+                "updated_at": datetime.now(timezone.utc),
+            }},
+        )
         if not mongo_msg:
             self.logger.warning("no_mongo_document_found", message_id=message_id)
             return {"updated": False}
 
-        mongo_msg.message_status = new_status
-        mongo_msg.wa_message_id = wa_id
-        message_crud.update(id=message_id, data=mongo_msg)
-
         self.logger.info("mongo_doc_updated", message_id=message_id)
     except Exception as e:
         self.logger.error("mongo_update_failed", error=str(e))
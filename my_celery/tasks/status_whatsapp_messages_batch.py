@@ -0,0 +1,126 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from pymongo import UpdateOne
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from my_celery.signals.lifecycle import get_message_crud
+from my_celery.tasks.base_task import BaseTask
+from my_celery.celery_app import celery_app
+from my_celery.database.db_config import get_db
+
+RETRY_COUNTDOWN = 60
+MAX_RETRIES = 5
+
+STATUS_RANK = {
+    "sent": 1,
+    "delivered": 2,
+    "read": 3,
+    "failed": 4,
+}
+
+
+def collapse_statuses(statuses: List[Dict[str, Any]]) -> Dict[str, str]:
+    latest: Dict[str, Dict[str, Any]] = {}
+    for entry in statuses:
+        wa_id = entry.get("wa_message_id")
+        if not wa_id:
+            continue
+        current = latest.get(wa_id)
+        if current is None or _status_key(entry) >= _status_key(current):
+            latest[wa_id] = entry
+    return {wa_id: entry["status"] for wa_id, entry in latest.items()}
+
+
+def _status_key(entry: Dict[str, Any]) -> tuple:
+    return (STATUS_RANK.get(entry.get("status"), 0), int(entry.get("timestamp") or 0))
+
+
+def _build_values_clause(statuses: Dict[str, str]) -> tuple[str, Dict[str, Any]]:
+    rows = []
+    params = {}
+    for idx, (wa_id, new_status) in enumerate(statuses.items()):
+        rows.append(f"(:wa_id_{idx}, :status_{idx}, :rank_{idx})")
+        params[f"wa_id_{idx}"] = wa_id
+        params[f"status_{idx}"] = new_status
+        params[f"rank_{idx}"] = STATUS_RANK.get(new_status, 0)
+    return ", ".join(rows), params
+
+
+def _stored_rank_sql(column: str) -> str:
+    whens = " ".join(f"WHEN '{status}' THEN {rank}" for status, rank in STATUS_RANK.items())
+    return f"CASE {column} {whens} ELSE 0 END"
+
+
+@celery_app.task(
+    name="my_celery.tasks.status_whatsapp_messages_batch",
+    bind=True,
+    base=BaseTask,
+    max_retries=MAX_RETRIES,
+    retry_jitter=True,
+    default_retry_delay=RETRY_COUNTDOWN,
+    acks_late=False,
+)
+def status_whatsapp_messages_batch(self, data):
+    try:
+        message_crud = get_message_crud()
+    except RuntimeError as e:
+        self.logger.error("get_message_crud_failed", error=str(e))
+        raise self.retry(exc=e)
+
+    statuses = collapse_statuses(data.get("statuses", []))
+    if not statuses:
+        return {"updated": 0}
+
+    values_clause, params = _build_values_clause(statuses)
+
+    with get_db() as db:
+        try:
+            result = db.execute(
+                text(f"""
+                    UPDATE messages AS m
+                    SET message_status = v.status,
+                        updated_at = now()
+                    FROM (VALUES {values_clause}) AS v(wa_id, status, rank)
+                    WHERE m.whatsapp_message_id = v.wa_id
+                      -- batches are not ordered: never move a message back to a lower status
+                      AND {_stored_rank_sql("m.message_status")} < v.rank
+                    RETURNING m.id, m.whatsapp_message_id
+                """),
+                params,
+            )
+            updated_rows = result.fetchall()
+        except OperationalError as oe:
+            self.logger.warning("db_batch_update_failed", error=str(oe))
+            raise self.retry(exc=oe)
+
+    if not updated_rows:
+        self.logger.warning("no_message_statuses_advanced", count=len(statuses))
+        return {"updated": 0}
+
+    now = datetime.now(timezone.utc)
+    operations = [
+        UpdateOne(
+            {"_id": message_id},
+            {"$set": {
+                "message_status": statuses[wa_id],
+                "wa_message_id": wa_id,
+                "updated_at": now,
+            }},
+        )
+        for message_id, wa_id in updated_rows
+    ]
+
+    try:
+        mongo_result = message_crud.bulk_write(operations)
+    except Exception as e:
+        self.logger.error("mongo_batch_update_failed", error=str(e))
+        return self.retry(exc=e)
+
+    self.logger.info(
+        "message_statuses_updated",
+        received=len(data.get("statuses", [])),
+        collapsed=len(statuses),
+        updated=len(updated_rows),
+        mongo_matched=mongo_result.matched_count if mongo_result else 0,
+    )
+    return {"updated": len(updated_rows)}
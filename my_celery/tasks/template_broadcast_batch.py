@@ -0,0 +1,194 @@
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from pymongo import UpdateOne
+from requests import ConnectionError as RequestsConnectionError, HTTPError, Timeout
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from my_celery.api.BaseWhatsAppBusinessApi import send_template_message
+from my_celery.signals.lifecycle import get_message_crud
+from my_celery.tasks.base_task import BaseTask
+from my_celery.celery_app import celery_app
+from my_celery.database.db_config import get_db
+from my_celery.models.Message import Message
+from my_celery.utils.DateTimeHelper import DateTimeHelper
+from my_celery.utils.Helper import Helper
+
+RETRY_COUNTDOWN = 60
+MAX_RETRIES = 3
+
+BROADCAST_BATCH_STATEMENT = text("""
+    SELECT r_whatsapp_message_id, r_conversation_id, r_message_id
+    FROM broadcast_messaging_batch(
+        :p_contact_phones,
+        :p_country_code_phones,
+        :p_business_phone,
+        :p_whatsapp_message_ids,
+        :p_user_id
+    )
+""")
+
+
+class TemplateSendDeferred(Exception):
+    """Recipients hit a transient Graph error (429, 5xx, network) and are sent again on retry."""
+
+
+def _is_transient(exc: Exception) -> bool:
+    if isinstance(exc, HTTPError):
+        status_code = getattr(exc.response, "status_code", None)
+        return status_code == 429 or (status_code is not None and status_code >= 500)
+    return isinstance(exc, (RequestsConnectionError, Timeout))
+
+
+def _parse_number(self, number: str) -> Optional[Tuple[str, str]]:
+    try:
+        country_code, contact_number = Helper.number_parsed(number)
+    except ValueError as e:
+        self.logger.error("invalid_recipient_number", phone_to=number, error=str(e))
+        return None
+    return str(country_code), str(contact_number)
+
+
+def _send_templates(self, numbers: List[str], data: Dict[str, Any]) -> Tuple[List[Dict[str, str]], List[str]]:
+    """Sends to every valid number; returns what was sent and the numbers to send again later.
+
+    Numbers are parsed before anything is sent, so an invalid one never leaves sent messages
+    unpersisted. Permanent Graph errors (other 4xx) are logged and the recipient dropped.
+    """
+    sent, deferred = [], []
+    for number in numbers:
+        parsed = _parse_number(self, number)
+        if parsed is None:
+            continue
+
+        payload = {**data["whatsapp_message_body"], "to": number}
+        try:
+            response_template = send_template_message(
+                accessToken=data["business_token"],
+                phone_number_id=data["business_number_id"],
+                payload=payload
+            )
+        except Exception as e:
+            if _is_transient(e):
+                self.logger.warning("template_send_deferred", phone_to=number, error=str(e))
+                deferred.append(number)
+            else:
+                self.logger.error("template_send_failed", phone_to=number, error=str(e))
+            continue
+
+        messages = response_template.get("messages", [])
+        wa_message_id = messages[0].get("id") if messages else None
+        if not wa_message_id:
+            self.logger.error("no_message_id_in_response", phone_to=number, response=response_template)
+            continue
+
+        country_code, contact_number = parsed
+        sent.append({"phone_to": number, "wa_message_id": wa_message_id, "country_code": country_code, "contact_number": contact_number})
+    return sent, deferred
+
+
+def _persist_sent(self, sent: List[Dict[str, str]], business_number: str, user_id: str) -> List[List[str]]:
+    contact_phones, country_codes, wa_message_ids = [], [], []
+    for entry in sent:
+        parsed = (entry["country_code"], entry["contact_number"]) if "contact_number" in entry else _parse_number(self, entry["phone_to"])
+        if parsed is None:
+            continue
+        country_codes.append(parsed[0])
+        contact_phones.append(parsed[1])
+        wa_message_ids.append(entry["wa_message_id"])
+    if not wa_message_ids:
+        return []
+
+    with get_db() as db:
+        rows = db.execute(BROADCAST_BATCH_STATEMENT, {
+            "p_contact_phones": contact_phones,
+            "p_country_code_phones": country_codes,
+            "p_business_phone": business_number,
+            "p_whatsapp_message_ids": wa_message_ids,
+            "p_user_id": user_id
+        }).fetchall()
+    return [[str(wa_message_id), str(conversation_id), str(message_id)] for wa_message_id, conversation_id, message_id in rows]
+
+
+def _store_messages(message_crud, persisted: List[List[str]], data: Dict[str, Any]) -> None:
+    # Upserts on the message id, so a retry after a partly applied bulk write is harmless.
+    now = DateTimeHelper.now_utc()
+    operations = []
+    for wa_message_id, conversation_id, message_id in persisted:
+        document = Message(
+            id=UUID(message_id),
+            message_type="template",
+            message_status="sent",
+            conversation_id=UUID(conversation_id),
+            wa_message_id=wa_message_id,
+            content=data.get("original_template_body"),
+            is_from_contact=False,
+            member_id=data.get("user_id"),
+            created_at=now,
+            updated_at=now
+        ).model_dump_doc()
+        operations.append(UpdateOne({"_id": document["_id"]}, {"$setOnInsert": document}, upsert=True))
+    message_crud.bulk_write(operations)
+
+
+@celery_app.task(
+    name="my_celery.tasks.template_broadcast_batch",
+    bind=True,
+    base=BaseTask,
+    max_retries=MAX_RETRIES,
+    retry_jitter=True,
+    default_retry_delay=RETRY_COUNTDOWN,
+    acks_late=False,
+)
+def template_broadcast_batch(self, data):
+    try:
+        message_crud = get_message_crud()
+    except RuntimeError as e:
+        self.logger.error("failed_to_initialize_message_crud", error=str(e))
+        raise self.retry(exc=e)
+
+    business_number = data.get("business_number")
+    user_id = data.get("user_id")
+    business_token = data.get("business_token")
+    business_number_id = data.get("business_number_id")
+    whatapp_template_content = data.get("whatsapp_message_body")
+    numbers = data.get("numbers") or []
+
+    if not all([business_number, user_id, whatapp_template_content, business_token, business_number_id, numbers]):
+        self.logger.error("invalid_input_data", data=data)
+        return {"error": "Invalid input"}
+
+    # A retry resumes where the last run stopped: `persisted` rows still need their Mongo
+    # documents, `sent` recipients were messaged but not stored, and `deferred` recipients
+    # are sent again once this batch is stored. Nothing already sent is sent twice.
+    persisted = data.get("persisted")
+    sent = data.get("sent")
+    deferred = data.get("deferred") or []
+    if persisted is None and sent is None:
+        sent, deferred = _send_templates(self, numbers, data)
+
+    if persisted is None:
+        try:
+            persisted = _persist_sent(self, sent or [], business_number, user_id)
+        except OperationalError as db_exc:
+            return self.retry_task(exc=db_exc, args=[{**data, "sent": sent, "deferred": deferred, "persisted": None}])
+
+    try:
+        _store_messages(message_crud, persisted, data)
+    except Exception as mongo_exc:
+        self.logger.error("mongo_batch_insertion_failed", error=str(mongo_exc), count=len(persisted))
+        return self.retry_task(exc=mongo_exc, args=[{**data, "sent": None, "deferred": deferred, "persisted": persisted}])
+
+    self.logger.info(
+        "template_broadcast_batch_completed",
+        recipients=len(numbers),
+        persisted=len(persisted),
+        deferred=len(deferred),
+    )
+    if deferred:
+        return self.retry_task(
+            exc=TemplateSendDeferred(f"{len(deferred)} recipients deferred after transient send errors"),
+            countdown=self.backoff_countdown(),
+            args=[{**data, "numbers": deferred, "sent": None, "deferred": None, "persisted": None}],
+        )
+    return {"persisted": len(persisted), "failed": len(numbers) - len(persisted)}
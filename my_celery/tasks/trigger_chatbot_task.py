@@ -1,12 +1,15 @@
 from uuid import UUID
 from my_celery.celery_app import celery_app
 from my_celery.models.ChatBot import FlowNode
-from my_celery.models.schemas.ChatbotReplyEventPayload import ChatbotReplyEventPayload
 from my_celery.tasks.base_task import BaseTask
 from my_celery.signals.lifecycle import get_chatbot_context_service, get_chatbot_crud
 
 from my_celery.services.MessageService import message_node_handler
-from my_celery.tasks.handle_flow_node_task import handle_flow_node_task
+from my_celery.tasks.handle_flow_node_task import (
+    WAITING_NODE_TYPES,
+    handle_flow_node_task,
+    run_auto_advancing_nodes,
+)
 
 RETRY_COUNTDOWN = 60  
 MAX_RETRIES = 1
@@ -64,18 +67,6 @@ def trigger_chatbot_task(self, data):
     try:
         first_node = chatbot_process(self, chatbot_id)  
         
-        chatbot_context_service = get_chatbot_context_service()
-        try:
-            chatbot_context_service.update_current_node(
-                conversation_id=conversation_id,
-                new_current_node_id=first_node.id,
-                previous_node_id=None,
-                chatbot_id=chatbot_id
-            )
-            self.logger.info(f"Initialized chatbot context for conversation {conversation_id} with first node {first_node.id}")
-        except Exception as e:
-            self.logger.warning(f"Failed to initialize chatbot context: {e}")
-        
         try:
             message_docs = message_node_handler(
                 message_node=first_node,
@@ -87,28 +78,43 @@ def trigger_chatbot_task(self, data):
             self.logger.error(f"Failed to process first node {first_node.id}: {e}")
             raise
         
-        should_continue_flow = (
-            first_node.type.value == "message"
-            and not first_node.is_final 
-        )
+        run = run_auto_advancing_nodes(first_node, conversation_id, business_data)
+        last_node = run["last_node"]
+        
+        if not run["completed"]:
+            chatbot_context_service = get_chatbot_context_service()
+            try:
+                chatbot_context_service.update_current_node(
+                    conversation_id=conversation_id,
+                    new_current_node_id=last_node.id,
+                    previous_node_id=run["previous_node_id"],
+                    chatbot_id=chatbot_id,
+                    node_type=last_node.type.value,
+                    waiting_for_response=last_node.type.value in WAITING_NODE_TYPES
+                )
+                self.logger.info(f"Initialized chatbot context for conversation {conversation_id} at node {last_node.id}")
+            except Exception as e:
+                self.logger.warning(f"Failed to initialize chatbot context: {e}")
+        
+        should_continue_flow = run["budget_exhausted"] or run["step_failed"]
         
         if should_continue_flow:
-            self.logger.info(f"Continuing flow automatically after first node")
+            self.logger.info(f"Continuing flow from node {last_node.id} in a new task")
             next_payload = {
                 "conversation_id": conversation_id,
-                "current_node_id": str(first_node.id),
+                "current_node_id": str(last_node.id),
                 "business_data": business_data
             }
             handle_flow_node_task.delay(next_payload)
-        else:
-            self.logger.info(f"Flow paused at first node {first_node.id} (type: {first_node.type.value})")
+        elif not run["completed"]:
+            self.logger.info(f"Flow paused at node {last_node.id} (type: {last_node.type.value})")
         
         return {
             "status": "success",
             "conversation_id": conversation_id,
             "first_node_id": str(first_node.id),
             "chatbot_id": chatbot_id,
-            "messages_created": len(message_docs),
+            "messages_created": len(message_docs) + run["messages_created"],
             "flow_continues": should_continue_flow
         }
         
@@ -1,11 +1,9 @@
-import phonenumbers
+from app.utils.PhoneNumberNormalizer import phone_number_normalizer
 
 class Helper:
     
     @staticmethod
     def number_parsed(number: str) -> str:
-        parsed_number = phonenumbers.parse(number, None)
-        country_code = f"+{parsed_number.country_code}"
-        national_number = parsed_number.national_number
-        return country_code, national_number
+        parsed_number = phone_number_normalizer.normalize(number, require_valid=False)
+        return parsed_number.country_code, parsed_number.national_number
     
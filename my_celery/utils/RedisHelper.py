@@ -1,3 +1,9 @@
+import zlib
+
+# Both the API and the Celery worker hash conversations onto these shards: keep them equal.
+CONVERSATION_EXPIRY_INDEX_SHARDS = 16
+
+
 class RedisHelper:
     ############################################ app
     @staticmethod
@@ -33,6 +39,17 @@ class RedisHelper:
     def redis_conversation_expired_key(conversation_id: str) -> str:
         return f"teaminbox:conversation:{{{conversation_id}}}:closed_session"
     
+    @staticmethod
+    def redis_conversation_expiry_index_key(conversation_id: str) -> str:
+        # Sorted set: member = conversation id, score = epoch second its 24h window closes.
+        # Split in shards (hash-tagged apart) so one key is not a hot slot in cluster mode.
+        shard = zlib.crc32(str(conversation_id).encode()) % CONVERSATION_EXPIRY_INDEX_SHARDS
+        return RedisHelper.redis_conversation_expiry_index_shard_key(shard)
+
+    @staticmethod
+    def redis_conversation_expiry_index_shard_key(shard: int) -> str:
+        return f"teaminbox:conversation_expiry_index:{{{shard}}}"
+    
     @staticmethod
     def redis_conversation_last_message_key(conversation_id: str) -> str:
         return f"teaminbox:conversation:{{{conversation_id}}}:last_message"
@@ -109,24 +126,24 @@ class RedisHelper:
     
     @staticmethod
     def redis_chatbot_context_key(conversation_id: str) -> str:
-        return f"chatbot:conversation:{conversation_id}"
+        return f"chatbot:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_button_key(chatbot_id: str, current_node_id: str, btn_id: str) -> str:
-        return f"chatbot:{chatbot_id}:node:{current_node_id}:buttons:{btn_id}"
+        return f"chatbot:{{{chatbot_id}}}:node:{current_node_id}:buttons:{btn_id}"
     
     @staticmethod
     def redis_chatbot_contact_data_key(conversation_id: str) -> str:
-        return f"chatbot:contact_data:conversation:{conversation_id}"
+        return f"chatbot:contact_data:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_business_data_by_conversation_key(conversation_id: str) -> str:
-        return f"chatbot:business_data:conversation:{conversation_id}"
+        return f"chatbot:business_data:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_flow_state_key(conversation_id: str) -> str:
-        return f"chatbot:flow_state:conversation:{conversation_id}"
+        return f"chatbot:flow_state:conversation:{{{conversation_id}}}"
     
     @staticmethod
     def redis_chatbot_node_transitions_key(chatbot_id: str, node_id: str) -> str:
-        return f"chatbot:{chatbot_id}:node:{node_id}:transitions"
\ No newline at end of file
+        return f"chatbot:{{{chatbot_id}}}:node:{node_id}:transitions"
\ No newline at end of file
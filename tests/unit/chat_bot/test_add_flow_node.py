@@ -0,0 +1,131 @@
+import base64
+import hashlib
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pymongo import DeleteMany, ReplaceOne, UpdateOne
+
+from app.chat_bot.models.ChatBot import FlowNode
+from app.chat_bot.models.schema.chat_bot_body.DynamicChatBotRequest import DynamicChatBotRequest
+from app.chat_bot.v1.use_case.AddFlowNode import MEDIA_ID_TTL_SECONDS, AddFlowNode
+from app.core.exceptions.custom_exceptions.ConflictException import ConflictException
+from app.utils.DateTimeHelper import DateTimeHelper
+
+CHAT_BOT_ID = uuid.uuid4()
+IMAGE = b"\x89PNG flow node image"
+IMAGE_CACHE_KEY = f"{hashlib.sha256(IMAGE).hexdigest()}:image/png"
+
+
+def request_node(node_id: str, question: str = "Name?", x: float = 0) -> dict:
+    return {
+        "id": node_id,
+        "type": "question",
+        "body": {"body_question": {"question_text": question}},
+        "position": {"x": x, "y": 0},
+    }
+
+
+def stored_node(use_case: AddFlowNode, request: dict, **fields) -> FlowNode:
+    """A saved node; model_construct skips Beanie's collection check, which needs a database."""
+    node = DynamicChatBotRequest(chatbot_id=str(CHAT_BOT_ID), nodes=[request]).nodes[0]
+    return FlowNode.model_construct(
+        id=node.id, chat_bot_id=CHAT_BOT_ID, type=node.type, position=node.position,
+        content_hash=use_case._compute_node_hash(node), body=fields.pop("body", None), **fields
+    )
+
+
+def image(uploaded_seconds_ago: float) -> dict:
+    return {
+        "s3_key": "flows/image.png", "cdn_url": "https://cdn/flows/image.png", "media_id": "old-media-id",
+        "file_name": "image.png", "content_type": "image", "mime_type": "image/png", "content_hash": IMAGE_CACHE_KEY,
+        "media_uploaded_at": DateTimeHelper.now_utc().timestamp() - uploaded_seconds_ago,
+    }
+
+
+@pytest.fixture
+def mongo_crud():
+    crud = MagicMock()
+    crud.find_many = AsyncMock(return_value=[])
+    crud.bulk_write = AsyncMock()
+    crud.to_mongo = lambda node: {"_id": node.id}
+    return crud
+
+@pytest.fixture
+def use_case(mongo_crud):
+    use_case = AddFlowNode(
+        chat_bot_service=SimpleNamespace(get=AsyncMock(return_value=SimpleNamespace(id=CHAT_BOT_ID))),
+        business_service=SimpleNamespace(get=AsyncMock(return_value=SimpleNamespace(phone_number_id="pn-1", access_token="token"))),
+        whatsapp_media_api=SimpleNamespace(upload_media=AsyncMock(return_value={"id": "new-media-id"})),
+        s3_bucket_service=MagicMock(),
+        aws_region="eu-west-1",
+        aws_s3_bucket_name="bucket",
+        mongo_crud_chat_bot=mongo_crud,
+    )
+    use_case.dispatch_nodes = AsyncMock(side_effect=lambda node, business_id: FlowNode.model_construct(id=node.id, position=node.position))
+    return use_case
+
+
+def existing(mongo_crud, *nodes):
+    # The first query looks for ids owned by other chatbots, the second loads this chatbot's nodes.
+    mongo_crud.find_many.side_effect = [[], list(nodes)]
+
+
+@pytest.mark.asyncio
+async def test_only_changed_nodes_are_rebuilt_and_writes_are_scoped_to_the_chatbot(use_case, mongo_crud):
+    moved, edited, removed = request_node("moved"), request_node("edited"), request_node("removed")
+    existing(mongo_crud, stored_node(use_case, moved), stored_node(use_case, edited), stored_node(use_case, removed))
+
+    await use_case.execute("bp-1", DynamicChatBotRequest(chatbot_id=str(CHAT_BOT_ID), nodes=[
+        request_node("moved", x=10), request_node("edited", question="Email?"), request_node("new"),
+    ]))
+
+    assert [call.args[0].id for call in use_case.dispatch_nodes.await_args_list] == ["edited", "new"]
+    operations = mongo_crud.bulk_write.await_args.args[0]
+    assert [type(operation) for operation in operations] == [UpdateOne, ReplaceOne, ReplaceOne, DeleteMany]
+    assert all(operation._filter["chat_bot_id"] == CHAT_BOT_ID for operation in operations)
+    assert operations[0]._doc["$set"]["position"] == {"x": 10, "y": 0}
+    assert operations[3]._filter["_id"] == {"$nin": ["moved", "edited", "new"]}
+
+
+@pytest.mark.asyncio
+async def test_node_ids_of_another_chatbot_are_rejected(use_case, mongo_crud):
+    mongo_crud.find_many.side_effect = [[SimpleNamespace(id="taken")]]
+
+    with pytest.raises(ConflictException):
+        await use_case.execute("bp-1", DynamicChatBotRequest(chatbot_id=str(CHAT_BOT_ID), nodes=[request_node("taken")]))
+    with pytest.raises(ConflictException):
+        await use_case.execute("bp-1", DynamicChatBotRequest(chatbot_id=str(CHAT_BOT_ID), nodes=[request_node("a"), request_node("a")]))
+    mongo_crud.bulk_write.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_nodes_with_an_expired_media_id_are_rebuilt(use_case, mongo_crud):
+    fresh, stale = request_node("fresh"), request_node("stale")
+    existing(
+        mongo_crud,
+        stored_node(use_case, fresh, body={"content_items": [{"type": "image", "content": image(uploaded_seconds_ago=60)}]}),
+        stored_node(use_case, stale, body={"content_items": [{"type": "image", "content": image(MEDIA_ID_TTL_SECONDS + 60)}]}),
+    )
+
+    await use_case.execute("bp-1", DynamicChatBotRequest(chatbot_id=str(CHAT_BOT_ID), nodes=[fresh, stale]))
+
+    assert [call.args[0].id for call in use_case.dispatch_nodes.await_args_list] == ["stale"]
+
+
+@pytest.mark.asyncio
+async def test_expired_media_ids_are_uploaded_again_to_whatsapp_only(use_case):
+    upload = {"base64_data": base64.b64encode(IMAGE).decode(), "mime_type": "image/png", "file_name": "image.png"}
+
+    use_case._media_cache = {IMAGE_CACHE_KEY: image(uploaded_seconds_ago=60)}
+    assert (await use_case._process_media_upload(upload, "bp-1"))["media_id"] == "old-media-id"
+    use_case.whatsapp_media_api.upload_media.assert_not_awaited()
+
+    use_case._media_cache = {IMAGE_CACHE_KEY: image(MEDIA_ID_TTL_SECONDS + 60)}
+    media = await use_case._process_media_upload(upload, "bp-1")
+
+    assert (media["media_id"], media["s3_key"]) == ("new-media-id", "flows/image.png")
+    assert DateTimeHelper.now_utc().timestamp() - media["media_uploaded_at"] < 60
+    use_case.whatsapp_media_api.upload_media.assert_awaited_once()
+    use_case.s3_bucket_service.upload_fileobj.assert_not_called()
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+import msgpack
+import pytest
+
+from app.core.codec import codec
+from app.core.codec.messages import TaskMessage, TriggerChatbotPayload
+from app.core.codec.records import ChatbotContext, SocketSession
+
+
+def test_values_written_with_the_old_extension_types_still_decode():
+    legacy = msgpack.packb(
+        {
+            "chatbot_id": msgpack.ExtType(codec.LEGACY_UUID_EXT, b"0198a7c2-5f1e-7c3a-9d44-2b8f61e0c9aa"),
+            "created_at": msgpack.ExtType(codec.LEGACY_DATETIME_EXT, b"2025-03-01T10:00:00"),
+            "waiting_for_response": True,
+        },
+        use_bin_type=True,
+    )
+
+    context = codec.decode(legacy, ChatbotContext)
+
+    assert context.chatbot_id == "0198a7c2-5f1e-7c3a-9d44-2b8f61e0c9aa"
+    assert context.created_at == datetime(2025, 3, 1, 10, tzinfo=timezone.utc)
+    assert context.waiting_for_response is True
+
+
+def test_records_round_trip_with_their_wire_names():
+    session = SocketSession(user_id=str(UUID(int=1)), business_profile_id="bp-1", worker_id=42)
+
+    raw = codec.encode(session)
+
+    assert codec.decode(raw)["userId"] == str(UUID(int=1))
+    assert codec.decode(raw, SocketSession) == session
+    with pytest.raises(codec.ValidationError):
+        codec.decode(codec.encode({"userId": "u-1"}), SocketSession)
+
+
+def test_task_messages_decode_to_the_celery_protocol_fields():
+    payload = TriggerChatbotPayload(
+        conversation_id="c-1", chatbot_id="b-1", business_token="t", business_phone_number_id="pn-1",
+        recipient_number="+15550100",
+    )
+
+    body = codec.decode(codec.encode(TaskMessage(id="1", task="my_celery.tasks.trigger_chatbot_task", args=[payload])))
+
+    assert body == {
+        "id": "1",
+        "task": "my_celery.tasks.trigger_chatbot_task",
+        "args": [{
+            "conversation_id": "c-1", "chatbot_id": "b-1", "business_token": "t",
+            "business_phone_number_id": "pn-1", "recipient_number": "+15550100", "contact_id": None,
+        }],
+        "kwargs": {},
+        "retries": 0,
+        "eta": None,
+    }
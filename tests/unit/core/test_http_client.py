@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.exceptions.GlobalException import GlobalException
+from app.core.services.HTTPClient import EnhancedHTTPClient
+
+
+def build_client(handler) -> tuple[EnhancedHTTPClient, MagicMock]:
+    log_service = MagicMock()
+    log_service.log_business_event = AsyncMock()
+    log_service.log_external_api_error = AsyncMock()
+    client = EnhancedHTTPClient(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        log_service=log_service,
+        success_log_sample_rate=0.0,
+    )
+    return client, log_service
+
+
+@pytest.mark.asyncio
+async def test_circuit_opens_after_consecutive_server_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, json={"error": "unavailable"})
+
+    client, _ = build_client(handler)
+
+    for _ in range(5):
+        with pytest.raises(GlobalException):
+            await client.post("https://graph.facebook.com/v22.0/123/messages", json={})
+
+    with pytest.raises(GlobalException) as exc_info:
+        await client.post("https://graph.facebook.com/v22.0/123/messages", json={})
+
+    assert len(calls) == 5
+    assert exc_info.value.details["circuit"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_latency_is_recorded_per_endpoint_and_success_logs_are_sampled():
+    client, log_service = build_client(lambda request: httpx.Response(200, json={"ok": True}))
+
+    async with client.request_context(user_id="user-1"):
+        await client.get("https://graph.facebook.com/v22.0/1234567890/message_templates")
+        await client.get("https://graph.facebook.com/v22.0/9876543210/message_templates")
+
+    latency = client.metrics()["latency"]
+    assert latency["GET graph.facebook.com/v22.0/{id}/message_templates"]["count"] == 2
+    log_service.log_business_event.assert_not_awaited()
+    assert client._current_user_id is None
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from benchmarks.import_time import parse_importtime
+
+
+def test_container_import_leaves_heavy_subsystems_unloaded():
+    # A fresh interpreter, since this test process may already have imported them.
+    completed = subprocess.run(
+        [
+            sys.executable, "-W", "ignore", "-c",
+            "import sys, app.core.config.container; "
+            "print(','.join(name for name in ('pandas', 'boto3', 'botocore') if name in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == ""
+
+
+def test_importtime_rows_are_parsed_with_their_depth():
+    output = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       120 |        120 |     app.utils.RedisHelper",
+        "some warning on stderr",
+        "import time:      3000 |       3120 |   app.core.storage.redis",
+    ])
+
+    costs = parse_importtime(output)
+
+    assert [(cost.module, cost.self_us, cost.cumulative_us, cost.depth) for cost in costs] == [
+        ("app.utils.RedisHelper", 120, 120, 2),
+        ("app.core.storage.redis", 3000, 3120, 1),
+    ]
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.core.services import LeaderElection as module
+from app.core.services.LeaderElection import LeaderElection
+
+
+class FakeLeaseStore:
+    """A single lease key with Python stand-ins for the acquire/renew/release scripts."""
+
+    def __init__(self):
+        self.values = {}
+
+    def register_script(self, script):
+        async def acquire(keys, args):
+            if keys[0] in self.values:
+                return None
+            self.values[keys[0]] = args[0]
+            return b"OK"
+
+        async def renew(keys, args):
+            return int(self.values.get(keys[0]) == args[0])
+
+        async def release(keys, args):
+            if self.values.get(keys[0]) != args[0]:
+                return 0
+            del self.values[keys[0]]
+            return 1
+
+        return {module.ACQUIRE_SCRIPT: acquire, module.RENEW_SCRIPT: renew, module.RELEASE_SCRIPT: release}[script]
+
+
+def election(store, running, name):
+    leader = LeaderElection(store, renew_interval=0.01)
+
+    async def start():
+        running.append(name)
+
+    async def stop():
+        running.remove(name)
+
+    leader.register(start, stop)
+    return leader
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_one_worker_and_move_when_it_stops():
+    store, running = FakeLeaseStore(), []
+    first, second = election(store, running, "first"), election(store, running, "second")
+
+    await first.start()
+    await asyncio.sleep(0.03)
+    await second.start()
+    await asyncio.sleep(0.03)
+    assert running == ["first"]
+
+    await first.stop()
+    await asyncio.sleep(0.03)
+    assert running == ["second"] and second.is_leader
+
+    await second.stop()
+    assert running == [] and store.values == {}
+
+
+@pytest.mark.asyncio
+async def test_leader_steps_down_when_the_lease_is_taken():
+    store, running = FakeLeaseStore(), []
+    leader = election(store, running, "first")
+
+    await leader.start()
+    await asyncio.sleep(0.03)
+    store.values[leader.key] = "someone-else"
+    await asyncio.sleep(0.03)
+
+    assert running == [] and not leader.is_leader
+    await leader.stop()
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from unittest.mock import MagicMock
+
+from app.core.logs.LogShipper import LogShipper
+from app.core.logs.LoggingBaseMiddleWare import LoggingMiddleware
+
+
+def build_app(log_business_event, sample_rate: float = 0.0):
+    log_service = MagicMock()
+    log_service.log_business_event = log_business_event
+    shipper = LogShipper(log_service)
+
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware, system_log_service=log_service, log_shipper=shipper, sample_rate=sample_rate)
+
+    @app.get("/items")
+    async def list_items():
+        return []
+
+    @app.post("/items")
+    async def create_item():
+        return {"id": 1}
+
+    @app.get("/broken")
+    async def broken():
+        raise HTTPException(status_code=503, detail="down")
+
+    return app, shipper
+
+
+@pytest.mark.asyncio
+async def test_response_does_not_wait_for_the_log_publish():
+    release = asyncio.Event()
+    shipped = []
+
+    async def slow_publish(**record):
+        await release.wait()
+        shipped.append(record)
+
+    app, shipper = build_app(slow_publish)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await asyncio.wait_for(client.get("/broken"), timeout=1)
+
+    assert response.status_code == 503
+    assert shipped == []
+
+    release.set()
+    await shipper.drain()
+    assert shipped[0]["context"]["status_code"] == 503
+
+
+@pytest.mark.asyncio
+async def test_filters_and_sampling_decide_what_is_shipped():
+    shipped = []
+
+    async def publish(**record):
+        shipped.append(record)
+
+    app, shipper = build_app(publish, sample_rate=0.0)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/items")
+        await client.post("/items")
+        await client.get("/metrics")
+        await client.get("/broken")
+    await shipper.drain()
+
+    assert [record["context"]["path"] for record in shipped] == ["/broken"]
+
+    shipped.clear()
+    app, shipper = build_app(publish, sample_rate=1.0)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/items")
+        await client.post("/items")
+    await shipper.drain()
+
+    assert [(record["context"]["method"], record["context"]["path"]) for record in shipped] == [("POST", "/items")]
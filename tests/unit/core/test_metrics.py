@@ -0,0 +1,60 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics.MetricsMiddleware import MetricsMiddleware
+from app.core.metrics.metrics import metrics_endpoint, room_kind
+
+
+def request_count(route: str, status: str) -> float:
+    return REGISTRY.get_sample_value(
+        "http_request_duration_seconds_count",
+        {"method": "GET", "route": route, "status": status},
+    ) or 0.0
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_with_the_route_template():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/conversations/{conversation_id}")
+    async def get_conversation(conversation_id: str):
+        return {"id": conversation_id}
+
+    before = request_count("/conversations/{conversation_id}", "200")
+    unmatched_before = request_count("unmatched", "404")
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.get("/conversations/a")
+        await client.get("/conversations/b")
+        await client.get("/nowhere")
+
+    assert request_count("/conversations/{conversation_id}", "200") == before + 2
+    assert request_count("unmatched", "404") == unmatched_before + 1
+
+
+def test_room_kind_keeps_labels_bounded():
+    assert room_kind("0190b1a2-7c3d-7e4f-8a9b-0c1d2e3f4a5b") == "conversation"
+    assert room_kind("558569350676631") == "business"
+    assert room_kind("Xk3_aZ9sQwErTy12AAAB") == "session"
+    assert room_kind(None) == "broadcast"
+
+
+@pytest.mark.asyncio
+async def test_metrics_need_the_configured_bearer_token():
+    app = FastAPI()
+    app.add_route("/metrics", metrics_endpoint("s3cret"))
+    hidden = FastAPI()
+    hidden.add_route("/metrics", metrics_endpoint(None))
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 401
+        assert (await client.get("/metrics", headers={"Authorization": "Bearer wrong"})).status_code == 401
+        response = await client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "db_call_duration_seconds" in response.text
+
+    async with AsyncClient(transport=ASGITransport(app=hidden), base_url="http://test") as client:
+        assert (await client.get("/metrics")).status_code == 404
@@ -0,0 +1,43 @@
+import pytest
+
+from app.utils.Helper import Helper
+from app.utils.PhoneNumberNormalizer import PhoneNumber, PhoneNumberNormalizer
+
+
+def test_normalize_returns_every_form_from_one_parse():
+    normalizer = PhoneNumberNormalizer(maxsize=8)
+
+    first = normalizer.normalize("+962791234567")
+    second = normalizer.normalize("+962791234567")
+
+    assert first == PhoneNumber(e164="+962791234567", country_code="+962", national_number="791234567", is_valid=True)
+    assert second is first
+    assert normalizer.cache_info().misses == 1
+
+
+def test_invalid_and_unparsable_numbers():
+    normalizer = PhoneNumberNormalizer(maxsize=8)
+
+    with pytest.raises(ValueError, match="Invalid phone number"):
+        normalizer.normalize("+96279")
+    assert normalizer.normalize("+96279", require_valid=False).is_valid is False
+    with pytest.raises(ValueError, match="Invalid phone number: "):
+        normalizer.normalize("not a number")
+    assert normalizer.try_normalize("not a number") is None
+    assert normalizer.cache_info().misses == 2
+
+
+def test_normalize_many_keeps_order_and_parses_duplicates_once():
+    normalizer = PhoneNumberNormalizer(maxsize=8)
+    numbers = ["+14155550123", "bogus", "+14155550123", "+442079460958"]
+
+    results = normalizer.normalize_many(numbers)
+
+    assert [result.e164 if result else None for result in results] == [
+        "+14155550123", None, "+14155550123", "+442079460958",
+    ]
+    assert normalizer.cache_info().misses == 3
+
+
+def test_helper_adds_the_missing_plus():
+    assert Helper.number_parsed("962791234567") == ("+962", "791234567")
@@ -0,0 +1,34 @@
+from redis.crc import key_slot
+
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+
+
+def test_keys_of_one_conversation_share_a_slot():
+    conversation_id = "0198a7c2-5f1e-7c3a-9d44-2b8f61e0c9aa"
+    keys = [
+        RedisHelper.redis_chatbot_context_key(conversation_id),
+        RedisHelper.redis_chatbot_contact_data_key(conversation_id),
+        RedisHelper.redis_business_data_by_conversation_key(conversation_id),
+        RedisHelper.redis_chatbot_flow_state_key(conversation_id),
+        RedisHelper.redis_conversation_last_message_key(conversation_id),
+        RedisHelper.redis_conversation_expired_key(conversation_id),
+        RedisHelper.redis_business_conversation_unread_key(conversation_id),
+        RedisHelper.redis_conversation_messages_stream_key(conversation_id),
+    ]
+
+    assert len({key_slot(key.encode()) for key in keys}) == 1
+
+
+def test_group_by_slot_only_splits_in_cluster_mode():
+    keys = [RedisHelper.redis_chatbot_context_key(f"conv-{n}") for n in range(20)]
+    keys += [RedisHelper.redis_chatbot_contact_data_key("conv-0")]
+
+    standalone = AsyncRedisService(host="localhost", port=6379)
+    cluster = AsyncRedisService(host="localhost", port=7000, cluster=True)
+
+    assert list(standalone.group_by_slot(keys).values()) == [keys]
+    groups = cluster.group_by_slot(keys)
+    assert sorted(key for group in groups.values() for key in group) == sorted(keys)
+    assert len(groups) == 20
+    assert all(len({key_slot(key.encode()) for key in group}) == 1 for group in groups.values())
@@ -0,0 +1,44 @@
+import json
+
+from app.core.tracing.tracer import (
+    FileSpanExporter,
+    SpanProcessor,
+    Tracer,
+    extract,
+    inject,
+    parse_traceparent,
+)
+
+
+def test_traceparent_round_trip_and_rejects_garbage():
+    context = parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+
+    assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+    assert context.sampled is True
+    assert context.to_traceparent() == "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert parse_traceparent("not-a-trace") is None
+    assert parse_traceparent(None) is None
+
+
+def test_spans_propagate_through_headers_and_are_exported(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    processor = SpanProcessor(FileSpanExporter(str(path)))
+    api = Tracer("api", processor=processor)
+    worker = Tracer("worker", processor=processor)
+
+    with api.start_span("HTTP POST /webhook", kind="server") as request_span:
+        with api.start_span("amqp.publish message_hook_received_event", kind="producer"):
+            headers = inject({"task": "my_celery.tasks.process_received_message_task"})
+
+    with worker.start_span("celery.task process_received_message_task", parent=extract(headers)) as task_span:
+        pass
+
+    processor.flush()
+    spans = {span["name"]: span for span in map(json.loads, path.read_text().splitlines())}
+
+    assert task_span.context.trace_id == request_span.context.trace_id
+    assert spans["celery.task process_received_message_task"]["parent_id"] == \
+        spans["amqp.publish message_hook_received_event"]["span_id"]
+    assert spans["amqp.publish message_hook_received_event"]["parent_id"] == request_span.context.span_id
+    assert spans["HTTP POST /webhook"]["service"] == "api"
+    assert all(span["duration_ms"] >= 0 for span in spans.values())
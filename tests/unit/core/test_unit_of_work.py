@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from app.core.storage.postgres import PostgresDatabase, SessionScope, unit_of_work
+
+
+class Base(DeclarativeBase):
+    # Own registry, so the app's SQLModel mappers are not configured by this test.
+    pass
+
+
+class UnitOfWorkItem(Base):
+    __tablename__ = "unit_of_work_items"
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str]
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    # Two unrelated files stand in for primary and replica, so a read shows where it ran.
+    db = PostgresDatabase(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}", f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (db._engine, db._replica_engine):
+        async with engine.begin() as conn:
+            await conn.run_sync(UnitOfWorkItem.__table__.create)
+    async with db._session_factory(bind=db._replica_engine) as session:
+        session.add(UnitOfWorkItem(name="replica"))
+        await session.commit()
+    db.checkouts = 0
+
+    @event.listens_for(db._engine.sync_engine, "checkout")
+    def _count_checkout(*args):
+        db.checkouts += 1
+
+    yield db
+    await db.dispose()
+
+
+async def add(scope: SessionScope, name: str, fail: bool = False) -> None:
+    async with scope as session:
+        session.add(UnitOfWorkItem(name=name))
+        if fail:
+            await session.flush()
+            raise ValueError(name)
+        await session.commit()
+
+
+async def names(scope: SessionScope) -> list:
+    async with scope as session:
+        return [item.name for item in (await session.execute(select(UnitOfWorkItem).order_by(UnitOfWorkItem.id))).scalars()]
+
+
+@pytest.mark.asyncio
+async def test_repository_calls_in_a_unit_of_work_share_a_session_and_are_counted(db):
+    users, messages = SessionScope(db), SessionScope(db)
+
+    async with unit_of_work() as work:
+        await add(users, "a")
+        await add(messages, "b")
+        assert await names(users) == ["a", "b"]
+        with pytest.raises(ValueError):
+            await add(messages, "discarded", fail=True)
+        assert await names(messages) == ["a", "b"]
+        assert len(work._sessions) == 1
+
+    assert work.query_count == 5
+    assert [(statement.split()[0], count) for statement, count in work.repeated_statements(2)] == [("INSERT", 3), ("SELECT", 2)]
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_per_call_outside_a_unit_of_work_and_in_spawned_tasks(db):
+    scope = SessionScope(db)
+
+    await add(scope, "a")
+    async with unit_of_work() as work:
+        assert await asyncio.create_task(names(scope)) == ["a"]
+
+    assert db.checkouts == 2
+    assert work.query_count == 0
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_stick_to_the_primary_after_a_write(db):
+    contacts = SessionScope(db)
+
+    assert await names(contacts.replica()) == ["replica"]
+    async with unit_of_work() as work:
+        assert await names(contacts.replica()) == ["replica"]
+        await add(contacts, "a")
+        assert await names(contacts.replica()) == ["a"]
+
+    assert work.wrote
+    assert await names(contacts.replica()) == ["replica"]
+
+
+@pytest.mark.asyncio
+async def test_connections_go_back_to_the_pool_between_calls(db):
+    scope = SessionScope(db)
+
+    async with unit_of_work() as work:
+        assert await names(scope) == []
+        assert db._engine.pool.checkedout() == 0
+        async with scope as session:
+            session.add(UnitOfWorkItem(name="never committed"))
+            await session.flush()
+            assert db._engine.pool.checkedout() == 1
+        assert db._engine.pool.checkedout() == 0
+        assert await names(scope) == []
+
+    assert work.query_count == 3
@@ -0,0 +1,118 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.events.sub.ChatbotReplyDispatcher import ChatbotReplyDispatcher
+
+
+@pytest.fixture
+def socket_message():
+    gateway = MagicMock()
+    gateway.emitted = []
+
+    async def emit_chatbot_reply_messages(payloads):
+        gateway.emitted.append([payload["message"]["id"] for payload in payloads])
+        await asyncio.sleep(0)
+
+    gateway.emit_chatbot_reply_messages = emit_chatbot_reply_messages
+    return gateway
+
+def reply(conversation_id: str, message_id: int) -> dict:
+    return {"conversation_id": conversation_id, "message": {"id": message_id}}
+
+
+@pytest.mark.asyncio
+async def test_replies_keep_order_per_conversation(socket_message):
+    dispatcher = ChatbotReplyDispatcher(socket_message=socket_message, lanes=4)
+
+    for message_id in range(20):
+        await dispatcher.submit(reply(f"conv-{message_id % 3}", message_id), published_at=time.time())
+    await dispatcher.drain()
+
+    emitted = [message_id for batch in socket_message.emitted for message_id in batch]
+    assert sorted(emitted) == list(range(20))
+    for conversation in range(3):
+        ids = [message_id for message_id in emitted if message_id % 3 == conversation]
+        assert ids == sorted(ids)
+
+    metrics = dispatcher.metrics()
+    assert metrics["emitted"] == 20
+    assert metrics["batches"] < 20
+
+
+@pytest.mark.asyncio
+async def test_same_conversation_always_maps_to_same_lane(socket_message):
+    dispatcher = ChatbotReplyDispatcher(socket_message=socket_message, lanes=8)
+
+    assert len({dispatcher.lane_for("0198a7c2-conv") for _ in range(10)}) == 1
+
+
+def rabbit_message():
+    message = MagicMock()
+    message.ack = AsyncMock()
+    message.nack = AsyncMock()
+    return message
+
+
+@pytest.mark.asyncio
+async def test_messages_are_acked_only_after_their_reply_was_emitted(socket_message):
+    dispatcher = ChatbotReplyDispatcher(socket_message=socket_message, lanes=1)
+    released = asyncio.Event()
+    emit = socket_message.emit_chatbot_reply_messages
+
+    async def blocked_emit(payloads):
+        await released.wait()
+        await emit(payloads)
+
+    socket_message.emit_chatbot_reply_messages = blocked_emit
+    message = rabbit_message()
+
+    await dispatcher.submit(reply("conv-1", 1), message=message)
+    await asyncio.sleep(0)
+    message.ack.assert_not_awaited()
+
+    released.set()
+    await dispatcher.drain()
+    message.ack.assert_awaited_once()
+    message.nack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_a_failed_emit_requeues_its_messages(socket_message):
+    dispatcher = ChatbotReplyDispatcher(socket_message=socket_message, lanes=1)
+    socket_message.emit_chatbot_reply_messages = AsyncMock(side_effect=RuntimeError("redis down"))
+    message = rabbit_message()
+
+    await dispatcher.submit(reply("conv-1", 1), message=message)
+    await dispatcher.drain()
+
+    message.nack.assert_awaited_once_with(requeue=True)
+    message.ack.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_only_dead_lanes_are_restarted_and_keep_their_replies(socket_message):
+    dispatcher = ChatbotReplyDispatcher(socket_message=socket_message, lanes=2)
+    dispatcher._ensure_started()
+    dead = dispatcher.lane_for("conv-1")
+    alive_worker = dispatcher._workers[1 - dead]
+    dispatcher._workers[dead].cancel()
+    await asyncio.sleep(0)
+    dispatcher._lanes[dead].put_nowait((reply("conv-1", 1), None, None, time.time_ns(), None))
+
+    await dispatcher.submit(reply("conv-1", 2))
+    await dispatcher.drain()
+
+    assert dispatcher._workers[1 - dead] is alive_worker
+    assert [message_id for batch in socket_message.emitted for message_id in batch] == [1, 2]
+
+
+def test_the_reply_subscriber_channel_prefetches_enough_to_fill_the_lanes():
+    from app.core.config.settings import settings
+    from app.events.sub.ChatBotReplyEvent import rabbitmq_router
+
+    (subscriber,) = [s for s in rabbitmq_router.broker._subscribers.values() if s.queue.name == "chatbot_replies_queue"]
+
+    assert subscriber.channel.prefetch_count == settings.CHATBOT_REPLY_PREFETCH
+    assert subscriber.consume_args == {}
@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.real_time.socketio import socket_gateway
+from app.real_time.socketio.socket_gateway import SocketMessageGateway
+
+
+def _position(stream_id: str) -> tuple:
+    milliseconds, sequence = stream_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+class FakeStreams:
+    def __init__(self):
+        self.streams = {}
+
+    async def xadd(self, key, fields, maxlen=None, use_json=False, **_):
+        entries = self.streams.setdefault(key, [])
+        stream_id = f"{1000 + len(entries)}-0"
+        entries.append((stream_id, dict(fields)))
+        if maxlen is not None:
+            del entries[:-maxlen]
+        return stream_id
+
+    async def xrange(self, key, min="-", max="+", count=None, use_json=False):
+        entries = self.streams.get(key, [])
+        if min.startswith("("):
+            entries = [entry for entry in entries if _position(entry[0]) > _position(min[1:])]
+        return entries[:count] if count else entries
+
+
+@pytest.fixture
+def gateway():
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    gateway = SocketMessageGateway(sio=sio, redis=FakeStreams(), business_profile_service=MagicMock(), window_service=MagicMock(), unread_counters=MagicMock(), change_log=MagicMock())
+    gateway.logger = MagicMock(with_context=MagicMock(return_value=AsyncMock()))
+    return gateway
+
+
+def emitted(gateway, event):
+    return [call.args[1] for call in gateway.sio.emit.call_args_list if call.args[0] == event]
+
+
+@pytest.mark.asyncio
+async def test_replays_only_events_after_last_stream_id(gateway):
+    logger = AsyncMock()
+    ids = [
+        await gateway._emit_business_event("new_conversation", {"conversation_id": str(n)}, "pn-1", logger)
+        for n in range(5)
+    ]
+
+    ok = await gateway._replay_stream("sid-1", "chat:business_group:{pn-1}:events_stream", ids[1], {"phone_number_id": "pn-1"}, logger)
+
+    replay = emitted(gateway, "stream_replay")[0]
+    assert ok is True
+    assert [event["data"]["conversation_id"] for event in replay["events"]] == ["2", "3", "4"]
+    assert replay["last_stream_id"] == ids[-1]
+    assert emitted(gateway, "new_conversation")[0]["stream_id"] == ids[0]
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_resync_when_window_or_retention_is_exceeded(gateway, monkeypatch):
+    monkeypatch.setattr(socket_gateway, "STREAM_REPLAY_WINDOW", 2)
+    monkeypatch.setattr(socket_gateway, "CONVERSATION_STREAM_MAXLEN", 4)
+    logger = AsyncMock()
+    ids = [
+        await gateway._emit_conversation_event("conversation_status_chat", {"status": str(n)}, "c-1", logger)
+        for n in range(5)
+    ]
+    key = "chat:conversation:{c-1}:messages_stream"
+
+    assert await gateway._replay_stream("sid-1", key, ids[2], {"conversation_id": "c-1"}, logger) is True
+    assert await gateway._replay_stream("sid-1", key, ids[1], {"conversation_id": "c-1"}, logger) is False
+    assert await gateway._replay_stream("sid-1", key, ids[0], {"conversation_id": "c-1"}, logger) is False
+    assert await gateway._replay_stream("sid-1", key, "garbage", {"conversation_id": "c-1"}, logger) is False
+
+    reasons = [payload["reason"] for payload in emitted(gateway, "resync_required")]
+    assert reasons == ["window_exceeded", "stream_trimmed", "invalid_stream_id"]
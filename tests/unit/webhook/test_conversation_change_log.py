@@ -0,0 +1,71 @@
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import fakeredis
+import pytest
+import pytest_asyncio
+
+from app.core.storage.redis import AsyncRedisService
+from app.whatsapp.team_inbox.services.ConversationChangeLog import ConversationChangeLog
+from app.whatsapp.team_inbox.v1.use_case.GetConversationChanges import GetConversationChanges
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """The real service over fakeredis, so the record and changes scripts run as Lua."""
+    service = AsyncRedisService("localhost", 6379)
+    service._client = fakeredis.FakeAsyncRedis()
+    yield service
+    await service._client.aclose()
+
+
+@pytest.fixture
+def change_log(redis):
+    return ConversationChangeLog(redis, max_entries=3)
+
+
+@pytest.mark.asyncio
+async def test_changes_keep_each_conversation_once_at_its_latest_version(change_log):
+    await change_log.record("bp-1", "c-1")
+    await change_log.record("bp-1", "c-2", "c-3")
+    assert await change_log.record("bp-1", "c-1") == 4
+
+    page = await change_log.changes_since("bp-1", 1, limit=2)
+    assert (page.conversation_ids, page.version, page.has_more) == (["c-2", "c-3"], 3, True)
+
+    page = await change_log.changes_since("bp-1", page.version, limit=2)
+    assert (page.conversation_ids, page.version, page.has_more) == (["c-1"], 4, False)
+
+    page = await change_log.changes_since("bp-1", 4, limit=2)
+    assert (page.conversation_ids, page.resync_required) == ([], False)
+    assert (await change_log.changes_since("bp-2", 0, limit=2)).conversation_ids == []
+
+
+@pytest.mark.asyncio
+async def test_tokens_the_log_cannot_serve_require_a_resync(change_log):
+    for conversation_id in ("c-1", "c-2", "c-3", "c-4"):
+        await change_log.record("bp-1", conversation_id)
+
+    assert (await change_log.changes_since("bp-1", 0, limit=10)).resync_required
+    assert (await change_log.changes_since("bp-1", 1, limit=10)).conversation_ids == ["c-2", "c-3", "c-4"]
+    assert (await change_log.changes_since("bp-1", 9, limit=10)).resync_required
+
+
+@pytest.mark.asyncio
+async def test_changed_conversations_the_user_cannot_see_are_left_out(change_log):
+    visible, moved = uuid.uuid4(), uuid.uuid4()
+    await change_log.record("bp-1", moved, visible)
+    conversation_service = SimpleNamespace(get_user_conversations_by_ids=AsyncMock(return_value=[SimpleNamespace(id=visible)]))
+    get_conversations = SimpleNamespace(build_rows=AsyncMock(return_value=[]))
+    use_case = GetConversationChanges(
+        SimpleNamespace(get=AsyncMock(return_value=object())), conversation_service, change_log, get_conversations
+    )
+
+    assert (await use_case.execute("u-1", "bp-1")).data.version == 2
+    response = await use_case.execute("u-1", "bp-1", since=0)
+
+    assert "removed" not in response.data.model_dump()
+    assert response.data.version == 2
+    conversation_service.get_user_conversations_by_ids.assert_awaited_once_with("u-1", [moved, visible])
+    get_conversations.build_rows.assert_awaited_once_with("bp-1", [SimpleNamespace(id=visible)])
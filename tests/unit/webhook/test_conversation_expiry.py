@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta, timezone
+import fakeredis
+import uuid6
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+from app.whatsapp.team_inbox.operations.ConversationExpirySweeper import ConversationExpirySweeper
+from app.whatsapp.team_inbox.services.ConversationWindowService import ConversationWindowService
+from app.whatsapp.team_inbox.utils.conversation_status import ConversationStatus
+
+NOW = datetime(2025, 3, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """The real service over fakeredis, so the claim script runs as Lua."""
+    service = AsyncRedisService("localhost", 6379)
+    service._client = fakeredis.FakeAsyncRedis()
+    yield service
+    await service._client.aclose()
+
+@pytest.fixture
+def window_service(redis):
+    return ConversationWindowService(redis)
+
+
+@pytest.mark.asyncio
+async def test_a_page_of_windows_is_one_zmscore_per_shard(window_service, redis):
+    open_id, closed_id, unknown_id = str(uuid6.uuid7()), str(uuid6.uuid7()), str(uuid6.uuid7())
+    await window_service.open_window(open_id, now=NOW)
+    await window_service.open_window(closed_id, now=NOW - timedelta(days=2))
+    redis.zmscore = AsyncMock(wraps=redis.zmscore)
+
+    expirations = await window_service.expires_at_many([open_id, closed_id, unknown_id], now=NOW)
+
+    assert expirations == [NOW + timedelta(days=1), None, None]
+    shards = {RedisHelper.redis_conversation_expiry_index_key(c) for c in (open_id, closed_id, unknown_id)}
+    assert redis.zmscore.await_count == len(shards)
+
+
+@pytest.mark.asyncio
+async def test_windows_from_the_old_per_conversation_keys_are_indexed_on_read(window_service, redis):
+    from_api, from_worker = str(uuid6.uuid7()), str(uuid6.uuid7())
+    real_now = datetime.now(timezone.utc)
+    await redis.set(RedisHelper.redis_conversation_expired_key(from_api), NOW + timedelta(hours=3), ttl=86400)
+    await redis.set(RedisHelper.redis_conversation_expired_key(from_worker), "active", ttl=3600)
+
+    assert await window_service.expires_at(from_api, now=NOW) == NOW + timedelta(hours=3)
+    worker_expiry = await window_service.expires_at(from_worker, now=real_now)
+    assert timedelta(minutes=59) < worker_expiry - real_now <= timedelta(hours=1)
+
+    index_key = RedisHelper.redis_conversation_expiry_index_key
+    assert await redis.zscore(index_key(from_api), from_api) == (NOW + timedelta(hours=3)).timestamp()
+    assert await redis.zscore(index_key(from_worker), from_worker) == worker_expiry.timestamp()
+
+
+@pytest.mark.asyncio
+async def test_claim_expired_takes_only_lapsed_windows_once(window_service):
+    lapsed = [str(uuid6.uuid7()) for _ in range(3)]
+    for conversation_id in lapsed:
+        await window_service.open_window(conversation_id, now=NOW - timedelta(days=2))
+    await window_service.open_window("still-open", now=NOW)
+
+    first = await window_service.claim_expired(now=NOW, limit=2)
+    assert len(first) == 2
+    assert sorted(list(first) + list(await window_service.claim_expired(now=NOW))) == sorted(lapsed)
+    assert await window_service.claim_expired(now=NOW) == {}
+
+
+@pytest.mark.asyncio
+async def test_sweeper_expires_claimed_conversations_and_emits_status(window_service):
+    expired_id, reopened_id = uuid6.uuid7(), uuid6.uuid7()
+    window_service.claim_expired = AsyncMock(return_value={str(expired_id): 1.0, str(reopened_id): 1.0})
+    window_service.expires_at_many = AsyncMock(return_value=[None, NOW + timedelta(days=1)])
+    conversation_service = MagicMock()
+    conversation_service.expire_conversations = AsyncMock(return_value=[(expired_id, ConversationStatus.EXPIRED, "pn-1")])
+    socket_message = MagicMock()
+    socket_message.emit_conversation_expired = AsyncMock()
+    sweeper = ConversationExpirySweeper(window_service, conversation_service, socket_message, batch_size=10)
+
+    assert await sweeper.sweep() == 1
+    conversation_service.expire_conversations.assert_awaited_once_with([expired_id])
+    socket_message.emit_conversation_expired.assert_awaited_once_with(
+        conversation_id=str(expired_id), status="EXPIRED", phone_number_id="pn-1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_claimed_windows_go_back_when_closing_them_fails(window_service):
+    lapsed, reopened = str(uuid6.uuid7()), str(uuid6.uuid7())
+    await window_service.open_window(lapsed, now=NOW - timedelta(days=2))
+    await window_service.open_window(reopened, now=NOW - timedelta(days=2))
+    conversation_service = MagicMock()
+
+    async def fail_after_a_reopen(conversation_ids):
+        await window_service.open_window(reopened, now=NOW)
+        raise RuntimeError("database unavailable")
+
+    conversation_service.expire_conversations = AsyncMock(side_effect=fail_after_a_reopen)
+    sweeper = ConversationExpirySweeper(window_service, conversation_service, MagicMock())
+
+    with pytest.raises(RuntimeError):
+        await sweeper.sweep()
+
+    index_key = RedisHelper.redis_conversation_expiry_index_key
+    redis = window_service.redis_service
+    assert await redis.zscore(index_key(lapsed), lapsed) == (NOW - timedelta(days=1)).timestamp()
+    assert await redis.zscore(index_key(reopened), reopened) == (NOW + timedelta(days=1)).timestamp()
@@ -0,0 +1,117 @@
+import uuid6
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.real_time.webhook.services.MessageStatusPipeline import MessageStatusPipeline
+from app.whatsapp.team_inbox.models.Message import MessageStatusProjection
+
+
+@pytest.fixture
+def message_publisher():
+    publisher = MagicMock()
+    publisher.send_status_batch = AsyncMock()
+    return publisher
+
+@pytest.fixture
+def socket_message():
+    gateway = MagicMock()
+    gateway.emit_message_statuses = AsyncMock()
+    return gateway
+
+@pytest.fixture
+def conversation_id():
+    return uuid6.uuid7()
+
+@pytest.fixture
+def mongo_message(conversation_id):
+    crud = MagicMock()
+    crud.find_many = AsyncMock(return_value=[
+        MessageStatusProjection(_id=uuid6.uuid7(), conversation_id=conversation_id, wa_message_id="wamid.1"),
+        MessageStatusProjection(_id=uuid6.uuid7(), conversation_id=conversation_id, wa_message_id="wamid.2"),
+    ])
+    return crud
+
+@pytest.fixture
+def pipeline(message_publisher, mongo_message, socket_message):
+    return MessageStatusPipeline(
+        message_publisher=message_publisher,
+        mongo_message=mongo_message,
+        socket_message=socket_message,
+        flush_window=60,
+    )
+
+def status(wa_message_id: str, value: str, timestamp: int) -> dict:
+    return {"wa_message_id": wa_message_id, "status": value, "timestamp": str(timestamp)}
+
+
+@pytest.mark.asyncio
+async def test_statuses_collapse_to_latest_per_message(pipeline, message_publisher, socket_message, conversation_id):
+    await pipeline.add([
+        status("wamid.1", "sent", 100),
+        status("wamid.2", "sent", 100),
+        status("wamid.1", "read", 102),
+        status("wamid.1", "delivered", 101),
+    ])
+    pipeline._flush_task.cancel()
+
+    await pipeline.flush()
+
+    batch = message_publisher.send_status_batch.await_args.args[0]
+    assert {entry["wa_message_id"]: entry["status"] for entry in batch} == {"wamid.1": "read", "wamid.2": "sent"}
+
+    socket_message.emit_message_statuses.assert_awaited_once()
+    emitted = socket_message.emit_message_statuses.await_args.kwargs
+    assert emitted["conversation_id"] == str(conversation_id)
+    assert sorted(item["status"] for item in emitted["statuses"]) == ["read", "sent"]
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_flushes_immediately(message_publisher, mongo_message, socket_message):
+    pipeline = MessageStatusPipeline(
+        message_publisher=message_publisher,
+        mongo_message=mongo_message,
+        socket_message=socket_message,
+        flush_window=60,
+        max_batch_size=2,
+    )
+
+    await pipeline.add([status("wamid.1", "sent", 100), status("wamid.2", "sent", 100)])
+
+    message_publisher.send_status_batch.assert_awaited_once()
+    assert pipeline._flush_task is None
+
+
+@pytest.mark.asyncio
+async def test_close_flushes_the_buffered_window(pipeline, message_publisher):
+    await pipeline.add([status("wamid.1", "delivered", 100)])
+
+    await pipeline.close()
+
+    message_publisher.send_status_batch.assert_awaited_once()
+    assert pipeline._flush_task is None
+
+
+@pytest.mark.asyncio
+async def test_a_late_status_never_moves_a_message_back(pipeline, mongo_message, socket_message, conversation_id):
+    mongo_message.find_many.return_value = [
+        MessageStatusProjection(_id=uuid6.uuid7(), conversation_id=conversation_id, wa_message_id="wamid.1", message_status="read"),
+        MessageStatusProjection(_id=uuid6.uuid7(), conversation_id=conversation_id, wa_message_id="wamid.2", message_status="sent"),
+    ]
+    await pipeline.add([status("wamid.1", "delivered", 100), status("wamid.2", "delivered", 100)])
+
+    await pipeline.close()
+
+    emitted = socket_message.emit_message_statuses.await_args.kwargs["statuses"]
+    assert emitted == [{"message_id": str(mongo_message.find_many.return_value[1].id), "status": "delivered"}]
+
+
+@pytest.mark.asyncio
+async def test_a_status_the_worker_already_applied_is_still_emitted(pipeline, mongo_message, socket_message, conversation_id):
+    document = MessageStatusProjection(_id=uuid6.uuid7(), conversation_id=conversation_id, wa_message_id="wamid.1", message_status="read")
+    mongo_message.find_many.return_value = [document]
+    await pipeline.add([status("wamid.1", "read", 100)])
+
+    await pipeline.close()
+
+    emitted = socket_message.emit_message_statuses.await_args.kwargs["statuses"]
+    assert emitted == [{"message_id": str(document.id), "status": "read"}]
@@ -0,0 +1,67 @@
+import uuid6
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.real_time.webhook.services.TemplateHook import TemplateHook
+
+
+@pytest.fixture
+def template_id():
+    return uuid6.uuid7()
+
+@pytest.fixture
+def template_service(template_id):
+    service = MagicMock()
+    service.update_statuses_by_wa_id = AsyncMock(return_value={template_id: "APPROVED"})
+    service.get_existing_wa_ids = AsyncMock(return_value={"123"})
+    return service
+
+@pytest.fixture
+def mongo_crud():
+    crud = MagicMock()
+    crud.bulk_write = AsyncMock()
+    return crud
+
+@pytest.fixture
+def template_hook(template_service, mongo_crud):
+    return TemplateHook(
+        template_service=template_service,
+        client_service=MagicMock(),
+        business_profile_service=MagicMock(),
+        mongo_crud=mongo_crud,
+        wa_template_api=MagicMock(),
+        flush_window=60,
+    )
+
+def status_event(event: str, template_wa_id: int = 123) -> dict:
+    return {"profile_id": "1691192741820643", "message_template_id": template_wa_id, "event": event}
+
+
+@pytest.mark.asyncio
+async def test_status_burst_is_coalesced_into_one_write(template_hook, template_service, mongo_crud):
+    for event in ["PENDING", "REJECTED", "APPROVED"]:
+        await template_hook.handle_message_template_status_update(status_event(event))
+    template_hook._flush_task.cancel()
+
+    await template_hook.flush_pending_updates()
+
+    template_service.update_statuses_by_wa_id.assert_awaited_once_with({"123": "APPROVED"})
+    template_service.get_existing_wa_ids.assert_not_awaited()
+    operations = mongo_crud.bulk_write.await_args.args[0]
+    assert len(operations) == 1
+    assert operations[0]._doc["$set"]["status"] == "APPROVED"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_statuses_skip_mongo_and_unknown_templates_are_created(template_hook, template_service, mongo_crud):
+    template_service.update_statuses_by_wa_id.return_value = {}
+    template_hook.handle_create_template = AsyncMock()
+    await template_hook.handle_message_template_status_update(status_event("APPROVED"))
+    await template_hook.handle_message_template_status_update(status_event("APPROVED", template_wa_id=456))
+
+    await template_hook.close()
+
+    template_service.get_existing_wa_ids.assert_awaited_once_with(["123", "456"])
+    template_hook.handle_create_template.assert_awaited_once_with(status_event("APPROVED", template_wa_id=456))
+    mongo_crud.bulk_write.assert_not_awaited()
+    assert template_hook._flush_task is None
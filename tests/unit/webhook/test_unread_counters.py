@@ -0,0 +1,72 @@
+import fakeredis
+import pytest
+import pytest_asyncio
+
+from app.core.storage.redis import AsyncRedisService
+from app.utils.RedisHelper import RedisHelper
+from app.whatsapp.team_inbox.services.UnreadCounterService import UnreadCounterService, UnreadCounts
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """The real service over fakeredis, so the counter scripts run as Lua."""
+    service = AsyncRedisService("localhost", 6379)
+    service._client = fakeredis.FakeAsyncRedis()
+    yield service
+    await service._client.aclose()
+
+
+@pytest.fixture
+def counters(redis):
+    return UnreadCounterService(redis)
+
+
+@pytest.mark.asyncio
+async def test_counts_and_business_total_move_together(counters):
+    await counters.increment("bp-1", "c-1")
+    await counters.increment("bp-1", "c-1")
+    assert await counters.increment("bp-1", "c-2") == UnreadCounts(conversation=1, total=3)
+
+    assert await counters.counts("bp-1", ["c-1", "c-2", "c-3"]) == [2, 1, 0]
+    assert await counters.reset("bp-1", "c-1", last_read_message_id="1-0") == UnreadCounts(conversation=2, total=1)
+    assert await counters.total("bp-1") == 1
+    assert await counters.get("bp-1", "c-1") == UnreadCounts(conversation=0, total=1)
+
+
+@pytest.mark.asyncio
+async def test_businesses_are_counted_separately(counters):
+    await counters.increment("bp-1", "c-1")
+
+    assert await counters.total("bp-2") == 0
+    assert await counters.counts("bp-2", ["c-1"]) == [0]
+
+
+async def legacy_count(redis, conversation_id, count):
+    # What the per-conversation hash looked like before the business hash: a bare counter
+    # from HINCRBY next to JSON fields.
+    key = RedisHelper.redis_business_conversation_unread_key(conversation_id)
+    await redis.hincrby(key, "unread_count", count)
+    await redis.hset(key, {"last_read_message_id": "0-0"}, use_json=True)
+
+
+@pytest.mark.asyncio
+async def test_legacy_counts_are_moved_into_the_business_hash_once(counters, redis):
+    await legacy_count(redis, "c-1", 3)
+    await legacy_count(redis, "c-2", 2)
+
+    assert await counters.counts("bp-1", ["c-1", "c-3"]) == [3, 0]
+    assert await counters.counts("bp-1", ["c-1"]) == [3]
+    assert await counters.increment("bp-1", "c-2") == UnreadCounts(conversation=3, total=6)
+    assert await counters.total("bp-1") == 6
+    assert await redis.hgetall(RedisHelper.redis_business_conversation_unread_key("c-1"), use_json=True) == {
+        "last_read_message_id": "0-0"
+    }
+
+
+@pytest.mark.asyncio
+async def test_a_legacy_count_is_cleared_by_marking_read_without_touching_the_total(counters, redis):
+    await counters.increment("bp-1", "c-2")
+    await legacy_count(redis, "c-1", 4)
+
+    assert await counters.reset("bp-1", "c-1") == UnreadCounts(conversation=4, total=1)
+    assert await counters.get("bp-1", "c-1") == UnreadCounts(conversation=0, total=1)
@@ -0,0 +1,37 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import fakeredis
+import pytest
+
+from my_celery.database.redis import RedisService
+from my_celery.tasks import process_received_message_task as module
+from my_celery.utils.RedisHelper import RedisHelper
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    service = RedisService("localhost", 6379)
+    service._client = fakeredis.FakeRedis()
+    monkeypatch.setattr(module, "get_redis_service", lambda: service)
+    return service
+
+
+def test_windows_from_both_legacy_formats_are_read_and_indexed(redis):
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=3)
+    redis.set(RedisHelper.redis_conversation_expired_key("from-api"), expires_at, ttl=86400)
+    redis.set(RedisHelper.redis_conversation_expired_key("from-worker"), "active", ttl=3600)
+
+    assert module._conversation_window_expires_at("from-api") == pytest.approx(expires_at.timestamp())
+    assert 3500 < module.get_conversation_time_remaining("from-worker", MagicMock()) <= 3600
+    assert module.check_conversation_expiration("from-worker", MagicMock()) is False
+
+    index_key = RedisHelper.redis_conversation_expiry_index_key
+    assert redis.zscore(index_key("from-api"), "from-api") == pytest.approx(expires_at.timestamp())
+    assert redis.zscore(index_key("from-worker"), "from-worker") == pytest.approx(time.time() + 3600, abs=5)
+
+
+def test_missing_windows_are_not_indexed(redis):
+    assert module._conversation_window_expires_at("unknown") is None
+    assert redis.zscore(RedisHelper.redis_conversation_expiry_index_key("unknown"), "unknown") is None
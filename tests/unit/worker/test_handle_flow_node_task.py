@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from my_celery.tasks import handle_flow_node_task as module
+
+TASK = module.handle_flow_node_task
+
+
+def node(node_id, node_type="message", next_nodes=None, is_final=False):
+    return SimpleNamespace(id=node_id, type=SimpleNamespace(value=node_type), next_nodes=next_nodes, is_final=is_final)
+
+
+@pytest.fixture
+def flow(monkeypatch):
+    flow = MagicMock()
+    flow.nodes, flow.events, flow.failing = {}, [], set()
+    flow.context = MagicMock()
+    flow.context.update_current_node.side_effect = lambda **kwargs: flow.events.append(("context", kwargs["new_current_node_id"]))
+
+    def message_node_handler(message_node, business_data, conversation_id):
+        if message_node.id in flow.failing:
+            raise RuntimeError("graph down")
+        flow.events.append(("send", message_node.id))
+        return [object()]
+
+    crud = MagicMock()
+    crud.get_by_id.side_effect = lambda node_id: flow.nodes.get(node_id)
+    monkeypatch.setattr(module, "get_chatbot_context_service", lambda: flow.context)
+    monkeypatch.setattr(module, "get_chatbot_crud", lambda: crud)
+    monkeypatch.setattr(module, "message_node_handler", message_node_handler)
+    monkeypatch.setattr(module, "handle_flow_completion", flow.handle_flow_completion)
+    monkeypatch.setattr(module, "get_next_node", lambda current_node_id, **kwargs: flow.nodes[flow.nodes[current_node_id].next_nodes])
+    monkeypatch.setattr(TASK, "delay", flow.delay)
+    monkeypatch.setattr(TASK, "retry", flow.retry)
+    monkeypatch.setattr(TASK, "logger", MagicMock(), raising=False)
+    return flow
+
+
+def add_chain(flow, *nodes):
+    for item in nodes:
+        flow.nodes[item.id] = item
+
+
+def payload(current_node_id="start"):
+    return {"conversation_id": "conv-1", "current_node_id": current_node_id, "business_data": {"chatbot_id": "bot-1"}}
+
+
+def test_message_nodes_run_in_one_task_and_each_is_saved_in_the_context_before_it_is_sent(flow):
+    add_chain(flow, node("start", "question", "a"), node("a", next_nodes="b"), node("b", next_nodes="q"), node("q", "question"))
+
+    result = TASK.run(payload())
+
+    assert flow.events == [
+        ("context", "a"), ("send", "a"), ("context", "b"), ("send", "b"), ("context", "q"), ("send", "q"),
+    ]
+    assert flow.context.update_current_node.call_args.kwargs["waiting_for_response"] is True
+    assert (result["processed_node"], result["messages_created"], result["flow_continues"]) == ("q", 3, False)
+    flow.delay.assert_not_called()
+    flow.handle_flow_completion.assert_not_called()
+
+
+def test_a_failed_step_resumes_from_the_last_sent_node(flow):
+    add_chain(flow, node("start", "question", "a"), node("a", next_nodes="b"), node("b"))
+    flow.failing.add("b")
+
+    result = TASK.run(payload())
+
+    assert flow.events == [("context", "a"), ("send", "a"), ("context", "b")]
+    assert flow.delay.call_args.args[0]["current_node_id"] == "a"
+    assert result["flow_continues"] is True
+
+
+def test_the_flow_completes_after_its_last_message_node(flow):
+    add_chain(flow, node("start", "question", "a"), node("a", next_nodes="b"), node("b"))
+
+    TASK.run(payload())
+
+    flow.handle_flow_completion.assert_called_once_with("conv-1", "b", {"chatbot_id": "bot-1"})
+    flow.delay.assert_not_called()
+
+
+def test_a_spent_step_budget_hands_the_rest_to_a_new_task(flow):
+    add_chain(flow, node("a", next_nodes="b"), node("b", next_nodes="c"), node("c", next_nodes="d"), node("d"))
+
+    run = module.run_auto_advancing_nodes(flow.nodes["a"], "conv-1", {"chatbot_id": "bot-1"}, max_steps=2)
+
+    assert (run["last_node"].id, run["steps"], run["budget_exhausted"]) == ("c", 2, True)
+    assert flow.events == [("context", "b"), ("send", "b"), ("context", "c"), ("send", "c")]
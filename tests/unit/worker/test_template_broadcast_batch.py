@@ -0,0 +1,83 @@
+import uuid
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from requests import HTTPError, Response
+
+from my_celery.tasks import template_broadcast_batch as module
+
+TASK = module.template_broadcast_batch
+
+
+def graph_error(status_code: int) -> HTTPError:
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(f"{status_code} error", response=response)
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = MagicMock()
+    worker.outcomes = {}
+    worker.message_crud = MagicMock()
+
+    def send_template_message(accessToken, phone_number_id, payload):
+        worker.sends.append(payload["to"])
+        outcome = worker.outcomes.get(payload["to"], "ok")
+        if isinstance(outcome, Exception):
+            raise outcome
+        return {"messages": [{"id": f"wamid.{payload['to']}"}]}
+
+    @contextmanager
+    def get_db():
+        db = MagicMock()
+        db.execute.side_effect = lambda statement, params: MagicMock(fetchall=lambda: [
+            (wa_message_id, uuid.uuid4(), uuid.uuid4()) for wa_message_id in params["p_whatsapp_message_ids"]
+        ])
+        worker.db_calls.append(db)
+        yield db
+
+    worker.sends, worker.db_calls = [], []
+    monkeypatch.setattr(module, "send_template_message", send_template_message)
+    monkeypatch.setattr(module, "get_db", get_db)
+    monkeypatch.setattr(module, "get_message_crud", lambda: worker.message_crud)
+    monkeypatch.setattr(TASK, "retry_task", worker.retry_task, raising=False)
+    monkeypatch.setattr(TASK, "logger", MagicMock(), raising=False)
+    TASK.push_request(retries=0)
+    yield worker
+    TASK.pop_request()
+
+
+def batch(numbers):
+    return {
+        "user_id": str(uuid.uuid4()), "business_number": "+962790000000", "business_token": "token",
+        "business_number_id": "pn-1", "original_template_body": {}, "numbers": numbers,
+        "whatsapp_message_body": {"messaging_product": "whatsapp", "type": "template", "template": {}},
+    }
+
+
+def test_transient_failures_are_sent_again_and_invalid_numbers_never_sent(worker):
+    worker.outcomes = {"+962791111112": graph_error(429), "+962791111113": graph_error(400)}
+
+    TASK.run(batch(["+962791111111", "not-a-number", "+962791111112", "+962791111113"]))
+
+    assert worker.sends == ["+962791111111", "+962791111112", "+962791111113"]
+    assert worker.db_calls[0].execute.call_args.args[1]["p_whatsapp_message_ids"] == ["wamid.+962791111111"]
+    assert len(worker.message_crud.bulk_write.call_args.args[0]) == 1
+    retry = worker.retry_task.call_args.kwargs
+    assert isinstance(retry["exc"], module.TemplateSendDeferred)
+    assert retry["args"][0]["numbers"] == ["+962791111112"]
+
+
+def test_a_failed_mongo_write_is_retried_without_sending_or_persisting_again(worker):
+    worker.message_crud.bulk_write.side_effect = [RuntimeError("mongo down"), None]
+
+    TASK.run(batch(["+962791111111"]))
+    retried = worker.retry_task.call_args.kwargs["args"][0]
+    TASK.run(retried)
+
+    assert worker.sends == ["+962791111111"]
+    assert len(worker.db_calls) == 1
+    assert worker.message_crud.bulk_write.call_count == 2
+    assert len(retried["persisted"]) == 1